@@ -20,7 +20,9 @@ from PySide6.QtWidgets import (
     QFrame
 )
 
+from ..encode.ffmpeg import get_custom_preset_names
 from ..gl.uniforms import UserParameter
+from ..render.memory_plan import plan_render_memory, MB
 
 
 class ShaderDock(QDockWidget):
@@ -463,6 +465,33 @@ class ExportDock(QDockWidget):
         self.fps_spin.setValue(30)
         output_layout.addRow("FPS:", self.fps_spin)
         
+        # Frame range (global frame numbers; end is exclusive)
+        range_container = QWidget()
+        range_layout = QHBoxLayout(range_container)
+        range_layout.setContentsMargins(0, 0, 0, 0)
+        
+        self.frame_start_spin = QSpinBox()
+        self.frame_start_spin.setRange(0, 1000000)
+        self.frame_start_spin.setToolTip("First frame to render")
+        range_layout.addWidget(self.frame_start_spin)
+        
+        range_layout.addWidget(QLabel("to"))
+        
+        self.frame_end_spin = QSpinBox()
+        self.frame_end_spin.setRange(0, 1000000)
+        self.frame_end_spin.setSpecialValueText("End")
+        self.frame_end_spin.setToolTip("Frame to stop before")
+        range_layout.addWidget(self.frame_end_spin)
+        
+        range_layout.addWidget(QLabel("every"))
+        
+        self.frame_stride_spin = QSpinBox()
+        self.frame_stride_spin.setRange(1, 1000)
+        self.frame_stride_spin.setToolTip("Render every Nth frame")
+        range_layout.addWidget(self.frame_stride_spin)
+        
+        output_layout.addRow("Frames:", range_container)
+        
         layout.addWidget(output_group)
         
         # Quality settings
@@ -478,6 +507,42 @@ class ExportDock(QDockWidget):
         self.accumulation_spin.setValue(1)
         quality_layout.addRow("Accumulation:", self.accumulation_spin)
         
+        self.shutter_spin = QDoubleSpinBox()
+        self.shutter_spin.setRange(0, 360)
+        self.shutter_spin.setSingleStep(45)
+        self.shutter_spin.setSuffix("°")
+        self.shutter_spin.setSpecialValueText("Off")
+        self.shutter_spin.setToolTip(
+            "Motion blur shutter angle; spreads the accumulation samples\n"
+            "over the shutter interval instead of adding samples"
+        )
+        quality_layout.addRow("Motion blur:", self.shutter_spin)
+        
+        # Memory budgets (frames are rendered in bands to fit)
+        self.host_budget_spin = QSpinBox()
+        self.host_budget_spin.setRange(0, 262144)
+        self.host_budget_spin.setSingleStep(256)
+        self.host_budget_spin.setSuffix(" MB")
+        self.host_budget_spin.setSpecialValueText("Unlimited")
+        quality_layout.addRow("Host memory:", self.host_budget_spin)
+        
+        self.gpu_budget_spin = QSpinBox()
+        self.gpu_budget_spin.setRange(0, 262144)
+        self.gpu_budget_spin.setSingleStep(256)
+        self.gpu_budget_spin.setSuffix(" MB")
+        self.gpu_budget_spin.setSpecialValueText("Unlimited")
+        quality_layout.addRow("GPU memory:", self.gpu_budget_spin)
+        
+        self.memory_label = QLabel()
+        self.memory_label.setWordWrap(True)
+        self.memory_label.setStyleSheet("font-size: 10px;")
+        quality_layout.addRow(self.memory_label)
+        
+        for spin in (self.width_spin, self.height_spin, self.accumulation_spin,
+                     self.host_budget_spin, self.gpu_budget_spin):
+            spin.valueChanged.connect(self._update_memory_estimate)
+        self.supersample_combo.currentTextChanged.connect(self._update_memory_estimate)
+        
         layout.addWidget(quality_group)
         
         # Export options
@@ -489,6 +554,41 @@ class ExportDock(QDockWidget):
         self.save_png_cb.setEnabled(False)  # Always on for now
         options_layout.addWidget(self.save_png_cb)
         
+        # Frame format
+        format_layout = QHBoxLayout()
+        format_layout.addWidget(QLabel("Frames:"))
+        
+        self.frame_format_combo = QComboBox()
+        self.frame_format_combo.addItems(["png", "qoi", "tiff", "npy", "store"])
+        self.frame_format_combo.setToolTip(
+            "Intermediate frame format (npy frames cannot be encoded by FFmpeg;\n"
+            "store writes one memory-mapped raw file for fast re-encoding)"
+        )
+        self.frame_format_combo.currentTextChanged.connect(self._on_frame_format_changed)
+        format_layout.addWidget(self.frame_format_combo)
+        
+        format_layout.addWidget(QLabel("PNG level:"))
+        self.png_level_spin = QSpinBox()
+        self.png_level_spin.setRange(0, 9)
+        self.png_level_spin.setValue(1)
+        self.png_level_spin.setToolTip("zlib compression level (0 = fastest, 9 = smallest)")
+        format_layout.addWidget(self.png_level_spin)
+        options_layout.addLayout(format_layout)
+        
+        # Bit depth
+        depth_layout = QHBoxLayout()
+        depth_layout.addWidget(QLabel("Bit depth:"))
+        
+        self.bit_depth_combo = QComboBox()
+        self.bit_depth_combo.addItems(["Auto", "8-bit", "16-bit"])
+        self.bit_depth_combo.setToolTip(
+            "Bits per sample of the rendered frames (Auto = 16-bit for the\n"
+            "10-bit ProRes codecs, which avoids banding in gradients)"
+        )
+        self.bit_depth_combo.currentTextChanged.connect(self._update_memory_estimate)
+        depth_layout.addWidget(self.bit_depth_combo)
+        options_layout.addLayout(depth_layout)
+        
         self.encode_video_cb = QCheckBox("Encode video")
         self.encode_video_cb.setChecked(True)
         options_layout.addWidget(self.encode_video_cb)
@@ -501,7 +601,9 @@ class ExportDock(QDockWidget):
         self.codec_combo.addItems([
             "h264_high", "h264_medium", "h264_compat",
             "h265_high", "prores_422", "prores_4444",
-            "avi_mjpeg", "avi_uncompressed", "avi_huffyuv"
+            "avi_mjpeg", "avi_uncompressed", "avi_huffyuv",
+            "gif", "gif_frame_palette", "webp", "apng", "apng_16bit",
+            *get_custom_preset_names()
         ])
         codec_layout.addWidget(self.codec_combo)
         options_layout.addLayout(codec_layout)
@@ -540,6 +642,7 @@ class ExportDock(QDockWidget):
         self.setWidget(widget)
         
         self._rendering = False
+        self._update_memory_estimate()
     
     def _browse_output(self):
         """Browse for output directory."""
@@ -550,6 +653,33 @@ class ExportDock(QDockWidget):
         if dir_path:
             self.dir_edit.setText(dir_path)
     
+    def _update_memory_estimate(self, *args):
+        """Show the memory plan for the current quality settings."""
+        settings = self.get_settings()
+        plan = plan_render_memory(
+            width=settings["width"],
+            height=settings["height"],
+            supersample_scale=settings["supersample_scale"],
+            accumulation_samples=settings["accumulation_samples"],
+            host_budget_mb=settings["host_memory_budget_mb"],
+            gpu_budget_mb=settings["gpu_memory_budget_mb"],
+            bit_depth=settings["bit_depth"]
+        )
+        text = (f"Peak ≈ {plan.host_peak_bytes / MB:.0f} MB host, "
+                f"{plan.gpu_peak_bytes / MB:.0f} MB GPU")
+        if plan.tiled:
+            text += f" ({plan.tiles} bands)"
+        if not plan.fits:
+            text += f"\nOver budget: {plan.reason}"
+        self.memory_label.setText(text)
+        self.memory_label.setStyleSheet(
+            "font-size: 10px;" + ("" if plan.fits else " color: red;")
+        )
+    
+    def _on_frame_format_changed(self, text: str):
+        """Handle frame format change."""
+        self.png_level_spin.setEnabled(text == "png")
+    
     def _on_render_clicked(self):
         """Handle render button click."""
         self.render_clicked.emit()
@@ -557,6 +687,7 @@ class ExportDock(QDockWidget):
     def get_settings(self) -> dict:
         """Get current export settings."""
         ss_map = {"1x": 1, "2x": 2, "4x": 4}
+        depth_map = {"Auto": 0, "8-bit": 8, "16-bit": 16}
         return {
             "output_dir": self.dir_edit.text(),
             "width": self.width_spin.value(),
@@ -564,6 +695,15 @@ class ExportDock(QDockWidget):
             "fps": self.fps_spin.value(),
             "supersample_scale": ss_map.get(self.supersample_combo.currentText(), 1),
             "accumulation_samples": self.accumulation_spin.value(),
+            "shutter_angle": self.shutter_spin.value(),
+            "host_memory_budget_mb": self.host_budget_spin.value(),
+            "gpu_memory_budget_mb": self.gpu_budget_spin.value(),
+            "frame_format": self.frame_format_combo.currentText(),
+            "png_compress_level": self.png_level_spin.value(),
+            "bit_depth": depth_map.get(self.bit_depth_combo.currentText(), 0),
+            "frame_start": self.frame_start_spin.value(),
+            "frame_end": self.frame_end_spin.value(),
+            "frame_stride": self.frame_stride_spin.value(),
             "save_png": self.save_png_cb.isChecked(),
             "encode_video": self.encode_video_cb.isChecked(),
             "codec": self.codec_combo.currentText(),
@@ -580,8 +720,19 @@ class ExportDock(QDockWidget):
         self.width_spin.setEnabled(not rendering)
         self.height_spin.setEnabled(not rendering)
         self.fps_spin.setEnabled(not rendering)
+        self.frame_start_spin.setEnabled(not rendering)
+        self.frame_end_spin.setEnabled(not rendering)
+        self.frame_stride_spin.setEnabled(not rendering)
         self.supersample_combo.setEnabled(not rendering)
         self.accumulation_spin.setEnabled(not rendering)
+        self.shutter_spin.setEnabled(not rendering)
+        self.host_budget_spin.setEnabled(not rendering)
+        self.gpu_budget_spin.setEnabled(not rendering)
+        self.frame_format_combo.setEnabled(not rendering)
+        self.bit_depth_combo.setEnabled(not rendering)
+        self.png_level_spin.setEnabled(
+            not rendering and self.frame_format_combo.currentText() == "png"
+        )
     
     def update_progress(self, current: int, total: int):
         """Update progress bar."""
@@ -5,16 +5,17 @@ for shader editing, preview, timeline, parameters, and export.
 """
 
 import os
+import threading
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
-from PySide6.QtCore import Qt, Slot, QFileSystemWatcher, QTimer
+from PySide6.QtCore import Qt, QObject, Signal, Slot, QFileSystemWatcher, QTimer
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QDockWidget, QStatusBar, QMenuBar, QMenu,
     QFileDialog, QMessageBox, QLabel
 )
-from PySide6.QtGui import QAction, QKeySequence
+from PySide6.QtGui import QAction, QActionGroup, QKeySequence
 
 from ..gl.preview_widget import PreviewGLWidget
 from ..gl.uniforms import parse_params_from_source
@@ -24,6 +25,18 @@ from .docks import (
 from .models import Project, save_project, load_project
 
 
+class EncodeSignals(QObject):
+    """Signals of background encodes, emitted from their threads.
+    
+    Signals:
+        log_message: Emitted with log messages
+        finished: Emitted when an encode ends (success, video_path)
+    """
+    
+    log_message = Signal(str)
+    finished = Signal(bool, str)
+
+
 class MainWindow(QMainWindow):
     """Main application window."""
     
@@ -42,6 +55,11 @@ class MainWindow(QMainWindow):
         self.file_watcher.fileChanged.connect(self._on_shader_file_changed)
         self.auto_reload = True
         
+        # Encodes run in the background so the next render can start
+        self.encode_signals = EncodeSignals(self)
+        self._encoders: List = []
+        self._closing = False
+        
         # Set up UI
         self._setup_menu()
         self._setup_central_widget()
@@ -110,7 +128,23 @@ class MainWindow(QMainWindow):
         view_menu = QMenu("&View", self)
         menu_bar.addMenu(view_menu)
         
-        # Will add dock visibility toggles here
+        # Preview render scale; heavy shaders render fewer pixels
+        scale_menu = view_menu.addMenu("Preview &Scale")
+        self.scale_actions = QActionGroup(self)
+        for scale in (1.0, 0.75, 0.5, 0.25):
+            action = QAction(f"{scale:.0%}", self)
+            action.setCheckable(True)
+            action.setData(scale)
+            action.setChecked(scale == 1.0)
+            action.triggered.connect(lambda _, scale=scale: self._on_render_scale_changed(scale))
+            self.scale_actions.addAction(action)
+            scale_menu.addAction(action)
+        
+        self.smooth_upscale_action = QAction("Smooth &Upscaling", self)
+        self.smooth_upscale_action.setCheckable(True)
+        self.smooth_upscale_action.setChecked(True)
+        self.smooth_upscale_action.toggled.connect(self._on_upscale_filter_changed)
+        view_menu.addAction(self.smooth_upscale_action)
         
         # Help menu
         help_menu = QMenu("&Help", self)
@@ -194,6 +228,10 @@ class MainWindow(QMainWindow):
         
         # Export dock signals
         self.export_dock.render_clicked.connect(self._start_render)
+        
+        # Background encode signals
+        self.encode_signals.log_message.connect(self.export_dock.add_log)
+        self.encode_signals.finished.connect(self._on_encode_finished)
     
     def _load_default_shader(self):
         """Load the default example shader."""
@@ -322,6 +360,28 @@ class MainWindow(QMainWindow):
         total = self.preview_widget.timeline.total_frames
         self.frame_label.setText(f"Frame: {self.preview_widget.current_frame} / {total}")
     
+    def _on_render_scale_changed(self, scale: float):
+        """Handle preview render scale change."""
+        self.preview_widget.set_render_scale(scale)
+        self.project.preview.render_scale = scale
+    
+    @Slot(bool)
+    def _on_upscale_filter_changed(self, linear: bool):
+        """Handle preview upscale filter change."""
+        self.preview_widget.set_upscale_filter(linear)
+        self.project.preview.upscale_filter = "linear" if linear else "nearest"
+    
+    def _apply_preview_settings(self):
+        """Show the project's preview scale and filter in the preview and menu."""
+        preview = self.project.preview
+        self.preview_widget.set_render_scale(preview.render_scale)
+        self.preview_widget.set_upscale_filter(preview.upscale_filter != "nearest")
+        for action in self.scale_actions.actions():
+            action.setChecked(action.data() == self.preview_widget.render_scale)
+        self.smooth_upscale_action.blockSignals(True)
+        self.smooth_upscale_action.setChecked(preview.upscale_filter != "nearest")
+        self.smooth_upscale_action.blockSignals(False)
+    
     @Slot(float)
     def _on_seed_changed(self, seed: float):
         """Handle seed change."""
@@ -409,10 +469,35 @@ class MainWindow(QMainWindow):
             return
         
         # Import here to avoid circular imports
+        from ..encode.ffmpeg import get_render_bit_depth
+        from ..encode.probe import check_presets
         from ..render.offline_worker import OfflineRenderWorker, create_render_thread
+        from ..render.scheduler import RENDER, get_scheduler
+        
+        # Fail now, not after the render, if the codec cannot be encoded
+        if settings.get("encode_video"):
+            problems = check_presets([settings.get("codec", "h264_high")])
+            if problems:
+                QMessageBox.warning(self, "Cannot Encode", "\n".join(problems))
+                return
+        
+        # Post pass files are relative to the project file
+        post_passes = self._project_post_passes()
+        
+        # 10-bit codecs get 16-bit frames unless a depth was chosen
+        bit_depth = get_render_bit_depth(
+            settings.get("codec", "") if settings.get("encode_video") else "",
+            settings.get("bit_depth", 0)
+        )
+        
+        # Renders take a render slot, as background encodes take an encode slot
+        scheduler = get_scheduler()
+        render_stats = scheduler.stats()[RENDER]
+        if render_stats["busy"] >= render_stats["slots"]:
+            self.export_dock.add_log("Waiting for the running render to finish...")
         
         # Create worker and thread
-        self.render_worker = OfflineRenderWorker()
+        self.render_worker = OfflineRenderWorker(scheduler=scheduler)
         self.render_worker.configure(
             shader_source=shader_source,
             output_dir=settings["output_dir"],
@@ -423,11 +508,21 @@ class MainWindow(QMainWindow):
             seed=self.project.seed,
             supersample_scale=settings.get("supersample_scale", 1),
             accumulation_samples=settings.get("accumulation_samples", 1),
+            shutter_angle=settings.get("shutter_angle", 0.0),
+            bit_depth=bit_depth,
+            post_passes=post_passes,
             complexity=self.preview_widget.uniform_manager.standard.complexity,
             force=self.preview_widget.uniform_manager.standard.force,
             force2=self.preview_widget.uniform_manager.standard.force2,
             base_hue_rad=self.preview_widget.uniform_manager.standard.base_hue_rad,
-            color_mode=self.preview_widget.uniform_manager.standard.color_mode
+            color_mode=self.preview_widget.uniform_manager.standard.color_mode,
+            frame_format=settings.get("frame_format", "png"),
+            png_compress_level=settings.get("png_compress_level", 1),
+            host_memory_budget_mb=settings.get("host_memory_budget_mb", 0),
+            gpu_memory_budget_mb=settings.get("gpu_memory_budget_mb", 0),
+            frame_start=settings.get("frame_start", 0),
+            frame_end=settings.get("frame_end", 0),
+            frame_stride=settings.get("frame_stride", 1)
         )
         
         # Connect worker signals
@@ -443,6 +538,24 @@ class MainWindow(QMainWindow):
         self.export_dock.set_rendering(True)
         self.status_bar.showMessage("Rendering started...", 2000)
     
+    def _project_post_passes(self) -> list:
+        """Post pass specs of the project, with absolute file paths."""
+        from ..gl.post_process import resolve_post_pass_paths
+        
+        base_dir = self.project_path.parent if self.project_path else Path.cwd()
+        return resolve_post_pass_paths(self.project.offline.post_passes, base_dir)
+    
+    def _apply_post_passes(self):
+        """Show the project's post passes in the preview."""
+        from ..gl.post_process import create_post_passes
+        
+        try:
+            passes = create_post_passes(self._project_post_passes())
+        except (OSError, ValueError) as e:
+            passes = []
+            self.status_bar.showMessage(f"Post passes disabled: {e}", 5000)
+        self.preview_widget.set_post_passes(passes)
+    
     @Slot(bool)
     def _on_render_finished(self, success: bool):
         """Handle render completion."""
@@ -468,29 +581,91 @@ class MainWindow(QMainWindow):
         QMessageBox.critical(self, "Render Error", message)
     
     def _encode_video(self, settings: dict):
-        """Encode rendered frames to video.
+        """Encode rendered frames to video in the background.
+        
+        The encode waits for an encode slot of the process-wide scheduler
+        and runs with its FFmpeg thread budget, so the next render can
+        start while this one encodes.
         
         Args:
             settings: Export settings dictionary
         """
-        from ..encode.ffmpeg import encode_frames
+        from ..encode.ffmpeg import (
+            FFmpegEncoder, encode_render_output, get_output_path_for_preset
+        )
+        from ..render.frame_store import FRAME_STORE_FORMAT
+        from ..render.image_writer import create_frame_writer
+        from ..render.manifest import get_render_coverage
+        from ..render.scheduler import ENCODE, get_scheduler
         
         output_dir = settings["output_dir"]
         fps = settings.get("fps", 30.0)
         codec = settings.get("codec", "h264_high")
+        frame_format = settings.get("frame_format", "png")
         
-        video_path = os.path.join(output_dir, "output.mp4")
+        # Frame-range renders are encoded once the whole loop is covered
+        manifest = get_render_coverage(output_dir)
+        if manifest is not None and not manifest.complete:
+            self.export_dock.add_log(
+                f"Skipping video encoding: partial render ({manifest.describe()})"
+            )
+            self.status_bar.showMessage("Render complete!", 3000)
+            return
         
-        self.export_dock.add_log("Starting video encoding...")
+        if frame_format != FRAME_STORE_FORMAT:
+            writer = create_frame_writer(frame_format)
+            if not writer.ffmpeg_readable:
+                self.export_dock.add_log(
+                    f"Skipping video encoding: FFmpeg cannot read .{writer.extension} frames"
+                )
+                self.status_bar.showMessage("Render complete!", 3000)
+                return
         
-        success = encode_frames(
-            frames_dir=output_dir,
-            output_path=video_path,
-            fps=fps,
-            preset=codec,
-            log_callback=self.export_dock.add_log
+        video_path = get_output_path_for_preset(
+            os.path.join(output_dir, "output.mp4"), codec
         )
         
+        scheduler = get_scheduler()
+        encode_stats = scheduler.stats()[ENCODE]
+        if encode_stats["busy"] >= encode_stats["slots"]:
+            self.export_dock.add_log("Waiting for the running encode to finish...")
+        
+        encoder = FFmpegEncoder()
+        self._encoders.append(encoder)
+        signals = self.encode_signals
+        
+        def run():
+            success = False
+            try:
+                with scheduler.slot(ENCODE, cancelled=lambda: self._closing) as slot:
+                    if slot is None:
+                        return
+                    encoder.threads = slot.threads
+                    source = "frame store" if frame_format == FRAME_STORE_FORMAT else "frames"
+                    signals.log_message.emit(f"Starting video encoding from {source}...")
+                    success = encode_render_output(
+                        output_dir=output_dir,
+                        output_path=video_path,
+                        fps=fps,
+                        preset=codec,
+                        frame_format=frame_format,
+                        log_callback=signals.log_message.emit,
+                        encoder=encoder
+                    )
+            except Exception as e:
+                signals.log_message.emit(f"Video encoding failed: {e}")
+            finally:
+                self._encoders.remove(encoder)
+                signals.finished.emit(success, video_path)
+        
+        threading.Thread(target=run, name="looplab-encode", daemon=True).start()
+        self.status_bar.showMessage("Encoding video in the background...", 3000)
+    
+    @Slot(bool, str)
+    def _on_encode_finished(self, success: bool, video_path: str):
+        """Handle the end of a background encode."""
+        if self._closing:
+            return
         if success:
             self.status_bar.showMessage("Video encoded successfully!", 3000)
             QMessageBox.information(
@@ -508,6 +683,8 @@ class MainWindow(QMainWindow):
         self.project_path = None
         self.setWindowTitle("LoopLab - GLSL Loop Shader Tool")
         self._load_default_shader()
+        self.preview_widget.set_post_passes([])
+        self._apply_preview_settings()
     
     @Slot()
     def _open_project(self):
@@ -532,6 +709,8 @@ class MainWindow(QMainWindow):
                 # Apply settings
                 self.preview_widget.set_seed(self.project.seed)
                 self.parameters_dock.set_seed(self.project.seed)
+                self._apply_post_passes()
+                self._apply_preview_settings()
                 
                 self.status_bar.showMessage(f"Opened: {path}", 3000)
             else:
@@ -585,8 +764,11 @@ class MainWindow(QMainWindow):
         # Clean up preview widget
         self.preview_widget.cleanup()
         
-        # Stop any running render
+        # Stop any running render and background encodes
         if hasattr(self, 'render_worker'):
             self.render_worker.cancel()
+        self._closing = True
+        for encoder in list(self._encoders):
+            encoder.cancel()
         
         event.accept()
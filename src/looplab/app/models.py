@@ -12,6 +12,7 @@ class PreviewSettings:
     """Settings for the preview window."""
     
     render_scale: float = 1.0  # 0.25 to 1.0
+    upscale_filter: str = "linear"  # linear or nearest, for scales below 1.0
     supersampling: bool = False
     target_fps: float = 30.0
 
@@ -25,6 +26,16 @@ class OfflineSettings:
     fps: float = 30.0
     supersample_scale: int = 1  # 1, 2, or 4
     accumulation_samples: int = 1  # 1 to N samples per frame
+    shutter_angle: float = 0.0  # motion blur in degrees, 0 = off (uses the samples)
+    frame_format: str = "png"  # png, qoi, tiff, npy, store
+    bit_depth: int = 0  # 8 or 16 bits per sample, 0 = 16 for 10-bit presets, else 8
+    png_compress_level: int = 1  # 0-9, low levels suit intermediate frames
+    host_memory_budget_mb: float = 0  # 0 = unlimited; frames are tiled to fit
+    gpu_memory_budget_mb: float = 0  # 0 = unlimited
+    frame_start: int = 0  # first frame to render
+    frame_end: int = 0  # frame to stop before, 0 = end of loop
+    frame_stride: int = 1  # render every Nth frame
+    post_passes: list = field(default_factory=list)  # GPU post pass specs, in order
     save_png_sequence: bool = True
     encode_video: bool = True
 
@@ -0,0 +1,657 @@
+"""LoopLab command-line interface.
+
+Running ``looplab`` with no arguments starts the GUI; a subcommand runs
+headless tools instead:
+    
+    looplab daemon --workers 2              run the render daemon
+    looplab submit shader.frag -o out/      submit a job to the daemon
+    looplab status [JOB]                    show daemon or job status
+    looplab cancel JOB                      cancel a job
+    looplab farm init|work|status JOBDIR    shared-filesystem multi-node render
+    looplab golden record|check DIR         regression check the example shaders
+    looplab seams                           check the loop seams of the example shaders
+    looplab encode out/ --preset webp       re-encode a render (from its lossless master)
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+
+def _add_daemon_address(parser: argparse.ArgumentParser):
+    """Add the options that locate a running daemon."""
+    from .render.daemon import DEFAULT_HOST, DEFAULT_PORT
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Daemon host (default: localhost)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Daemon port")
+    parser.add_argument("--socket", default=None, help="Daemon Unix socket path")
+
+
+def _client(args):
+    from .render.daemon import DaemonClient
+    return DaemonClient(args.host, args.port, args.socket)
+
+
+def _print_json(data):
+    print(json.dumps(data, indent=2))
+
+
+def cmd_daemon(args) -> int:
+    """Run the render daemon."""
+    from .render.daemon import run_daemon
+    return run_daemon(
+        workers=args.workers,
+        host=args.host,
+        port=args.port,
+        socket_path=args.socket,
+        program_cache_size=args.cache_size,
+        encode_slots=args.encode_slots,
+        threads=args.threads
+    )
+
+
+def _post_pass_arg(text: str) -> dict:
+    """Parse a --post option, making file paths absolute for the daemon."""
+    import os
+    from .gl.post_process import parse_post_pass_arg
+    try:
+        spec = parse_post_pass_arg(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    if "path" in spec:
+        spec["path"] = os.path.abspath(spec["path"])
+    return spec
+
+
+def _add_render_options(parser: argparse.ArgumentParser):
+    """Add the shader argument and render settings of a job spec."""
+    parser.add_argument("shader", help="Shader file (mainImage function)")
+    parser.add_argument("--width", type=int)
+    parser.add_argument("--height", type=int)
+    parser.add_argument("--fps", type=float)
+    parser.add_argument("--duration", type=float)
+    parser.add_argument("--seed", type=float)
+    parser.add_argument("--supersample", dest="supersample_scale", type=int)
+    parser.add_argument("--gpu-downsample", dest="gpu_downsample", action="store_true",
+                        default=None,
+                        help="Downsample supersampled frames on the GPU before readback")
+    parser.add_argument("--accumulation", dest="accumulation_samples", type=int)
+    parser.add_argument("--shutter", dest="shutter_angle", type=float,
+                        help="Motion blur shutter angle in degrees (uses the accumulation samples)")
+    parser.add_argument("--frame-format")
+    parser.add_argument("--bit-depth", dest="bit_depth", type=int, choices=(8, 16),
+                        help="Bits per sample of the frames (default: 16 for 10-bit presets, else 8)")
+    parser.add_argument("--post", dest="post_passes", type=_post_pass_arg, action="append",
+                        metavar="TYPE[:PATH][,KEY=VALUE...]",
+                        help="GPU post pass before readback, repeatable: tonemap, dither, "
+                             "lut:FILE.cube or shader:FILE.glsl (e.g. tonemap,exposure=1.5)")
+    parser.add_argument("--start", dest="frame_start", type=int,
+                        help="First frame to render")
+    parser.add_argument("--end", dest="frame_end", type=int,
+                        help="Frame to stop before (default: end of loop)")
+    parser.add_argument("--stride", dest="frame_stride", type=int,
+                        help="Render every Nth frame")
+    parser.add_argument("--preset", action="append",
+                        help="Encode with this preset after rendering; repeat for several "
+                             "deliverables from one FFmpeg pass")
+    parser.add_argument("--encode-jobs", dest="encode_jobs", type=int,
+                        help="Encode in GOP-aligned segments with this many FFmpeg processes")
+    parser.add_argument("--incremental", dest="incremental_encode", action="store_true",
+                        default=None,
+                        help="Keep the encoded segments; encoding again re-encodes only "
+                             "segments whose frames changed")
+    parser.add_argument("--loop-repeats", dest="loop_repeats", type=int,
+                        help="Play the encoded loop this many times in the video "
+                             "(copied, not re-encoded)")
+    parser.add_argument("--master", nargs="?", const="master_ffv1",
+                        choices=["master_ffv1", "master_x264"],
+                        help="Also encode a lossless master (default FFV1) that the presets "
+                             "and later re-exports transcode from")
+    parser.add_argument("--max-size", dest="max_size_mb", type=float, metavar="MB",
+                        help="Re-encode animated images (gif, webp, apng presets) with "
+                             "fewer colours or smaller until they fit this size")
+
+
+def _render_spec(args) -> Optional[dict]:
+    """Build a job spec from render options, or None if the shader is unreadable."""
+    spec = {}
+    for name in ("width", "height", "fps", "duration", "seed",
+                 "supersample_scale", "gpu_downsample", "accumulation_samples", "shutter_angle",
+                 "frame_format", "bit_depth",
+                 "post_passes", "frame_start", "frame_end", "frame_stride", "encode_jobs",
+                 "incremental_encode", "loop_repeats", "max_size_mb", "master"):
+        value = getattr(args, name)
+        if value is not None:
+            spec[name] = value
+    if args.preset:
+        spec["preset"] = args.preset[0]
+        if len(args.preset) > 1:
+            spec["presets"] = args.preset[1:]
+    # Embed the source so workers need not share our filesystem view
+    try:
+        with open(args.shader) as f:
+            spec["shader_source"] = f.read()
+    except OSError as e:
+        print(f"Failed to read shader: {e}", file=sys.stderr)
+        return None
+    return spec
+
+
+def cmd_submit(args) -> int:
+    """Submit a render job to the daemon."""
+    spec = _render_spec(args)
+    if spec is None:
+        return 1
+    spec["output_dir"] = args.output_dir
+    if args.priority is not None:
+        spec["priority"] = args.priority
+    
+    client = _client(args)
+    try:
+        job = client.submit(spec)
+    except (OSError, ValueError) as e:
+        print(f"Submit failed: {e}", file=sys.stderr)
+        return 1
+    
+    if not args.wait:
+        print(job["id"])
+        return 0
+    
+    state = job["state"]
+    for event in client.events(job["id"]):
+        if event["type"] == "progress":
+            print(f"\r{event['frame']}/{event['total']}", end="", file=sys.stderr)
+        elif event["type"] == "encode_progress":
+            eta = "" if event["eta"] is None else f", ETA {event['eta']:.0f}s"
+            print(f"\rEncoding {event['frame']}/{event['total']} "
+                  f"({event['fps']:.1f} fps{eta})", end="", file=sys.stderr)
+        elif event["type"] == "stage" and event["stage"] == "encode_wait":
+            print("\nRendered; waiting for an encode slot", file=sys.stderr)
+        elif event["type"] == "deliverable":
+            status = "done" if event["success"] else "failed"
+            print(f"\n{event['preset']}: {event['path']} {status}", file=sys.stderr)
+        elif event["type"] == "error":
+            print(f"\n{event['message']}", file=sys.stderr)
+        elif event["type"] == "state":
+            state = event["state"]
+    print(file=sys.stderr)
+    print(f"{job['id']} {state}")
+    return 0 if state == "done" else 1
+
+
+def cmd_status(args) -> int:
+    """Show daemon or job status."""
+    client = _client(args)
+    try:
+        if args.job:
+            _print_json(client.status(args.job))
+        else:
+            _print_json({"health": client.health(), "jobs": client.list_jobs()})
+    except (OSError, ValueError) as e:
+        print(f"Status failed: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def cmd_cancel(args) -> int:
+    """Cancel a daemon job."""
+    try:
+        result = _client(args).cancel(args.job)
+    except (OSError, ValueError) as e:
+        print(f"Cancel failed: {e}", file=sys.stderr)
+        return 1
+    _print_json(result)
+    return 0 if result.get("cancelled") else 1
+
+
+def cmd_farm_init(args) -> int:
+    """Create a distributed render job directory."""
+    from .render.distributed import DistributedJob
+    
+    spec = _render_spec(args)
+    if spec is None:
+        return 1
+    if args.output_dir:
+        spec["output_dir"] = args.output_dir
+    
+    try:
+        job = DistributedJob.create(args.job_dir, spec, args.chunk_size)
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    
+    print(f"{job.job_dir}: {job.total_frames} frames in {job.chunk_count} chunks")
+    return 0
+
+
+def cmd_farm_work(args) -> int:
+    """Work on a distributed render job."""
+    import signal
+    from .render.distributed import DistributedJob, FarmWorker
+    
+    try:
+        job = DistributedJob.load(args.job_dir)
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    
+    worker = FarmWorker(
+        job,
+        worker_id=args.worker_id,
+        lease_timeout=args.lease_timeout,
+        heartbeat_interval=args.heartbeat,
+        poll_interval=args.poll,
+        log_callback=print
+    )
+    signal.signal(signal.SIGTERM, lambda *a: worker.cancel())
+    try:
+        return 0 if worker.run() else 1
+    except KeyboardInterrupt:
+        return 130
+
+
+def cmd_farm_status(args) -> int:
+    """Show distributed render progress."""
+    from .render.distributed import DistributedJob
+    
+    try:
+        _print_json(DistributedJob.load(args.job_dir).status())
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    return 0
+
+
+def _golden_shaders(args):
+    """Shader files selected by the golden options."""
+    from .render.golden import get_example_shaders
+    
+    paths = get_example_shaders(args.examples)
+    if args.match:
+        paths = [p for p in paths if args.match.lower() in p.name.lower()]
+    return paths
+
+
+def cmd_golden_record(args) -> int:
+    """Record golden frames of the example shaders."""
+    from dataclasses import asdict
+    from .render.golden import GoldenSet, get_golden_frames, render_shaders, use_software_gl
+    
+    if args.software:
+        use_software_gl()
+    
+    golden = GoldenSet(args.golden_dir)
+    if args.match:
+        # Re-record some shaders of an existing set with its settings
+        try:
+            golden = GoldenSet.load(args.golden_dir)
+        except ValueError:
+            pass
+    if not golden.frames:
+        settings = golden.settings
+        settings.width, settings.height = args.width, args.height
+        golden.data["settings"] = asdict(settings)
+        golden.data["frames"] = get_golden_frames(
+            settings.create_timeline().total_frames, args.frames
+        )
+    
+    try:
+        for result in render_shaders(_golden_shaders(args), golden.settings,
+                                     golden.frames, print):
+            if result.error:
+                print(f"  {result.error.splitlines()[0]}", file=sys.stderr)
+            golden.add(result)
+    except RuntimeError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    
+    golden.save()
+    print(f"Recorded {len(golden.shaders)} shaders at frames {golden.frames} in {golden.directory}")
+    return 0
+
+
+def cmd_golden_check(args) -> int:
+    """Check the example shaders against recorded golden frames."""
+    from dataclasses import asdict
+    from .render.golden import GoldenSet, format_report, render_shaders, use_software_gl
+    
+    try:
+        golden = GoldenSet.load(args.golden_dir)
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    
+    if args.software:
+        use_software_gl()
+    
+    paths = _golden_shaders(args)
+    checks = []
+    try:
+        for result in render_shaders(paths, golden.settings, golden.frames):
+            checks.append(golden.check(result, args.tolerance))
+    except RuntimeError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    if not args.match:
+        checks.extend(golden.missing([p.name for p in paths]))
+    
+    if args.json:
+        _print_json([
+            {**asdict(check), "timing_ratio": check.timing_ratio} for check in checks
+        ])
+    else:
+        print(format_report(checks, args.timing_tolerance))
+    return 1 if any(check.regression for check in checks) else 0
+
+
+def cmd_seams(args) -> int:
+    """Check the loop seams of the example shaders."""
+    from dataclasses import asdict
+    from .render.golden import use_software_gl
+    from .render.seams import check_seams, format_report, rank_checks
+    from .render.streaming import RenderSettings
+    
+    if args.software:
+        use_software_gl()
+    
+    settings = RenderSettings(width=args.width, height=args.height,
+                              fps=args.fps, duration=args.duration)
+    log = None if args.json else (lambda message: print(message, file=sys.stderr))
+    try:
+        checks = check_seams(_golden_shaders(args), settings, args.workers,
+                             args.tolerance, args.max_discontinuity, log)
+    except (RuntimeError, ValueError) as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    
+    if args.json:
+        _print_json([asdict(check) for check in rank_checks(checks)])
+    else:
+        print(format_report(checks))
+    return 1 if any(check.broken for check in checks) else 0
+
+
+def cmd_tune(args) -> int:
+    """Tune an encoding preset's speed and CRF on a rendered loop."""
+    from dataclasses import asdict
+    from .encode.ffmpeg import find_render_input, save_custom_preset
+    from .encode.tuning import format_report, tune_preset
+    
+    source = find_render_input(args.source, args.fps, presets=[args.preset])
+    if source is None:
+        print(f"No frames FFmpeg can read in {args.source}", file=sys.stderr)
+        return 1
+    
+    log = None if args.json else (lambda message: print(message, file=sys.stderr))
+    try:
+        result = tune_preset(
+            source, base=args.preset, metric=args.metric, target=args.target,
+            goal=args.goal, speeds=args.speeds.split(","),
+            crf_range=(args.crf_min, args.crf_max), sample_seconds=args.sample_seconds,
+            jobs=args.jobs, log_callback=log
+        )
+        if args.save and result.best is not None:
+            save_custom_preset(args.save, result.to_preset(), notes=result.notes())
+    except (RuntimeError, ValueError, OSError) as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    
+    if args.json:
+        _print_json(asdict(result))
+    else:
+        print(format_report(result))
+        if args.save and result.best is not None:
+            print(f"Saved preset {args.save}")
+    return 0 if result.best is not None else 1
+
+
+def cmd_encode(args) -> int:
+    """Encode a finished render, transcoding from its master if it has one."""
+    from .encode.ffmpeg import (
+        PRESETS, create_encoder, encode_render_deliverables, encode_render_input,
+        find_render_input
+    )
+    from .encode.master import encode_render_master
+    from .render.manifest import get_render_coverage
+    
+    presets = list(dict.fromkeys(args.preset or []))
+    if not presets and not args.master:
+        print("Nothing to encode: give --preset or --master", file=sys.stderr)
+        return 2
+    unknown = [name for name in presets if name not in PRESETS]
+    if unknown:
+        print(f"Unknown preset: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+    
+    manifest = get_render_coverage(args.source)
+    if manifest is not None and not manifest.complete:
+        print(f"Cannot encode a partial render: {manifest.describe()}", file=sys.stderr)
+        return 1
+    
+    log = lambda message: print(message, file=sys.stderr)
+    if args.master and not encode_render_master(args.source, args.fps, args.master,
+                                                log_callback=log):
+        return 1
+    if not presets:
+        return 0
+    
+    output = args.output or str(Path(args.source) / "output.mp4")
+    if len(presets) > 1:
+        results = encode_render_deliverables(args.source, output, args.fps, presets,
+                                             log_callback=log)
+        return 0 if all(result.success for result in results) else 1
+    
+    source = find_render_input(args.source, args.fps, presets=presets)
+    if source is None:
+        print(f"No frames FFmpeg can read in {args.source}", file=sys.stderr)
+        return 1
+    encoder = create_encoder(args.jobs, incremental=args.incremental)
+    ok = encode_render_input(source, output, presets[0], log_callback=log, encoder=encoder)
+    return 0 if ok else 1
+
+
+def cmd_ffmpeg(args) -> int:
+    """Show the local FFmpeg's capabilities and which presets it can encode."""
+    from dataclasses import asdict
+    from .encode.ffmpeg import PRESETS
+    from .encode.probe import probe_ffmpeg
+    
+    capabilities = probe_ffmpeg(args.ffmpeg, refresh=args.refresh)
+    if capabilities is None:
+        print("FFmpeg not found", file=sys.stderr)
+        return 1
+    if not capabilities.answered:
+        print(f"Could not probe {capabilities.path}", file=sys.stderr)
+        return 1
+    
+    presets = {name: capabilities.check_preset(encoding) for name, encoding in PRESETS.items()}
+    if args.json:
+        _print_json({**asdict(capabilities), "presets": presets})
+        return 0
+    
+    print(capabilities.path)
+    print(capabilities.version)
+    print(f"{len(capabilities.encoders)} video encoders, {len(capabilities.pix_fmts)} "
+          f"pixel formats, {len(capabilities.filters)} filters")
+    for name, problem in presets.items():
+        print(f"  {name:<18} {problem or 'ok'}")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser for all subcommands."""
+    parser = argparse.ArgumentParser(prog="looplab", description="LoopLab headless tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    daemon = subparsers.add_parser("daemon", help="Run the render daemon")
+    _add_daemon_address(daemon)
+    daemon.add_argument("--workers", type=int, default=1, help="Warm GL contexts")
+    daemon.add_argument("--cache-size", type=int, default=16,
+                        help="Compiled programs cached per context")
+    daemon.add_argument("--encode-slots", type=int, default=1,
+                        help="Encodes run at once, overlapping later renders")
+    daemon.add_argument("--threads", type=int, default=0,
+                        help="CPU threads shared by frame writers and FFmpeg "
+                             "(default: one per core)")
+    daemon.set_defaults(func=cmd_daemon)
+    
+    submit = subparsers.add_parser("submit", help="Submit a render job to the daemon")
+    _add_daemon_address(submit)
+    _add_render_options(submit)
+    submit.add_argument("-o", "--output-dir", required=True, help="Frame output directory")
+    submit.add_argument("--wait", action="store_true", help="Stream progress until done")
+    submit.add_argument("--priority", type=int,
+                        help="Higher priorities render and encode first (default: 0)")
+    submit.set_defaults(func=cmd_submit)
+    
+    status = subparsers.add_parser("status", help="Show daemon or job status")
+    _add_daemon_address(status)
+    status.add_argument("job", nargs="?", help="Job id")
+    status.set_defaults(func=cmd_status)
+    
+    cancel = subparsers.add_parser("cancel", help="Cancel a daemon job")
+    _add_daemon_address(cancel)
+    cancel.add_argument("job", help="Job id")
+    cancel.set_defaults(func=cmd_cancel)
+    
+    farm = subparsers.add_parser("farm", help="Render one job across machines")
+    farm_commands = farm.add_subparsers(dest="farm_command", required=True)
+    
+    farm_init = farm_commands.add_parser("init", help="Create a shared job directory")
+    farm_init.add_argument("job_dir", help="Job directory on the shared filesystem")
+    _add_render_options(farm_init)
+    farm_init.add_argument("-o", "--output-dir", help="Frame directory (default: JOBDIR/frames)")
+    farm_init.add_argument("--chunk-size", type=int, default=30, help="Frames per lease")
+    farm_init.set_defaults(func=cmd_farm_init)
+    
+    farm_work = farm_commands.add_parser("work", help="Render chunks until the job is done")
+    farm_work.add_argument("job_dir")
+    farm_work.add_argument("--worker-id", default=None)
+    farm_work.add_argument("--lease-timeout", type=float, default=120.0,
+                           help="Seconds without a heartbeat before a lease is reclaimed")
+    farm_work.add_argument("--heartbeat", type=float, default=10.0,
+                           help="Seconds between lease heartbeats")
+    farm_work.add_argument("--poll", type=float, default=5.0,
+                           help="Seconds between checks while waiting for other workers")
+    farm_work.set_defaults(func=cmd_farm_work)
+    
+    farm_status = farm_commands.add_parser("status", help="Show chunk progress")
+    farm_status.add_argument("job_dir")
+    farm_status.set_defaults(func=cmd_farm_status)
+    
+    golden = subparsers.add_parser("golden", help="Golden-image regression checks")
+    golden_commands = golden.add_subparsers(dest="golden_command", required=True)
+    
+    golden_record = golden_commands.add_parser("record", help="Record golden frames")
+    golden_check = golden_commands.add_parser("check", help="Compare against golden frames")
+    for command in (golden_record, golden_check):
+        command.add_argument("golden_dir", help="Golden set directory")
+        command.add_argument("--examples", default=None,
+                             help="Shader directory (default: bundled examples)")
+        command.add_argument("--match", default=None, help="Only shaders whose name contains this")
+        command.add_argument("--software", action="store_true", help="Use software OpenGL")
+    
+    golden_record.add_argument("--width", type=int, default=160)
+    golden_record.add_argument("--height", type=int, default=90)
+    golden_record.add_argument("--frames", type=int, default=4,
+                               help="Frames per shader, evenly spaced over the loop")
+    golden_record.set_defaults(func=cmd_golden_record)
+    
+    golden_check.add_argument("--tolerance", type=float, default=40.0,
+                              help="Minimum PSNR (dB) of frames that changed")
+    golden_check.add_argument("--timing-tolerance", type=float, default=1.5,
+                              help="Render time ratio reported as slower")
+    golden_check.add_argument("--json", action="store_true", help="Print results as JSON")
+    golden_check.set_defaults(func=cmd_golden_check)
+    
+    seams = subparsers.add_parser("seams", help="Check the loop seams of the example shaders")
+    seams.add_argument("--examples", default=None,
+                       help="Shader directory (default: bundled examples)")
+    seams.add_argument("--match", default=None, help="Only shaders whose name contains this")
+    seams.add_argument("--software", action="store_true", help="Use software OpenGL")
+    seams.add_argument("--width", type=int, default=160)
+    seams.add_argument("--height", type=int, default=90)
+    seams.add_argument("--fps", type=float, default=30.0)
+    seams.add_argument("--duration", type=float, default=30.0)
+    seams.add_argument("--workers", type=int, default=1,
+                       help="Worker processes, each with its own GL context")
+    seams.add_argument("--tolerance", type=float, default=40.0,
+                       help="Minimum PSNR (dB) of phase 2π against frame 0")
+    seams.add_argument("--max-discontinuity", type=float, default=2.0,
+                       help="Maximum seam jump relative to per-frame motion")
+    seams.add_argument("--json", action="store_true", help="Print results as JSON")
+    seams.set_defaults(func=cmd_seams)
+    
+    tune = subparsers.add_parser("tune", help="Tune an encoding preset on a rendered loop")
+    tune.add_argument("source", help="Render output directory or .llraw frame store")
+    tune.add_argument("--preset", default="h264_high", help="x264 or x265 preset to tune")
+    tune.add_argument("--metric", default="auto", choices=["auto", "vmaf", "psnr", "ssim"],
+                      help="Quality metric (auto: VMAF if FFmpeg has libvmaf, else SSIM)")
+    tune.add_argument("--target", type=float, default=None,
+                      help="Minimum score (default: VMAF 95, PSNR 42 dB, SSIM 0.98)")
+    tune.add_argument("--goal", default="fastest", choices=["fastest", "smallest"])
+    tune.add_argument("--speeds", default="veryfast,faster,fast,medium,slow",
+                      help="Comma-separated speed presets to search")
+    tune.add_argument("--crf-min", type=int, default=14)
+    tune.add_argument("--crf-max", type=int, default=32)
+    tune.add_argument("--sample-seconds", type=float, default=4.0,
+                      help="Seconds of the loop encoded per candidate")
+    tune.add_argument("--fps", type=float, default=30.0, help="Frame rate of image sequences")
+    tune.add_argument("--jobs", type=int, default=2, help="Concurrent FFmpeg processes")
+    tune.add_argument("--save", default=None, metavar="NAME",
+                      help="Save the winner as a custom preset")
+    tune.add_argument("--json", action="store_true", help="Print results as JSON")
+    tune.set_defaults(func=cmd_tune)
+    
+    encode = subparsers.add_parser("encode", help="Encode a finished render (from its "
+                                   "lossless master if it has one)")
+    encode.add_argument("source", help="Render output directory")
+    encode.add_argument("--preset", action="append",
+                        help="Encoding preset; repeat for several deliverables from one pass")
+    encode.add_argument("-o", "--output", default=None,
+                        help="Output video path (default: SOURCE/output.mp4)")
+    encode.add_argument("--master", nargs="?", const="master_ffv1",
+                        choices=["master_ffv1", "master_x264"],
+                        help="Encode a lossless master first, unless it is current")
+    encode.add_argument("--jobs", type=int, default=1,
+                        help="Concurrent FFmpeg processes (segmented encode of one preset)")
+    encode.add_argument("--incremental", action="store_true",
+                        help="Re-encode only segments whose frames changed since the last "
+                             "incremental encode to the same output")
+    encode.add_argument("--fps", type=float, default=30.0, help="Frame rate of image sequences")
+    encode.set_defaults(func=cmd_encode)
+    
+    ffmpeg = subparsers.add_parser("ffmpeg", help="Show FFmpeg capabilities and preset support")
+    ffmpeg.add_argument("--ffmpeg", default=None, help="FFmpeg executable (default: auto-detect)")
+    ffmpeg.add_argument("--refresh", action="store_true", help="Probe again, ignoring the cache")
+    ffmpeg.add_argument("--json", action="store_true", help="Print results as JSON")
+    ffmpeg.set_defaults(func=cmd_ffmpeg)
+    
+    return parser
+
+
+def get_commands() -> List[str]:
+    """Names of all subcommands."""
+    parser = build_parser()
+    for action in parser._actions:
+        if isinstance(action, argparse._SubParsersAction):
+            return list(action.choices)
+    return []
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run a subcommand.
+    
+    Args:
+        argv: Arguments (without the program name)
+    
+    Returns:
+        Process exit code
+    """
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
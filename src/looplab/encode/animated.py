@@ -0,0 +1,238 @@
+"""Animated image export (GIF, WebP, APNG) with a file size cap.
+
+Short loops for the web are delivered as animated images that loop
+forever (the presets set ``-loop 0`` or ``-plays 0``). GIF presets
+quantize each frame to a generated palette (see get_palette_graph): a
+loop palette is made by a palettegen pass before each encode, per-frame
+palettes in the encode itself.
+
+Web targets often limit file size. When a size cap is given, the loop is
+encoded again with a smaller palette (GIF) or lower quality (WebP), then
+at smaller sizes, until the file fits or the steps run out. Each step is
+a full encode, so a loop whose first encode fits costs nothing extra.
+"""
+
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+from .ffmpeg import (
+    PALETTE_LOOP, PRESETS, EncodeProgress, EncodingPreset, FFmpegEncoder, VideoCodec,
+    find_render_input, get_output_filter_args, get_output_path_for_preset, get_palette_path
+)
+
+
+# Palette sizes tried for GIF presets
+GIF_COLOR_STEPS = (256, 128, 64, 32)
+# Quality settings tried for WebP presets
+WEBP_QUALITY_STEPS = (75, 60, 45, 30)
+# Output sizes tried when quality steps alone do not fit
+SCALE_STEPS = (1.0, 0.75, 0.5)
+
+
+@dataclass
+class AnimatedStep:
+    """Encoder settings of one attempt at fitting a size cap.
+    
+    Attributes:
+        scale: Output size relative to the render
+        colors: GIF palette size
+        quality: WebP quality (0 = the preset's own)
+    """
+    
+    scale: float = 1.0
+    colors: int = 256
+    quality: int = 0
+    
+    def describe(self) -> str:
+        parts = [f"{self.scale:.0%} size"]
+        if self.quality:
+            parts.append(f"quality {self.quality}")
+        else:
+            parts.append(f"{self.colors} colours")
+        return ", ".join(parts)
+
+
+def plan_size_steps(encoding: EncodingPreset) -> List[AnimatedStep]:
+    """Attempts for a size cap, from best to smallest.
+    
+    Quality is lowered before size, since a smaller loop loses detail
+    everywhere while a smaller palette mostly costs smooth gradients.
+    APNG is lossless, so only its size changes.
+    """
+    if encoding.codec == VideoCodec.GIF:
+        levels = [AnimatedStep(colors=colors) for colors in GIF_COLOR_STEPS]
+    elif encoding.codec == VideoCodec.WEBP:
+        levels = [AnimatedStep(quality=quality) for quality in WEBP_QUALITY_STEPS]
+    else:
+        levels = [AnimatedStep()]
+    
+    return [
+        AnimatedStep(scale, level.colors, level.quality)
+        for scale in SCALE_STEPS
+        for level in (levels if scale == 1.0 else levels[-1:])
+    ]
+
+
+def get_step_filters(step: AnimatedStep,
+                     video_filters: Optional[List[str]] = None) -> List[str]:
+    """Video filters of one attempt, before any palette."""
+    filters = [*(video_filters or [])]
+    if step.scale < 1.0:
+        filters.append(f"scale=trunc(iw*{step.scale}/2)*2:-2:flags=lanczos")
+    return filters
+
+
+def get_step_args(encoding: EncodingPreset, step: AnimatedStep,
+                  video_filters: Optional[List[str]] = None) -> Tuple[List[str], List[str]]:
+    """Filter and output options of one attempt.
+    
+    Returns:
+        (FFmpeg filter options, preset output options)
+    """
+    filter_args = get_output_filter_args(encoding, get_step_filters(step, video_filters),
+                                         step.colors)
+    
+    args = list(encoding.ffmpeg_args)
+    if step.quality and "-quality" in args:
+        args[args.index("-quality") + 1] = str(step.quality)
+    return filter_args, args
+
+
+def encode_animated(
+    input_args: List[str],
+    output_path: str,
+    preset: str,
+    total_frames: int = 0,
+    max_bytes: int = 0,
+    video_filters: Optional[List[str]] = None,
+    encoder: Optional[FFmpegEncoder] = None,
+    log_callback: Optional[Callable[[str], None]] = None,
+    status_callback: Optional[Callable[[EncodeProgress], None]] = None
+) -> bool:
+    """Encode frames to an animated image, within a size cap if given.
+    
+    Args:
+        input_args: FFmpeg input options
+        output_path: Output file path
+        preset: Animated encoding preset name
+        total_frames: Number of input frames, for progress and ETA
+        max_bytes: Largest acceptable file size (0 = no cap)
+        video_filters: Video filters applied before encoding
+        encoder: FFmpegEncoder to run (so the caller can cancel it)
+        log_callback: Called with log messages
+        status_callback: Called with progress reports
+    
+    Returns:
+        True if the file was written within the cap
+    """
+    encoding = PRESETS.get(preset)
+    if encoding is None or not encoding.is_animated:
+        if log_callback:
+            log_callback(f"Not an animated image preset: {preset}")
+        return False
+    
+    encoder = encoder or FFmpegEncoder()
+    palette = get_palette_path(output_path)
+    steps = plan_size_steps(encoding) if max_bytes > 0 else [AnimatedStep()]
+    for attempt, step in enumerate(steps):
+        if attempt and log_callback:
+            log_callback(f"Re-encoding at {step.describe()}")
+        
+        inputs = list(input_args)
+        if encoding.palette == PALETTE_LOOP:
+            # Each step's palette has its own size and is made from its scaled frames
+            if not encoder.generate_palette(input_args, str(palette),
+                                            get_step_filters(step, video_filters), step.colors,
+                                            total_frames, log_callback):
+                palette.unlink(missing_ok=True)
+                return False
+            inputs += ["-i", str(palette)]
+        
+        filter_args, preset_args = get_step_args(encoding, step, video_filters)
+        args = [*inputs, *filter_args, *preset_args, *encoder.thread_args(), output_path]
+        try:
+            if not encoder.run(args, total_frames, log_callback=log_callback,
+                               status_callback=status_callback):
+                return False
+        finally:
+            palette.unlink(missing_ok=True)
+        
+        size = os.path.getsize(output_path) if os.path.exists(output_path) else 0
+        if not size:
+            if log_callback:
+                log_callback(f"FFmpeg wrote no output: {output_path}")
+            return False
+        if not max_bytes or size <= max_bytes:
+            if log_callback:
+                log_callback(f"Encoding complete: {output_path} ({size / 1e6:.2f} MB)")
+            return True
+        
+        if log_callback:
+            log_callback(f"{size / 1e6:.2f} MB at {step.describe()} exceeds the "
+                         f"{max_bytes / 1e6:.2f} MB cap")
+    
+    if log_callback:
+        log_callback(f"Cannot fit {output_path} within {max_bytes / 1e6:.2f} MB")
+    return False
+
+
+def encode_render_animated(
+    output_dir: str,
+    output_path: str,
+    fps: float,
+    preset: str = "gif",
+    max_bytes: int = 0,
+    log_callback: Optional[Callable[[str], None]] = None,
+    status_callback: Optional[Callable[[EncodeProgress], None]] = None,
+    encoder: Optional[FFmpegEncoder] = None
+) -> bool:
+    """Encode the frames of an offline render to an animated image.
+    
+    Args:
+        output_dir: Render output directory
+        output_path: Output file path (with the preset's extension)
+        fps: Frame rate (image sequences only; stores record their own)
+        preset: Animated encoding preset name
+        max_bytes: Largest acceptable file size (0 = no cap)
+        log_callback: Called with log messages
+        status_callback: Called with progress reports
+        encoder: FFmpegEncoder to run (so the caller can cancel it)
+    
+    Returns:
+        True if encoding succeeded
+    """
+    from ..render.manifest import get_render_coverage
+    
+    encoder = encoder or FFmpegEncoder()
+    if not encoder.is_available():
+        if log_callback:
+            log_callback("FFmpeg not found. Please install FFmpeg.")
+        return False
+    
+    manifest = get_render_coverage(output_dir)
+    if manifest is not None and not manifest.complete:
+        if log_callback:
+            log_callback(f"Cannot encode a partial render: {manifest.describe()}")
+        return False
+    
+    source = find_render_input(output_dir, fps, presets=[preset])
+    if source is None:
+        if log_callback:
+            log_callback(f"No frames FFmpeg can read in {output_dir}")
+        return False
+    
+    output_path = get_output_path_for_preset(output_path, preset)
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    return encode_animated(
+        input_args=source.input_args(0),
+        output_path=output_path,
+        preset=preset,
+        total_frames=source.total_frames,
+        max_bytes=max_bytes,
+        video_filters=source.video_filters,
+        encoder=encoder,
+        log_callback=log_callback,
+        status_callback=status_callback
+    )
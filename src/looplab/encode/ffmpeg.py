@@ -2,13 +2,25 @@
 
 This module provides utilities for encoding image sequences
 into video files using FFmpeg.
+
+FFmpeg runs with ``-progress pipe:1``: its progress reports are parsed
+from stdout while warnings and errors stream from stderr, both read by
+background threads so neither pipe can fill up and stall the encode.
+Callbacks are still called on the thread that runs the encode.
 """
 
+import json
+import os
+import queue
+import re
 import subprocess
 import shutil
+import threading
+import time
+from collections import deque
 from pathlib import Path
-from typing import Optional, List, Callable
-from dataclasses import dataclass
+from typing import Deque, Dict, Optional, List, Callable, Sequence, Tuple
+from dataclasses import dataclass, field, replace
 from enum import Enum
 
 
@@ -18,6 +30,20 @@ class VideoCodec(Enum):
     H265 = "h265"
     PRORES = "prores"
     AVI = "avi"
+    FFV1 = "ffv1"
+    GIF = "gif"
+    WEBP = "webp"
+    APNG = "apng"
+
+
+# Animated image formats: encoded in one process and set to loop forever
+ANIMATED_CODECS = frozenset({VideoCodec.GIF, VideoCodec.WEBP, VideoCodec.APNG})
+
+# Palette modes of GIF presets (see get_palette_graph)
+PALETTE_LOOP = "loop"
+PALETTE_FRAME = "frame"
+# FFmpeg input a PALETTE_LOOP encode reads its palette from
+PALETTE_INPUT = 1
 
 
 @dataclass
@@ -28,6 +54,13 @@ class EncodingPreset:
     codec: VideoCodec
     extension: str
     ffmpeg_args: List[str]
+    bit_depth: int = 8  # bits per sample of the encoded video
+    palette: str = ""  # PALETTE_LOOP or PALETTE_FRAME to quantize to a generated palette
+    
+    @property
+    def is_animated(self) -> bool:
+        """Whether the preset writes an animated image (GIF, WebP, APNG)."""
+        return self.codec in ANIMATED_CODECS
 
 
 # Predefined encoding presets
@@ -86,7 +119,8 @@ PRESETS = {
             "-c:v", "prores_ks",
             "-profile:v", "3",  # HQ profile
             "-pix_fmt", "yuv422p10le",
-        ]
+        ],
+        bit_depth=10
     ),
     "prores_4444": EncodingPreset(
         name="ProRes 4444",
@@ -96,7 +130,8 @@ PRESETS = {
             "-c:v", "prores_ks",
             "-profile:v", "4",  # 4444 profile
             "-pix_fmt", "yuva444p10le",
-        ]
+        ],
+        bit_depth=10
     ),
     "avi_mjpeg": EncodingPreset(
         name="AVI (Motion JPEG)",
@@ -126,22 +161,371 @@ PRESETS = {
             "-pix_fmt", "rgb24",
         ]
     ),
+    "master_ffv1": EncodingPreset(
+        name="Master (FFV1 Lossless)",
+        codec=VideoCodec.FFV1,
+        extension="mkv",
+        ffmpeg_args=[
+            "-c:v", "ffv1",
+            "-level", "3",
+            "-g", "1",  # Every frame a keyframe, for seeking
+            "-slices", "16",  # Coded in parallel by the encoder and decoder threads
+            "-slicecrc", "1",
+        ]
+    ),
+    "master_x264": EncodingPreset(
+        name="Master (Lossless x264)",
+        codec=VideoCodec.H264,
+        extension="mkv",
+        ffmpeg_args=[
+            "-c:v", "libx264rgb",
+            "-preset", "ultrafast",
+            "-qp", "0",  # Lossless
+            "-g", "30",
+            "-pix_fmt", "rgb24",
+        ]
+    ),
+    "gif": EncodingPreset(
+        name="GIF (Loop Palette)",
+        codec=VideoCodec.GIF,
+        extension="gif",
+        ffmpeg_args=[
+            "-c:v", "gif",
+            "-loop", "0",  # Loop forever
+        ],
+        palette=PALETTE_LOOP
+    ),
+    "gif_frame_palette": EncodingPreset(
+        name="GIF (Per-Frame Palettes)",
+        codec=VideoCodec.GIF,
+        extension="gif",
+        ffmpeg_args=[
+            "-c:v", "gif",
+            "-loop", "0",
+        ],
+        palette=PALETTE_FRAME
+    ),
+    "webp": EncodingPreset(
+        name="Animated WebP",
+        codec=VideoCodec.WEBP,
+        extension="webp",
+        ffmpeg_args=[
+            "-c:v", "libwebp_anim",
+            "-quality", "75",  # 0-100, higher is better
+            "-compression_level", "4",
+            "-loop", "0",
+            "-pix_fmt", "yuva420p",
+        ]
+    ),
+    "apng": EncodingPreset(
+        name="Animated PNG",
+        codec=VideoCodec.APNG,
+        extension="png",
+        ffmpeg_args=[
+            "-c:v", "apng",
+            "-plays", "0",  # Loop forever
+            "-f", "apng",
+            "-pix_fmt", "rgba",
+        ]
+    ),
+    "apng_16bit": EncodingPreset(
+        name="Animated PNG (16-bit)",
+        codec=VideoCodec.APNG,
+        extension="png",
+        ffmpeg_args=[
+            "-c:v", "apng",
+            "-plays", "0",
+            "-f", "apng",
+            "-pix_fmt", "rgba64be",
+        ],
+        bit_depth=16
+    ),
 }
 
 
+# Names of the presets above; custom presets may not replace them
+BUILTIN_PRESETS = frozenset(PRESETS)
+
+
+def get_custom_presets_path() -> Path:
+    """Get path to the custom presets file.
+    
+    Returns:
+        Path to the custom presets JSON file
+    """
+    if os.name == 'nt':  # Windows
+        base = Path(os.environ.get('APPDATA', '~'))
+    else:  # macOS/Linux
+        base = Path.home() / '.config'
+    
+    return base / 'looplab' / 'presets.json'
+
+
+def _read_custom_presets(path: Path) -> dict:
+    """Raw entries of a custom presets file (empty if missing or invalid)."""
+    try:
+        with open(path) as f:
+            data = json.load(f)
+        return dict(data.get("presets", {}))
+    except (OSError, ValueError, AttributeError, TypeError):
+        return {}
+
+
+def load_custom_presets(path: Optional[Path] = None) -> Dict[str, EncodingPreset]:
+    """Load saved custom presets (e.g. from ``looplab tune --save``).
+    
+    Entries that are malformed or reuse a built-in name are skipped.
+    
+    Args:
+        path: Presets file, or None for get_custom_presets_path()
+    
+    Returns:
+        Presets by name
+    """
+    presets = {}
+    for key, entry in _read_custom_presets(path or get_custom_presets_path()).items():
+        if key in BUILTIN_PRESETS:
+            continue
+        try:
+            presets[key] = EncodingPreset(
+                name=entry["name"],
+                codec=VideoCodec(entry["codec"]),
+                extension=entry["extension"],
+                ffmpeg_args=[str(arg) for arg in entry["ffmpeg_args"]],
+                bit_depth=int(entry.get("bit_depth", 8)),
+                palette=str(entry.get("palette", ""))
+            )
+        except (KeyError, ValueError, TypeError):
+            continue
+    return presets
+
+
+def save_custom_preset(
+    key: str,
+    encoding: EncodingPreset,
+    path: Optional[Path] = None,
+    notes: Optional[dict] = None
+):
+    """Save a custom preset and make it available as ``PRESETS[key]``.
+    
+    Args:
+        key: Preset name used on the command line and in job settings
+        encoding: Preset to save
+        path: Presets file, or None for get_custom_presets_path()
+        notes: Extra JSON data stored with the preset (e.g. how it was tuned)
+    
+    Raises:
+        ValueError: If the name is empty or that of a built-in preset
+        OSError: If the file cannot be written
+    """
+    if not key or key in BUILTIN_PRESETS:
+        raise ValueError(f"Cannot save a custom preset as {key!r}")
+    
+    path = path or get_custom_presets_path()
+    entries = _read_custom_presets(path)
+    entries[key] = {
+        "name": encoding.name,
+        "codec": encoding.codec.value,
+        "extension": encoding.extension,
+        "ffmpeg_args": list(encoding.ffmpeg_args),
+        "bit_depth": encoding.bit_depth,
+        **({"palette": encoding.palette} if encoding.palette else {}),
+        **({"notes": notes} if notes else {}),
+    }
+    
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp = path.with_name(path.name + ".tmp")
+    with open(temp, 'w') as f:
+        json.dump({"presets": entries}, f, indent=2)
+    os.replace(temp, path)
+    
+    PRESETS[key] = encoding
+
+
+def get_custom_preset_names() -> List[str]:
+    """Names of the custom presets in PRESETS."""
+    return [key for key in PRESETS if key not in BUILTIN_PRESETS]
+
+
+PRESETS.update(load_custom_presets())
+
+
+# FFmpeg log lines kept per encode (older lines are dropped)
+MAX_LOG_LINES = 200
+# Seconds FFmpeg gets to exit after cancel() before it is killed
+CANCEL_GRACE_SECONDS = 2.0
+
+
+@dataclass
+class EncodeProgress:
+    """Progress of a running encode, from FFmpeg's progress reports.
+    
+    Attributes:
+        frame: Frames encoded so far
+        total_frames: Frames to encode (0 = unknown)
+        fps: Encoding speed in frames per second
+        speed: Encoding speed relative to playback (e.g. 1.5)
+        out_time: Seconds of video encoded
+        elapsed: Wall-clock seconds since FFmpeg started
+        done: Whether FFmpeg reported the end of the encode
+    """
+    
+    frame: int = 0
+    total_frames: int = 0
+    fps: float = 0.0
+    speed: float = 0.0
+    out_time: float = 0.0
+    elapsed: float = 0.0
+    done: bool = False
+    
+    @property
+    def fraction(self) -> float:
+        """Fraction of frames encoded (0 while the total is unknown)."""
+        if self.total_frames <= 0:
+            return 0.0
+        return min(1.0, self.frame / self.total_frames)
+    
+    @property
+    def eta_seconds(self) -> Optional[float]:
+        """Estimated seconds until the encode finishes, if known."""
+        if self.done:
+            return 0.0
+        if self.total_frames <= 0 or self.frame <= 0:
+            return None
+        rate = self.fps
+        if rate <= 0 and self.elapsed > 0:
+            rate = self.frame / self.elapsed
+        if rate <= 0:
+            return None
+        return max(0, self.total_frames - self.frame) / rate
+    
+    def describe(self) -> str:
+        """One-line summary, e.g. "frame 120/900 (13%), 45.0 fps, 1.50x, ETA 0:17"."""
+        parts = [f"frame {self.frame}"]
+        if self.total_frames:
+            parts[0] += f"/{self.total_frames} ({self.fraction:.0%})"
+        if self.fps:
+            parts.append(f"{self.fps:.1f} fps")
+        if self.speed:
+            parts.append(f"{self.speed:.2f}x")
+        eta = self.eta_seconds
+        if eta is not None:
+            minutes, seconds = divmod(int(round(eta)), 60)
+            parts.append(f"ETA {minutes}:{seconds:02d}")
+        return ", ".join(parts)
+
+
+class ProgressParser:
+    """Incremental parser for FFmpeg ``-progress`` output.
+    
+    FFmpeg writes blocks of ``key=value`` lines, each ending with
+    ``progress=continue`` (or ``progress=end`` for the last block).
+    """
+    
+    def __init__(self, total_frames: int = 0):
+        self.progress = EncodeProgress(total_frames=total_frames)
+        self._start = time.monotonic()
+    
+    def feed(self, line: str) -> Optional[EncodeProgress]:
+        """Parse one line of output.
+        
+        Returns:
+            A snapshot of the progress at the end of each block, else None
+        """
+        key, sep, value = line.strip().partition("=")
+        if not sep:
+            return None
+        
+        progress = self.progress
+        try:
+            if key == "frame":
+                progress.frame = int(value)
+            elif key == "fps":
+                progress.fps = float(value)
+            elif key == "speed":
+                progress.speed = float(value.rstrip("x"))
+            elif key == "out_time_us":
+                progress.out_time = int(value) / 1e6
+            elif key == "progress":
+                progress.elapsed = time.monotonic() - self._start
+                progress.done = value == "end"
+                return replace(progress)
+        except ValueError:
+            # "N/A" before the first frame is encoded
+            pass
+        return None
+
+
+def count_sequence_frames(frames_dir: str, frame_pattern: str) -> int:
+    """Count the files of an image sequence.
+    
+    Args:
+        frames_dir: Directory containing frame images
+        frame_pattern: printf-style pattern (e.g. "frame_%06d.png")
+    """
+    glob = re.sub(r"%0?\d*d", "*", frame_pattern)
+    return sum(1 for _ in Path(frames_dir).glob(glob))
+
+
+def _pump_lines(stream, kind: str, events: "queue.Queue"):
+    """Forward lines of a pipe to a queue, then None at EOF."""
+    try:
+        for line in stream:
+            events.put((kind, line.rstrip("\r\n")))
+    finally:
+        events.put((kind, None))
+
+
+# (PATH, FFmpeg found on it) of the last PATH lookup
+_path_ffmpeg: Tuple[Optional[str], Optional[str]] = (None, None)
+# FFmpeg found by searching install directories, for later calls
+_located_ffmpeg: Optional[str] = None
+# (PATH, probe cache state) when the last search found nothing
+_search_missed: Optional[tuple] = None
+
+
 def find_ffmpeg() -> Optional[str]:
     """Find FFmpeg executable.
     
+    The PATH is looked up again only when it changes or the FFmpeg found
+    on it is gone. A search of the common install directories runs once;
+    its result is remembered in this process and in the probe cache (see
+    encode.probe). A search that finds nothing is not repeated until the
+    PATH or the probe cache changes.
+    
     Returns:
         Path to FFmpeg or None if not found
     """
+    global _path_ffmpeg, _located_ffmpeg, _search_missed
+    
     # First try the system PATH
-    ffmpeg_path = shutil.which("ffmpeg")
+    search_path = os.environ.get("PATH", "")
+    cached_path, ffmpeg_path = _path_ffmpeg
+    if cached_path != search_path or (ffmpeg_path and not os.path.isfile(ffmpeg_path)):
+        ffmpeg_path = shutil.which("ffmpeg")
+        _path_ffmpeg = (search_path, ffmpeg_path)
     if ffmpeg_path:
         return ffmpeg_path
     
-    # Check common installation locations on Windows
-    import os
+    if _located_ffmpeg and os.path.isfile(_located_ffmpeg):
+        return _located_ffmpeg
+    
+    from .probe import get_probe_cache_state, load_located_ffmpeg, save_located_ffmpeg
+    state = (search_path, get_probe_cache_state())
+    if state == _search_missed:
+        return None
+    
+    _located_ffmpeg = load_located_ffmpeg() or _search_ffmpeg()
+    if _located_ffmpeg:
+        save_located_ffmpeg(_located_ffmpeg)
+        _search_missed = None
+    else:
+        _search_missed = state
+    return _located_ffmpeg
+
+
+def _search_ffmpeg() -> Optional[str]:
+    """Search common installation locations on Windows."""
     common_paths = [
         # Winget installation
         os.path.expandvars(r"%LOCALAPPDATA%\Microsoft\WinGet\Packages"),
@@ -179,48 +563,66 @@ def find_ffmpeg() -> Optional[str]:
 
 
 def get_ffmpeg_version() -> Optional[str]:
-    """Get FFmpeg version string.
+    """Get FFmpeg version string (probed once per binary, see encode.probe).
     
     Returns:
         Version string or None if FFmpeg not available
     """
-    ffmpeg = find_ffmpeg()
-    if not ffmpeg:
+    from .probe import probe_ffmpeg
+    
+    capabilities = probe_ffmpeg()
+    if capabilities is None or not capabilities.version:
         return None
+    return capabilities.version
+
+
+@dataclass
+class DeliverableResult:
+    """Outcome of one output of a multi-preset encode.
     
-    try:
-        result = subprocess.run(
-            [ffmpeg, "-version"],
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
-        # Extract first line (version info)
-        lines = result.stdout.strip().split('\n')
-        if lines:
-            return lines[0]
-    except (subprocess.TimeoutExpired, subprocess.SubprocessError):
-        pass
+    Attributes:
+        preset: Encoding preset name
+        output_path: Video file written
+        success: Whether the file was encoded
+        size: File size in bytes
+        log_lines: FFmpeg messages of this output's encoder
+    """
     
-    return None
+    preset: str
+    output_path: str
+    success: bool = False
+    size: int = 0
+    log_lines: List[str] = field(default_factory=list)
 
 
 class FFmpegEncoder:
     """FFmpeg-based video encoder."""
     
-    def __init__(self, ffmpeg_path: Optional[str] = None):
+    def __init__(self, ffmpeg_path: Optional[str] = None, threads: int = 0):
         """Initialize encoder.
         
         Args:
             ffmpeg_path: Path to FFmpeg, or None to auto-detect
+            threads: Encoder threads per output (0 = FFmpeg's default, one
+                per core); see render.scheduler for machine-wide budgets
         """
         self.ffmpeg_path = ffmpeg_path or find_ffmpeg()
+        self.threads = threads
         self.process: Optional[subprocess.Popen] = None
+        # Last progress report and log lines of the current or last encode
+        self.last_progress: Optional[EncodeProgress] = None
+        self.log_lines: Deque[str] = deque(maxlen=MAX_LOG_LINES)
+        self._cancelled = False
     
     def is_available(self) -> bool:
         """Check if FFmpeg is available."""
         return self.ffmpeg_path is not None
     
+    @property
+    def cancelled(self) -> bool:
+        """Whether ``cancel`` was called since the last FFmpeg run started."""
+        return self._cancelled
+    
     def encode_sequence(
         self,
         input_pattern: str,
@@ -228,17 +630,33 @@ class FFmpegEncoder:
         fps: float,
         preset: str = "h264_high",
         progress_callback: Optional[Callable[[int, int], None]] = None,
-        log_callback: Optional[Callable[[str], None]] = None
+        log_callback: Optional[Callable[[str], None]] = None,
+        input_args: Optional[List[str]] = None,
+        video_filters: Optional[List[str]] = None,
+        total_frames: int = 0,
+        status_callback: Optional[Callable[[EncodeProgress], None]] = None,
+        output_args: Optional[List[str]] = None
     ) -> bool:
         """Encode an image sequence to video.
         
+        Blocks until FFmpeg exits or ``cancel`` is called from another
+        thread. Callbacks run on the calling thread about twice a second.
+        
         Args:
             input_pattern: Input file pattern (e.g., "frames/frame_%06d.png")
             output_path: Output video file path
             fps: Frame rate
             preset: Encoding preset name
             progress_callback: Called with (current_frame, total_frames)
-            log_callback: Called with log messages
+            log_callback: Called with log messages, including FFmpeg
+                warnings and errors as they are written
+            input_args: FFmpeg input options used instead of the image
+                sequence input (e.g. RawFrameStore.ffmpeg_input_args())
+            video_filters: Video filters applied before encoding
+            total_frames: Number of input frames, for progress and ETA
+                (0 = unknown)
+            status_callback: Called with each EncodeProgress report
+            output_args: FFmpeg output options added after the preset's
             
         Returns:
             True if encoding succeeded
@@ -255,53 +673,632 @@ class FFmpegEncoder:
         
         encoding = PRESETS[preset]
         
-        # Build FFmpeg command
+        # Build FFmpeg arguments
+        args = [*(input_args or ["-framerate", str(fps), "-i", input_pattern])]
+        palette = get_palette_path(output_path) if encoding.palette == PALETTE_LOOP else None
+        if palette is not None:
+            if not self.generate_palette(args, str(palette), video_filters,
+                                         total_frames=total_frames, log_callback=log_callback):
+                palette.unlink(missing_ok=True)
+                return False
+            args += ["-i", str(palette)]
+        args += get_output_filter_args(encoding, video_filters)
+        args += [*encoding.ffmpeg_args, *self.thread_args(), *(output_args or []), output_path]
+        
+        try:
+            if not self.run(args, total_frames, progress_callback, log_callback, status_callback):
+                return False
+        finally:
+            if palette is not None:
+                palette.unlink(missing_ok=True)
+        
+        if log_callback:
+            log_callback(f"Encoding complete: {output_path}")
+        
+        return True
+    
+    def run(
+        self,
+        args: List[str],
+        total_frames: int = 0,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        log_callback: Optional[Callable[[str], None]] = None,
+        status_callback: Optional[Callable[[EncodeProgress], None]] = None
+    ) -> bool:
+        """Run FFmpeg with progress reporting, logging and cancellation.
+        
+        Args:
+            args: FFmpeg arguments after the global options (inputs,
+                filters, output options and output path)
+            total_frames: Number of output frames, for progress and ETA
+            progress_callback: Called with (current_frame, total_frames)
+            log_callback: Called with log messages
+            status_callback: Called with each EncodeProgress report
+        
+        Returns:
+            True if FFmpeg succeeded
+        """
+        if not self.is_available():
+            if log_callback:
+                log_callback("FFmpeg not available")
+            return False
+        
         cmd = [
             self.ffmpeg_path,
             "-y",  # Overwrite output
-            "-framerate", str(fps),
-            "-i", input_pattern,
-            *encoding.ffmpeg_args,
-            output_path
+            "-hide_banner", "-nostdin", "-nostats",
+            "-loglevel", "warning",
+            "-progress", "pipe:1",
+            *args,
         ]
         
         if log_callback:
             log_callback(f"Running: {' '.join(cmd)}")
         
+        self._cancelled = False
+        self.last_progress = None
+        self.log_lines.clear()
+        
         try:
             # Run FFmpeg
-            self.process = subprocess.Popen(
+            process = subprocess.Popen(
                 cmd,
+                stdin=subprocess.DEVNULL,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
-                text=True
+                text=True,
+                errors="replace"
             )
-            
-            # Wait for completion
-            stdout, stderr = self.process.communicate()
-            
-            if self.process.returncode != 0:
-                if log_callback:
-                    log_callback(f"FFmpeg error: {stderr}")
-                return False
-            
-            if log_callback:
-                log_callback(f"Encoding complete: {output_path}")
-            
-            return True
-            
-        except subprocess.SubprocessError as e:
+        except (OSError, subprocess.SubprocessError) as e:
             if log_callback:
                 log_callback(f"Encoding failed: {e}")
             return False
+        
+        self.process = process
+        try:
+            returncode = self._follow(process, total_frames, progress_callback,
+                                      log_callback, status_callback)
         finally:
             self.process = None
+        
+        if self._cancelled:
+            if log_callback:
+                log_callback("Encoding cancelled")
+            return False
+        
+        if returncode != 0:
+            if log_callback:
+                log_callback(f"FFmpeg exited with code {returncode}")
+            return False
+        
+        return True
+    
+    def _follow(
+        self,
+        process: subprocess.Popen,
+        total_frames: int,
+        progress_callback: Optional[Callable[[int, int], None]],
+        log_callback: Optional[Callable[[str], None]],
+        status_callback: Optional[Callable[[EncodeProgress], None]]
+    ) -> int:
+        """Relay FFmpeg's progress and log lines until it exits.
+        
+        Returns:
+            FFmpeg's exit code
+        """
+        events: "queue.Queue" = queue.Queue()
+        for stream, kind in ((process.stdout, "progress"), (process.stderr, "log")):
+            threading.Thread(
+                target=_pump_lines, args=(stream, kind, events), daemon=True
+            ).start()
+        
+        # A cancel that raced with starting the process
+        if self._cancelled:
+            process.terminate()
+        
+        parser = ProgressParser(total_frames)
+        open_streams = 2
+        kill_at = None
+        while open_streams:
+            try:
+                kind, line = events.get(timeout=0.25)
+            except queue.Empty:
+                if self._cancelled:
+                    if kill_at is None:
+                        kill_at = time.monotonic() + CANCEL_GRACE_SECONDS
+                    elif time.monotonic() > kill_at:
+                        process.kill()
+                continue
+            
+            if line is None:
+                open_streams -= 1
+            elif kind == "log":
+                self.log_lines.append(line)
+                if log_callback:
+                    log_callback(f"FFmpeg: {line}")
+            else:
+                progress = parser.feed(line)
+                if progress is None:
+                    continue
+                self.last_progress = progress
+                if progress_callback:
+                    progress_callback(progress.frame, total_frames)
+                if status_callback:
+                    status_callback(progress)
+        
+        try:
+            return process.wait(timeout=CANCEL_GRACE_SECONDS)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            return process.wait()
+    
+    def encode_multi(
+        self,
+        input_args: List[str],
+        outputs: Dict[str, str],
+        video_filters: Optional[List[str]] = None,
+        total_frames: int = 0,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        log_callback: Optional[Callable[[str], None]] = None,
+        status_callback: Optional[Callable[[EncodeProgress], None]] = None
+    ) -> List[DeliverableResult]:
+        """Encode one input to several presets with a single FFmpeg run.
+        
+        The input is decoded and filtered once, then split to one encoder
+        per preset, so extra deliverables cost only their own encoding.
+        
+        Args:
+            input_args: FFmpeg input options (e.g. an image sequence input)
+            outputs: Output path by preset name
+            video_filters: Video filters applied once, before the split
+            total_frames: Number of input frames, for progress and ETA
+            progress_callback: Called with (current_frame, total_frames)
+            log_callback: Called with log messages
+            status_callback: Called with each EncodeProgress report
+        
+        Returns:
+            One DeliverableResult per output, in the order of ``outputs``
+        """
+        results = [DeliverableResult(preset, path) for preset, path in outputs.items()]
+        
+        unknown = [r.preset for r in results if r.preset not in PRESETS]
+        if unknown or not results:
+            if log_callback:
+                log_callback(f"Unknown preset: {', '.join(unknown)}" if unknown
+                             else "No outputs to encode")
+            return results
+        
+        # Decode and filter once, then one labelled branch per output
+        count = len(results)
+        chain = [*(video_filters or [])]
+        if count > 1:
+            chain.append(f"split={count}" + "".join(f"[out{i}]" for i in range(count)))
+        
+        # Loop-palette GIFs share one palette, made by a pass of its own
+        args = [*input_args]
+        palette = None
+        loop_gifs = [r for r in results if PRESETS[r.preset].palette == PALETTE_LOOP]
+        if loop_gifs:
+            palette = get_palette_path(loop_gifs[0].output_path)
+            if not self.generate_palette(args, str(palette), video_filters,
+                                         total_frames=total_frames, log_callback=log_callback):
+                palette.unlink(missing_ok=True)
+                return results
+            args += ["-i", str(palette)]
+        
+        outputs = [f"[out{i}]" for i in range(count)]
+        if count > 1:
+            graph = "[0:v]" + ",".join(chain)
+            # GIF branches quantize to their own palette
+            for i, result in enumerate(results):
+                mode = PRESETS[result.preset].palette
+                if mode:
+                    graph += f";[out{i}]{get_palette_graph(mode, tag=str(i))}[gif{i}]"
+                    outputs[i] = f"[gif{i}]"
+            args += ["-filter_complex", graph]
+        else:
+            args += get_output_filter_args(PRESETS[results[0].preset], chain)
+        for i, result in enumerate(results):
+            if count > 1:
+                args += ["-map", outputs[i]]
+            args += [*PRESETS[result.preset].ffmpeg_args, *self.thread_args(), result.output_path]
+        
+        try:
+            ok = self.run(args, total_frames, progress_callback, log_callback, status_callback)
+        finally:
+            if palette is not None:
+                palette.unlink(missing_ok=True)
+        
+        # Encoder messages start with "[libx264 @ 0x...]"; others concern all outputs
+        for result in results:
+            codec = get_codec_name(PRESETS[result.preset])
+            result.log_lines = [
+                line for line in self.log_lines
+                if not line.startswith("[") or line.startswith(f"[{codec} @")
+            ]
+            output = Path(result.output_path)
+            result.size = output.stat().st_size if output.exists() else 0
+            result.success = ok and result.size > 0
+            if log_callback:
+                status = "complete" if result.success else "failed"
+                log_callback(f"[{result.preset}] Encoding {status}: {result.output_path}")
+        
+        return results
+    
+    def thread_args(self) -> List[str]:
+        """Output options limiting an encoder to the thread budget."""
+        return ["-threads", str(self.threads)] if self.threads > 0 else []
+    
+    def generate_palette(
+        self,
+        input_args: List[str],
+        palette_path: str,
+        video_filters: Optional[List[str]] = None,
+        colors: int = 256,
+        total_frames: int = 0,
+        log_callback: Optional[Callable[[str], None]] = None
+    ) -> bool:
+        """Write the palette of a PALETTE_LOOP encode to a PNG.
+        
+        Reads the frames once, keeping only their colour statistics, so
+        the encode that follows can map each frame as it arrives.
+        
+        Args:
+            input_args: FFmpeg input options of the encode
+            palette_path: PNG to write (see get_palette_path)
+            video_filters: Video filters of the encode, applied first
+            colors: Palette size (2-256)
+            total_frames: Number of input frames, for progress
+            log_callback: Called with log messages
+        
+        Returns:
+            True if the palette was written
+        """
+        graph = ",".join([*(video_filters or []), get_palettegen_filter(PALETTE_LOOP, colors)])
+        args = [*input_args, "-vf", graph, *self.thread_args(), "-update", "1", palette_path]
+        if log_callback:
+            log_callback(f"Generating a {colors}-colour palette for the loop")
+        return self.run(args, total_frames, log_callback=log_callback)
     
     def cancel(self):
-        """Cancel ongoing encoding."""
-        if self.process:
-            self.process.terminate()
-            self.process = None
+        """Cancel ongoing encoding.
+        
+        Asks FFmpeg to exit and returns at once; ``encode_sequence``
+        returns False shortly after, killing FFmpeg if it does not exit
+        within CANCEL_GRACE_SECONDS.
+        """
+        self._cancelled = True
+        process = self.process
+        if process is not None and process.poll() is None:
+            try:
+                process.terminate()
+            except OSError:
+                pass
+
+
+def create_encoder(jobs: int = 1, threads: int = 0, incremental: bool = False):
+    """Encoder for the convenience functions below.
+    
+    Args:
+        jobs: Concurrent FFmpeg processes; above 1 the video is encoded
+            as GOP-aligned segments (see encode.segmented)
+        threads: Encoder threads in total, shared by the processes
+            (0 = one per core)
+        incremental: Keep the segments and re-encode only those whose
+            frames changed on the next encode to the same path
+    
+    Returns:
+        FFmpegEncoder, or SegmentedEncoder for several jobs or
+        incremental encodes
+    """
+    if jobs > 1 or incremental:
+        from .segmented import SegmentedEncoder
+        return SegmentedEncoder(jobs, threads=threads, incremental=incremental)
+    return FFmpegEncoder(threads=threads)
+
+
+def get_render_bit_depth(preset: str, bit_depth: int = 0) -> int:
+    """Bits per sample to render frames at for an encoding preset.
+    
+    Presets that encode more than 8 bits per sample (the 10-bit ProRes
+    presets) get 16-bit frames, so gradients keep their precision all
+    the way to FFmpeg instead of being quantized to 8 bits first.
+    
+    Args:
+        preset: Encoding preset name (empty for no encoding)
+        bit_depth: Requested bit depth (0 = choose from the preset)
+    
+    Returns:
+        8 or 16
+    """
+    if bit_depth:
+        return 16 if bit_depth > 8 else 8
+    encoding = PRESETS.get(preset)
+    return 16 if encoding is not None and encoding.bit_depth > 8 else 8
+
+
+def get_codec_name(encoding: EncodingPreset) -> str:
+    """FFmpeg encoder name of a preset (e.g. "libx264")."""
+    args = encoding.ffmpeg_args
+    if "-c:v" in args:
+        return args[args.index("-c:v") + 1]
+    return ""
+
+
+def get_preset_pix_fmt(encoding: EncodingPreset) -> str:
+    """Output pixel format of a preset (e.g. "yuv420p"), or "" if FFmpeg picks."""
+    args = encoding.ffmpeg_args
+    if "-pix_fmt" in args:
+        return args[args.index("-pix_fmt") + 1]
+    return ""
+
+
+def get_palettegen_filter(mode: str, colors: int = 256) -> str:
+    """The palettegen filter of a palette mode.
+    
+    Args:
+        mode: PALETTE_LOOP or PALETTE_FRAME
+        colors: Palette size (2-256)
+    """
+    colors = max(2, min(256, colors))
+    stats = "single" if mode == PALETTE_FRAME else "full"
+    return f"palettegen=max_colors={colors}:stats_mode={stats}"
+
+
+def get_palette_graph(mode: str, colors: int = 256, tag: str = "",
+                      palette_input: int = PALETTE_INPUT) -> str:
+    """Filter graph quantizing frames to a generated palette.
+    
+    PALETTE_FRAME builds one palette per frame, for loops whose colours
+    change too much for a shared palette, in the same run: the frames are
+    split, palettegen reads one branch and paletteuse maps the other
+    frame by frame. PALETTE_LOOP builds one palette from every frame of
+    the loop, which in one run would hold every frame in the split's
+    queue until the last had been read. Its palette is made by a
+    separate pass instead (FFmpegEncoder.generate_palette) and read from
+    FFmpeg input ``palette_input``.
+    
+    Args:
+        mode: PALETTE_LOOP or PALETTE_FRAME
+        colors: Palette size of PALETTE_FRAME (2-256)
+        tag: Suffix keeping the graph's labels unique within a larger graph
+        palette_input: Index of the palette's FFmpeg input (PALETTE_LOOP)
+    
+    Returns:
+        Filter graph with one unlabelled input and output
+    """
+    if mode == PALETTE_FRAME:
+        return f"split[frames{tag}][stats{tag}];" \
+               f"[stats{tag}]{get_palettegen_filter(mode, colors)}[palette{tag}];" \
+               f"[frames{tag}][palette{tag}]paletteuse=new=1:dither=sierra2_4a"
+    return f"null[frames{tag}];[frames{tag}][{palette_input}:v]" \
+           f"paletteuse=dither=sierra2_4a:diff_mode=rectangle"
+
+
+def get_output_filter_args(encoding: EncodingPreset, video_filters: Optional[List[str]] = None,
+                           colors: int = 256) -> List[str]:
+    """Filter options of an encode: the input's filters, then the palette.
+    
+    PALETTE_LOOP graphs read the palette as a second input, so they are
+    passed as ``-filter_complex`` on input 0.
+    
+    Args:
+        encoding: Encoding preset
+        video_filters: Video filters applied before encoding
+        colors: Palette size of GIF presets
+    
+    Returns:
+        FFmpeg options (empty if there is nothing to filter)
+    """
+    parts = [*(video_filters or [])]
+    if encoding.palette:
+        parts.append(get_palette_graph(encoding.palette, colors))
+    if not parts:
+        return []
+    if encoding.palette == PALETTE_LOOP:
+        return ["-filter_complex", "[0:v]" + ",".join(parts)]
+    return ["-vf", ",".join(parts)]
+
+
+def get_palette_path(output_path: str) -> Path:
+    """Temporary palette of a PALETTE_LOOP encode, next to its output."""
+    path = Path(output_path)
+    return path.with_name(f".{path.stem}.palette.png")
+
+
+def get_output_path_for_preset(output_path: str, preset: str) -> str:
+    """Ensure an output path has the extension of its preset's container.
+    
+    Args:
+        output_path: Requested output path
+        preset: Encoding preset name
+    
+    Returns:
+        Output path with the preset's extension
+    """
+    encoding = PRESETS.get(preset)
+    if encoding:
+        output_path_obj = Path(output_path)
+        if output_path_obj.suffix.lower() != f".{encoding.extension}":
+            output_path = str(output_path_obj.with_suffix(f".{encoding.extension}"))
+    return output_path
+
+
+def get_output_paths_for_presets(output_path: str, presets: List[str]) -> Dict[str, str]:
+    """Output paths of several deliverables of one render.
+    
+    A single preset keeps ``output_path`` (with its extension); with
+    several, each file is named after its preset (``output_h264_high.mp4``).
+    
+    Returns:
+        Output path by preset name
+    """
+    if len(presets) == 1:
+        return {presets[0]: get_output_path_for_preset(output_path, presets[0])}
+    path = Path(output_path)
+    return {
+        preset: get_output_path_for_preset(str(path.with_name(f"{path.stem}_{preset}")), preset)
+        for preset in presets
+    }
+
+
+@dataclass
+class RenderInput:
+    """Frames of a render as FFmpeg input.
+    
+    Attributes:
+        input_args: Maps a start frame to FFmpeg input options that read
+            the frames from there on
+        total_frames: Frames in the render
+        fps: Frame rate
+        video_filters: Video filters needed to present the frames
+        frame_digest: Maps a frame number to a hash of its pixels, for
+            incremental encodes (None if the frames cannot be hashed)
+    """
+    
+    input_args: Callable[[int], List[str]]
+    total_frames: int
+    fps: float
+    video_filters: List[str]
+    frame_digest: Optional[Callable[[int], str]] = None
+
+
+def _find_master_input(output_dir: str, fps: float,
+                       presets: Sequence[str]) -> Optional[RenderInput]:
+    """The current master of a render, hashed by the frames it was made from.
+    
+    Args:
+        output_dir: Render output directory
+        fps: Frame rate of image sequences
+        presets: Presets the master is read for
+    
+    Returns:
+        RenderInput of the master, or None if it cannot be used
+    """
+    from .master import load_master_input
+    
+    master = load_master_input(output_dir, presets)
+    if master is not None:
+        # A current master holds the same pixels as the frames, so
+        # incremental encodes can compare segments by the frames' hashes
+        frames = find_render_input(output_dir, fps, use_master=False)
+        master.frame_digest = frames.frame_digest if frames is not None else None
+    return master
+
+
+def find_render_input(path: str, fps: float = 30.0, use_master: bool = True,
+                      presets: Sequence[str] = ()) -> Optional[RenderInput]:
+    """Find the frames of a render output as FFmpeg input.
+    
+    Args:
+        path: Render output directory or .llraw frame store
+        fps: Frame rate of image sequences (stores record their own)
+        use_master: Read the directory's lossless master instead of its
+            frames if it is current (see encode.master)
+        presets: Presets the frames are read for; the master is skipped
+            if one needs more bit depth or alpha than it holds
+    
+    Returns:
+        RenderInput, or None if no frames FFmpeg can read are found
+    """
+    from ..render.frame_store import get_frame_store_path, open_frame_store
+    from ..render.image_writer import FRAME_FORMATS
+    from .segmented import hash_frame_file
+    
+    source = Path(path)
+    if use_master and source.is_dir():
+        master = _find_master_input(path, fps, presets)
+        if master is not None:
+            return master
+    
+    store_path = source if source.is_file() else get_frame_store_path(source)
+    if store_path.is_file():
+        store = open_frame_store(store_path)
+        if store is None:
+            return None
+        with store:
+            return RenderInput(
+                store.ffmpeg_input_args, len(store), store.fps, store.ffmpeg_filters(),
+                lambda frame, offset=store.header_size, size=store.frame_bytes:
+                    hash_frame_file(store_path, offset + frame * size, size)
+            )
+    
+    for writer_class in FRAME_FORMATS.values():
+        writer = writer_class()
+        if not writer.ffmpeg_readable:
+            continue
+        total = count_sequence_frames(str(source), writer.frame_pattern)
+        if total:
+            pattern = str(source / writer.frame_pattern)
+            return RenderInput(
+                lambda start, pattern=pattern: [
+                    "-start_number", str(start), "-framerate", str(fps), "-i", pattern
+                ],
+                total, fps, [],
+                lambda frame, pattern=pattern: hash_frame_file(pattern % frame)
+            )
+    return None
+
+
+def encode_render_input(
+    source: RenderInput,
+    output_path: str,
+    preset: str = "h264_high",
+    log_callback: Optional[Callable[[str], None]] = None,
+    status_callback: Optional[Callable[[EncodeProgress], None]] = None,
+    encoder=None,
+    jobs: int = 1,
+    output_args: Optional[List[str]] = None
+) -> bool:
+    """Encode frames found by find_render_input (e.g. a lossless master).
+    
+    Args:
+        source: Frames to encode
+        output_path: Output video file path
+        preset: Encoding preset name
+        log_callback: Called with log messages
+        status_callback: Called with encode progress reports
+        encoder: Encoder to run, FFmpegEncoder or SegmentedEncoder (so
+            the caller can cancel it), or None for create_encoder(jobs)
+        jobs: Concurrent FFmpeg processes when no encoder is given
+        output_args: Extra FFmpeg output options (single-process encodes)
+    
+    Returns:
+        True if encoding succeeded
+    """
+    encoder = encoder or create_encoder(jobs)
+    
+    if not encoder.is_available():
+        if log_callback:
+            log_callback("FFmpeg not found. Please install FFmpeg.")
+        return False
+    
+    output_path = get_output_path_for_preset(output_path, preset)
+    if not isinstance(encoder, FFmpegEncoder):
+        return encoder.encode(
+            input_args=source.input_args,
+            total_frames=source.total_frames,
+            output_path=output_path,
+            fps=source.fps,
+            preset=preset,
+            video_filters=source.video_filters,
+            log_callback=log_callback,
+            status_callback=status_callback,
+            frame_digest=source.frame_digest
+        )
+    
+    return encoder.encode_sequence(
+        input_pattern="",
+        output_path=output_path,
+        fps=source.fps,
+        preset=preset,
+        log_callback=log_callback,
+        input_args=source.input_args(0),
+        video_filters=source.video_filters,
+        total_frames=source.total_frames,
+        status_callback=status_callback,
+        output_args=output_args
+    )
 
 
 def encode_frames(
@@ -310,7 +1307,11 @@ def encode_frames(
     fps: float,
     preset: str = "h264_high",
     frame_pattern: str = "frame_%06d.png",
-    log_callback: Optional[Callable[[str], None]] = None
+    log_callback: Optional[Callable[[str], None]] = None,
+    status_callback: Optional[Callable[[EncodeProgress], None]] = None,
+    encoder=None,
+    jobs: int = 1,
+    output_args: Optional[List[str]] = None
 ) -> bool:
     """Convenience function to encode frames from a directory.
     
@@ -321,11 +1322,17 @@ def encode_frames(
         preset: Encoding preset name
         frame_pattern: Frame filename pattern
         log_callback: Called with log messages
+        status_callback: Called with encode progress reports
+        encoder: Encoder to run, FFmpegEncoder or SegmentedEncoder (so
+            the caller can cancel it), or None for create_encoder(jobs)
+        jobs: Concurrent FFmpeg processes when no encoder is given
+        output_args: Extra FFmpeg output options (single-process encodes;
+            segmented encodes set their own GOP options)
         
     Returns:
         True if encoding succeeded
     """
-    encoder = FFmpegEncoder()
+    encoder = encoder or create_encoder(jobs)
     
     if not encoder.is_available():
         if log_callback:
@@ -333,18 +1340,258 @@ def encode_frames(
         return False
     
     input_pattern = str(Path(frames_dir) / frame_pattern)
+    output_path = get_output_path_for_preset(output_path, preset)
+    total_frames = count_sequence_frames(frames_dir, frame_pattern)
     
-    # Ensure output has correct extension
-    encoding = PRESETS.get(preset)
-    if encoding:
-        output_path_obj = Path(output_path)
-        if output_path_obj.suffix.lower() != f".{encoding.extension}":
-            output_path = str(output_path_obj.with_suffix(f".{encoding.extension}"))
+    if not isinstance(encoder, FFmpegEncoder):
+        from .segmented import hash_frame_file
+        return encoder.encode(
+            input_args=lambda start: [
+                "-start_number", str(start), "-framerate", str(fps), "-i", input_pattern
+            ],
+            total_frames=total_frames,
+            output_path=output_path,
+            fps=fps,
+            preset=preset,
+            log_callback=log_callback,
+            status_callback=status_callback,
+            frame_digest=lambda frame: hash_frame_file(input_pattern % frame)
+        )
     
     return encoder.encode_sequence(
         input_pattern=input_pattern,
         output_path=output_path,
         fps=fps,
         preset=preset,
-        log_callback=log_callback
+        log_callback=log_callback,
+        total_frames=total_frames,
+        status_callback=status_callback,
+        output_args=output_args
+    )
+
+
+def encode_frame_store(
+    store_path: str,
+    output_path: str,
+    preset: str = "h264_high",
+    log_callback: Optional[Callable[[str], None]] = None,
+    status_callback: Optional[Callable[[EncodeProgress], None]] = None,
+    encoder=None,
+    jobs: int = 1,
+    output_args: Optional[List[str]] = None
+) -> bool:
+    """Encode a raw frame store (see render.frame_store) to video.
+    
+    FFmpeg reads the store directly as rawvideo, so re-encoding the same
+    render with another preset costs no image decoding.
+    
+    Args:
+        store_path: Path to the .llraw frame store
+        output_path: Output video file path
+        preset: Encoding preset name
+        log_callback: Called with log messages
+        status_callback: Called with encode progress reports
+        encoder: Encoder to run, FFmpegEncoder or SegmentedEncoder (so
+            the caller can cancel it), or None for create_encoder(jobs)
+        jobs: Concurrent FFmpeg processes when no encoder is given
+        output_args: Extra FFmpeg output options (single-process encodes)
+    
+    Returns:
+        True if encoding succeeded
+    """
+    from ..render.frame_store import open_frame_store
+    
+    encoder = encoder or create_encoder(jobs)
+    
+    if not encoder.is_available():
+        if log_callback:
+            log_callback("FFmpeg not found. Please install FFmpeg.")
+        return False
+    
+    store = open_frame_store(store_path)
+    if store is None:
+        if log_callback:
+            log_callback(f"Not a frame store: {store_path}")
+        return False
+    
+    with store:
+        missing = len(store) - len(store.written_frames())
+        if missing and log_callback:
+            log_callback(f"Warning: {missing} frames in the store were never rendered")
+        
+        if not isinstance(encoder, FFmpegEncoder):
+            from .segmented import hash_frame_file
+            offset, size = store.header_size, store.frame_bytes
+            return encoder.encode(
+                input_args=store.ffmpeg_input_args,
+                total_frames=len(store),
+                output_path=get_output_path_for_preset(output_path, preset),
+                fps=store.fps,
+                preset=preset,
+                video_filters=store.ffmpeg_filters(),
+                log_callback=log_callback,
+                status_callback=status_callback,
+                frame_digest=lambda frame: hash_frame_file(
+                    store.path, offset + frame * size, size
+                )
+            )
+        
+        return encoder.encode_sequence(
+            input_pattern=str(store.path),
+            output_path=get_output_path_for_preset(output_path, preset),
+            fps=store.fps,
+            preset=preset,
+            log_callback=log_callback,
+            input_args=store.ffmpeg_input_args(),
+            video_filters=store.ffmpeg_filters(),
+            total_frames=len(store),
+            status_callback=status_callback,
+            output_args=output_args
+        )
+
+
+def encode_render_deliverables(
+    output_dir: str,
+    output_path: str,
+    fps: float,
+    presets: List[str],
+    log_callback: Optional[Callable[[str], None]] = None,
+    status_callback: Optional[Callable[[EncodeProgress], None]] = None,
+    encoder: Optional[FFmpegEncoder] = None
+) -> List[DeliverableResult]:
+    """Encode the frames of an offline render to several presets at once.
+    
+    The frames are read and decoded once for all presets (see
+    FFmpegEncoder.encode_multi). Output paths follow
+    get_output_paths_for_presets.
+    
+    Args:
+        output_dir: Render output directory
+        output_path: Output video file path (a preset suffix is added)
+        fps: Frame rate (image sequences only; stores record their own)
+        presets: Encoding preset names
+        log_callback: Called with log messages
+        status_callback: Called with encode progress reports
+        encoder: FFmpegEncoder to run (so the caller can cancel it)
+    
+    Returns:
+        One DeliverableResult per preset
+    """
+    from ..render.manifest import get_render_coverage
+    
+    encoder = encoder or FFmpegEncoder()
+    outputs = get_output_paths_for_presets(output_path, list(dict.fromkeys(presets)))
+    failed = [DeliverableResult(preset, path) for preset, path in outputs.items()]
+    
+    if not encoder.is_available():
+        if log_callback:
+            log_callback("FFmpeg not found. Please install FFmpeg.")
+        return failed
+    
+    manifest = get_render_coverage(output_dir)
+    if manifest is not None and not manifest.complete:
+        if log_callback:
+            log_callback(f"Cannot encode a partial render: {manifest.describe()}")
+        return failed
+    
+    source = find_render_input(output_dir, fps, presets=list(outputs))
+    if source is None:
+        if log_callback:
+            log_callback(f"No frames FFmpeg can read in {output_dir}")
+        return failed
+    
+    return encoder.encode_multi(
+        input_args=source.input_args(0),
+        outputs=outputs,
+        video_filters=source.video_filters,
+        total_frames=source.total_frames,
+        log_callback=log_callback,
+        status_callback=status_callback
+    )
+
+
+def encode_render_output(
+    output_dir: str,
+    output_path: str,
+    fps: float,
+    preset: str = "h264_high",
+    frame_format: str = "png",
+    log_callback: Optional[Callable[[str], None]] = None,
+    status_callback: Optional[Callable[[EncodeProgress], None]] = None,
+    encoder=None,
+    jobs: int = 1,
+    output_args: Optional[List[str]] = None
+) -> bool:
+    """Encode the frames of an offline render, whatever their format.
+    
+    Args:
+        output_dir: Render output directory
+        output_path: Output video file path
+        fps: Frame rate (image sequences only; stores record their own)
+        preset: Encoding preset name
+        frame_format: Frame format the render was written with
+        log_callback: Called with log messages
+        status_callback: Called with encode progress reports
+        encoder: Encoder to run, FFmpegEncoder or SegmentedEncoder (so
+            the caller can cancel it), or None for create_encoder(jobs)
+        jobs: Concurrent FFmpeg processes when no encoder is given
+        output_args: Extra FFmpeg output options (single-process encodes)
+    
+    Returns:
+        True if encoding succeeded
+    """
+    from ..render.frame_store import FRAME_STORE_FORMAT, get_frame_store_path
+    from ..render.image_writer import create_frame_writer
+    from ..render.manifest import get_render_coverage
+    
+    # Renders of frame ranges leave gaps until the loop is filled in
+    manifest = get_render_coverage(output_dir)
+    if manifest is not None and not manifest.complete:
+        if log_callback:
+            log_callback(f"Cannot encode a partial render: {manifest.describe()}")
+        return False
+    
+    # Transcode from the lossless master when there is one
+    master = _find_master_input(output_dir, fps, [preset])
+    if master is not None:
+        return encode_render_input(
+            source=master,
+            output_path=output_path,
+            preset=preset,
+            log_callback=log_callback,
+            status_callback=status_callback,
+            encoder=encoder,
+            jobs=jobs,
+            output_args=output_args
+        )
+    
+    if frame_format == FRAME_STORE_FORMAT:
+        return encode_frame_store(
+            store_path=str(get_frame_store_path(output_dir)),
+            output_path=output_path,
+            preset=preset,
+            log_callback=log_callback,
+            status_callback=status_callback,
+            encoder=encoder,
+            jobs=jobs,
+            output_args=output_args
+        )
+    
+    writer = create_frame_writer(frame_format)
+    if not writer.ffmpeg_readable:
+        if log_callback:
+            log_callback(f"FFmpeg cannot read .{writer.extension} frames")
+        return False
+    
+    return encode_frames(
+        frames_dir=output_dir,
+        output_path=output_path,
+        fps=fps,
+        preset=preset,
+        frame_pattern=writer.frame_pattern,
+        log_callback=log_callback,
+        status_callback=status_callback,
+        encoder=encoder,
+        jobs=jobs,
+        output_args=output_args
     )
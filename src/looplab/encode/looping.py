@@ -0,0 +1,175 @@
+"""Loop-aware encoding: one encoded loop repeated without re-encoding.
+
+A long deliverable of a loop (a 30 s loop as a 10 minute file) need not
+be encoded frame by frame. The loop is encoded once with closed GOPs
+whose length divides the loop, so the loop starts on a keyframe and no
+frame refers across its end. FFmpeg then plays that file N times with
+``-stream_loop`` and copies the packets to the output, so the long file
+costs no more encoding than the loop itself. Every repetition restarts on
+the loop's first keyframe and the frame after the last one is frame 0
+again, so the repeats join without a visible seam.
+"""
+
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from .ffmpeg import (
+    PRESETS, EncodeProgress, EncodingPreset, FFmpegEncoder, encode_render_output,
+    find_render_input, get_codec_name, get_output_path_for_preset
+)
+from .segmented import DEFAULT_GOP_SECONDS, get_gop_args, get_gop_frames
+
+
+def get_loop_gop(total_frames: int, fps: float, seconds: float = DEFAULT_GOP_SECONDS) -> int:
+    """GOP length that divides the loop, close to ``seconds`` of video.
+    
+    Args:
+        total_frames: Frames in the loop
+        fps: Frame rate
+        seconds: Preferred keyframe interval
+    
+    Returns:
+        The divisor of total_frames nearest the preferred interval (the
+        whole loop if it is shorter), or the preferred interval itself
+        if no divisor is within a factor of two of it
+    """
+    target = get_gop_frames(fps, seconds)
+    if total_frames <= target:
+        return max(1, total_frames)
+    divisors = [n for n in range(target // 2, target * 2 + 1) if n and total_frames % n == 0]
+    if not divisors:
+        # The last GOP of the loop is shorter; repeats still start on a keyframe
+        return target
+    return min(divisors, key=lambda n: (abs(n - target), -n))
+
+
+def get_loop_output_args(encoding: EncodingPreset, total_frames: int, fps: float) -> List[str]:
+    """Output options for a loop that can be repeated by stream copy.
+    
+    Fixed, closed GOPs that divide the loop; intra-only codecs need none.
+    """
+    args = get_gop_args(encoding, get_loop_gop(total_frames, fps))
+    if get_codec_name(encoding) == "libx264":
+        args += ["-flags", "+cgop"]
+    return args
+
+
+def repeat_loop(
+    loop_path: str,
+    output_path: str,
+    repeats: int,
+    loop_frames: int = 0,
+    encoder=None,
+    log_callback: Optional[Callable[[str], None]] = None,
+    status_callback: Optional[Callable[[EncodeProgress], None]] = None
+) -> bool:
+    """Write a video of an encoded loop played ``repeats`` times.
+    
+    The packets are copied, not re-encoded.
+    
+    Args:
+        loop_path: Encoded loop (with closed GOPs)
+        output_path: Output video file path
+        repeats: Times the loop plays
+        loop_frames: Frames in the loop, to check the output (0 = unchecked)
+        encoder: FFmpegEncoder or SegmentedEncoder to run FFmpeg with
+            (so the caller can cancel it)
+        log_callback: Called with log messages
+        status_callback: Called with progress reports
+    
+    Returns:
+        True if the output was written with every frame
+    """
+    encoder = encoder or FFmpegEncoder()
+    total_frames = loop_frames * repeats
+    
+    args = ["-stream_loop", str(repeats - 1), "-i", loop_path, "-map", "0:v", "-c", "copy"]
+    if Path(output_path).suffix.lower() in (".mp4", ".mov"):
+        args += ["-movflags", "+faststart"]
+    args.append(output_path)
+    
+    if not encoder.run(args, total_frames, log_callback=log_callback,
+                       status_callback=status_callback):
+        return False
+    
+    frames = encoder.last_progress.frame if encoder.last_progress else 0
+    if total_frames and frames and frames != total_frames:
+        if log_callback:
+            log_callback(f"Repeated video has {frames} frames, expected {total_frames}")
+        return False
+    
+    if log_callback:
+        log_callback(f"Encoding complete: {output_path} ({repeats} loops)")
+    return True
+
+
+def encode_render_loop(
+    output_dir: str,
+    output_path: str,
+    fps: float,
+    repeats: int,
+    preset: str = "h264_high",
+    frame_format: str = "png",
+    log_callback: Optional[Callable[[str], None]] = None,
+    status_callback: Optional[Callable[[EncodeProgress], None]] = None,
+    encoder=None,
+    jobs: int = 1
+) -> bool:
+    """Encode a rendered loop once and write it repeated ``repeats`` times.
+    
+    Args:
+        output_dir: Render output directory
+        output_path: Output video file path (with the preset's extension)
+        fps: Frame rate (image sequences only; stores record their own)
+        repeats: Times the loop plays in the output
+        preset: Encoding preset name
+        frame_format: Frame format the render was written with
+        log_callback: Called with log messages
+        status_callback: Called with progress reports
+        encoder: Encoder for the loop and its repeat, FFmpegEncoder or
+            SegmentedEncoder (segments already have fixed, closed GOPs),
+            or None for create_encoder(jobs)
+        jobs: Concurrent FFmpeg processes when no encoder is given
+    
+    Returns:
+        True if encoding succeeded
+    """
+    if preset not in PRESETS:
+        if log_callback:
+            log_callback(f"Unknown preset: {preset}")
+        return False
+    
+    source = find_render_input(output_dir, fps, presets=[preset])
+    if source is None:
+        if log_callback:
+            log_callback(f"No frames FFmpeg can read in {output_dir}")
+        return False
+    
+    output_path = get_output_path_for_preset(output_path, preset)
+    output = Path(output_path)
+    loop_path = output.with_name(f".{output.stem}.loop{output.suffix}")
+    try:
+        if not encode_render_output(
+            output_dir=output_dir,
+            output_path=str(loop_path),
+            fps=fps,
+            preset=preset,
+            frame_format=frame_format,
+            log_callback=log_callback,
+            status_callback=status_callback,
+            encoder=encoder,
+            jobs=jobs,
+            output_args=get_loop_output_args(PRESETS[preset], source.total_frames, source.fps)
+        ):
+            return False
+        
+        # A cancel that lands after the loop's last frame still stops the repeat
+        if encoder is not None and encoder.cancelled:
+            if log_callback:
+                log_callback("Encoding cancelled")
+            return False
+        return repeat_loop(str(loop_path), output_path, repeats, source.total_frames,
+                           encoder=encoder, log_callback=log_callback,
+                           status_callback=status_callback)
+    finally:
+        loop_path.unlink(missing_ok=True)
@@ -0,0 +1,250 @@
+"""Lossless mezzanine masters of renders.
+
+Re-exporting a finished loop in another format means decoding thousands
+of image frames again, or rendering again once they are deleted. A
+master is one lossless video of the whole loop (FFV1, or lossless x264 in
+Matroska) kept next to the frames: a fraction of the size of a PNG
+sequence and much faster to decode. FFV1 masters code every frame as a
+keyframe in parallel slices, so segmented encodes seek straight to their
+first frame.
+
+Once a render directory has a current master, find_render_input reads
+the master instead of the frames, so every later encode (other presets,
+deliverables, repeated loops, tuning) transcodes from it. ``master.json``
+records the render signature and frame count the master was made from;
+a master older than the render's manifest is ignored.
+
+``master.json`` also records the master's pixel format. FFV1 masters keep
+the render's alpha and 16-bit samples; x264 masters are 8-bit RGB, so
+they are only made of 8-bit renders, and presets that encode alpha
+(ProRes 4444) read the frames instead.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Callable, Optional, Sequence, Union
+
+from .ffmpeg import (
+    PRESETS, EncodeProgress, EncodingPreset, FFmpegEncoder, RenderInput, find_render_input,
+    get_preset_pix_fmt
+)
+
+
+MASTER_FILE = "master.mkv"
+MASTER_INFO_FILE = "master.json"
+
+# Presets a master can be encoded with
+MASTER_PRESETS = ("master_ffv1", "master_x264")
+DEFAULT_MASTER_PRESET = "master_ffv1"
+
+# Pixel format of masters by preset and render bit depth
+MASTER_PIX_FMTS = {
+    ("master_ffv1", 8): "bgra",
+    ("master_ffv1", 16): "gbrap16le",
+    ("master_x264", 8): "rgb24",
+}
+
+# Bits per sample and alpha of the master pixel formats
+_PIX_FMT_CONTENT = {
+    "bgra": (8, True),
+    "gbrap16le": (16, True),
+    "rgb24": (8, False),
+}
+
+# Prefixes of FFmpeg pixel formats with an alpha channel
+_ALPHA_PIX_FMTS = ("yuva", "rgba", "bgra", "argb", "abgr", "gbrap", "ya")
+
+
+def get_master_path(output_dir: Union[str, Path]) -> Path:
+    """Path of the master video of a render output directory."""
+    return Path(output_dir) / MASTER_FILE
+
+
+def read_master_info(output_dir: Union[str, Path]) -> Optional[dict]:
+    """Contents of a render's ``master.json``, or None."""
+    try:
+        info = json.loads((Path(output_dir) / MASTER_INFO_FILE).read_text())
+    except (OSError, ValueError):
+        return None
+    return info if isinstance(info, dict) else None
+
+
+def get_render_bit_depth(output_dir: Union[str, Path]) -> int:
+    """Bits per sample of a render's frames (8 or 16).
+    
+    Read from the frame store, else the render manifest; renders with
+    neither are assumed to be 16-bit so no precision is dropped.
+    """
+    from ..render.frame_store import get_frame_store_path, open_frame_store
+    from ..render.manifest import get_render_coverage
+    
+    store = open_frame_store(get_frame_store_path(output_dir))
+    if store is not None:
+        with store:
+            return 16 if store.dtype.itemsize > 1 else 8
+    
+    manifest = get_render_coverage(output_dir)
+    if manifest is not None and isinstance(manifest.signature.get("bit_depth"), int):
+        return 16 if manifest.signature["bit_depth"] > 8 else 8
+    return 16
+
+
+def master_can_encode(info: dict, encoding: EncodingPreset) -> bool:
+    """Check that a master holds everything a preset encodes.
+    
+    Args:
+        info: Contents of ``master.json`` (masters recorded without a
+            pixel format count as 8-bit RGB)
+        encoding: Preset to encode from the master
+    """
+    bits, alpha = _PIX_FMT_CONTENT.get(info.get("pix_fmt"), (8, False))
+    needs_alpha = get_preset_pix_fmt(encoding).startswith(_ALPHA_PIX_FMTS)
+    return encoding.bit_depth <= bits and (alpha or not needs_alpha)
+
+
+def load_master_input(output_dir: Union[str, Path],
+                      presets: Sequence[str] = ()) -> Optional[RenderInput]:
+    """The current master of a render as FFmpeg input.
+    
+    Seeks start half a frame early: Matroska rounds timestamps to
+    milliseconds, and an exact seek could skip the first frame.
+    
+    Args:
+        output_dir: Render output directory
+        presets: Presets to be encoded from the master; the master is
+            only returned if it holds the bit depth and alpha of each
+    
+    Returns:
+        RenderInput of the master, or None if there is none, the
+        render has changed since it was encoded or a preset needs more
+        than it holds
+    """
+    from ..render.manifest import get_render_coverage
+    
+    path = get_master_path(output_dir)
+    info = read_master_info(output_dir)
+    try:
+        frames, fps = int(info["frames"]), float(info["fps"])
+        master_mtime = path.stat().st_mtime
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    
+    if not all(name in PRESETS and master_can_encode(info, PRESETS[name]) for name in presets):
+        return None
+    
+    manifest = get_render_coverage(output_dir)
+    if manifest is not None:
+        if manifest.signature != info.get("signature") or not manifest.complete:
+            return None
+        try:
+            if manifest.path.stat().st_mtime > master_mtime:
+                return None
+        except OSError:
+            pass
+    
+    def input_args(start: int) -> list:
+        seek = ["-ss", f"{(start - 0.5) / fps:.6f}"] if start else []
+        return [*seek, "-i", str(path)]
+    
+    return RenderInput(input_args, frames, fps, [])
+
+
+def encode_render_master(
+    output_dir: str,
+    fps: float = 30.0,
+    preset: str = DEFAULT_MASTER_PRESET,
+    encoder: Optional[FFmpegEncoder] = None,
+    log_callback: Optional[Callable[[str], None]] = None,
+    status_callback: Optional[Callable[[EncodeProgress], None]] = None
+) -> bool:
+    """Encode the frames of a render to a lossless master.
+    
+    Does nothing if the render already has a current master.
+    
+    Args:
+        output_dir: Render output directory
+        fps: Frame rate (image sequences only; stores record their own)
+        preset: One of MASTER_PRESETS
+        encoder: FFmpegEncoder to run (so the caller can cancel it)
+        log_callback: Called with log messages
+        status_callback: Called with progress reports
+    
+    Returns:
+        True if the render has a current master
+    """
+    from ..render.manifest import get_render_coverage
+    
+    if preset not in MASTER_PRESETS:
+        if log_callback:
+            log_callback(f"Not a master preset: {preset}")
+        return False
+    
+    bit_depth = get_render_bit_depth(output_dir)
+    if (preset, bit_depth) not in MASTER_PIX_FMTS:
+        if log_callback:
+            log_callback(f"{PRESETS[preset].name} cannot hold {bit_depth}-bit frames; "
+                         f"encoding {PRESETS[DEFAULT_MASTER_PRESET].name} instead")
+        preset = DEFAULT_MASTER_PRESET
+    pix_fmt = MASTER_PIX_FMTS[(preset, bit_depth)]
+    
+    if (load_master_input(output_dir) is not None
+            and read_master_info(output_dir).get("pix_fmt") == pix_fmt):
+        if log_callback:
+            log_callback(f"Master is up to date: {get_master_path(output_dir)}")
+        return True
+    
+    manifest = get_render_coverage(output_dir)
+    if manifest is not None and not manifest.complete:
+        if log_callback:
+            log_callback(f"Cannot encode a partial render: {manifest.describe()}")
+        return False
+    
+    source = find_render_input(output_dir, fps, use_master=False)
+    if source is None:
+        if log_callback:
+            log_callback(f"No frames FFmpeg can read in {output_dir}")
+        return False
+    
+    encoder = encoder or FFmpegEncoder()
+    path = get_master_path(output_dir)
+    info_path = Path(output_dir) / MASTER_INFO_FILE
+    temp = path.with_name(f".{path.stem}.tmp{path.suffix}")
+    info_path.unlink(missing_ok=True)
+    try:
+        if not encoder.encode_sequence(
+            input_pattern="",
+            output_path=str(temp),
+            fps=source.fps,
+            preset=preset,
+            log_callback=log_callback,
+            input_args=source.input_args(0),
+            video_filters=source.video_filters,
+            total_frames=source.total_frames,
+            status_callback=status_callback,
+            output_args=["-pix_fmt", pix_fmt]
+        ):
+            return False
+        
+        frames = encoder.last_progress.frame if encoder.last_progress else 0
+        if frames and frames != source.total_frames:
+            if log_callback:
+                log_callback(f"Master has {frames} frames, expected {source.total_frames}")
+            return False
+        
+        os.replace(temp, path)
+    finally:
+        temp.unlink(missing_ok=True)
+    
+    info_path.write_text(json.dumps({
+        "preset": preset,
+        "pix_fmt": pix_fmt,
+        "frames": source.total_frames,
+        "fps": source.fps,
+        "signature": manifest.signature if manifest is not None else None,
+    }, indent=2))
+    
+    if log_callback:
+        size = path.stat().st_size
+        log_callback(f"Master written: {path} ({size / 1e6:.1f} MB, {PRESETS[preset].name})")
+    return True
@@ -0,0 +1,290 @@
+"""Cached FFmpeg discovery and capability probing.
+
+Finding FFmpeg may walk package directories on Windows, and asking it
+for its version, encoders, pixel formats and filters spawns a process per
+question. The answers only change when the binary does, so they are
+probed once, kept in memory and saved to ``ffmpeg_probe.json`` in the
+config directory, keyed by the binary's path and invalidated when its
+modification time or size changes.
+
+Presets are checked against the probed capabilities when a render is
+submitted (encoder present, pixel format supported by that encoder), so
+a missing codec fails the job before rendering instead of at encode time.
+"""
+
+import json
+import os
+import subprocess
+import threading
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .ffmpeg import PRESETS, EncodingPreset, find_ffmpeg, get_codec_name, get_custom_presets_path
+
+
+PROBE_VERSION = 1
+PROBE_TIMEOUT_SECONDS = 10
+
+_lock = threading.Lock()
+_probes: Dict[str, "FFmpegCapabilities"] = {}
+
+
+def get_probe_cache_path() -> Path:
+    """Get path to the FFmpeg probe cache (next to the custom presets)."""
+    return get_custom_presets_path().with_name("ffmpeg_probe.json")
+
+
+def _stat(path: str) -> Optional[Tuple[float, int]]:
+    """Modification time and size of a binary, or None if it is gone."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime, st.st_size
+
+
+def _run(ffmpeg_path: str, *args: str) -> str:
+    """Output of an FFmpeg query (empty if it fails)."""
+    try:
+        result = subprocess.run(
+            [ffmpeg_path, "-hide_banner", *args],
+            capture_output=True, text=True, timeout=PROBE_TIMEOUT_SECONDS
+        )
+    except (OSError, subprocess.SubprocessError):
+        return ""
+    return result.stdout
+
+
+def _listing(text: str) -> List[List[str]]:
+    """Fields of the lines after the ``---`` separator of a listing."""
+    lines = text.splitlines()
+    start = next((i + 1 for i, line in enumerate(lines) if line.strip().startswith("---")), 0)
+    return [line.split() for line in lines[start:] if line.strip()]
+
+
+def parse_encoders(text: str) -> List[str]:
+    """Video encoder names from ``ffmpeg -encoders``."""
+    return [fields[1] for fields in _listing(text)
+            if len(fields) > 1 and fields[0].startswith("V")]
+
+
+def parse_pix_fmts(text: str) -> List[str]:
+    """Pixel format names from ``ffmpeg -pix_fmts``."""
+    return [fields[1] for fields in _listing(text) if len(fields) > 1]
+
+
+def parse_filters(text: str) -> List[str]:
+    """Filter names from ``ffmpeg -filters``."""
+    return [fields[1] for fields in (line.split() for line in text.splitlines())
+            if len(fields) > 2 and "->" in fields[2]]
+
+
+def parse_encoder_pix_fmts(text: str) -> List[str]:
+    """Pixel formats from ``ffmpeg -h encoder=NAME`` (empty if unlisted)."""
+    for line in text.splitlines():
+        if "Supported pixel formats:" in line:
+            return line.split(":", 1)[1].split()
+    return []
+
+
+@dataclass
+class FFmpegCapabilities:
+    """What an FFmpeg binary can do.
+    
+    Attributes:
+        path: FFmpeg executable
+        mtime: Modification time of the binary when probed
+        size: Size of the binary when probed
+        version: First line of ``ffmpeg -version``
+        encoders: Video encoder names
+        pix_fmts: Pixel format names
+        filters: Filter names
+        encoder_pix_fmts: Pixel formats per encoder, probed on first use
+    """
+    
+    path: str
+    mtime: float
+    size: int
+    version: str = ""
+    encoders: List[str] = field(default_factory=list)
+    pix_fmts: List[str] = field(default_factory=list)
+    filters: List[str] = field(default_factory=list)
+    encoder_pix_fmts: Dict[str, List[str]] = field(default_factory=dict)
+    
+    def is_current(self) -> bool:
+        """Whether the binary is unchanged since it was probed."""
+        return _stat(self.path) == (self.mtime, self.size)
+    
+    @property
+    def answered(self) -> bool:
+        """Whether FFmpeg answered the version and encoder queries."""
+        return bool(self.version and self.encoders)
+    
+    def has_encoder(self, name: str) -> bool:
+        return name in self.encoders
+    
+    def has_filter(self, name: str) -> bool:
+        return name in self.filters
+    
+    def check_preset(self, encoding: EncodingPreset) -> Optional[str]:
+        """Why this FFmpeg cannot encode a preset, or None if it can."""
+        codec = get_codec_name(encoding)
+        if codec and not self.has_encoder(codec):
+            return f"{encoding.name}: FFmpeg has no {codec} encoder"
+        if encoding.palette and not self.has_filter("palettegen"):
+            return f"{encoding.name}: FFmpeg has no palettegen filter"
+        
+        args = encoding.ffmpeg_args
+        if "-pix_fmt" not in args:
+            return None
+        pix_fmt = args[args.index("-pix_fmt") + 1]
+        supported = self._encoder_pix_fmts(codec) if codec else []
+        if pix_fmt not in (supported or self.pix_fmts):
+            return f"{encoding.name}: {codec or 'FFmpeg'} cannot encode {pix_fmt}"
+        return None
+    
+    def _encoder_pix_fmts(self, codec: str) -> List[str]:
+        """Pixel formats of an encoder, probing and saving them once."""
+        if codec not in self.encoder_pix_fmts:
+            text = _run(self.path, "-h", f"encoder={codec}")
+            if not text.strip():
+                return []
+            self.encoder_pix_fmts[codec] = parse_encoder_pix_fmts(text)
+            _save(self)
+        return self.encoder_pix_fmts[codec]
+
+
+def _load_cache(path: Optional[Path] = None) -> dict:
+    """Probe cache contents (empty if missing, invalid or outdated)."""
+    try:
+        with open(path or get_probe_cache_path()) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != PROBE_VERSION:
+        return {}
+    return data
+
+
+def _write_cache(data: dict, path: Optional[Path] = None):
+    """Replace the probe cache; failures only cost a re-probe later."""
+    path = path or get_probe_cache_path()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(temp, 'w') as f:
+            json.dump({**data, "version": PROBE_VERSION}, f, indent=2)
+        os.replace(temp, path)
+    except OSError:
+        pass
+
+
+def _save(capabilities: FFmpegCapabilities):
+    """Store one binary's capabilities in the probe cache."""
+    with _lock:
+        data = _load_cache()
+        data.setdefault("binaries", {})[capabilities.path] = asdict(capabilities)
+        _write_cache(data)
+
+
+def get_probe_cache_state() -> Optional[Tuple[float, int]]:
+    """Modification time and size of the probe cache, or None if there is none."""
+    return _stat(str(get_probe_cache_path()))
+
+
+def load_located_ffmpeg() -> Optional[str]:
+    """FFmpeg found by a previous directory search, if it still exists."""
+    located = _load_cache().get("located")
+    return located if isinstance(located, str) and os.path.isfile(located) else None
+
+
+def save_located_ffmpeg(path: str):
+    """Remember FFmpeg found by a directory search."""
+    with _lock:
+        data = _load_cache()
+        data["located"] = path
+        _write_cache(data)
+
+
+def probe_ffmpeg(ffmpeg_path: Optional[str] = None,
+                 refresh: bool = False) -> Optional[FFmpegCapabilities]:
+    """Capabilities of an FFmpeg binary, probed once per binary version.
+    
+    Args:
+        ffmpeg_path: FFmpeg executable, or None to auto-detect
+        refresh: Probe again even if a cached result is current
+    
+    Returns:
+        FFmpegCapabilities, or None if FFmpeg is not available. A probe
+        FFmpeg did not answer (see ``answered``) is returned but not cached.
+    """
+    ffmpeg_path = ffmpeg_path or find_ffmpeg()
+    if not ffmpeg_path:
+        return None
+    ffmpeg_path = os.path.abspath(ffmpeg_path)
+    stat = _stat(ffmpeg_path)
+    if stat is None:
+        return None
+    
+    if not refresh:
+        with _lock:
+            cached = _probes.get(ffmpeg_path)
+        if cached is not None and cached.is_current():
+            return cached
+        
+        entry = _load_cache().get("binaries", {}).get(ffmpeg_path)
+        try:
+            cached = FFmpegCapabilities(**entry) if isinstance(entry, dict) else None
+        except TypeError:
+            cached = None
+        if cached is not None and cached.is_current() and cached.answered:
+            with _lock:
+                _probes[ffmpeg_path] = cached
+            return cached
+    
+    version_lines = _run(ffmpeg_path, "-version").strip().splitlines()
+    capabilities = FFmpegCapabilities(
+        path=ffmpeg_path,
+        mtime=stat[0],
+        size=stat[1],
+        version=version_lines[0] if version_lines else "",
+        encoders=parse_encoders(_run(ffmpeg_path, "-encoders")),
+        pix_fmts=parse_pix_fmts(_run(ffmpeg_path, "-pix_fmts")),
+        filters=parse_filters(_run(ffmpeg_path, "-filters"))
+    )
+    if not capabilities.answered:
+        # Timed out or failed: probe again next time rather than remember it
+        return capabilities
+    with _lock:
+        _probes[ffmpeg_path] = capabilities
+    _save(capabilities)
+    return capabilities
+
+
+def check_presets(presets: Sequence[str], ffmpeg_path: Optional[str] = None) -> List[str]:
+    """Problems encoding presets with the local FFmpeg.
+    
+    Args:
+        presets: Preset names (unknown names are reported too)
+        ffmpeg_path: FFmpeg executable, or None to auto-detect
+    
+    Returns:
+        One message per problem (empty if every preset can be encoded)
+    """
+    if not presets:
+        return []
+    capabilities = probe_ffmpeg(ffmpeg_path)
+    if capabilities is None:
+        return ["FFmpeg not found. Please install FFmpeg."]
+    if not capabilities.answered:
+        return [f"Could not probe FFmpeg at {capabilities.path} (timed out or failed). "
+                "Please try again."]
+    
+    problems = []
+    for name in presets:
+        encoding = PRESETS.get(name)
+        problem = capabilities.check_preset(encoding) if encoding else f"Unknown preset: {name}"
+        if problem:
+            problems.append(problem)
+    return problems
@@ -0,0 +1,545 @@
+"""Segmented parallel video encoding.
+
+x265 and slow x264 presets keep only a few cores busy per encode. A
+segmented encode splits the frames into GOP-aligned segments, encodes
+them with concurrent FFmpeg processes and joins the segments with the
+concat demuxer, copying the streams without re-encoding.
+
+Every segment uses the preset's own rate control (CRF) with the same
+fixed GOP length and scene-cut keyframes disabled, so the joined video
+has the keyframe spacing and quality of a single-process encode. Each
+segment's frame count and the joined video's are checked against the
+plan before the result is accepted.
+
+Incremental encodes keep the segments next to the output with a manifest
+of the encoder settings and a hash of each segment's frames. After a
+frame range is rendered again, only the segments whose frames changed
+are encoded; the join copies the rest as they are. Incremental segments
+have a fixed length, so the plan does not depend on the number of jobs.
+"""
+
+import hashlib
+import json
+import math
+import os
+import queue
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from .ffmpeg import (
+    PRESETS, EncodeProgress, EncodingPreset, FFmpegEncoder, find_ffmpeg, get_codec_name
+)
+
+
+# Keyframe interval of segmented encodes
+DEFAULT_GOP_SECONDS = 2.0
+# Segments per parallel job, so fast segments do not leave cores idle
+SEGMENTS_PER_JOB = 2
+# Length of incremental segments in GOPs (a changed frame re-encodes one)
+INCREMENTAL_SEGMENT_GOPS = 5
+
+# Manifest of the kept segments of an incremental encode
+SEGMENT_MANIFEST = "segments.json"
+SEGMENT_MANIFEST_VERSION = 1
+
+
+def get_gop_frames(fps: float, seconds: float = DEFAULT_GOP_SECONDS) -> int:
+    """GOP length in frames for a frame rate."""
+    return max(1, int(round(fps * seconds)))
+
+
+def get_gop_args(encoding: EncodingPreset, gop: int) -> List[str]:
+    """Output options that fix the GOP length of a preset's encoder.
+    
+    Intra-only codecs (ProRes, MJPEG, ...) need none.
+    """
+    codec = get_codec_name(encoding)
+    fixed = ["-g", str(gop), "-keyint_min", str(gop)]
+    if codec == "libx264":
+        return fixed + ["-sc_threshold", "0"]
+    if codec == "libx265":
+        return fixed + ["-x265-params", "scenecut=0:open-gop=0"]
+    return []
+
+
+def plan_segments(total_frames: int, jobs: int, gop: int,
+                  length: int = 0) -> List[Tuple[int, int]]:
+    """Split frames into GOP-aligned segments.
+    
+    Args:
+        total_frames: Frames to encode
+        jobs: Parallel encodes
+        gop: GOP length in frames
+        length: Segment length in frames, rounded up to whole GOPs
+            (0 = split the frames between the jobs)
+    
+    Returns:
+        (start frame, frame count) per segment; every segment but the
+        last is a whole number of GOPs
+    """
+    if total_frames <= 0:
+        return []
+    target = length or math.ceil(total_frames / max(1, jobs * SEGMENTS_PER_JOB))
+    size = max(gop, math.ceil(target / gop) * gop)
+    return [(start, min(size, total_frames - start)) for start in range(0, total_frames, size)]
+
+
+def write_concat_list(path: Path, segments: List[Path]):
+    """Write a concat demuxer list of segment files."""
+    lines = ["ffconcat version 1.0"]
+    for segment in segments:
+        name = segment.name.replace("'", "'\\''")
+        lines.append(f"file '{name}'")
+    path.write_text("\n".join(lines) + "\n")
+
+
+def hash_frame_file(path: Union[str, Path], offset: int = 0, size: int = -1) -> str:
+    """Hash of a frame file, or of one frame's bytes within a file.
+    
+    Returns:
+        Hex digest, or "" if the file cannot be read
+    """
+    digest = hashlib.sha1()
+    try:
+        with open(path, "rb") as f:
+            f.seek(offset)
+            if size >= 0:
+                digest.update(f.read(size))
+            else:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(chunk)
+    except OSError:
+        return ""
+    return digest.hexdigest()
+
+
+def load_segment_manifest(path: Path, settings: dict) -> List[dict]:
+    """Kept segments of an incremental encode with the same settings.
+    
+    Returns:
+        Segment records ({"start", "count", "hash"} by index), or an
+        empty list if there are none or the settings differ
+    """
+    try:
+        data = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return []
+    if not isinstance(data, dict) or data.get("version") != SEGMENT_MANIFEST_VERSION:
+        return []
+    if data.get("settings") != settings:
+        return []
+    segments = data.get("segments")
+    return segments if isinstance(segments, list) else []
+
+
+def save_segment_manifest(path: Path, settings: dict, segments: List[Optional[dict]]):
+    """Record the kept segments of an incremental encode.
+    
+    Args:
+        path: Manifest path
+        settings: Encoder settings the segments were encoded with
+        segments: Record per segment index, None for segments to discard
+    """
+    temp = path.with_name(path.name + ".tmp")
+    temp.write_text(json.dumps({
+        "version": SEGMENT_MANIFEST_VERSION,
+        "settings": settings,
+        "segments": [segment or {} for segment in segments],
+    }, indent=2))
+    os.replace(temp, path)
+
+
+class SegmentedEncoder:
+    """Encodes frames as parallel GOP-aligned segments, then joins them."""
+    
+    def __init__(self, jobs: int = 2, ffmpeg_path: Optional[str] = None,
+                 gop_seconds: float = DEFAULT_GOP_SECONDS, threads: int = 0,
+                 incremental: bool = False):
+        """Initialize encoder.
+        
+        Args:
+            jobs: Concurrent FFmpeg processes
+            ffmpeg_path: Path to FFmpeg, or None to auto-detect
+            gop_seconds: Keyframe interval
+            threads: Encoder threads shared by the processes (0 = one per core)
+            incremental: Keep the segments and encode only changed ones
+                on the next run (needs frame hashes, see encode)
+        """
+        self.jobs = max(1, jobs)
+        self.ffmpeg_path = ffmpeg_path or find_ffmpeg()
+        self.gop_seconds = gop_seconds
+        self.threads = threads
+        self.incremental = incremental
+        self.last_progress: Optional[EncodeProgress] = None
+        
+        self._lock = threading.Lock()
+        self._encoders: List[FFmpegEncoder] = []
+        self._cancelled = False
+        self._failed = False
+    
+    def is_available(self) -> bool:
+        """Check if FFmpeg is available."""
+        return self.ffmpeg_path is not None
+    
+    @property
+    def cancelled(self) -> bool:
+        """Whether ``cancel`` was called since the last encode started."""
+        return self._cancelled
+    
+    def cancel(self):
+        """Cancel all running segment encodes (returns at once)."""
+        self._stop(cancelled=True)
+    
+    def run(
+        self,
+        args: List[str],
+        total_frames: int = 0,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        log_callback: Optional[Callable[[str], None]] = None,
+        status_callback: Optional[Callable[[EncodeProgress], None]] = None
+    ) -> bool:
+        """Run one more FFmpeg process that ``cancel`` stops, like FFmpegEncoder.run.
+        
+        For steps after an encode, such as repeating an encoded loop; does
+        nothing once the encode was cancelled or failed.
+        
+        Returns:
+            True if FFmpeg succeeded
+        """
+        encoder = self._new_encoder()
+        if encoder is None:
+            if log_callback and self._cancelled:
+                log_callback("Encoding cancelled")
+            return False
+        
+        ok = encoder.run(args, total_frames, progress_callback, log_callback, status_callback)
+        self.last_progress = encoder.last_progress
+        return ok and not self._cancelled
+    
+    def _stop(self, cancelled: bool):
+        """Stop running encodes and start no more."""
+        with self._lock:
+            if cancelled:
+                self._cancelled = True
+            else:
+                self._failed = True
+            encoders = list(self._encoders)
+        for encoder in encoders:
+            encoder.cancel()
+    
+    def _new_encoder(self) -> Optional[FFmpegEncoder]:
+        """Encoder for one FFmpeg run, or None once stopped."""
+        encoder = FFmpegEncoder(self.ffmpeg_path)
+        with self._lock:
+            if self._cancelled or self._failed:
+                return None
+            self._encoders.append(encoder)
+        return encoder
+    
+    def encode(
+        self,
+        input_args: Callable[[int], List[str]],
+        total_frames: int,
+        output_path: str,
+        fps: float,
+        preset: str = "h265_high",
+        video_filters: Optional[List[str]] = None,
+        log_callback: Optional[Callable[[str], None]] = None,
+        status_callback: Optional[Callable[[EncodeProgress], None]] = None,
+        frame_digest: Optional[Callable[[int], str]] = None
+    ) -> bool:
+        """Encode frames in parallel segments and join them.
+        
+        Callbacks run on the calling thread, like FFmpegEncoder's.
+        Incremental encodes need ``frame_digest``; without it every
+        segment is encoded and none are kept.
+        
+        Args:
+            input_args: Maps a start frame to FFmpeg input options that
+                read the frames from there on
+            total_frames: Frames to encode
+            output_path: Output video file path
+            fps: Frame rate
+            preset: Encoding preset name
+            video_filters: Video filters applied before encoding
+            log_callback: Called with log messages
+            status_callback: Called with combined progress reports
+            frame_digest: Maps a frame number to a hash of its pixels
+                (incremental encodes)
+        
+        Returns:
+            True if encoding succeeded and every frame arrived
+        """
+        if not self.is_available():
+            if log_callback:
+                log_callback("FFmpeg not available")
+            return False
+        
+        if preset not in PRESETS:
+            if log_callback:
+                log_callback(f"Unknown preset: {preset}")
+            return False
+        
+        encoding = PRESETS[preset]
+        if encoding.is_animated:
+            return self._encode_whole(input_args, total_frames, output_path, fps, preset,
+                                      video_filters, log_callback, status_callback)
+        
+        incremental = self.incremental and frame_digest is not None
+        if self.incremental and not incremental and log_callback:
+            log_callback("No frame hashes for an incremental encode; encoding every segment")
+        
+        gop = get_gop_frames(fps, self.gop_seconds)
+        length = gop * INCREMENTAL_SEGMENT_GOPS if incremental else 0
+        segments = plan_segments(total_frames, self.jobs, gop, length)
+        if not segments:
+            if log_callback:
+                log_callback("No frames to encode")
+            return False
+        
+        self._cancelled = False
+        self._failed = False
+        self._encoders.clear()
+        self.last_progress = None
+        
+        output = Path(output_path)
+        work_dir = output.with_name(f".{output.stem}.segments")
+        work_dir.mkdir(parents=True, exist_ok=True)
+        paths = [work_dir / f"segment_{i:04d}.{encoding.extension}" for i in range(len(segments))]
+        
+        # Share the cores between the concurrent encodes
+        threads = max(1, (self.threads or os.cpu_count() or 1) // self.jobs)
+        gop_args = get_gop_args(encoding, gop)
+        output_args = [*gop_args, "-threads", str(threads)]
+        
+        records: List[Optional[dict]] = []
+        pending = list(range(len(segments)))
+        if incremental:
+            settings = {
+                "preset": preset,
+                "ffmpeg_args": list(encoding.ffmpeg_args),
+                "gop_args": gop_args,
+                "fps": fps,
+                "input_args": input_args(0),
+                "video_filters": list(video_filters or []),
+            }
+            records, pending = self._plan_incremental(
+                segments, paths, work_dir, settings, frame_digest, log_callback
+            )
+        
+        pending_frames = sum(segments[index][1] for index in pending)
+        if log_callback:
+            log_callback(f"Encoding {pending_frames} frames as {len(pending)} segments "
+                         f"({self.jobs} at a time, GOP {gop})")
+        
+        try:
+            events: "queue.Queue" = queue.Queue()
+            with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+                futures = [
+                    pool.submit(self._encode_segment, index, *segments[index], paths[index],
+                                input_args, fps, preset, video_filters, output_args, events)
+                    for index in pending
+                ]
+                self._relay(events, futures, pending_frames, fps, log_callback, status_callback)
+                results = dict(zip(pending, (future.result() for future in futures)))
+            
+            if incremental:
+                # Keep what was encoded, even if the encode as a whole failed
+                for index, result in results.items():
+                    if not result:
+                        records[index] = None
+                save_segment_manifest(work_dir / SEGMENT_MANIFEST, settings, records)
+            
+            if self._cancelled:
+                if log_callback:
+                    log_callback("Encoding cancelled")
+                return False
+            failed = [str(index) for index, result in results.items() if not result]
+            if failed:
+                if log_callback:
+                    log_callback(f"Segments failed: {', '.join(failed)}")
+                return False
+            
+            return self._join(paths, work_dir, output_path, encoding, total_frames,
+                              log_callback)
+        finally:
+            if not incremental:
+                shutil.rmtree(work_dir, ignore_errors=True)
+    
+    def _plan_incremental(self, segments: List[Tuple[int, int]], paths: List[Path],
+                          work_dir: Path, settings: dict,
+                          frame_digest: Callable[[int], str],
+                          log_callback: Optional[Callable[[str], None]]
+                          ) -> Tuple[List[Optional[dict]], List[int]]:
+        """Hash the frames and find the segments that must be encoded.
+        
+        Segments to encode are dropped from the manifest before any
+        encode starts, so an interrupted run never leaves a stale segment
+        recorded as current.
+        
+        Returns:
+            (segment records by index, indices of segments to encode)
+        """
+        total_frames = segments[-1][0] + segments[-1][1]
+        with ThreadPoolExecutor(max_workers=max(self.jobs, os.cpu_count() or 1)) as pool:
+            digests = list(pool.map(frame_digest, range(total_frames)))
+        
+        records = []
+        for start, count in segments:
+            frames = digests[start:start + count]
+            records.append({
+                "start": start,
+                "count": count,
+                # An unreadable frame never matches, so its segment is encoded
+                "hash": hashlib.sha1("".join(frames).encode()).hexdigest() if all(frames) else "",
+            })
+        
+        manifest_path = work_dir / SEGMENT_MANIFEST
+        kept = load_segment_manifest(manifest_path, settings)
+        pending = [
+            index for index, record in enumerate(records)
+            if not (record["hash"] and index < len(kept) and kept[index] == record
+                    and paths[index].is_file())
+        ]
+        save_segment_manifest(manifest_path, settings, [
+            None if index in pending else record for index, record in enumerate(records)
+        ])
+        # Segments of an earlier plan are never joined again
+        for path in work_dir.glob("segment_*"):
+            if path not in paths:
+                path.unlink(missing_ok=True)
+        
+        if log_callback:
+            reused = len(segments) - len(pending)
+            log_callback(f"{reused} of {len(segments)} segments are unchanged")
+        return records, pending
+    
+    def _encode_whole(self, input_args: Callable[[int], List[str]], total_frames: int,
+                      output_path: str, fps: float, preset: str,
+                      video_filters: Optional[List[str]],
+                      log_callback: Optional[Callable[[str], None]],
+                      status_callback: Optional[Callable[[EncodeProgress], None]]) -> bool:
+        """Encode in one process: animated images cannot be joined by stream copy."""
+        self._cancelled = False
+        self._failed = False
+        self._encoders.clear()
+        encoder = FFmpegEncoder(self.ffmpeg_path, threads=self.threads)
+        with self._lock:
+            self._encoders.append(encoder)
+        
+        if log_callback:
+            log_callback(f"{PRESETS[preset].name} is encoded in one process")
+        ok = encoder.encode_sequence(
+            input_pattern="",
+            output_path=output_path,
+            fps=fps,
+            preset=preset,
+            log_callback=log_callback,
+            input_args=input_args(0),
+            video_filters=video_filters,
+            total_frames=total_frames,
+            status_callback=status_callback
+        )
+        self.last_progress = encoder.last_progress
+        return ok
+    
+    def _encode_segment(self, index: int, start: int, count: int, path: Path,
+                        input_args: Callable[[int], List[str]], fps: float, preset: str,
+                        video_filters: Optional[List[str]], output_args: List[str],
+                        events: "queue.Queue") -> bool:
+        """Encode one segment (pool thread); reports go to ``events``."""
+        encoder = self._new_encoder()
+        if encoder is None:
+            return False
+        
+        ok = encoder.encode_sequence(
+            input_pattern="",
+            output_path=str(path),
+            fps=fps,
+            preset=preset,
+            log_callback=lambda message: events.put(("log", f"[segment {index}] {message}")),
+            input_args=input_args(start),
+            video_filters=video_filters,
+            total_frames=count,
+            status_callback=lambda progress: events.put(("progress", index, progress)),
+            output_args=["-frames:v", str(count), *output_args]
+        )
+        
+        frames = encoder.last_progress.frame if encoder.last_progress else 0
+        if ok and frames != count:
+            events.put(("log", f"[segment {index}] encoded {frames} frames, expected {count}"))
+            ok = False
+        events.put(("done", index, ok))
+        return ok
+    
+    def _relay(self, events: "queue.Queue", futures, total_frames: int, fps: float,
+               log_callback: Optional[Callable[[str], None]],
+               status_callback: Optional[Callable[[EncodeProgress], None]]):
+        """Forward segment reports on this thread until all segments end."""
+        start = time.monotonic()
+        frames: Dict[int, int] = {}
+        failed = False
+        
+        while not all(future.done() for future in futures) or not events.empty():
+            try:
+                event = events.get(timeout=0.25)
+            except queue.Empty:
+                continue
+            
+            if event[0] == "log":
+                if log_callback:
+                    log_callback(event[1])
+            elif event[0] == "done":
+                # One failed segment fails the encode; stop the others
+                if not event[2] and not failed:
+                    failed = True
+                    self._stop(cancelled=False)
+            else:
+                _, index, progress = event
+                frames[index] = progress.frame
+                done = sum(frames.values())
+                elapsed = time.monotonic() - start
+                rate = done / elapsed if elapsed > 0 else 0.0
+                self.last_progress = EncodeProgress(
+                    frame=done,
+                    total_frames=total_frames,
+                    fps=rate,
+                    speed=rate / fps if fps > 0 else 0.0,
+                    out_time=done / fps if fps > 0 else 0.0,
+                    elapsed=elapsed
+                )
+                if status_callback:
+                    status_callback(self.last_progress)
+    
+    def _join(self, paths: List[Path], work_dir: Path, output_path: str,
+              encoding: EncodingPreset, total_frames: int,
+              log_callback: Optional[Callable[[str], None]]) -> bool:
+        """Concatenate the segments without re-encoding and check the result."""
+        encoder = self._new_encoder()
+        if encoder is None:
+            return False
+        
+        concat_list = work_dir / "segments.ffconcat"
+        write_concat_list(concat_list, paths)
+        
+        args = ["-f", "concat", "-safe", "0", "-i", str(concat_list), "-c", "copy"]
+        if encoding.extension in ("mp4", "mov"):
+            args += ["-movflags", "+faststart"]
+        args.append(output_path)
+        
+        if not encoder.run(args, total_frames, log_callback=log_callback):
+            return False
+        
+        frames = encoder.last_progress.frame if encoder.last_progress else 0
+        if frames and frames != total_frames:
+            if log_callback:
+                log_callback(f"Joined video has {frames} frames, expected {total_frames}")
+            return False
+        
+        if log_callback:
+            log_callback(f"Encoding complete: {output_path}")
+        return True
@@ -0,0 +1,454 @@
+"""Encoder preset auto-tuning against a quality target.
+
+The built-in x264/x265 presets use one speed preset and CRF for every
+loop, which over-encodes most content. Tuning encodes a sample clip of a
+render with combinations of speed preset and CRF, measures each result
+against the source frames and keeps the fastest encode (or the smallest
+file) that still meets the quality target.
+
+Quality is measured with FFmpeg's libvmaf filter when the local FFmpeg
+has it, or locally as PSNR or SSIM of the decoded frames. For each speed
+preset the highest CRF that meets the target is found by bisection
+(quality falls as CRF rises), and the speed presets are searched in
+parallel. Every FFmpeg process gets the same share of the cores, so the
+encode times of the candidates compare fairly.
+
+Run with:
+    looplab tune renders/loop --preset h264_high --target 95 --save loop_tuned
+"""
+
+import json
+import math
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+
+from .ffmpeg import PRESETS, EncodingPreset, FFmpegEncoder, RenderInput, find_ffmpeg
+
+
+# Speed presets searched (x264 and x265 share these names)
+DEFAULT_SPEEDS = ("veryfast", "faster", "fast", "medium", "slow")
+# CRF values searched, inclusive
+DEFAULT_CRF_RANGE = (14, 32)
+# Seconds of the loop encoded per candidate
+DEFAULT_SAMPLE_SECONDS = 4.0
+
+# Quality metrics and their default targets
+VMAF = "vmaf"
+PSNR = "psnr"
+SSIM = "ssim"
+DEFAULT_TARGETS = {VMAF: 95.0, PSNR: 42.0, SSIM: 0.98}
+
+# What the winner is chosen for
+FASTEST = "fastest"
+SMALLEST = "smallest"
+
+
+def has_vmaf(ffmpeg_path: Optional[str] = None) -> bool:
+    """Whether an FFmpeg build has the libvmaf filter."""
+    from .probe import probe_ffmpeg
+    
+    capabilities = probe_ffmpeg(ffmpeg_path)
+    return capabilities is not None and capabilities.has_filter("libvmaf")
+
+
+def get_tuned_args(encoding: EncodingPreset, speed: str, crf: int) -> List[str]:
+    """A preset's FFmpeg options with another speed preset and CRF.
+    
+    Raises:
+        ValueError: If the preset has no speed preset or CRF to change
+    """
+    args = list(encoding.ffmpeg_args)
+    for option, value in (("-preset", speed), ("-crf", str(crf))):
+        if option not in args:
+            raise ValueError(f"{encoding.name} has no {option} option to tune")
+        args[args.index(option) + 1] = value
+    return args
+
+
+def plan_sample(total_frames: int, fps: float,
+                seconds: float = DEFAULT_SAMPLE_SECONDS) -> Tuple[int, int]:
+    """Clip of a loop to encode, from its middle.
+    
+    Returns:
+        (start frame, frame count)
+    """
+    count = min(total_frames, max(1, int(round(seconds * fps))))
+    return (total_frames - count) // 2, count
+
+
+@dataclass
+class TuneCandidate:
+    """One encode of the sample clip.
+    
+    Attributes:
+        speed: Encoder speed preset
+        crf: Constant rate factor
+        score: Measured quality (metric of the search)
+        size: Encoded sample size in bytes
+        encode_seconds: Wall time of the encode
+        passed: Whether the score met the target
+        error: Why the encode or measurement failed
+    """
+    
+    speed: str
+    crf: int
+    score: float = 0.0
+    size: int = 0
+    encode_seconds: float = 0.0
+    passed: bool = False
+    error: str = ""
+
+
+@dataclass
+class TuneResult:
+    """Outcome of a tuning run.
+    
+    Attributes:
+        base: Preset the search started from
+        metric: Quality metric (VMAF, PSNR or SSIM)
+        target: Minimum score
+        goal: FASTEST or SMALLEST
+        sample_frames: Frames encoded per candidate
+        candidates: Every encode, in the order they finished
+        best: Winning candidate, or None if none met the target
+    """
+    
+    base: str
+    metric: str
+    target: float
+    goal: str
+    sample_frames: int
+    candidates: List[TuneCandidate] = field(default_factory=list)
+    best: Optional[TuneCandidate] = None
+    
+    def to_preset(self) -> EncodingPreset:
+        """The winner as an encoding preset.
+        
+        Raises:
+            ValueError: If no candidate met the target
+        """
+        if self.best is None:
+            raise ValueError("No candidate met the quality target")
+        encoding = PRESETS[self.base]
+        return replace(
+            encoding,
+            name=f"{encoding.name} (tuned: {self.best.speed}, CRF {self.best.crf})",
+            ffmpeg_args=get_tuned_args(encoding, self.best.speed, self.best.crf)
+        )
+    
+    def notes(self) -> dict:
+        """How the winner was found, saved with the custom preset."""
+        return {
+            "base": self.base,
+            "metric": self.metric,
+            "target": self.target,
+            "goal": self.goal,
+            "score": self.best.score if self.best else None,
+        }
+
+
+def choose_best(candidates: Sequence[TuneCandidate],
+                goal: str = FASTEST) -> Optional[TuneCandidate]:
+    """Fastest (or smallest) candidate that met the target."""
+    passed = [c for c in candidates if c.passed]
+    if not passed:
+        return None
+    if goal == SMALLEST:
+        return min(passed, key=lambda c: (c.size, c.encode_seconds))
+    return min(passed, key=lambda c: (c.encode_seconds, c.size))
+
+
+def _read_ppm_frames(stream) -> Iterator[np.ndarray]:
+    """Frames of a binary PPM stream (FFmpeg's image2pipe/ppm output)."""
+    while True:
+        magic = stream.readline()
+        if not magic:
+            return
+        width, height = (int(v) for v in stream.readline().split())
+        stream.readline()  # maxval, always 255 for rgb24
+        data = stream.read(width * height * 3)
+        if len(data) < width * height * 3:
+            return
+        yield np.frombuffer(data, dtype=np.uint8).reshape(height, width, 3)
+
+
+def _decode(ffmpeg_path: str, input_args: List[str], video_filters: List[str],
+            frames: int) -> subprocess.Popen:
+    """Start FFmpeg decoding frames to an RGB PPM stream on stdout."""
+    cmd = [ffmpeg_path, "-hide_banner", "-nostdin", "-loglevel", "error", *input_args]
+    if video_filters:
+        cmd += ["-vf", ",".join(video_filters)]
+    cmd += ["-frames:v", str(frames), "-f", "image2pipe", "-c:v", "ppm",
+            "-pix_fmt", "rgb24", "-"]
+    return subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                            stderr=subprocess.DEVNULL)
+
+
+def compare_frames(ffmpeg_path: str, encoded: str, reference_args: List[str],
+                   video_filters: List[str], frames: int) -> Dict[str, float]:
+    """PSNR and SSIM of an encoded clip against its source frames.
+    
+    Both are decoded to 8-bit RGB by FFmpeg and compared a frame at a
+    time, so long clips do not have to fit in memory.
+    
+    Returns:
+        Dict with ``psnr`` (dB, over all frames), ``ssim`` (mean) and
+        ``frames`` (frames compared)
+    
+    Raises:
+        RuntimeError: If the clips cannot be decoded or differ in length
+    """
+    from ..render.seams import compute_ssim
+    
+    decoders = [
+        _decode(ffmpeg_path, ["-i", encoded], [], frames),
+        _decode(ffmpeg_path, reference_args, video_filters, frames),
+    ]
+    squared, ssim, compared = 0.0, 0.0, 0
+    try:
+        pairs = zip(_read_ppm_frames(decoders[0].stdout), _read_ppm_frames(decoders[1].stdout))
+        for a, b in pairs:
+            if a.shape != b.shape:
+                raise RuntimeError(f"Frame size changed: {a.shape} vs {b.shape}")
+            squared += float(np.mean((a.astype(np.float32) - b.astype(np.float32)) ** 2))
+            ssim += compute_ssim(a, b)
+            compared += 1
+    finally:
+        for decoder in decoders:
+            decoder.stdout.close()
+            decoder.kill()
+            decoder.wait()
+    
+    if compared != frames:
+        raise RuntimeError(f"Compared {compared} frames, expected {frames}")
+    mse = squared / compared
+    return {
+        PSNR: math.inf if mse == 0.0 else 10.0 * math.log10(255.0 ** 2 / mse),
+        SSIM: ssim / compared,
+        "frames": compared,
+    }
+
+
+def _filter_path(path: Path) -> str:
+    """A file path quoted for use as a filter option."""
+    return "'" + str(path).replace("\\", "/").replace(":", "\\:") + "'"
+
+
+def measure_vmaf(ffmpeg_path: str, encoded: str, reference_args: List[str],
+                 video_filters: List[str], frames: int, log_path: Path,
+                 threads: int = 1) -> float:
+    """Mean VMAF of an encoded clip against its source frames.
+    
+    Raises:
+        RuntimeError: If FFmpeg fails or writes no score
+    """
+    reference = ",".join([*video_filters, "format=yuv444p"])
+    graph = (f"[0:v]format=yuv444p[dist];[1:v]{reference}[ref];"
+             f"[dist][ref]libvmaf=log_fmt=json:log_path={_filter_path(log_path)}"
+             f":n_threads={threads}")
+    args = ["-i", encoded, *reference_args, "-lavfi", graph,
+            "-frames:v", str(frames), "-f", "null", "-"]
+    
+    encoder = FFmpegEncoder(ffmpeg_path)
+    if not encoder.run(args, frames):
+        raise RuntimeError("; ".join(encoder.log_lines) or "VMAF measurement failed")
+    try:
+        with open(log_path) as f:
+            data = json.load(f)
+        return float(data["pooled_metrics"]["vmaf"]["mean"])
+    except (OSError, ValueError, KeyError, TypeError):
+        raise RuntimeError("FFmpeg wrote no VMAF score")
+
+
+class _Search:
+    """State shared by the per-speed searches of one tuning run."""
+    
+    def __init__(self, ffmpeg_path: str, source: RenderInput, encoding: EncodingPreset,
+                 metric: str, target: float, start: int, frames: int,
+                 work_dir: Path, threads: int, events: "queue.Queue"):
+        self.ffmpeg_path = ffmpeg_path
+        self.source = source
+        self.encoding = encoding
+        self.metric = metric
+        self.target = target
+        self.start = start
+        self.frames = frames
+        self.work_dir = work_dir
+        self.threads = threads
+        self.events = events
+    
+    def evaluate(self, speed: str, crf: int) -> TuneCandidate:
+        """Encode the sample with one speed preset and CRF and score it."""
+        candidate = TuneCandidate(speed=speed, crf=crf)
+        output = self.work_dir / f"{speed}_crf{crf}.{self.encoding.extension}"
+        reference_args = self.source.input_args(self.start)
+        
+        args = [*reference_args]
+        if self.source.video_filters:
+            args += ["-vf", ",".join(self.source.video_filters)]
+        args += [*get_tuned_args(self.encoding, speed, crf),
+                 "-frames:v", str(self.frames), "-threads", str(self.threads), str(output)]
+        
+        encoder = FFmpegEncoder(self.ffmpeg_path)
+        began = time.monotonic()
+        ok = encoder.run(args, self.frames)
+        candidate.encode_seconds = time.monotonic() - began
+        
+        try:
+            if not ok:
+                raise RuntimeError("; ".join(encoder.log_lines) or "Encoding failed")
+            candidate.size = output.stat().st_size
+            if self.metric == VMAF:
+                candidate.score = measure_vmaf(
+                    self.ffmpeg_path, str(output), reference_args, self.source.video_filters,
+                    self.frames, output.with_suffix(".vmaf.json"), self.threads
+                )
+            else:
+                scores = compare_frames(self.ffmpeg_path, str(output), reference_args,
+                                        self.source.video_filters, self.frames)
+                candidate.score = scores[self.metric]
+            candidate.passed = candidate.score >= self.target
+        except (OSError, RuntimeError) as e:
+            candidate.error = str(e)
+        finally:
+            output.unlink(missing_ok=True)
+        
+        self.events.put(candidate)
+        return candidate
+    
+    def search(self, speed: str, crf_range: Tuple[int, int]) -> Optional[TuneCandidate]:
+        """Highest CRF of a speed preset that meets the target (pool thread)."""
+        low, high = crf_range
+        best = None
+        while low <= high:
+            crf = (low + high) // 2
+            candidate = self.evaluate(speed, crf)
+            if candidate.error:
+                return best
+            if candidate.passed:
+                best = candidate
+                low = crf + 1
+            else:
+                high = crf - 1
+        return best
+
+
+def tune_preset(
+    source: RenderInput,
+    base: str = "h264_high",
+    metric: str = "auto",
+    target: Optional[float] = None,
+    goal: str = FASTEST,
+    speeds: Sequence[str] = DEFAULT_SPEEDS,
+    crf_range: Tuple[int, int] = DEFAULT_CRF_RANGE,
+    sample_seconds: float = DEFAULT_SAMPLE_SECONDS,
+    jobs: int = 2,
+    ffmpeg_path: Optional[str] = None,
+    log_callback: Optional[Callable[[str], None]] = None
+) -> TuneResult:
+    """Search speed presets and CRFs of a preset for a quality target.
+    
+    Callbacks run on the calling thread.
+    
+    Args:
+        source: Frames of the rendered loop (see find_render_input)
+        base: x264 or x265 preset to tune
+        metric: VMAF, PSNR, SSIM or "auto" (VMAF if FFmpeg has it, else SSIM)
+        target: Minimum score, or None for DEFAULT_TARGETS[metric]
+        goal: FASTEST (least encode time) or SMALLEST (least size)
+        speeds: Speed presets to search
+        crf_range: Lowest and highest CRF to try
+        sample_seconds: Length of the clip encoded per candidate
+        jobs: Concurrent searches (one FFmpeg process each)
+        ffmpeg_path: Path to FFmpeg, or None to auto-detect
+        log_callback: Called with a line per finished candidate
+    
+    Returns:
+        TuneResult with every candidate and the winner
+    
+    Raises:
+        RuntimeError: If FFmpeg is missing, or lacks libvmaf for VMAF
+        ValueError: If the preset, metric, goal or source cannot be tuned
+    """
+    ffmpeg_path = ffmpeg_path or find_ffmpeg()
+    if not ffmpeg_path:
+        raise RuntimeError("FFmpeg not available")
+    if base not in PRESETS:
+        raise ValueError(f"Unknown preset: {base}")
+    encoding = PRESETS[base]
+    if "-preset" not in encoding.ffmpeg_args or "-crf" not in encoding.ffmpeg_args:
+        raise ValueError(f"{base} has no speed preset and CRF to tune")
+    
+    if metric == "auto":
+        metric = VMAF if has_vmaf(ffmpeg_path) else SSIM
+    elif metric == VMAF and not has_vmaf(ffmpeg_path):
+        raise RuntimeError("This FFmpeg build has no libvmaf filter")
+    if metric not in DEFAULT_TARGETS:
+        raise ValueError(f"Unknown quality metric: {metric}")
+    if goal not in (FASTEST, SMALLEST):
+        raise ValueError(f"Unknown tuning goal: {goal}")
+    if source.total_frames <= 0:
+        raise ValueError("No frames to tune on")
+    
+    target = DEFAULT_TARGETS[metric] if target is None else target
+    start, frames = plan_sample(source.total_frames, source.fps, sample_seconds)
+    result = TuneResult(base=base, metric=metric, target=target, goal=goal,
+                        sample_frames=frames)
+    
+    jobs = max(1, min(jobs, len(speeds)))
+    threads = max(1, (os.cpu_count() or 1) // jobs)
+    if log_callback:
+        log_callback(f"Tuning {base} for {metric} >= {target:g} on frames "
+                     f"{start}-{start + frames - 1} ({len(speeds)} speeds, {jobs} at a time)")
+    
+    work_dir = Path(tempfile.mkdtemp(prefix="looplab_tune_"))
+    events: "queue.Queue" = queue.Queue()
+    search = _Search(ffmpeg_path, source, encoding, metric, target, start, frames,
+                     work_dir, threads, events)
+    try:
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(search.search, speed, crf_range) for speed in speeds]
+            while not all(future.done() for future in futures) or not events.empty():
+                try:
+                    candidate = events.get(timeout=0.25)
+                except queue.Empty:
+                    continue
+                result.candidates.append(candidate)
+                if log_callback:
+                    log_callback(format_candidate(candidate, metric))
+            winners = [future.result() for future in futures]
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    
+    result.best = choose_best([w for w in winners if w is not None], goal)
+    return result
+
+
+def format_candidate(candidate: TuneCandidate, metric: str) -> str:
+    """One line describing a candidate."""
+    line = f"{candidate.speed:<9} crf {candidate.crf:>2}  "
+    if candidate.error:
+        return line + f"failed: {candidate.error}"
+    verdict = "pass" if candidate.passed else "fail"
+    return (line + f"{metric} {candidate.score:7.3f} {verdict}  "
+            f"{candidate.size / 1024:8.1f} KiB  {candidate.encode_seconds:6.2f} s")
+
+
+def format_report(result: TuneResult) -> str:
+    """Human-readable summary of a tuning run."""
+    lines = [format_candidate(c, result.metric) for c in result.candidates]
+    if result.best is None:
+        lines.append(f"No candidate reached {result.metric} {result.target:g}")
+    else:
+        lines.append(f"Best ({result.goal}): -preset {result.best.speed} "
+                     f"-crf {result.best.crf} ({result.metric} {result.best.score:.3f})")
+    return "\n".join(lines)
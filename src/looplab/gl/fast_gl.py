@@ -0,0 +1,130 @@
+"""Low-overhead OpenGL calls for render hot loops.
+
+PyOpenGL's default entry points check glGetError after every call and
+convert arguments through its array-format handlers. That is negligible
+for large frames but dominates the per-frame cost of small renders and
+thumbnails. In fast mode the per-frame calls (uniform updates, quad
+draws, framebuffer binds, clears and readback) go through raw ctypes
+function pointers resolved once, with no error checking, and uniforms
+whose values have not changed since a program last saw them are not
+sent again. Setup calls (compiling, creating textures) stay checked.
+
+Fast mode is enabled per thread. A FrameRenderer whose ``fast_gl`` is
+set (the render daemon's warm renderers, and the benchmark) turns it on
+when it makes its context current; other threads, such as the preview's
+GUI thread and one-off renders, keep checked calls. To opt in elsewhere, with the thread's context current:
+    
+    from looplab.gl import fast_gl
+    fast_gl.enable()
+
+Set LOOPLAB_GL_CHECKS=1 to keep checked calls everywhere when debugging.
+"""
+
+import ctypes
+import os
+import threading
+from typing import Optional
+
+try:
+    from OpenGL import platform as gl_platform
+    OPENGL_AVAILABLE = True
+except ImportError:
+    OPENGL_AVAILABLE = False
+
+
+_local = threading.local()
+_shared: Optional["FastGL"] = None
+_lock = threading.Lock()
+
+
+def _resolve(name: str, restype, *argtypes):
+    """Raw function pointer for a GL entry point.
+    
+    Raises:
+        RuntimeError: If the entry point cannot be found
+    """
+    platform = gl_platform.PLATFORM
+    address = platform.getExtensionProcedure(name.encode("ascii"))
+    if not address:
+        # GL 1.1 entry points are exported by the library itself (WGL)
+        function = getattr(platform.GL, name, None)
+        if function is not None:
+            address = ctypes.cast(function, ctypes.c_void_p).value
+    if not address:
+        raise RuntimeError(f"Cannot resolve {name}")
+    
+    function_type = platform.functionTypeFor(platform.GL)
+    return function_type(restype, *argtypes)(address)
+
+
+class FastGL:
+    """Raw GL entry points, bypassing PyOpenGL wrappers and error checks.
+    
+    Arguments must already be of the C types below; arrays are passed as
+    addresses (``ndarray.ctypes.data``).
+    """
+    
+    def __init__(self):
+        c_int, c_uint, c_float = ctypes.c_int, ctypes.c_uint, ctypes.c_float
+        
+        self.glUseProgram = _resolve("glUseProgram", None, c_uint)
+        self.glUniform1i = _resolve("glUniform1i", None, c_int, c_int)
+        self.glUniform1f = _resolve("glUniform1f", None, c_int, c_float)
+        self.glUniform2f = _resolve("glUniform2f", None, c_int, c_float, c_float)
+        self.glUniform3f = _resolve("glUniform3f", None, c_int, c_float, c_float, c_float)
+        self.glUniform4f = _resolve("glUniform4f", None, c_int, c_float, c_float, c_float, c_float)
+        self.glBindVertexArray = _resolve("glBindVertexArray", None, c_uint)
+        self.glDrawArrays = _resolve("glDrawArrays", None, c_uint, c_int, c_int)
+        self.glBindFramebuffer = _resolve("glBindFramebuffer", None, c_uint, c_uint)
+        self.glViewport = _resolve("glViewport", None, c_int, c_int, c_int, c_int)
+        self.glClearColor = _resolve("glClearColor", None, c_float, c_float, c_float, c_float)
+        self.glClear = _resolve("glClear", None, c_uint)
+        self.glReadPixels = _resolve(
+            "glReadPixels", None, c_int, c_int, c_int, c_int, c_uint, c_uint, ctypes.c_void_p
+        )
+        
+        # Uniform setters by value arity
+        self.uniform_setters = {
+            1: self.glUniform1f, 2: self.glUniform2f,
+            3: self.glUniform3f, 4: self.glUniform4f,
+        }
+
+
+def checks_forced() -> bool:
+    """Whether LOOPLAB_GL_CHECKS asks for checked calls everywhere."""
+    return os.environ.get("LOOPLAB_GL_CHECKS", "") not in ("", "0")
+
+
+def enable() -> bool:
+    """Use raw GL calls in this thread's hot loops.
+    
+    Call with the thread's GL context current. Entry points are resolved
+    on the first call in the process and shared by later threads.
+    
+    Returns:
+        True if fast mode is now on (False if OpenGL is unavailable, an
+        entry point could not be resolved, or LOOPLAB_GL_CHECKS is set)
+    """
+    global _shared
+    if not OPENGL_AVAILABLE or checks_forced():
+        return False
+    
+    with _lock:
+        if _shared is None:
+            try:
+                _shared = FastGL()
+            except (RuntimeError, AttributeError, TypeError):
+                return False
+    
+    _local.gl = _shared
+    return True
+
+
+def disable():
+    """Go back to checked PyOpenGL calls in this thread."""
+    _local.gl = None
+
+
+def current() -> Optional[FastGL]:
+    """Raw entry points if fast mode is on in this thread, else None."""
+    return getattr(_local, "gl", None)
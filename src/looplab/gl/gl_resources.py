@@ -7,6 +7,8 @@ from dataclasses import dataclass
 from typing import Optional
 import ctypes
 
+from . import fast_gl
+
 try:
     from OpenGL.GL import (
         glGenVertexArrays, glBindVertexArray, glDeleteVertexArrays,
@@ -14,17 +16,18 @@ try:
         glVertexAttribPointer, glEnableVertexAttribArray,
         glGenFramebuffers, glBindFramebuffer, glDeleteFramebuffers,
         glGenTextures, glBindTexture, glDeleteTextures,
-        glTexImage2D, glTexParameteri, glFramebufferTexture2D,
+        glTexImage2D, glTexSubImage2D, glTexParameteri, glFramebufferTexture2D,
         glGenRenderbuffers, glBindRenderbuffer, glDeleteRenderbuffers,
         glRenderbufferStorage, glFramebufferRenderbuffer,
-        glCheckFramebufferStatus, glViewport, glReadPixels,
+        glCheckFramebufferStatus, glViewport, glReadPixels, glBlitFramebuffer,
         glDrawArrays, glClear, glClearColor,
         GL_ARRAY_BUFFER, GL_STATIC_DRAW, GL_FLOAT, GL_FALSE,
-        GL_FRAMEBUFFER, GL_TEXTURE_2D, GL_RGBA, GL_RGBA8,
+        GL_FRAMEBUFFER, GL_TEXTURE_2D, GL_RGBA, GL_RGBA8, GL_RGBA16, GL_RGBA16F,
         GL_COLOR_ATTACHMENT0, GL_RENDERBUFFER, GL_DEPTH24_STENCIL8,
         GL_DEPTH_STENCIL_ATTACHMENT, GL_FRAMEBUFFER_COMPLETE,
-        GL_UNSIGNED_BYTE, GL_TRIANGLES, GL_COLOR_BUFFER_BIT,
-        GL_TEXTURE_MIN_FILTER, GL_TEXTURE_MAG_FILTER, GL_LINEAR,
+        GL_UNSIGNED_BYTE, GL_UNSIGNED_SHORT, GL_TRIANGLES, GL_COLOR_BUFFER_BIT,
+        GL_TEXTURE_MIN_FILTER, GL_TEXTURE_MAG_FILTER, GL_LINEAR, GL_NEAREST,
+        GL_READ_FRAMEBUFFER, GL_DRAW_FRAMEBUFFER,
         GL_TEXTURE_WRAP_S, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE,
     )
     import numpy as np
@@ -33,6 +36,11 @@ except ImportError:
     OPENGL_AVAILABLE = False
 
 
+# Render target color formats; RGBA16 targets are read back as uint16,
+# RGBA16F targets as float32
+COLOR_FORMATS = ("rgba8", "rgba16", "rgba16f")
+
+
 # Fullscreen quad vertices (two triangles)
 QUAD_VERTICES = [
     -1.0, -1.0,
@@ -86,6 +94,13 @@ class QuadMesh:
         if not OPENGL_AVAILABLE or not self.is_valid:
             return
         
+        fast = fast_gl.current()
+        if fast is not None:
+            # Leave the VAO bound; every draw binds its own
+            fast.glBindVertexArray(self.vao)
+            fast.glDrawArrays(GL_TRIANGLES, 0, 6)
+            return
+        
         glBindVertexArray(self.vao)
         glDrawArrays(GL_TRIANGLES, 0, 6)
         glBindVertexArray(0)
@@ -104,15 +119,35 @@ class QuadMesh:
 
 @dataclass
 class RenderTarget:
-    """Framebuffer Object (FBO) for offscreen rendering."""
+    """Framebuffer Object (FBO) for offscreen rendering.
+    
+    ``color_format`` selects the color texture (see COLOR_FORMATS).
+    RGBA8 targets are read back as bytes, RGBA16 targets as 16-bit
+    unsigned normalized samples and RGBA16F targets as float32, so
+    values outside 0-1 survive.
+    """
     
     fbo: int = 0
     texture: int = 0
     rbo: int = 0  # Renderbuffer for depth/stencil
     width: int = 0
     height: int = 0
+    color_format: str = "rgba8"
     is_valid: bool = False
     
+    @property
+    def dtype(self) -> "np.dtype":
+        """NumPy dtype of read-back samples."""
+        import numpy as np
+        if self.color_format == "rgba16f":
+            return np.dtype(np.float32)
+        return np.dtype(np.uint8 if self.color_format == "rgba8" else np.uint16)
+    
+    def _pixel_type(self) -> int:
+        if self.color_format == "rgba16f":
+            return GL_FLOAT
+        return GL_UNSIGNED_BYTE if self.color_format == "rgba8" else GL_UNSIGNED_SHORT
+    
     def create(self, width: int, height: int):
         """Create FBO with color texture and depth buffer.
         
@@ -123,6 +158,9 @@ class RenderTarget:
         if not OPENGL_AVAILABLE:
             return
         
+        if self.color_format not in COLOR_FORMATS:
+            raise ValueError(f"Unknown color format: {self.color_format}")
+        
         self.width = width
         self.height = height
         
@@ -131,10 +169,13 @@ class RenderTarget:
         glBindFramebuffer(GL_FRAMEBUFFER, self.fbo)
         
         # Create color texture
+        internal_format = {
+            "rgba8": GL_RGBA8, "rgba16": GL_RGBA16, "rgba16f": GL_RGBA16F
+        }[self.color_format]
         self.texture = glGenTextures(1)
         glBindTexture(GL_TEXTURE_2D, self.texture)
-        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA8, width, height, 0,
-                     GL_RGBA, GL_UNSIGNED_BYTE, None)
+        glTexImage2D(GL_TEXTURE_2D, 0, internal_format, width, height, 0,
+                     GL_RGBA, self._pixel_type(), None)
         glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
         glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
         glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
@@ -163,6 +204,12 @@ class RenderTarget:
         if not OPENGL_AVAILABLE or not self.is_valid:
             return
         
+        fast = fast_gl.current()
+        if fast is not None:
+            fast.glBindFramebuffer(GL_FRAMEBUFFER, self.fbo)
+            fast.glViewport(0, 0, self.width, self.height)
+            return
+        
         glBindFramebuffer(GL_FRAMEBUFFER, self.fbo)
         glViewport(0, 0, self.width, self.height)
     
@@ -171,13 +218,19 @@ class RenderTarget:
         if not OPENGL_AVAILABLE:
             return
         
+        fast = fast_gl.current()
+        if fast is not None:
+            fast.glBindFramebuffer(GL_FRAMEBUFFER, 0)
+            return
+        
         glBindFramebuffer(GL_FRAMEBUFFER, 0)
     
     def read_pixels(self) -> Optional[bytes]:
         """Read pixels from the FBO.
         
         Returns:
-            Raw RGBA pixel data as bytes, or None on failure
+            Raw RGBA pixel data as bytes (samples of ``dtype``), or None
+            on failure
         """
         if not OPENGL_AVAILABLE or not self.is_valid:
             return None
@@ -188,12 +241,90 @@ class RenderTarget:
         
         # Read pixels
         pixels = glReadPixels(0, 0, self.width, self.height,
-                              GL_RGBA, GL_UNSIGNED_BYTE)
+                              GL_RGBA, self._pixel_type())
         
         self.unbind()
         
+        # PyOpenGL returns arrays rather than bytes for non-byte types
+        if pixels is not None and not isinstance(pixels, bytes):
+            pixels = np.ascontiguousarray(pixels, dtype=self.dtype).tobytes()
+        
         return pixels
     
+    def read_pixels_into(self, out: "np.ndarray") -> bool:
+        """Read pixels from the FBO directly into an existing array.
+        
+        Avoids allocating a new buffer per frame; ``out`` may be a slot in
+        a memory-mapped frame store. Rows are in OpenGL (bottom-up) order.
+        
+        Args:
+            out: C-contiguous array of shape (height, width, 4) and
+                ``dtype``
+        
+        Returns:
+            True if pixels were read
+        
+        Raises:
+            ValueError: If ``out`` is too small or not C-contiguous (fast
+                GL mode writes through its address unchecked)
+        """
+        if not OPENGL_AVAILABLE or not self.is_valid:
+            return False
+        
+        fast = fast_gl.current()
+        if fast is not None:
+            needed = self.width * self.height * 4 * self.dtype.itemsize
+            if out.nbytes < needed or not out.flags["C_CONTIGUOUS"]:
+                raise ValueError("Readback buffer does not fit the render target")
+            fast.glBindFramebuffer(GL_FRAMEBUFFER, self.fbo)
+            fast.glReadPixels(0, 0, self.width, self.height,
+                              GL_RGBA, self._pixel_type(), out.ctypes.data)
+            fast.glBindFramebuffer(GL_FRAMEBUFFER, 0)
+            return True
+        
+        self.bind()
+        glReadPixels(0, 0, self.width, self.height,
+                     GL_RGBA, self._pixel_type(), out)
+        self.unbind()
+        
+        return True
+    
+    def upload(self, pixels: "np.ndarray"):
+        """Replace the color buffer with host pixels.
+        
+        Args:
+            pixels: C-contiguous (height, width, 4) array of ``dtype`` in
+                OpenGL (bottom-up) row order
+        """
+        if not OPENGL_AVAILABLE or not self.is_valid:
+            return
+        
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glTexSubImage2D(GL_TEXTURE_2D, 0, 0, 0, self.width, self.height,
+                        GL_RGBA, self._pixel_type(), pixels)
+        glBindTexture(GL_TEXTURE_2D, 0)
+    
+    def blit_to(self, fbo: int, width: int, height: int, linear: bool = True):
+        """Copy the color buffer into another framebuffer, scaled to fit.
+        
+        Halving with linear filtering averages each 2x2 block of pixels,
+        the same box filter as a CPU downsample. Leaves ``fbo`` bound.
+        
+        Args:
+            fbo: Destination framebuffer (0 = the default framebuffer)
+            width: Destination width
+            height: Destination height
+            linear: Linear filtering (False = nearest pixel)
+        """
+        if not OPENGL_AVAILABLE or not self.is_valid:
+            return
+        
+        glBindFramebuffer(GL_READ_FRAMEBUFFER, self.fbo)
+        glBindFramebuffer(GL_DRAW_FRAMEBUFFER, fbo)
+        glBlitFramebuffer(0, 0, self.width, self.height, 0, 0, width, height,
+                          GL_COLOR_BUFFER_BIT, GL_LINEAR if linear else GL_NEAREST)
+        glBindFramebuffer(GL_FRAMEBUFFER, fbo)
+    
     def resize(self, width: int, height: int):
         """Resize the FBO.
         
@@ -234,5 +365,11 @@ def clear_viewport(r: float = 0.0, g: float = 0.0, b: float = 0.0, a: float = 1.
     if not OPENGL_AVAILABLE:
         return
     
+    fast = fast_gl.current()
+    if fast is not None:
+        fast.glClearColor(r, g, b, a)
+        fast.glClear(GL_COLOR_BUFFER_BIT)
+        return
+    
     glClearColor(r, g, b, a)
     glClear(GL_COLOR_BUFFER_BIT)
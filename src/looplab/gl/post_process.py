@@ -0,0 +1,522 @@
+"""GPU post-processing chain.
+
+Post passes are fullscreen shader passes run over the rendered image
+before it is shown or read back, so grading, LUTs and dithering cost a
+few milliseconds on the GPU instead of a second CPU pipeline. The user
+shader draws into a float scene target, each pass samples the previous
+result through ``u_input`` and the last pass writes into the output
+framebuffer.
+
+Passes are described by plain dicts, so they can live in project files
+and job specs:
+    
+    [{"type": "tonemap", "exposure": 1.2},
+     {"type": "lut", "path": "grade.cube", "strength": 0.8},
+     {"type": "dither"}]
+
+User passes (``"type": "shader"``) are GLSL files defining
+    
+    vec4 postProcess(vec4 color, vec2 fragCoord)
+
+with the uniforms of ``shader_manager.get_post_header``. Other numeric
+keys of a spec are set as ``u_<key>`` uniforms.
+"""
+
+import hashlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+import numpy as np
+
+from .shader_manager import ShaderManager, ShaderProgram
+from .gl_resources import QuadMesh, RenderTarget
+
+try:
+    from OpenGL.GL import (
+        glGenTextures, glBindTexture, glDeleteTextures, glActiveTexture,
+        glTexImage3D, glTexParameteri, glBindFramebuffer, glViewport,
+        GL_TEXTURE_3D, GL_TEXTURE_2D, GL_TEXTURE0, GL_TEXTURE1,
+        GL_RGB32F, GL_RGB, GL_FLOAT, GL_FRAMEBUFFER,
+        GL_TEXTURE_MIN_FILTER, GL_TEXTURE_MAG_FILTER, GL_LINEAR,
+        GL_TEXTURE_WRAP_S, GL_TEXTURE_WRAP_T, GL_TEXTURE_WRAP_R, GL_CLAMP_TO_EDGE,
+    )
+    OPENGL_AVAILABLE = True
+except ImportError:
+    OPENGL_AVAILABLE = False
+
+
+TONEMAP_SOURCE = """
+uniform float u_exposure;
+
+// ACES filmic curve fit (Narkowicz 2015)
+vec3 aces(vec3 x) {
+    return clamp((x * (2.51 * x + 0.03)) / (x * (2.43 * x + 0.59) + 0.14), 0.0, 1.0);
+}
+
+vec4 postProcess(vec4 color, vec2 fragCoord) {
+    return vec4(aces(color.rgb * u_exposure), color.a);
+}
+"""
+
+DITHER_SOURCE = """
+// 8x8 Bayer threshold in (0, 1)
+float bayer8(ivec2 p) {
+    int x = p.x & 7;
+    int y = p.y & 7;
+    int v = x ^ y;
+    int index = ((v & 1) << 5) | ((y & 1) << 4) | ((v & 2) << 2)
+              | ((y & 2) << 1) | ((v & 4) >> 1) | ((y & 4) >> 2);
+    return (float(index) + 0.5) / 64.0;
+}
+
+vec4 postProcess(vec4 color, vec2 fragCoord) {
+    // Spread the rounding to the output levels over the pattern
+    float threshold = bayer8(ivec2(fragCoord)) - 0.5;
+    return vec4(color.rgb + threshold / u_levels, color.a);
+}
+"""
+
+LUT_SOURCE = """
+uniform sampler3D u_lut;
+uniform float u_lut_size;
+uniform vec3 u_domain_min;
+uniform vec3 u_domain_max;
+
+vec4 postProcess(vec4 color, vec2 fragCoord) {
+    vec3 rgb = clamp((color.rgb - u_domain_min) / (u_domain_max - u_domain_min), 0.0, 1.0);
+    // Sample texel centres so 0 and 1 hit the first and last entries
+    vec3 coord = rgb * ((u_lut_size - 1.0) / u_lut_size) + 0.5 / u_lut_size;
+    return vec4(texture(u_lut, coord).rgb, color.a);
+}
+"""
+
+# Built-in pass sources and their parameters (with defaults)
+BUILTIN_PASSES: Dict[str, Tuple[str, Dict[str, float]]] = {
+    "tonemap": (TONEMAP_SOURCE, {"exposure": 1.0}),
+    "dither": (DITHER_SOURCE, {}),
+    "lut": (LUT_SOURCE, {}),
+}
+
+POST_PASS_TYPES = (*BUILTIN_PASSES, "shader")
+
+# Spec keys that are not pass parameters
+_SPEC_KEYS = {"type", "path", "strength"}
+
+
+@dataclass
+class CubeLut:
+    """A 3D lookup table from an Adobe/Resolve ``.cube`` file.
+    
+    Attributes:
+        size: Entries per axis
+        table: (size, size, size, 3) float32 array indexed [b, g, r],
+            the layout of a 3D texture with red along x
+        domain_min: Input value mapped to the first entry
+        domain_max: Input value mapped to the last entry
+        title: TITLE line, if any
+    """
+    
+    size: int
+    table: np.ndarray
+    domain_min: Tuple[float, float, float] = (0.0, 0.0, 0.0)
+    domain_max: Tuple[float, float, float] = (1.0, 1.0, 1.0)
+    title: str = ""
+
+
+def parse_cube_lut(text: str) -> CubeLut:
+    """Parse the text of a 3D ``.cube`` LUT.
+    
+    Raises:
+        ValueError: If the file is not a well-formed 3D LUT
+    """
+    size = 0
+    title = ""
+    domain_min = (0.0, 0.0, 0.0)
+    domain_max = (1.0, 1.0, 1.0)
+    values: List[Tuple[float, float, float]] = []
+    
+    for line in text.splitlines():
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        
+        keyword, _, rest = line.partition(" ")
+        try:
+            if keyword == "TITLE":
+                title = rest.strip().strip('"')
+            elif keyword == "LUT_3D_SIZE":
+                size = int(rest)
+            elif keyword == "LUT_1D_SIZE":
+                raise ValueError("1D LUTs are not supported")
+            elif keyword == "DOMAIN_MIN":
+                domain_min = tuple(float(v) for v in rest.split())
+            elif keyword == "DOMAIN_MAX":
+                domain_max = tuple(float(v) for v in rest.split())
+            elif keyword[0].isalpha():
+                continue  # Unknown keyword (e.g. LUT_3D_INPUT_RANGE)
+            else:
+                values.append(tuple(float(v) for v in line.split()))
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid LUT line: {line!r}") from e
+    
+    if size < 2:
+        raise ValueError("Missing or invalid LUT_3D_SIZE")
+    if len(domain_min) != 3 or len(domain_max) != 3:
+        raise ValueError("DOMAIN_MIN and DOMAIN_MAX need three values")
+    if len(values) != size ** 3 or any(len(v) != 3 for v in values):
+        raise ValueError(f"Expected {size ** 3} RGB entries, got {len(values)}")
+    
+    table = np.array(values, dtype=np.float32).reshape(size, size, size, 3)
+    return CubeLut(size, table, domain_min, domain_max, title)
+
+
+def load_cube_lut(path: Union[str, Path]) -> CubeLut:
+    """Load a 3D ``.cube`` LUT file.
+    
+    Raises:
+        OSError: If the file cannot be read
+        ValueError: If the file is not a well-formed 3D LUT
+    """
+    return parse_cube_lut(Path(path).read_text())
+
+
+@dataclass
+class PostPass:
+    """One pass of a post chain, ready to compile.
+    
+    Attributes:
+        name: Pass type, or the file name of a user pass
+        source: Pass code (postProcess function)
+        uniforms: Pass parameters as uniform name -> value
+        strength: Mix of the pass result over its input (0-1)
+        lut: LUT bound to u_lut (lut passes)
+    """
+    
+    name: str
+    source: str
+    uniforms: Dict[str, Any] = field(default_factory=dict)
+    strength: float = 1.0
+    lut: Optional[CubeLut] = None
+    
+    @property
+    def key(self) -> str:
+        """Cache key of the pass program."""
+        return hashlib.sha1(self.source.encode("utf-8")).hexdigest()
+
+
+def validate_post_pass_spec(spec: Any) -> Optional[str]:
+    """Check a post pass spec without reading any files.
+    
+    Returns:
+        Error message, or None if the spec is valid
+    """
+    if not isinstance(spec, dict):
+        return "Post pass must be an object"
+    
+    kind = spec.get("type")
+    if kind not in POST_PASS_TYPES:
+        return f"Unknown post pass type: {kind}"
+    if kind in ("lut", "shader") and not isinstance(spec.get("path"), str):
+        return f"The {kind} post pass needs a path"
+    
+    strength = spec.get("strength", 1.0)
+    if not isinstance(strength, (int, float)) or not 0.0 <= strength <= 1.0:
+        return "Post pass strength must be between 0 and 1"
+    
+    params = set(spec) - _SPEC_KEYS
+    if kind in BUILTIN_PASSES:
+        unknown = sorted(params - set(BUILTIN_PASSES[kind][1]))
+        if unknown:
+            return f"Unknown {kind} parameters: {', '.join(unknown)}"
+    for name in params:
+        if not isinstance(spec[name], (int, float)) or isinstance(spec[name], bool):
+            return f"Post pass parameter {name} must be a number"
+    
+    return None
+
+
+def create_post_pass(spec: Dict[str, Any],
+                     base_dir: Optional[Union[str, Path]] = None) -> PostPass:
+    """Create a post pass from its spec, loading any LUT or shader file.
+    
+    Args:
+        spec: Pass spec (see module docstring)
+        base_dir: Directory relative paths are resolved against
+    
+    Returns:
+        PostPass
+    
+    Raises:
+        ValueError: If the spec or LUT is invalid
+        OSError: If a referenced file cannot be read
+    """
+    error = validate_post_pass_spec(spec)
+    if error:
+        raise ValueError(error)
+    
+    kind = spec["type"]
+    path = None
+    if "path" in spec:
+        path = Path(spec["path"])
+        if base_dir is not None and not path.is_absolute():
+            path = Path(base_dir) / path
+    
+    params = {name: spec[name] for name in spec if name not in _SPEC_KEYS}
+    if kind in BUILTIN_PASSES:
+        source, defaults = BUILTIN_PASSES[kind]
+        params = {**defaults, **params}
+        name = kind
+    else:
+        source = path.read_text()
+        name = path.name
+    
+    post_pass = PostPass(
+        name=name,
+        source=source,
+        uniforms={f"u_{k}": float(v) for k, v in params.items()},
+        strength=float(spec.get("strength", 1.0))
+    )
+    
+    if kind == "lut":
+        lut = load_cube_lut(path)
+        post_pass.lut = lut
+        post_pass.uniforms.update({
+            "u_lut_size": float(lut.size),
+            "u_domain_min": tuple(float(v) for v in lut.domain_min),
+            "u_domain_max": tuple(float(v) for v in lut.domain_max),
+        })
+    
+    return post_pass
+
+
+def create_post_passes(specs: Sequence[Dict[str, Any]],
+                       base_dir: Optional[Union[str, Path]] = None) -> List[PostPass]:
+    """Create the passes of a chain from their specs (see create_post_pass)."""
+    return [create_post_pass(spec, base_dir) for spec in specs]
+
+
+def resolve_post_pass_paths(specs: Sequence[Dict[str, Any]],
+                            base_dir: Union[str, Path]) -> List[Dict[str, Any]]:
+    """Copy pass specs with relative file paths made absolute.
+    
+    Args:
+        specs: Pass specs (e.g. from a project file)
+        base_dir: Directory relative paths are resolved against
+    
+    Returns:
+        New list of specs
+    """
+    resolved = []
+    for spec in specs:
+        spec = dict(spec)
+        if isinstance(spec.get("path"), str) and not Path(spec["path"]).is_absolute():
+            spec["path"] = str(Path(base_dir) / spec["path"])
+        resolved.append(spec)
+    return resolved
+
+
+def parse_post_pass_arg(text: str) -> Dict[str, Any]:
+    """Parse a command-line post pass: ``TYPE[:PATH][,KEY=VALUE...]``.
+    
+    For example ``tonemap,exposure=1.5``, ``lut:grade.cube,strength=0.5``
+    or ``shader:vignette.glsl,amount=0.3``.
+    
+    Raises:
+        ValueError: If the text is malformed or the spec invalid
+    """
+    head, *options = text.split(",")
+    kind, _, path = head.partition(":")
+    spec: Dict[str, Any] = {"type": kind.strip()}
+    if path:
+        spec["path"] = path.strip()
+    
+    for option in options:
+        name, sep, value = option.partition("=")
+        if not sep:
+            raise ValueError(f"Expected KEY=VALUE, got {option!r}")
+        try:
+            spec[name.strip()] = float(value)
+        except ValueError:
+            raise ValueError(f"Post pass parameter {name.strip()} must be a number") from None
+    
+    error = validate_post_pass_spec(spec)
+    if error:
+        raise ValueError(error)
+    return spec
+
+
+@dataclass
+class LutTexture:
+    """3D texture holding a CubeLut."""
+    
+    texture: int = 0
+    
+    def create(self, lut: CubeLut):
+        """Upload the LUT as an RGB32F 3D texture."""
+        if not OPENGL_AVAILABLE:
+            return
+        
+        self.texture = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_3D, self.texture)
+        glTexImage3D(GL_TEXTURE_3D, 0, GL_RGB32F, lut.size, lut.size, lut.size, 0,
+                     GL_RGB, GL_FLOAT, np.ascontiguousarray(lut.table))
+        glTexParameteri(GL_TEXTURE_3D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_3D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+        for wrap in (GL_TEXTURE_WRAP_S, GL_TEXTURE_WRAP_T, GL_TEXTURE_WRAP_R):
+            glTexParameteri(GL_TEXTURE_3D, wrap, GL_CLAMP_TO_EDGE)
+        glBindTexture(GL_TEXTURE_3D, 0)
+    
+    def delete(self):
+        """Delete the texture."""
+        if OPENGL_AVAILABLE and self.texture:
+            glDeleteTextures(1, [self.texture])
+        self.texture = 0
+
+
+class PostChain:
+    """Ping-pong render targets and programs for a list of post passes.
+    
+    The caller draws its shader into ``scene_target`` (RGBA16F, so values
+    outside 0-1 survive for tonemapping) and then calls ``run`` to apply
+    the passes into the output framebuffer. All GL methods need the
+    owning context to be current.
+    """
+    
+    def __init__(self, passes: Optional[List[PostPass]] = None):
+        self.passes: List[PostPass] = list(passes or [])
+        self.last_error: str = ""
+        
+        self._shader_manager = ShaderManager()
+        self._programs: Dict[str, ShaderProgram] = {}
+        self._luts: Dict[int, LutTexture] = {}
+        self._targets: List[RenderTarget] = []
+    
+    @property
+    def active(self) -> bool:
+        """Whether there are passes to run."""
+        return bool(self.passes)
+    
+    @property
+    def scene_target(self) -> Optional[RenderTarget]:
+        """Target the shader is drawn into before the passes."""
+        return self._targets[0] if self._targets else None
+    
+    def set_passes(self, passes: List[PostPass]):
+        """Replace the passes; programs of unchanged passes are kept."""
+        for lut in self._luts.values():
+            lut.delete()
+        self._luts.clear()
+        self.passes = list(passes)
+    
+    def _fail(self, message: str) -> bool:
+        self.last_error = message
+        return False
+    
+    def prepare(self, width: int, height: int) -> bool:
+        """Compile the passes and size the targets.
+        
+        Args:
+            width: Output width in pixels
+            height: Output height in pixels
+        
+        Returns:
+            True if successful (see ``last_error`` otherwise)
+        """
+        if not self.passes:
+            self.release_targets()
+            return True
+        
+        for post_pass in self.passes:
+            if post_pass.key in self._programs:
+                continue
+            program = self._shader_manager.compile_post_program(post_pass.source)
+            if not program.is_valid:
+                errors = "\n".join(
+                    f"Line {e.original_line}: {e.message}" for e in program.errors
+                )
+                return self._fail(f"Post pass {post_pass.name} failed to compile:\n{errors}")
+            self._programs[post_pass.key] = program
+        
+        for i, post_pass in enumerate(self.passes):
+            if post_pass.lut is not None and i not in self._luts:
+                self._luts[i] = LutTexture()
+                self._luts[i].create(post_pass.lut)
+        
+        # The scene target, plus a second target to ping-pong between
+        count = 2 if len(self.passes) > 1 else 1
+        while len(self._targets) > count:
+            self._targets.pop().delete()
+        while len(self._targets) < count:
+            self._targets.append(RenderTarget(color_format="rgba16f"))
+        for target in self._targets:
+            if target.is_valid:
+                target.resize(width, height)
+            else:
+                target.create(width, height)
+            if not target.is_valid:
+                return self._fail("Failed to create post-processing target")
+        
+        return True
+    
+    def run(self, quad: QuadMesh, output_fbo: int, width: int, height: int,
+            uniforms: Dict[str, Any]):
+        """Apply the passes to the scene target.
+        
+        Args:
+            quad: Fullscreen quad to draw with
+            output_fbo: Framebuffer the last pass writes to
+            width: Output viewport width
+            height: Output viewport height
+            uniforms: Frame uniforms (u_resolution, u_offset, u_time,
+                u_phase, u_frame, u_levels)
+        """
+        if not OPENGL_AVAILABLE or not self.passes:
+            return
+        
+        current = 0
+        for i, post_pass in enumerate(self.passes):
+            last = i == len(self.passes) - 1
+            if last:
+                glBindFramebuffer(GL_FRAMEBUFFER, output_fbo)
+                glViewport(0, 0, width, height)
+            else:
+                self._targets[1 - current].bind()
+            
+            glActiveTexture(GL_TEXTURE0)
+            glBindTexture(GL_TEXTURE_2D, self._targets[current].texture)
+            lut = self._luts.get(i)
+            if lut is not None:
+                glActiveTexture(GL_TEXTURE1)
+                glBindTexture(GL_TEXTURE_3D, lut.texture)
+            
+            self._shader_manager.set_uniforms(self._programs[post_pass.key], {
+                **uniforms,
+                **post_pass.uniforms,
+                "u_input": 0,
+                "u_lut": 1,
+                "u_strength": post_pass.strength,
+            })
+            quad.draw()
+            current = 1 - current
+        
+        glActiveTexture(GL_TEXTURE1)
+        glBindTexture(GL_TEXTURE_3D, 0)
+        glActiveTexture(GL_TEXTURE0)
+        glBindTexture(GL_TEXTURE_2D, 0)
+    
+    def release_targets(self):
+        """Delete the render targets, keeping compiled programs."""
+        for target in self._targets:
+            target.delete()
+        self._targets.clear()
+    
+    def delete(self):
+        """Delete all GL resources of the chain."""
+        self.release_targets()
+        for lut in self._luts.values():
+            lut.delete()
+        self._luts.clear()
+        for program in self._programs.values():
+            program.delete()
+        self._programs.clear()
+
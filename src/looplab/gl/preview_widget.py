@@ -2,9 +2,14 @@
 
 This module provides the QOpenGLWidget subclass that renders
 shaders in real-time for preview purposes.
+
+Below a render scale of 1.0 the shader draws into an offscreen target of
+the scaled size (in device pixels), which is then blitted up to the
+widget with nearest or linear filtering, so heavy shaders run on a
+fraction of the pixels.
 """
 
-from typing import Optional
+from typing import List, Optional, Tuple
 import math
 
 from PySide6.QtCore import QTimer, Signal, QElapsedTimer
@@ -13,7 +18,8 @@ from PySide6.QtGui import QSurfaceFormat
 from PySide6.QtOpenGLWidgets import QOpenGLWidget
 
 from .shader_manager import ShaderManager, ShaderProgram
-from .gl_resources import QuadMesh, clear_viewport
+from .gl_resources import QuadMesh, RenderTarget, clear_viewport
+from .post_process import PostChain, PostPass
 from .uniforms import UniformManager
 from ..render.timeline import Timeline
 
@@ -35,7 +41,9 @@ class PreviewGLWidget(QOpenGLWidget):
         fmt.setVersion(3, 3)
         fmt.setProfile(QSurfaceFormat.OpenGLContextProfile.CoreProfile)
         fmt.setSwapBehavior(QSurfaceFormat.SwapBehavior.DoubleBuffer)
-        fmt.setSamples(4)  # Multisampling
+        # No multisampling: a fullscreen quad has no edges to smooth, and
+        # scaled previews blit into the widget's framebuffer
+        fmt.setSamples(0)
         QSurfaceFormat.setDefaultFormat(fmt)
         
         super().__init__(parent)
@@ -45,6 +53,9 @@ class PreviewGLWidget(QOpenGLWidget):
         self.quad: Optional[QuadMesh] = None
         self.uniform_manager = UniformManager()
         
+        # Post passes between the shader and the screen
+        self.post_chain = PostChain()
+        
         # Timeline for animation
         self.timeline = Timeline()
         self.current_frame = 0
@@ -60,8 +71,10 @@ class PreviewGLWidget(QOpenGLWidget):
         self.anim_timer.timeout.connect(self._on_animation_tick)
         self.target_fps = 30.0
         
-        # Render scale (for performance)
+        # Render scale (for performance) and the filter scaling it back up
         self.render_scale = 1.0
+        self.upscale_linear = True
+        self._scale_target: Optional[RenderTarget] = None
     
     def initializeGL(self):
         """Initialize OpenGL resources."""
@@ -75,10 +88,50 @@ class PreviewGLWidget(QOpenGLWidget):
     
     def resizeGL(self, width: int, height: int):
         """Handle widget resize."""
-        # Update uniform resolution
-        scaled_width = int(width * self.render_scale)
-        scaled_height = int(height * self.render_scale)
-        self.uniform_manager.set_resolution(float(scaled_width), float(scaled_height))
+        ratio = self.devicePixelRatio()
+        render_width, render_height = self.get_render_size(int(width * ratio),
+                                                           int(height * ratio))
+        self.uniform_manager.set_resolution(float(render_width), float(render_height))
+    
+    def get_render_size(self, width: int, height: int) -> Tuple[int, int]:
+        """Size the shader renders at for a framebuffer size.
+        
+        Args:
+            width: Framebuffer width in device pixels
+            height: Framebuffer height in device pixels
+        
+        Returns:
+            (width, height) scaled by render_scale, at least 1x1
+        """
+        return (max(1, round(width * self.render_scale)),
+                max(1, round(height * self.render_scale)))
+    
+    def _prepare_scale_target(self, width: int, height: int) -> Optional[RenderTarget]:
+        """Offscreen target of the scaled size, or None at full scale.
+        
+        Args:
+            width: Framebuffer width in device pixels
+            height: Framebuffer height in device pixels
+        """
+        size = self.get_render_size(width, height)
+        if size == (width, height):
+            self._release_scale_target()
+            return None
+        
+        if self._scale_target is None:
+            self._scale_target = RenderTarget()
+        target = self._scale_target
+        if target.is_valid:
+            target.resize(*size)
+        else:
+            target.create(*size)
+        return target if target.is_valid else None
+    
+    def _release_scale_target(self):
+        """Delete the offscreen target of scaled previews."""
+        if self._scale_target is not None:
+            self._scale_target.delete()
+            self._scale_target = None
     
     def paintGL(self):
         """Render the current frame."""
@@ -90,6 +143,28 @@ class PreviewGLWidget(QOpenGLWidget):
         if not program or not program.is_valid:
             return
         
+        # Scaled previews render into a smaller target, blitted up at the end
+        ratio = self.devicePixelRatio()
+        width = int(self.width() * ratio)
+        height = int(self.height() * ratio)
+        target = self._prepare_scale_target(width, height)
+        render_width, render_height = (target.width, target.height) if target else (width, height)
+        self.uniform_manager.set_resolution(float(render_width), float(render_height))
+        output_fbo = target.fbo if target is not None else self.defaultFramebufferObject()
+        
+        # With post passes the shader draws into the chain's scene target
+        chain = self.post_chain
+        if chain.active:
+            if not chain.prepare(render_width, render_height):
+                self.shader_compiled.emit(False, chain.last_error)
+                chain.set_passes([])
+                return
+            chain.scene_target.bind()
+            clear_viewport(0.0, 0.0, 0.0, 1.0)
+        elif target is not None:
+            target.bind()
+            clear_viewport(0.0, 0.0, 0.0, 1.0)
+        
         # Get frame info from timeline
         frame_info = self.timeline.get_frame_info(self.current_frame)
         
@@ -106,6 +181,20 @@ class PreviewGLWidget(QOpenGLWidget):
         self.shader_manager.set_uniforms(program, self.uniform_manager.get_all_uniforms())
         self.quad.draw()
         
+        if chain.active:
+            chain.run(self.quad, output_fbo, render_width, render_height, {
+                "u_resolution": (float(render_width), float(render_height)),
+                "u_offset": (0.0, 0.0),
+                "u_time": frame_info.time,
+                "u_phase": frame_info.phase,
+                "u_frame": frame_info.frame,
+                "u_levels": 255.0,
+            })
+        
+        if target is not None:
+            target.blit_to(self.defaultFramebufferObject(), width, height,
+                           self.upscale_linear)
+        
         # Update FPS counter
         self._update_fps()
     
@@ -192,6 +281,16 @@ class PreviewGLWidget(QOpenGLWidget):
             self.shader_compiled.emit(False, errors)
             return False
     
+    def set_post_passes(self, passes: List[PostPass]):
+        """Set the GPU post passes applied to the preview.
+        
+        Args:
+            passes: Post passes in order (empty = none)
+        """
+        self.makeCurrent()
+        self.post_chain.set_passes(passes)
+        self.update()
+    
     def play(self):
         """Start animation playback."""
         self.playing = True
@@ -257,6 +356,16 @@ class PreviewGLWidget(QOpenGLWidget):
         """
         self.render_scale = max(0.25, min(1.0, scale))
         self.resizeGL(self.width(), self.height())
+        self.update()
+    
+    def set_upscale_filter(self, linear: bool):
+        """Set how scaled previews are enlarged to the widget.
+        
+        Args:
+            linear: Linear filtering (False = nearest pixel, sharp blocks)
+        """
+        self.upscale_linear = linear
+        self.update()
     
     def set_seed(self, seed: float):
         """Set the random seed.
@@ -274,5 +383,8 @@ class PreviewGLWidget(QOpenGLWidget):
         if self.quad:
             self.quad.delete()
         
+        self.post_chain.delete()
+        self._release_scale_target()
+        
         if self.shader_manager.current_program:
             self.shader_manager.current_program.delete()
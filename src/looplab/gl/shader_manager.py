@@ -13,6 +13,8 @@ from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Optional
 
+from . import fast_gl
+
 # Import OpenGL - will be used when Qt context is active
 try:
     from OpenGL.GL import (
@@ -49,6 +51,8 @@ class ShaderProgram:
     is_valid: bool = False
     errors: list[ShaderCompileError] = field(default_factory=list)
     uniform_locations: dict[str, int] = field(default_factory=dict)
+    # Last values sent in fast GL mode, to skip unchanged uniforms
+    uniform_values: dict[str, object] = field(default_factory=dict)
     
     def use(self):
         """Activate this shader program."""
@@ -138,6 +142,43 @@ void main() {
 """
 
 
+def get_post_header() -> str:
+    """Get the header prepended to post-processing passes."""
+    return """// LoopLab Post Pass Header
+#version 330 core
+
+uniform sampler2D u_input;   // Result of the previous pass (or the shader)
+uniform vec2 u_resolution;   // Full frame resolution in pixels
+uniform vec2 u_offset;       // Offset of this band within the frame
+uniform float u_time;
+uniform float u_phase;
+uniform int u_frame;
+uniform float u_levels;      // Output quantization levels (255 or 65535)
+uniform float u_strength;    // Mix of the pass result over its input
+
+out vec4 fragColor;
+
+// Input pixel at an offset (in pixels) from the current one
+vec4 inputAt(vec2 offset) {
+    ivec2 size = textureSize(u_input, 0);
+    ivec2 p = clamp(ivec2(gl_FragCoord.xy + offset), ivec2(0), size - 1);
+    return texelFetch(u_input, p, 0);
+}
+"""
+
+
+def get_post_wrapper() -> str:
+    """Get the main() wrapper for post passes (postProcess function)."""
+    return """
+// Main wrapper - feeds the input pixel through postProcess
+void main() {
+    vec4 color = texelFetch(u_input, ivec2(gl_FragCoord.xy), 0);
+    vec4 result = postProcess(color, gl_FragCoord.xy + u_offset);
+    fragColor = mix(color, result, u_strength);
+}
+"""
+
+
 def get_vertex_shader() -> str:
     """Get the standard vertex shader for fullscreen quad."""
     return """#version 330 core
@@ -192,6 +233,19 @@ class ShaderManager:
         
         return f"{header}\n{helpers}\n{user_source}\n{wrapper}"
     
+    def build_post_shader(self, pass_source: str) -> str:
+        """Build a complete post-processing fragment shader.
+        
+        Args:
+            pass_source: Pass code (postProcess function)
+            
+        Returns:
+            Complete shader source ready for compilation
+        """
+        header = get_post_header()
+        self.header_line_count = header.count('\n')
+        return f"{header}\n{pass_source}\n{get_post_wrapper()}"
+    
     def _compile_shader(self, source: str, shader_type: int) -> tuple[int, list[ShaderCompileError]]:
         """Compile a shader and return its ID and any errors.
         
@@ -282,14 +336,28 @@ class ShaderManager:
         Returns:
             ShaderProgram with compilation status and any errors
         """
-        program = ShaderProgram()
+        if not OPENGL_AVAILABLE:
+            return ShaderProgram(errors=[ShaderCompileError(0, "OpenGL not available")])
+        
+        return self._link_program(self.build_fragment_shader(user_fragment_source))
+    
+    def compile_post_program(self, pass_source: str) -> ShaderProgram:
+        """Compile a post-processing pass program.
         
+        Args:
+            pass_source: Pass code (postProcess function)
+            
+        Returns:
+            ShaderProgram with compilation status and any errors
+        """
         if not OPENGL_AVAILABLE:
-            program.errors = [ShaderCompileError(0, "OpenGL not available")]
-            return program
+            return ShaderProgram(errors=[ShaderCompileError(0, "OpenGL not available")])
         
-        # Build complete fragment shader
-        fragment_source = self.build_fragment_shader(user_fragment_source)
+        return self._link_program(self.build_post_shader(pass_source))
+    
+    def _link_program(self, fragment_source: str) -> ShaderProgram:
+        """Compile a complete fragment shader and link it with the quad vertex shader."""
+        program = ShaderProgram()
         vertex_source = get_vertex_shader()
         
         # Compile vertex shader
@@ -362,7 +430,13 @@ class ShaderManager:
         if not OPENGL_AVAILABLE or not program.is_valid:
             return
         
+        fast = fast_gl.current()
+        if fast is not None:
+            self._set_uniforms_fast(fast, program, uniforms)
+            return
+        
         program.use()
+        program.uniform_values.clear()
         
         for name, value in uniforms.items():
             loc = program.uniform_locations.get(name)
@@ -387,6 +461,35 @@ class ShaderManager:
                 elif len(value) == 4:
                     glUniform4f(loc, *value)
     
+    def _set_uniforms_fast(self, fast, program: ShaderProgram, uniforms: dict):
+        """Raw-call variant of set_uniforms that skips unchanged values.
+        
+        Missing uniforms are remembered as location -1 so they are only
+        looked up once per program.
+        """
+        fast.glUseProgram(program.program_id)
+        
+        locations = program.uniform_locations
+        last_values = program.uniform_values
+        setters = fast.uniform_setters
+        for name, value in uniforms.items():
+            loc = locations.get(name)
+            if loc is None:
+                loc = glGetUniformLocation(program.program_id, name)
+                locations[name] = loc
+            if loc < 0 or last_values.get(name) == value:
+                continue
+            
+            if isinstance(value, int):
+                fast.glUniform1i(loc, value)
+            elif isinstance(value, float):
+                fast.glUniform1f(loc, value)
+            elif isinstance(value, tuple) and len(value) in setters:
+                setters[len(value)](loc, *value)
+            else:
+                continue
+            last_values[name] = value
+    
     def reload(self) -> ShaderProgram:
         """Reload shader from the previously loaded path.
         
@@ -1,12 +1,22 @@
 """LoopLab main entry point."""
 
 import sys
-from PySide6.QtWidgets import QApplication
-from PySide6.QtCore import Qt
 
 
 def main():
-    """Main application entry point."""
+    """Main application entry point.
+    
+    Starts the GUI, or runs a headless subcommand (see looplab.cli).
+    """
+    from .cli import get_commands
+    if len(sys.argv) > 1 and sys.argv[1] in get_commands():
+        from .cli import main as cli_main
+        sys.exit(cli_main(sys.argv[1:]))
+    
+    # Client subcommands stay fast by not importing Qt
+    from PySide6.QtWidgets import QApplication
+    from PySide6.QtCore import Qt
+    
     # Enable high DPI scaling
     QApplication.setHighDpiScaleFactorRoundingPolicy(
         Qt.HighDpiScaleFactorRoundingPolicy.PassThrough
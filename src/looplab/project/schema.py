@@ -6,6 +6,10 @@ This module defines the schema and validation for LoopLab projects.
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional
 
+from ..gl.post_process import validate_post_pass_spec
+from ..render.frame_store import FRAME_STORE_FORMAT
+from ..render.image_writer import FRAME_FORMATS
+
 
 # Current schema version
 SCHEMA_VERSION = "1.0"
@@ -46,6 +50,10 @@ def validate_project_data(data: Dict[str, Any]) -> tuple[bool, str]:
             scale = preview["render_scale"]
             if not isinstance(scale, (int, float)) or scale <= 0 or scale > 1:
                 return False, "Invalid render_scale (must be greater than 0 and at most 1)"
+        
+        if "upscale_filter" in preview:
+            if preview["upscale_filter"] not in ("linear", "nearest"):
+                return False, "Invalid upscale_filter (must be linear or nearest)"
     
     # Validate offline settings if present
     if "offline" in data:
@@ -67,6 +75,53 @@ def validate_project_data(data: Dict[str, Any]) -> tuple[bool, str]:
             fps = offline["fps"]
             if not isinstance(fps, (int, float)) or fps <= 0:
                 return False, "Invalid fps"
+        
+        if "frame_format" in offline:
+            if offline["frame_format"] not in (*FRAME_FORMATS, FRAME_STORE_FORMAT):
+                return False, "Invalid frame_format"
+        
+        if "bit_depth" in offline:
+            if offline["bit_depth"] not in (0, 8, 16):
+                return False, "Invalid bit_depth (must be 0, 8 or 16)"
+        
+        if "post_passes" in offline:
+            passes = offline["post_passes"]
+            if not isinstance(passes, list):
+                return False, "Invalid post_passes (must be a list)"
+            for spec in passes:
+                error = validate_post_pass_spec(spec)
+                if error:
+                    return False, f"Invalid post_passes: {error}"
+        
+        if "png_compress_level" in offline:
+            level = offline["png_compress_level"]
+            if not isinstance(level, int) or not 0 <= level <= 9:
+                return False, "Invalid png_compress_level (must be 0-9)"
+        
+        for key in ("host_memory_budget_mb", "gpu_memory_budget_mb"):
+            if key in offline:
+                budget = offline[key]
+                if not isinstance(budget, (int, float)) or budget < 0:
+                    return False, f"Invalid {key}"
+        
+        if "shutter_angle" in offline:
+            angle = offline["shutter_angle"]
+            if not isinstance(angle, (int, float)) or not 0 <= angle <= 360:
+                return False, "Invalid shutter_angle (must be 0-360)"
+        
+        for key in ("frame_start", "frame_end"):
+            if key in offline:
+                frame = offline[key]
+                if not isinstance(frame, int) or frame < 0:
+                    return False, f"Invalid {key}"
+        
+        if "frame_stride" in offline:
+            stride = offline["frame_stride"]
+            if not isinstance(stride, int) or stride < 1:
+                return False, "Invalid frame_stride (must be at least 1)"
+        
+        if offline.get("frame_end", 0) and offline.get("frame_start", 0) >= offline["frame_end"]:
+            return False, "frame_end must be after frame_start"
     
     return True, ""
 
@@ -101,6 +156,7 @@ def get_default_project_data() -> Dict[str, Any]:
         "seed": 0.0,
         "preview": {
             "render_scale": 1.0,
+            "upscale_filter": "linear",
             "supersampling": False,
             "target_fps": 30.0,
         },
@@ -110,6 +166,16 @@ def get_default_project_data() -> Dict[str, Any]:
             "fps": 30.0,
             "supersample_scale": 1,
             "accumulation_samples": 1,
+            "shutter_angle": 0.0,
+            "frame_format": "png",
+            "bit_depth": 0,
+            "post_passes": [],
+            "png_compress_level": 1,
+            "host_memory_budget_mb": 0,
+            "gpu_memory_budget_mb": 0,
+            "frame_start": 0,
+            "frame_end": 0,
+            "frame_stride": 1,
             "save_png_sequence": True,
             "encode_video": True,
         },
@@ -1 +1,11 @@
 """Rendering and timeline components."""
+
+__all__ = ["stream", "RenderSettings"]
+
+
+def __getattr__(name):
+    # Exported lazily so importing the package stays cheap
+    if name in __all__:
+        from . import streaming
+        return getattr(streaming, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
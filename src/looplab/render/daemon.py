@@ -0,0 +1,1126 @@
+"""Long-lived render daemon with a warm GL context pool.
+
+Starting a render from scratch pays for the interpreter, the PySide6 and
+PyOpenGL imports, GL context creation and shader compilation. The daemon
+pays those once: it keeps N executor threads, each owning a warm
+FrameRenderer with its own compiled-program cache, and runs submitted
+jobs on them with OfflineRenderWorker.
+
+Queued jobs render in priority order. A finished render's encode waits
+for a CPU encode slot on its own thread (see render.scheduler), so the GL
+context moves straight on to the next job and one job's encode overlaps
+the next one's render. Frame writers and FFmpeg get fixed thread budgets
+so concurrent jobs do not oversubscribe the cores.
+
+Jobs are submitted as JSON over HTTP on localhost or a Unix socket:
+
+    GET  /health                status and pool statistics
+    GET  /jobs                  list jobs
+    POST /jobs                  submit a job, returns the job status
+    GET  /jobs/<id>             job status
+    POST /jobs/<id>/cancel      cancel a queued or running job
+    GET  /jobs/<id>/events      newline-delimited JSON events until the job ends
+
+The API only answers requests addressed to localhost (or the host it was
+started on), so a web page cannot reach it through DNS rebinding, and POST
+bodies must be ``application/json``, which browsers cannot send across
+origins without a preflight the daemon never grants. TCP requests also
+carry a token (``Authorization: Bearer``) that the daemon writes to a
+file only the user can read (get_daemon_token_path); DaemonClient reads
+it from there. The Unix socket is protected by its own permissions.
+
+Run with:
+    looplab daemon --workers 2 --encode-slots 2 --port 8765
+    looplab daemon --socket /tmp/looplab.sock
+"""
+
+import http.client
+import itertools
+import json
+import os
+import queue
+import secrets
+import socket
+import socketserver
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .scheduler import ENCODE, RENDER, JobScheduler
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Host header values the API answers (besides the host it is bound to)
+LOCAL_HOSTS = frozenset({"localhost", "127.0.0.1", "::1"})
+
+# Finished jobs kept for status queries
+MAX_FINISHED_JOBS = 1000
+
+# Events kept per job for late event-stream readers
+MAX_JOB_EVENTS = 500
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+# Job spec keys handled by the daemon rather than OfflineRenderWorker.configure
+_JOB_KEYS = {
+    "shader_source", "shader_path", "output_dir", "preset", "presets", "video_path",
+    "encode_jobs", "loop_repeats", "priority", "max_size_mb", "master",
+    "incremental_encode",
+}
+
+# OfflineRenderWorker.configure settings accepted in a job spec
+RENDER_SETTINGS = {
+    "width", "height", "fps", "duration", "seed",
+    "supersample_scale", "gpu_downsample", "accumulation_samples", "shutter_angle", "bit_depth", "post_passes",
+    "complexity", "force", "force2", "base_hue_rad", "color_mode",
+    "frame_format", "png_compress_level",
+    "host_memory_budget_mb", "gpu_memory_budget_mb",
+    "frame_start", "frame_end", "frame_stride",
+}
+
+
+@dataclass
+class RenderJob:
+    """A render job and its progress."""
+    
+    id: str
+    shader_source: str
+    output_dir: str
+    settings: Dict[str, Any] = field(default_factory=dict)
+    preset: str = ""
+    video_path: str = ""
+    # All deliverables, encoded in one FFmpeg run when there are several
+    presets: List[str] = field(default_factory=list)
+    video_paths: Dict[str, str] = field(default_factory=dict)
+    # Concurrent FFmpeg processes for the encode (segmented above 1)
+    encode_jobs: int = 1
+    # Keep the encoded segments and re-encode only those whose frames changed
+    incremental_encode: bool = False
+    # Times the encoded loop plays in the video (repeated by stream copy)
+    loop_repeats: int = 1
+    # Size cap of animated image deliverables in MB (0 = none)
+    max_size_mb: float = 0.0
+    # Lossless master preset encoded first; the presets transcode from it
+    master: str = ""
+    # Higher priorities render and encode first
+    priority: int = 0
+    state: str = QUEUED
+    # Stage of a running job: "render", "encode_wait" or "encode"
+    stage: str = ""
+    frame: int = 0
+    total_frames: int = 0
+    error: str = ""
+    created: float = field(default_factory=time.time)
+    started: float = 0.0
+    finished: float = 0.0
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    
+    def __post_init__(self):
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+        self._worker = None
+        self._cancel_requested = False
+    
+    @property
+    def is_finished(self) -> bool:
+        """Whether the job has reached a final state."""
+        return self.state in FINISHED_STATES
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Job status as JSON-serializable data."""
+        return {
+            "id": self.id,
+            "state": self.state,
+            "stage": self.stage,
+            "priority": self.priority,
+            "frame": self.frame,
+            "total_frames": self.total_frames,
+            "output_dir": self.output_dir,
+            "video_path": self.video_path,
+            "video_paths": self.video_paths,
+            "error": self.error,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+        }
+    
+    def add_event(self, kind: str, **data):
+        """Record an event and wake event-stream readers."""
+        with self._cond:
+            self.events.append({"seq": next(self._seq), "type": kind, **data})
+            if len(self.events) > MAX_JOB_EVENTS:
+                del self.events[:len(self.events) - MAX_JOB_EVENTS]
+            self._cond.notify_all()
+    
+    def wait_events(self, after: int = -1, timeout: float = 30.0) -> Tuple[List[Dict[str, Any]], bool]:
+        """Wait for events newer than a sequence number.
+        
+        Args:
+            after: Last sequence number already seen
+            timeout: Seconds to wait for a new event
+        
+        Returns:
+            (new events, whether the job has finished)
+        """
+        with self._cond:
+            self._cond.wait_for(
+                lambda: self.is_finished or (self.events and self.events[-1]["seq"] > after),
+                timeout
+            )
+            return [e for e in self.events if e["seq"] > after], self.is_finished
+    
+    def set_stage(self, stage: str):
+        """Record the stage a running job has reached."""
+        self.stage = stage
+        self.add_event("stage", stage=stage)
+    
+    def set_state(self, state: str, error: str = ""):
+        """Move the job to a new state and record it as an event."""
+        with self._cond:
+            self.state = state
+            if error:
+                self.error = error
+            if state == RUNNING:
+                self.started = time.time()
+            elif state in FINISHED_STATES:
+                self.finished = time.time()
+        self.add_event("state", state=state, error=error)
+
+
+def get_job_frames(settings: Dict[str, Any]) -> range:
+    """Frames selected by a job's render settings.
+    
+    Raises:
+        ValueError: If the frame range lies outside the loop
+    """
+    from .timeline import Timeline
+    
+    timeline = Timeline(
+        duration=settings.get("duration", 30.0),
+        fps=settings.get("fps", 30.0)
+    )
+    return timeline.frame_range(
+        settings.get("frame_start", 0),
+        settings.get("frame_end", 0) or None,
+        settings.get("frame_stride", 1)
+    )
+
+
+def create_job(job_id: str, spec: Dict[str, Any]) -> RenderJob:
+    """Validate a job spec and create a job.
+    
+    The spec holds ``shader_source`` (or ``shader_path``), ``output_dir``,
+    an optional encoding ``preset`` (or a list of ``presets``, encoded in one
+    pass), ``video_path``, ``encode_jobs``, ``loop_repeats``, ``priority``,
+    ``max_size_mb``, ``master``, ``incremental_encode`` and any
+    OfflineRenderWorker.configure settings (width, fps, frame_format, ...).
+    
+    Args:
+        job_id: Identifier for the job
+        spec: Job spec dictionary
+    
+    Returns:
+        RenderJob in the queued state
+    
+    Raises:
+        ValueError: If the spec is invalid
+    """
+    if not isinstance(spec, dict):
+        raise ValueError("Job spec must be a JSON object")
+    
+    source = spec.get("shader_source")
+    if not source and spec.get("shader_path"):
+        try:
+            source = Path(spec["shader_path"]).read_text()
+        except OSError as e:
+            raise ValueError(f"Failed to read shader: {e}")
+    if not source:
+        raise ValueError("Job needs shader_source or shader_path")
+    
+    output_dir = spec.get("output_dir")
+    if not output_dir:
+        raise ValueError("Job needs output_dir")
+    
+    settings = {k: v for k, v in spec.items() if k not in _JOB_KEYS}
+    unknown = set(settings) - RENDER_SETTINGS
+    if unknown:
+        raise ValueError(f"Unknown job settings: {', '.join(sorted(unknown))}")
+    
+    # Raises ValueError for ranges outside the loop
+    get_job_frames(settings)
+    
+    passes = settings.get("post_passes", [])
+    if not isinstance(passes, list):
+        raise ValueError("post_passes must be a list")
+    from ..gl.post_process import validate_post_pass_spec
+    for post_pass in passes:
+        error = validate_post_pass_spec(post_pass)
+        if error:
+            raise ValueError(error)
+    
+    presets = spec.get("presets") or []
+    if not isinstance(presets, list):
+        raise ValueError("presets must be a list")
+    if spec.get("preset"):
+        presets = [spec["preset"], *presets]
+    presets = list(dict.fromkeys(presets))
+    
+    video_path = spec.get("video_path") or ""
+    video_paths = {}
+    if presets:
+        from ..encode.ffmpeg import PRESETS, get_output_paths_for_presets
+        for name in presets:
+            if name not in PRESETS:
+                raise ValueError(f"Unknown preset: {name}")
+        video_paths = get_output_paths_for_presets(
+            video_path or os.path.join(output_dir, "output.mp4"), presets
+        )
+        video_path = video_paths[presets[0]]
+    preset = presets[0] if presets else ""
+    
+    encode_jobs = spec.get("encode_jobs", 1)
+    if not isinstance(encode_jobs, int) or isinstance(encode_jobs, bool) or encode_jobs < 1:
+        raise ValueError("encode_jobs must be a positive integer")
+    if encode_jobs > 1 and len(presets) > 1:
+        raise ValueError("encode_jobs applies to single-preset jobs")
+    
+    incremental_encode = spec.get("incremental_encode", False)
+    if not isinstance(incremental_encode, bool):
+        raise ValueError("incremental_encode must be true or false")
+    if incremental_encode and len(presets) > 1:
+        raise ValueError("incremental_encode applies to single-preset jobs")
+    
+    loop_repeats = spec.get("loop_repeats", 1)
+    if not isinstance(loop_repeats, int) or isinstance(loop_repeats, bool) or loop_repeats < 1:
+        raise ValueError("loop_repeats must be a positive integer")
+    if loop_repeats > 1 and len(presets) > 1:
+        raise ValueError("loop_repeats applies to single-preset jobs")
+    
+    animated = [name for name in presets if PRESETS[name].is_animated] if presets else []
+    if loop_repeats > 1 and animated:
+        raise ValueError("loop_repeats does not apply to animated images (they loop forever)")
+    if incremental_encode and animated:
+        raise ValueError("incremental_encode does not apply to animated images")
+    
+    max_size_mb = spec.get("max_size_mb", 0)
+    if not isinstance(max_size_mb, (int, float)) or isinstance(max_size_mb, bool) \
+            or max_size_mb < 0:
+        raise ValueError("max_size_mb must be a positive number")
+    if max_size_mb and (len(presets) != 1 or not animated):
+        raise ValueError("max_size_mb applies to single animated image presets")
+    
+    master = spec.get("master") or ""
+    if master:
+        from ..encode.master import MASTER_PRESETS
+        if master not in MASTER_PRESETS:
+            raise ValueError(f"master must be one of: {', '.join(MASTER_PRESETS)}")
+    
+    priority = spec.get("priority", 0)
+    if not isinstance(priority, int) or isinstance(priority, bool):
+        raise ValueError("priority must be an integer")
+    
+    if presets or settings.get("bit_depth"):
+        # 10-bit presets are fed 16-bit frames unless a depth was given
+        from ..encode.ffmpeg import get_render_bit_depth
+        requested = settings.get("bit_depth", 0)
+        settings["bit_depth"] = max(
+            get_render_bit_depth(name, requested) for name in presets or [""]
+        )
+    
+    if master:
+        from ..encode.master import MASTER_PIX_FMTS, master_can_encode
+        bit_depth = 16 if (settings.get("bit_depth") or 8) > 8 else 8
+        if (master, bit_depth) not in MASTER_PIX_FMTS:
+            raise ValueError(f"{master} cannot hold {bit_depth}-bit frames; use master_ffv1")
+        info = {"pix_fmt": MASTER_PIX_FMTS[(master, bit_depth)]}
+        unserved = [name for name in presets if not master_can_encode(info, PRESETS[name])]
+        if unserved:
+            raise ValueError(f"{master} drops the alpha or bit depth of: {', '.join(unserved)}")
+    
+    return RenderJob(
+        id=job_id,
+        shader_source=source,
+        output_dir=str(output_dir),
+        settings=settings,
+        preset=preset,
+        video_path=video_path,
+        presets=presets,
+        video_paths=video_paths,
+        encode_jobs=encode_jobs,
+        incremental_encode=incremental_encode,
+        loop_repeats=loop_repeats,
+        max_size_mb=float(max_size_mb),
+        master=master,
+        priority=priority
+    )
+
+
+class RenderDaemon:
+    """Job queue served by a pool of warm render contexts."""
+    
+    def __init__(self, workers: int = 1, program_cache_size: int = 16,
+                 encode_slots: int = 1, threads: int = 0):
+        """Initialize the daemon.
+        
+        Args:
+            workers: Number of executor threads (one GL context each)
+            program_cache_size: Compiled programs cached per context
+            encode_slots: Encodes run at once, overlapping later renders
+            threads: CPU threads shared by frame writers and FFmpeg
+                (0 = one per core)
+        """
+        self.workers = max(1, workers)
+        self.program_cache_size = program_cache_size
+        self.scheduler = JobScheduler(self.workers, encode_slots, threads or None)
+        
+        self._jobs: Dict[str, RenderJob] = {}
+        # (-priority, submission order, job); None stops an executor
+        self._queue: "queue.PriorityQueue[Tuple[float, int, Optional[RenderJob]]]" = \
+            queue.PriorityQueue()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._order = itertools.count()
+        self._threads: List[threading.Thread] = []
+        self._encode_threads: List[threading.Thread] = []
+        self._renderers: List[Any] = []
+        self.started = time.time()
+    
+    def submit(self, spec: Dict[str, Any]) -> RenderJob:
+        """Validate and queue a job.
+        
+        Presets are checked against the local FFmpeg's capabilities here,
+        so a job that could not be encoded fails before it renders.
+        
+        Raises:
+            ValueError: If the spec is invalid or a preset cannot be encoded
+        """
+        with self._lock:
+            job_id = f"{int(self.started)}-{next(self._ids)}"
+        job = create_job(job_id, spec)
+        
+        from ..encode.probe import check_presets
+        problems = check_presets([*job.presets, *([job.master] if job.master else [])])
+        if problems:
+            raise ValueError("; ".join(problems))
+        
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        job.add_event("state", state=QUEUED, error="")
+        self._queue.put((-job.priority, next(self._order), job))
+        return job
+    
+    def get(self, job_id: str) -> Optional[RenderJob]:
+        """Get a job by id."""
+        with self._lock:
+            return self._jobs.get(job_id)
+    
+    def list_jobs(self) -> List[RenderJob]:
+        """All known jobs, oldest first."""
+        with self._lock:
+            return list(self._jobs.values())
+    
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued or running job.
+        
+        Returns:
+            True if the job exists and was not already finished
+        """
+        job = self.get(job_id)
+        if job is None or job.is_finished:
+            return False
+        
+        with job._cond:
+            job._cancel_requested = True
+            worker = job._worker
+            if worker is None and job.state == QUEUED:
+                job.set_state(CANCELLED)
+        if worker is not None:
+            worker.cancel()
+        return True
+    
+    def stats(self) -> Dict[str, Any]:
+        """Pool and queue statistics."""
+        jobs = self.list_jobs()
+        counts = {state: 0 for state in (QUEUED, RUNNING) + FINISHED_STATES}
+        for job in jobs:
+            counts[job.state] += 1
+        return {
+            "workers": self.workers,
+            "uptime": time.time() - self.started,
+            "jobs": counts,
+            "scheduler": self.scheduler.stats(),
+            "program_cache": {
+                "hits": sum(r.cache_hits for r in self._renderers),
+                "misses": sum(r.cache_misses for r in self._renderers),
+            },
+        }
+    
+    def _prune(self):
+        """Forget the oldest finished jobs beyond MAX_FINISHED_JOBS."""
+        finished = [j for j in self._jobs.values() if j.is_finished]
+        for job in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job.id]
+    
+    def start(self, surfaces: List[Any]):
+        """Start one executor thread per offscreen surface.
+        
+        Args:
+            surfaces: QOffscreenSurfaces created on the GUI thread
+        """
+        for index, surface in enumerate(surfaces):
+            thread = threading.Thread(
+                target=self._executor_loop, args=(surface,),
+                name=f"looplab-render-{index}", daemon=True
+            )
+            self._threads.append(thread)
+            thread.start()
+    
+    def stop(self, timeout: float = 10.0):
+        """Cancel running jobs and stop the executor and encode threads."""
+        for job in self.list_jobs():
+            if not job.is_finished:
+                self.cancel(job.id)
+        for _ in self._threads:
+            self._queue.put((float("-inf"), next(self._order), None))
+        with self._lock:
+            threads = self._threads + self._encode_threads
+        for thread in threads:
+            thread.join(timeout)
+        self._threads.clear()
+        self._encode_threads.clear()
+    
+    def _executor_loop(self, surface):
+        """Executor thread: create a warm renderer and run queued jobs."""
+        from .frame_renderer import FrameRenderer
+        
+        renderer = FrameRenderer(self.program_cache_size)
+        # Warm daemon renderers run many jobs, where call overhead adds up
+        renderer.fast_gl = True
+        ok = renderer.create_context(surface)
+        if ok:
+            renderer.done_current()
+        self._renderers.append(renderer)
+        
+        while True:
+            job = self._queue.get()[2]
+            if job is None:
+                break
+            if job.is_finished:
+                continue
+            if not ok:
+                job.set_state(FAILED, renderer.last_error)
+                continue
+            self._run_job(renderer, job)
+        
+        if ok:
+            renderer.destroy()
+    
+    def _run_job(self, renderer, job: RenderJob):
+        """Render a job on a warm renderer, then hand it to the encode stage."""
+        with self.scheduler.slot(RENDER, job.priority, lambda: job._cancel_requested) as slot:
+            if slot is None:
+                job.set_state(CANCELLED)
+                return
+            self._render(renderer, job, slot.threads)
+    
+    def _render(self, renderer, job: RenderJob, writer_threads: int):
+        """Run a job's render with a frame writer thread budget."""
+        from .offline_worker import OfflineRenderWorker
+        
+        worker = OfflineRenderWorker(renderer=renderer)
+        worker.configure(job.shader_source, job.output_dir, writer_threads=writer_threads,
+                         **job.settings)
+        
+        errors: List[str] = []
+        result: List[bool] = []
+        
+        def on_progress(current: int, total: int):
+            job.frame, job.total_frames = current, total
+            job.add_event("progress", frame=current, total=total)
+            # Also catches a cancel that raced with the start of run()
+            if job._cancel_requested:
+                worker.cancel()
+        
+        def on_error(message: str):
+            errors.append(message)
+            job.add_event("error", message=message)
+        
+        worker.progress.connect(on_progress)
+        worker.log_message.connect(lambda message: job.add_event("log", message=message))
+        worker.error.connect(on_error)
+        worker.finished.connect(result.append)
+        
+        with job._cond:
+            if job._cancel_requested:
+                return
+            job._worker = worker
+            job.set_state(RUNNING)
+        job.set_stage("render")
+        
+        try:
+            worker.run()
+        except Exception as e:
+            errors.append(f"Render failed: {e}")
+            result = [False]
+        finally:
+            job._worker = None
+        
+        if job._cancel_requested:
+            job.set_state(CANCELLED)
+        elif not (result and result[0]):
+            job.set_state(FAILED, errors[-1] if errors else "Render failed")
+        elif job.preset or job.master:
+            self._start_encode(job, errors[-1] if errors else "")
+        elif errors:
+            job.set_state(FAILED, errors[-1])
+        else:
+            job.set_state(DONE)
+    
+    def _start_encode(self, job: RenderJob, render_error: str = ""):
+        """Encode a rendered job on its own thread, freeing the GL context."""
+        thread = threading.Thread(
+            target=self._encode_stage, args=(job, render_error),
+            name=f"looplab-encode-{job.id}", daemon=True
+        )
+        with self._lock:
+            self._encode_threads = [t for t in self._encode_threads if t.is_alive()]
+            self._encode_threads.append(thread)
+        thread.start()
+    
+    def _encode_stage(self, job: RenderJob, render_error: str = ""):
+        """Wait for an encode slot, encode, and finish the job.
+        
+        Args:
+            job: Job whose render succeeded
+            render_error: Last error the render reported, failing the job
+                once it is encoded
+        """
+        job.set_stage("encode_wait")
+        with self.scheduler.slot(ENCODE, job.priority, lambda: job._cancel_requested) as slot:
+            if slot is None:
+                job.set_state(CANCELLED)
+                return
+            job.set_stage("encode")
+            try:
+                ok = self._encode(job, slot.threads)
+            except Exception as e:
+                job.add_event("error", message=f"Video encoding failed: {e}")
+                ok = False
+        
+        if job._cancel_requested:
+            job.set_state(CANCELLED)
+        elif not ok:
+            job.set_state(FAILED, "Video encoding failed")
+        elif render_error:
+            job.set_state(FAILED, render_error)
+        else:
+            job.set_state(DONE)
+    
+    def _encode(self, job: RenderJob, threads: int = 0) -> bool:
+        """Encode a finished job's frames with its preset.
+        
+        The encoder stands in for the job's worker, so cancelling the
+        job stops FFmpeg. Progress is recorded as "encode_progress"
+        events.
+        
+        Args:
+            job: Job to encode
+            threads: FFmpeg thread budget (0 = one per core)
+        """
+        from ..encode.ffmpeg import (
+            FFmpegEncoder, create_encoder, encode_render_deliverables, encode_render_output
+        )
+        
+        def on_status(progress):
+            job.add_event(
+                "encode_progress", frame=progress.frame, total=progress.total_frames,
+                fps=progress.fps, speed=progress.speed, eta=progress.eta_seconds
+            )
+        
+        # Encode the master first; the presets then transcode from it
+        if job.master and not self._encode_master(job, threads, on_status):
+            return False
+        if not job.presets:
+            return True
+        
+        multi = len(job.presets) > 1
+        if multi or job.max_size_mb:
+            encoder = FFmpegEncoder(threads=threads)
+        else:
+            encoder = create_encoder(job.encode_jobs, threads, job.incremental_encode)
+        with job._cond:
+            if job._cancel_requested:
+                return False
+            job._worker = encoder
+        
+        try:
+            if multi:
+                results = encode_render_deliverables(
+                    output_dir=job.output_dir,
+                    output_path=job.video_path,
+                    fps=job.settings.get("fps", 30.0),
+                    presets=job.presets,
+                    log_callback=lambda message: job.add_event("log", message=message),
+                    status_callback=on_status,
+                    encoder=encoder
+                )
+                for result in results:
+                    job.add_event("deliverable", preset=result.preset, path=result.output_path,
+                                  success=result.success, size=result.size)
+                return all(result.success for result in results)
+            
+            if job.max_size_mb:
+                from ..encode.animated import encode_render_animated
+                return encode_render_animated(
+                    output_dir=job.output_dir,
+                    output_path=job.video_path,
+                    fps=job.settings.get("fps", 30.0),
+                    preset=job.preset,
+                    max_bytes=int(job.max_size_mb * 1e6),
+                    log_callback=lambda message: job.add_event("log", message=message),
+                    status_callback=on_status,
+                    encoder=encoder
+                )
+            
+            if job.loop_repeats > 1:
+                from ..encode.looping import encode_render_loop
+                return encode_render_loop(
+                    output_dir=job.output_dir,
+                    output_path=job.video_path,
+                    fps=job.settings.get("fps", 30.0),
+                    repeats=job.loop_repeats,
+                    preset=job.preset,
+                    frame_format=job.settings.get("frame_format", "png"),
+                    log_callback=lambda message: job.add_event("log", message=message),
+                    status_callback=on_status,
+                    encoder=encoder
+                )
+            
+            return encode_render_output(
+                output_dir=job.output_dir,
+                output_path=job.video_path,
+                fps=job.settings.get("fps", 30.0),
+                preset=job.preset,
+                frame_format=job.settings.get("frame_format", "png"),
+                log_callback=lambda message: job.add_event("log", message=message),
+                status_callback=on_status,
+                encoder=encoder
+            )
+        finally:
+            job._worker = None
+    
+    def _encode_master(self, job: RenderJob, threads: int, on_status) -> bool:
+        """Encode a finished job's frames to its lossless master."""
+        from ..encode.ffmpeg import FFmpegEncoder
+        from ..encode.master import encode_render_master
+        
+        encoder = FFmpegEncoder(threads=threads)
+        with job._cond:
+            if job._cancel_requested:
+                return False
+            job._worker = encoder
+        
+        try:
+            return encode_render_master(
+                output_dir=job.output_dir,
+                fps=job.settings.get("fps", 30.0),
+                preset=job.master,
+                encoder=encoder,
+                log_callback=lambda message: job.add_event("log", message=message),
+                status_callback=on_status
+            )
+        finally:
+            job._worker = None
+
+
+def get_daemon_token_path() -> Path:
+    """Get path to the daemon's API token (next to the custom presets)."""
+    from ..encode.ffmpeg import get_custom_presets_path
+    return get_custom_presets_path().with_name("daemon_token")
+
+
+def load_daemon_token(create: bool = False, path: Optional[Path] = None) -> Optional[str]:
+    """The daemon's API token.
+    
+    Args:
+        create: Write a new token (readable by the user only) if there is none
+        path: Token file (default: get_daemon_token_path())
+    
+    Returns:
+        Token, or None if there is none and ``create`` is False
+    """
+    path = path or get_daemon_token_path()
+    try:
+        token = path.read_text().strip()
+    except OSError:
+        token = ""
+    if token or not create:
+        return token or None
+    
+    token = secrets.token_urlsafe(32)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
+        f.write(token)
+    os.chmod(path, 0o600)
+    return token
+
+
+class DaemonRequestHandler(BaseHTTPRequestHandler):
+    """JSON API for a RenderDaemon (``server.daemon`` holds the daemon,
+    ``server.token`` the API token, if any)."""
+    
+    server_version = "LoopLabDaemon/1.0"
+    
+    def address_string(self) -> str:
+        # Unix socket clients have no address
+        return self.client_address[0] if self.client_address else "local"
+    
+    def log_message(self, format: str, *args):
+        pass
+    
+    @property
+    def daemon(self) -> RenderDaemon:
+        return self.server.daemon
+    
+    def _send_json(self, data: Any, status: int = 200):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def _send_error(self, status: int, message: str):
+        self._send_json({"error": message}, status)
+    
+    def _path_parts(self) -> List[str]:
+        return [p for p in self.path.split("?")[0].split("/") if p]
+    
+    def _authorize(self, post: bool = False) -> bool:
+        """Check the Host, token and (for POST) Content-Type of a request.
+        
+        Sends the error response and returns False if the request is refused.
+        """
+        host = self.headers.get("Host")
+        if host is not None:
+            name = host.strip()
+            if name.startswith("[") and "]" in name:  # [::1]:8765
+                name = name[1:name.index("]")]
+            elif name.count(":") == 1:
+                name = name.split(":")[0]
+            allowed = LOCAL_HOSTS | {getattr(self.server, "host", "")}
+            if name.lower() not in allowed:
+                self._send_error(403, f"Host not allowed: {host}")
+                return False
+        
+        token = getattr(self.server, "token", None)
+        if token:
+            given = self.headers.get("Authorization", "")
+            if not secrets.compare_digest(given.encode(), f"Bearer {token}".encode()):
+                self._send_error(401, "Missing or wrong API token")
+                return False
+        
+        if post:
+            content_type = self.headers.get("Content-Type", "").split(";")[0].strip()
+            if content_type.lower() != "application/json":
+                self._send_error(415, "Requests must be application/json")
+                return False
+        return True
+    
+    def do_GET(self):
+        if not self._authorize():
+            return
+        parts = self._path_parts()
+        
+        if parts == ["health"]:
+            self._send_json({"status": "ok", **self.daemon.stats()})
+        elif parts == ["jobs"]:
+            self._send_json([job.to_dict() for job in self.daemon.list_jobs()])
+        elif len(parts) in (2, 3) and parts[0] == "jobs":
+            job = self.daemon.get(parts[1])
+            if job is None:
+                self._send_error(404, f"Unknown job: {parts[1]}")
+            elif len(parts) == 2:
+                self._send_json(job.to_dict())
+            elif parts[2] == "events":
+                self._stream_events(job)
+            else:
+                self._send_error(404, "Not found")
+        else:
+            self._send_error(404, "Not found")
+    
+    def do_POST(self):
+        if not self._authorize(post=True):
+            return
+        parts = self._path_parts()
+        
+        if parts == ["jobs"]:
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                spec = json.loads(self.rfile.read(length) or b"{}")
+                job = self.daemon.submit(spec)
+            except (ValueError, json.JSONDecodeError) as e:
+                self._send_error(400, str(e))
+                return
+            self._send_json(job.to_dict(), 201)
+        elif len(parts) == 3 and parts[0] == "jobs" and parts[2] == "cancel":
+            job = self.daemon.get(parts[1])
+            if job is None:
+                self._send_error(404, f"Unknown job: {parts[1]}")
+                return
+            cancelled = self.daemon.cancel(job.id)
+            self._send_json({"cancelled": cancelled, **job.to_dict()})
+        else:
+            self._send_error(404, "Not found")
+    
+    def _stream_events(self, job: RenderJob):
+        """Stream job events as JSON lines until the job finishes."""
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        
+        seen = -1
+        try:
+            while True:
+                events, finished = job.wait_events(seen)
+                for event in events:
+                    self.wfile.write(json.dumps(event).encode("utf-8") + b"\n")
+                    seen = event["seq"]
+                self.wfile.flush()
+                if finished and not job.wait_events(seen, 0)[0]:
+                    break
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+class DaemonHTTPServer(ThreadingHTTPServer):
+    """Threaded HTTP server on a TCP port."""
+    
+    daemon_threads = True
+    
+    def __init__(self, address: Tuple[str, int], daemon: RenderDaemon, token: str):
+        self.daemon = daemon
+        self.host = address[0].lower()
+        self.token = token
+        super().__init__(address, DaemonRequestHandler)
+
+
+class DaemonUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Threaded HTTP server on a Unix domain socket."""
+    
+    daemon_threads = True
+    
+    def __init__(self, path: str, daemon: RenderDaemon):
+        self.daemon = daemon
+        if os.path.exists(path):
+            os.unlink(path)
+        super().__init__(path, DaemonRequestHandler)
+        os.chmod(path, 0o600)
+
+
+def create_server(
+    daemon: RenderDaemon,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    socket_path: Optional[str] = None,
+    token: Optional[str] = None
+) -> socketserver.BaseServer:
+    """Create the API server for a daemon (not yet serving).
+    
+    Args:
+        daemon: The daemon to expose
+        host: TCP host (localhost by default)
+        port: TCP port (0 picks a free port)
+        socket_path: Serve on this Unix socket instead of TCP
+        token: API token TCP requests must carry (default: the one in
+            get_daemon_token_path(), created if missing)
+    
+    Returns:
+        Server; call serve_forever() to handle requests
+    """
+    if socket_path:
+        return DaemonUnixServer(socket_path, daemon)
+    return DaemonHTTPServer((host, port), daemon, token or load_daemon_token(create=True))
+
+
+def run_daemon(
+    workers: int = 1,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    socket_path: Optional[str] = None,
+    program_cache_size: int = 16,
+    log_callback: Optional[Callable[[str], None]] = None,
+    encode_slots: int = 1,
+    threads: int = 0
+) -> int:
+    """Run the render daemon until interrupted.
+    
+    The Qt application and offscreen surfaces live on the calling (main)
+    thread; each executor thread creates its GL context there once.
+    
+    Returns:
+        Process exit code
+    """
+    import signal
+    from PySide6.QtCore import QTimer
+    from .frame_renderer import create_offscreen_surface, ensure_gui_application
+    
+    log = log_callback or print
+    
+    app = ensure_gui_application()
+    
+    daemon = RenderDaemon(workers, program_cache_size, encode_slots, threads)
+    surfaces = [create_offscreen_surface() for _ in range(daemon.workers)]
+    daemon.start(surfaces)
+    
+    try:
+        server = create_server(daemon, host, port, socket_path)
+    except OSError as e:
+        log(f"Failed to start daemon server: {e}")
+        daemon.stop()
+        return 1
+    
+    threading.Thread(target=server.serve_forever, name="looplab-api", daemon=True).start()
+    
+    pool = (f"{daemon.workers} workers, "
+            f"{daemon.scheduler.slots[ENCODE]} encode slots of "
+            f"{daemon.scheduler.threads[ENCODE]} threads")
+    if socket_path:
+        log(f"LoopLab daemon listening on {socket_path} ({pool})")
+    else:
+        log(f"LoopLab daemon listening on http://{host}:{server.server_address[1]} ({pool})")
+        log(f"API token in {get_daemon_token_path()}")
+    
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *args: app.quit())
+    
+    # Wake the interpreter periodically so signal handlers run
+    timer = QTimer()
+    timer.timeout.connect(lambda: None)
+    timer.start(200)
+    
+    app.exec()
+    
+    log("Shutting down")
+    server.shutdown()
+    server.server_close()
+    daemon.stop()
+    if socket_path and os.path.exists(socket_path):
+        os.unlink(socket_path)
+    return 0
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP connection over a Unix domain socket."""
+    
+    def __init__(self, path: str, timeout: Optional[float] = None):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = path
+    
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class DaemonClient:
+    """Client for the render daemon API."""
+    
+    def __init__(
+        self,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        socket_path: Optional[str] = None,
+        timeout: Optional[float] = 60.0,
+        token: Optional[str] = None
+    ):
+        """Initialize the client.
+        
+        Args:
+            host: Daemon TCP host
+            port: Daemon TCP port
+            socket_path: Connect to this Unix socket instead of TCP
+            timeout: Request timeout in seconds
+            token: API token (default: read from get_daemon_token_path())
+        """
+        self.host = host
+        self.port = port
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.token = token
+    
+    def _headers(self, post: bool = False) -> Dict[str, str]:
+        headers = {"Content-Type": "application/json"} if post else {}
+        if not self.socket_path:
+            token = self.token or load_daemon_token()
+            if token:
+                headers["Authorization"] = f"Bearer {token}"
+        return headers
+    
+    def _connect(self, timeout: Optional[float]) -> http.client.HTTPConnection:
+        if self.socket_path:
+            return _UnixHTTPConnection(self.socket_path, timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=timeout)
+    
+    def _request(self, method: str, path: str, data: Any = None) -> Any:
+        conn = self._connect(self.timeout)
+        try:
+            body = json.dumps(data).encode("utf-8") if data is not None else None
+            conn.request(method, path, body, self._headers(post=method == "POST"))
+            response = conn.getresponse()
+            result = json.loads(response.read() or b"null")
+            if response.status >= 400:
+                message = result.get("error") if isinstance(result, dict) else None
+                raise ValueError(message or f"HTTP {response.status}")
+            return result
+        finally:
+            conn.close()
+    
+    def health(self) -> Dict[str, Any]:
+        """Daemon status and statistics."""
+        return self._request("GET", "/health")
+    
+    def submit(self, spec: Dict[str, Any]) -> Dict[str, Any]:
+        """Submit a job spec, returning the job status."""
+        return self._request("POST", "/jobs", spec)
+    
+    def status(self, job_id: str) -> Dict[str, Any]:
+        """Get a job's status."""
+        return self._request("GET", f"/jobs/{job_id}")
+    
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        """List all jobs known to the daemon."""
+        return self._request("GET", "/jobs")
+    
+    def cancel(self, job_id: str) -> Dict[str, Any]:
+        """Cancel a job."""
+        return self._request("POST", f"/jobs/{job_id}/cancel")
+    
+    def events(self, job_id: str) -> Iterator[Dict[str, Any]]:
+        """Stream a job's events until it finishes."""
+        conn = self._connect(None)
+        try:
+            conn.request("GET", f"/jobs/{job_id}/events", headers=self._headers())
+            response = conn.getresponse()
+            if response.status >= 400:
+                raise ValueError(json.loads(response.read()).get("error", "Request failed"))
+            for line in response:
+                if line.strip():
+                    yield json.loads(line)
+        finally:
+            conn.close()
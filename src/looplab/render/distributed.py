@@ -0,0 +1,681 @@
+"""Shared-filesystem work stealing for multi-node renders.
+
+Any number of ``looplab farm work`` processes, on any machines that see
+the same job directory (e.g. over NFS), cooperate on one render with no
+coordinator service. Frames are deterministic (Timeline phase and
+u_seed), so it does not matter which worker renders which frame.
+
+Job directory layout:
+
+    job.json                    shader and render settings
+    frames/                     rendered frames (the render output_dir)
+    leases/chunk_000012.lease.0 chunk lease, generation 0
+    done/chunk_000012           chunk completion marker
+    encode.done / encode.failed encode result
+
+Chunks are claimed by creating a lease file with O_CREAT | O_EXCL, which
+is atomic on local filesystems and NFSv3+. Holders touch their lease as
+a heartbeat. A lease whose mtime has not changed for ``lease_timeout``
+seconds of the observer's own clock is stale (so clock skew between
+nodes does not matter), and is reclaimed by exclusively creating the
+next generation. A holder that finds a newer generation has lost the
+chunk and stops. The worker that completes the last chunk takes the
+``encode`` lease and encodes the video.
+
+Run with:
+    looplab farm init /shared/job shader.frag --width 1920 --height 1080
+    looplab farm work /shared/job          (on every node)
+    looplab farm status /shared/job
+"""
+
+import json
+import os
+import re
+import socket
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+
+JOB_FILE = "job.json"
+JOB_VERSION = 1
+
+DEFAULT_CHUNK_SIZE = 30
+DEFAULT_LEASE_TIMEOUT = 120.0
+DEFAULT_HEARTBEAT_INTERVAL = 10.0
+DEFAULT_POLL_INTERVAL = 5.0
+
+# Name of the lease taken by the worker that encodes the video
+ENCODE_LEASE = "encode"
+
+_LEASE_RE = re.compile(r"^(?P<name>.+)\.lease\.(?P<gen>\d+)$")
+
+
+def make_worker_id() -> str:
+    """Unique id for a worker process (host, pid and a random suffix)."""
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+class Lease:
+    """A held lease on a chunk (or the encode step)."""
+    
+    def __init__(self, table: "LeaseTable", name: str, generation: int, path: Path):
+        self.table = table
+        self.name = name
+        self.generation = generation
+        self.path = path
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def heartbeat(self) -> bool:
+        """Refresh the lease.
+        
+        Returns:
+            False if another worker has reclaimed it
+        """
+        if self.lost:
+            return False
+        
+        newer = self.table.lease_path(self.name, self.generation + 1)
+        if newer.exists():
+            self.lost = True
+            return False
+        
+        try:
+            os.utime(self.path, None)
+        except FileNotFoundError:
+            self.lost = True
+            return False
+        return True
+    
+    def start_heartbeat(self, interval: float):
+        """Refresh the lease from a background thread until stopped."""
+        def beat():
+            while not self._stop.wait(interval):
+                if not self.heartbeat():
+                    break
+        
+        self._thread = threading.Thread(
+            target=beat, name=f"lease-{self.name}", daemon=True
+        )
+        self._thread.start()
+    
+    def stop_heartbeat(self):
+        """Stop the background heartbeat."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+    
+    def release(self):
+        """Give up the lease so another worker can claim it at once."""
+        self.stop_heartbeat()
+        if self.lost:
+            return
+        try:
+            os.replace(self.path, self.path.with_name(
+                f"{self.name}.released.{self.generation}"
+            ))
+        except OSError:
+            pass
+
+
+class LeaseTable:
+    """Lease files in a shared directory.
+    
+    Each observer tracks when it first saw each lease's current mtime, so
+    staleness is judged on its own monotonic clock.
+    """
+    
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        owner: str,
+        timeout: float = DEFAULT_LEASE_TIMEOUT
+    ):
+        self.directory = Path(directory)
+        self.owner = owner
+        self.timeout = timeout
+        self._seen: Dict[Path, tuple] = {}
+        self.directory.mkdir(parents=True, exist_ok=True)
+    
+    def lease_path(self, name: str, generation: int) -> Path:
+        """Path of a lease generation."""
+        return self.directory / f"{name}.lease.{generation}"
+    
+    def generations(self, name: str) -> List[int]:
+        """Existing lease generations for a name."""
+        gens = []
+        for path in self.directory.glob(f"{name}.lease.*"):
+            match = _LEASE_RE.match(path.name)
+            if match and match.group("name") == name:
+                gens.append(int(match.group("gen")))
+        return sorted(gens)
+    
+    def is_stale(self, path: Path) -> bool:
+        """Whether a lease has not been refreshed within the timeout."""
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return True
+        
+        now = time.monotonic()
+        seen = self._seen.get(path)
+        if seen is None or seen[0] != mtime:
+            self._seen[path] = (mtime, now)
+            return False
+        return now - seen[1] > self.timeout
+    
+    def holder(self, name: str) -> Optional[Dict[str, Any]]:
+        """Lease record of the current (latest) holder, if any."""
+        gens = self.generations(name)
+        if not gens:
+            return None
+        try:
+            return json.loads(self.lease_path(name, gens[-1]).read_text())
+        except (OSError, ValueError):
+            return {}
+    
+    def acquire(self, name: str) -> Optional[Lease]:
+        """Try to claim a lease, reclaiming it if the holder is stale.
+        
+        Returns:
+            The Lease, or None if it is held by a live worker or another
+            worker won the race
+        """
+        gens = self.generations(name)
+        generation = 0
+        if gens:
+            if not self.is_stale(self.lease_path(name, gens[-1])):
+                return None
+            generation = gens[-1] + 1
+        
+        path = self.lease_path(name, generation)
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        except FileExistsError:
+            return None
+        
+        with os.fdopen(fd, "w") as f:
+            json.dump({
+                "owner": self.owner,
+                "host": socket.gethostname(),
+                "pid": os.getpid(),
+                "acquired": time.time(),
+            }, f)
+        
+        return Lease(self, name, generation, path)
+
+
+class DistributedJob:
+    """A render split into chunks in a shared job directory."""
+    
+    def __init__(self, job_dir: Union[str, Path], data: Dict[str, Any]):
+        self.job_dir = Path(job_dir)
+        self.data = data
+    
+    @classmethod
+    def create(
+        cls,
+        job_dir: Union[str, Path],
+        spec: Dict[str, Any],
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> "DistributedJob":
+        """Create a job directory from a render job spec.
+        
+        Args:
+            job_dir: Shared job directory (created if needed)
+            spec: Job spec as accepted by the render daemon; output_dir
+                defaults to ``<job_dir>/frames``
+            chunk_size: Frames per chunk
+        
+        Returns:
+            DistributedJob
+        
+        Raises:
+            ValueError: If the spec is invalid or the directory holds a job
+        """
+        from .daemon import create_job, get_job_frames
+        from .frame_store import FRAME_STORE_FORMAT
+        from .timeline import Timeline
+        
+        job_dir = Path(job_dir)
+        if (job_dir / JOB_FILE).exists():
+            raise ValueError(f"Job already exists: {job_dir}")
+        
+        spec = dict(spec)
+        spec.setdefault("output_dir", str(job_dir / "frames"))
+        if spec.get("preset") or spec.get("presets"):
+            spec.setdefault("video_path", str(job_dir / "output.mp4"))
+        job = create_job(job_dir.name, spec)
+        
+        if job.settings.get("frame_format") == FRAME_STORE_FORMAT:
+            raise ValueError("Frame stores need a single writer; use an image format")
+        
+        timeline = Timeline(
+            duration=job.settings.get("duration", 30.0),
+            fps=job.settings.get("fps", 30.0)
+        )
+        frames = get_job_frames(job.settings)
+        if (job.preset or job.master) and len(frames) < timeline.total_frames:
+            raise ValueError("Videos need the whole loop; render frame ranges without a preset")
+        
+        data = {
+            "version": JOB_VERSION,
+            "shader_source": job.shader_source,
+            "output_dir": job.output_dir,
+            "settings": job.settings,
+            "preset": job.preset,
+            "video_path": job.video_path,
+            "presets": job.presets,
+            "video_paths": job.video_paths,
+            "encode_jobs": job.encode_jobs,
+            "incremental_encode": job.incremental_encode,
+            "loop_repeats": job.loop_repeats,
+            "max_size_mb": job.max_size_mb,
+            "master": job.master,
+            "total_frames": len(frames),
+            "frame_range": [frames.start, frames.stop, frames.step],
+            "chunk_size": max(1, chunk_size),
+            "created": time.time(),
+        }
+        
+        job_dir.mkdir(parents=True, exist_ok=True)
+        tmp = job_dir / f".{JOB_FILE}.tmp"
+        tmp.write_text(json.dumps(data, indent=2))
+        os.replace(tmp, job_dir / JOB_FILE)
+        
+        return cls(job_dir, data)
+    
+    @classmethod
+    def load(cls, job_dir: Union[str, Path]) -> "DistributedJob":
+        """Load a job directory.
+        
+        Raises:
+            ValueError: If the directory holds no valid job
+        """
+        path = Path(job_dir) / JOB_FILE
+        try:
+            data = json.loads(path.read_text())
+        except (OSError, ValueError) as e:
+            raise ValueError(f"Not a render job: {job_dir} ({e})")
+        
+        if data.get("version", 0) > JOB_VERSION:
+            raise ValueError(f"Unsupported job version: {data.get('version')}")
+        return cls(job_dir, data)
+    
+    @property
+    def total_frames(self) -> int:
+        return self.data["total_frames"]
+    
+    @property
+    def chunk_size(self) -> int:
+        return self.data["chunk_size"]
+    
+    @property
+    def chunk_count(self) -> int:
+        return (self.total_frames + self.chunk_size - 1) // self.chunk_size
+    
+    @property
+    def output_dir(self) -> Path:
+        return Path(self.data["output_dir"])
+    
+    @property
+    def lease_dir(self) -> Path:
+        return self.job_dir / "leases"
+    
+    @property
+    def done_dir(self) -> Path:
+        return self.job_dir / "done"
+    
+    @staticmethod
+    def chunk_name(chunk: int) -> str:
+        return f"chunk_{chunk:06d}"
+    
+    @property
+    def frames(self) -> range:
+        """Frame indices selected for the job."""
+        return range(*self.data.get("frame_range", (0, self.total_frames, 1)))
+    
+    def chunk_frames(self, chunk: int) -> range:
+        """Frame indices of a chunk."""
+        start = chunk * self.chunk_size
+        return self.frames[start:start + self.chunk_size]
+    
+    def is_chunk_done(self, chunk: int) -> bool:
+        return (self.done_dir / self.chunk_name(chunk)).exists()
+    
+    def mark_chunk_done(self, chunk: int, owner: str):
+        """Record a chunk as complete."""
+        self.done_dir.mkdir(parents=True, exist_ok=True)
+        (self.done_dir / self.chunk_name(chunk)).write_text(owner)
+    
+    def done_chunks(self) -> List[int]:
+        """Indices of completed chunks."""
+        if not self.done_dir.exists():
+            return []
+        return sorted(
+            int(p.name[len("chunk_"):]) for p in self.done_dir.glob("chunk_*")
+        )
+    
+    @property
+    def all_done(self) -> bool:
+        return len(self.done_chunks()) >= self.chunk_count
+    
+    @property
+    def needs_encode(self) -> bool:
+        return bool(self.data.get("preset") or self.data.get("master"))
+    
+    def encode_state(self) -> str:
+        """"done", "failed", or "" if the video has not been encoded."""
+        if (self.job_dir / "encode.done").exists():
+            return "done"
+        if (self.job_dir / "encode.failed").exists():
+            return "failed"
+        return ""
+    
+    @property
+    def finished(self) -> bool:
+        """Whether all chunks (and the encode, if any) are complete."""
+        if not self.all_done:
+            return False
+        return not self.needs_encode or bool(self.encode_state())
+    
+    def status(self) -> Dict[str, Any]:
+        """Summary of chunk and encode progress."""
+        table = LeaseTable(self.lease_dir, "status")
+        done = set(self.done_chunks())
+        leased = {}
+        for chunk in range(self.chunk_count):
+            if chunk in done:
+                continue
+            holder = table.holder(self.chunk_name(chunk))
+            if holder is not None:
+                leased[self.chunk_name(chunk)] = holder.get("owner", "?")
+        
+        return {
+            "job_dir": str(self.job_dir),
+            "total_frames": self.total_frames,
+            "chunks": self.chunk_count,
+            "done": len(done),
+            "leased": leased,
+            "pending": self.chunk_count - len(done) - len(leased),
+            "encode": self.encode_state() or ("pending" if self.needs_encode else "none"),
+            "video_path": self.data.get("video_path", ""),
+        }
+
+
+class FarmWorker:
+    """Claims and renders chunks of a DistributedJob until it is done."""
+    
+    def __init__(
+        self,
+        job: DistributedJob,
+        worker_id: Optional[str] = None,
+        lease_timeout: float = DEFAULT_LEASE_TIMEOUT,
+        heartbeat_interval: float = DEFAULT_HEARTBEAT_INTERVAL,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        log_callback: Optional[Callable[[str], None]] = None
+    ):
+        self.job = job
+        self.worker_id = worker_id or make_worker_id()
+        self.heartbeat_interval = heartbeat_interval
+        self.poll_interval = poll_interval
+        self.log = log_callback or (lambda message: None)
+        self.leases = LeaseTable(job.lease_dir, self.worker_id, lease_timeout)
+        self.chunks_rendered = 0
+        
+        self._cancelled = False
+        self._settings = None
+        self._renderer = None
+    
+    def cancel(self):
+        """Stop after the current frame."""
+        self._cancelled = True
+    
+    def run(self) -> bool:
+        """Work on the job until it is finished or cancelled.
+        
+        Returns:
+            True if the job finished (this worker may have done no work)
+        """
+        self.log(f"Worker {self.worker_id} joined {self.job.job_dir} "
+                 f"({self.job.chunk_count} chunks)")
+        try:
+            while not self._cancelled:
+                if self._work_once():
+                    continue
+                if self.job.finished:
+                    break
+                time.sleep(self.poll_interval)
+        finally:
+            if self._renderer is not None:
+                self._renderer.destroy()
+                self._renderer = None
+        
+        if self._cancelled:
+            self.log("Worker cancelled")
+            return False
+        
+        self.log(f"Job finished ({self.chunks_rendered} chunks rendered here)")
+        return self.job.encode_state() != "failed"
+    
+    def _work_once(self) -> bool:
+        """Claim and complete one unit of work.
+        
+        Returns:
+            True if work was done (the caller should look for more)
+        """
+        for chunk in range(self.job.chunk_count):
+            if self._cancelled:
+                return False
+            if self.job.is_chunk_done(chunk):
+                continue
+            
+            lease = self.leases.acquire(self.job.chunk_name(chunk))
+            if lease is None:
+                continue
+            
+            # Re-check: the previous holder may have finished meanwhile
+            if self.job.is_chunk_done(chunk):
+                lease.release()
+                continue
+            
+            self.log(f"Rendering {self.job.chunk_name(chunk)} "
+                     f"(lease generation {lease.generation})")
+            lease.start_heartbeat(self.heartbeat_interval)
+            try:
+                completed = self._render_chunk(chunk, lease)
+            finally:
+                lease.stop_heartbeat()
+            
+            if completed and not lease.lost:
+                self.job.mark_chunk_done(chunk, self.worker_id)
+                self.chunks_rendered += 1
+            elif lease.lost:
+                self.log(f"Lost lease on {self.job.chunk_name(chunk)}")
+            lease.release()
+            return True
+        
+        if self.job.all_done and self.job.needs_encode and not self.job.encode_state():
+            lease = self.leases.acquire(ENCODE_LEASE)
+            if lease is not None:
+                lease.start_heartbeat(self.heartbeat_interval)
+                try:
+                    if not self.job.encode_state():
+                        self._run_encode()
+                finally:
+                    lease.release()
+                return True
+        
+        return False
+    
+    def _load_settings(self):
+        """Render settings, resolved once per worker."""
+        if self._settings is None:
+            from .offline_worker import OfflineRenderWorker
+            settings = OfflineRenderWorker()
+            settings.configure(
+                self.job.data["shader_source"], str(self.job.output_dir),
+                **self.job.data["settings"]
+            )
+            self._settings = settings
+        return self._settings
+    
+    def _render_chunk(self, chunk: int, lease: Lease) -> bool:
+        """Render every frame of a chunk into the shared output directory.
+        
+        Frames are written under a temporary name and renamed into place,
+        so readers never see a partial file even if two workers render
+        the same chunk.
+        
+        Returns:
+            True if all frames were written
+        """
+        from ..gl.post_process import create_post_passes
+        from .frame_renderer import FrameRenderer, ensure_gui_application
+        from .timeline import Timeline
+        
+        settings = self._load_settings()
+        plan = settings.plan_memory()
+        if not plan.fits:
+            self.log(f"Render exceeds memory budget: {plan.reason}")
+            self.cancel()
+            return False
+        
+        if self._renderer is None:
+            ensure_gui_application()
+            self._renderer = FrameRenderer()
+            if not self._renderer.create_context():
+                self.log(self._renderer.last_error)
+                self._renderer = None
+                self.cancel()
+                return False
+        
+        try:
+            post_passes = create_post_passes(settings.post_passes)
+        except (OSError, ValueError) as e:
+            self.log(f"Invalid post pass: {e}")
+            self.cancel()
+            return False
+        
+        renderer = self._renderer
+        renderer.configure(
+            settings.width, settings.height, settings.supersample_scale,
+            settings.accumulation_samples, plan.tile_height if plan.tiled else 0,
+            settings.shutter_angle, settings.fps, settings.bit_depth, settings.gpu_downsample
+        )
+        renderer.set_post_passes(post_passes)
+        if not (renderer.set_shader(settings.shader_source) and renderer.prepare()):
+            self.log(renderer.last_error)
+            self.cancel()
+            return False
+        
+        writer = settings.create_writer()
+        timeline = Timeline(duration=settings.duration, fps=settings.fps)
+        uniform_manager = settings.create_uniform_manager()
+        output_dir = self.job.output_dir
+        output_dir.mkdir(parents=True, exist_ok=True)
+        
+        for frame in self.job.chunk_frames(chunk):
+            if self._cancelled or lease.lost:
+                return False
+            
+            pixels = renderer.render_frame(timeline.get_frame_info(frame), uniform_manager)
+            if pixels is None:
+                # Deterministic frames would fail again; leave the chunk to others
+                self.log(f"Failed to render frame {frame}")
+                self.cancel()
+                return False
+            
+            path = output_dir / writer.frame_filename(frame)
+            tmp = path.with_name(f".{path.stem}.{self.worker_id}.tmp{path.suffix}")
+            writer.write(pixels, tmp)
+            os.replace(tmp, path)
+        
+        return True
+    
+    def _run_encode(self):
+        """Encode the finished frames and record the result."""
+        from ..encode.animated import encode_render_animated
+        from ..encode.ffmpeg import (
+            create_encoder, encode_render_deliverables, encode_render_output
+        )
+        from ..encode.looping import encode_render_loop
+        from ..encode.master import encode_render_master
+        
+        data = self.job.data
+        self.log("All chunks done, encoding video...")
+        
+        # Log progress with ETA every tenth of the encode
+        logged = [-1]
+        
+        def on_status(progress):
+            step = int(progress.fraction * 10)
+            if step > logged[0]:
+                logged[0] = step
+                self.log(f"Encoding: {progress.describe()}")
+        
+        # The presets transcode from the master once it is written
+        success = True
+        if data.get("master"):
+            success = encode_render_master(
+                output_dir=str(self.job.output_dir),
+                fps=data["settings"].get("fps", 30.0),
+                preset=data["master"],
+                log_callback=self.log,
+                status_callback=on_status
+            )
+        
+        if success and data.get("preset"):
+            presets = data.get("presets") or [data["preset"]]
+            if len(presets) > 1:
+                results = encode_render_deliverables(
+                    output_dir=str(self.job.output_dir),
+                    output_path=data["video_path"],
+                    fps=data["settings"].get("fps", 30.0),
+                    presets=presets,
+                    log_callback=self.log,
+                    status_callback=on_status
+                )
+                success = all(result.success for result in results)
+            elif data.get("max_size_mb"):
+                success = encode_render_animated(
+                    output_dir=str(self.job.output_dir),
+                    output_path=data["video_path"],
+                    fps=data["settings"].get("fps", 30.0),
+                    preset=data["preset"],
+                    max_bytes=int(data["max_size_mb"] * 1e6),
+                    log_callback=self.log,
+                    status_callback=on_status
+                )
+            elif data.get("loop_repeats", 1) > 1:
+                success = encode_render_loop(
+                    output_dir=str(self.job.output_dir),
+                    output_path=data["video_path"],
+                    fps=data["settings"].get("fps", 30.0),
+                    repeats=data["loop_repeats"],
+                    preset=data["preset"],
+                    frame_format=data["settings"].get("frame_format", "png"),
+                    log_callback=self.log,
+                    status_callback=on_status,
+                    encoder=create_encoder(data.get("encode_jobs", 1),
+                                           incremental=data.get("incremental_encode", False))
+                )
+            else:
+                success = encode_render_output(
+                    output_dir=str(self.job.output_dir),
+                    output_path=data["video_path"],
+                    fps=data["settings"].get("fps", 30.0),
+                    preset=data["preset"],
+                    frame_format=data["settings"].get("frame_format", "png"),
+                    log_callback=self.log,
+                    status_callback=on_status,
+                    encoder=create_encoder(data.get("encode_jobs", 1),
+                                           incremental=data.get("incremental_encode", False))
+                )
+        marker = "encode.done" if success else "encode.failed"
+        (self.job.job_dir / marker).write_text(self.worker_id)
@@ -0,0 +1,644 @@
+"""Headless frame renderer.
+
+This module provides the OpenGL side of offline rendering: an offscreen
+context, a fullscreen quad, a render target and a cache of compiled
+shader programs. The offline worker uses one renderer per job, while the
+render daemon keeps renderers warm across jobs so repeated renders skip
+context creation and shader compilation.
+"""
+
+import hashlib
+from collections import OrderedDict
+from typing import List, Optional
+import numpy as np
+
+from PySide6.QtGui import QGuiApplication, QOffscreenSurface, QSurfaceFormat, QOpenGLContext
+
+from ..gl import fast_gl
+from ..gl.shader_manager import ShaderManager, ShaderProgram
+from ..gl.gl_resources import QuadMesh, RenderTarget, clear_viewport
+from ..gl.post_process import PostChain, PostPass
+from ..gl.uniforms import UniformManager
+from .timeline import Timeline, get_shutter_offsets
+
+
+# Compiled programs kept per renderer (and so per GL context)
+DEFAULT_PROGRAM_CACHE_SIZE = 16
+
+
+def ensure_gui_application() -> QGuiApplication:
+    """Get the Qt application, creating a windowless one if needed.
+    
+    Offscreen contexts need a QGuiApplication; headless tools call this
+    on the main thread before creating any renderer.
+    """
+    import sys
+    return QGuiApplication.instance() or QGuiApplication(sys.argv[:1])
+
+
+def create_surface_format() -> QSurfaceFormat:
+    """Surface format used for offscreen rendering (OpenGL 3.3 core)."""
+    fmt = QSurfaceFormat()
+    fmt.setVersion(3, 3)
+    fmt.setProfile(QSurfaceFormat.OpenGLContextProfile.CoreProfile)
+    return fmt
+
+
+def create_offscreen_surface() -> QOffscreenSurface:
+    """Create an offscreen surface for a FrameRenderer.
+    
+    Qt requires offscreen surfaces to be created on the GUI thread on some
+    platforms; long-lived renderers should create their surfaces there
+    and pass them to ``FrameRenderer.create_context`` in the render thread.
+    """
+    surface = QOffscreenSurface()
+    surface.setFormat(create_surface_format())
+    surface.create()
+    return surface
+
+
+def get_source_key(source: str) -> str:
+    """Cache key for a shader source."""
+    return hashlib.sha1(source.encode("utf-8")).hexdigest()
+
+
+class FrameRenderer:
+    """Renders frames of a shader into host memory.
+    
+    All methods other than ``configure`` must be called from the thread
+    that created the context, with the context current.
+    """
+    
+    def __init__(self, program_cache_size: int = DEFAULT_PROGRAM_CACHE_SIZE):
+        # Output settings
+        self.width: int = 1920
+        self.height: int = 1080
+        self.supersample_scale: int = 1
+        # Halve supersampled bands on the GPU before readback (scales 2 and 4)
+        self.gpu_downsample: bool = False
+        self.accumulation_samples: int = 1
+        # Render-resolution rows per band (0 = whole frame)
+        self.tile_height: int = 0
+        # Motion blur: accumulation samples spread over the shutter
+        self.shutter_angle: float = 0.0
+        self.fps: float = 30.0
+        # Bits per sample of the render target and output frames (8 or 16)
+        self.bit_depth: int = 8
+        # Raw, unchecked GL calls in the render loop (see gl.fast_gl);
+        # opt-in, for callers that render many frames of known-good shaders
+        self.fast_gl: bool = False
+        
+        # Last error message from a failed call
+        self.last_error: str = ""
+        
+        self.program_cache_size = max(1, program_cache_size)
+        
+        # OpenGL resources (created in render thread)
+        self._context: Optional[QOpenGLContext] = None
+        self._surface: Optional[QOffscreenSurface] = None
+        self._shader_manager = ShaderManager()
+        self._quad: Optional[QuadMesh] = None
+        self._render_target: Optional[RenderTarget] = None
+        # Targets of successive 2x GPU downsamples, largest first
+        self._downsample_targets: List[RenderTarget] = []
+        self._programs: "OrderedDict[str, ShaderProgram]" = OrderedDict()
+        self._program: Optional[ShaderProgram] = None
+        # Post passes between the shader and readback
+        self._post_chain = PostChain()
+        # Output-size target the post passes write to when they run on a
+        # frame assembled in host memory (see _post_on_host)
+        self._post_target: Optional[RenderTarget] = None
+        
+        # Cache statistics
+        self.cache_hits: int = 0
+        self.cache_misses: int = 0
+    
+    @property
+    def has_context(self) -> bool:
+        """Whether a GL context has been created."""
+        return self._context is not None
+    
+    @property
+    def render_width(self) -> int:
+        """Render-resolution width (before downsampling)."""
+        return self.width * self.supersample_scale
+    
+    @property
+    def render_height(self) -> int:
+        """Render-resolution height (before downsampling)."""
+        return self.height * self.supersample_scale
+    
+    @property
+    def dtype(self) -> np.dtype:
+        """Sample type of rendered frames (uint8, or uint16 at 16 bits)."""
+        return np.dtype(np.uint16 if self.bit_depth > 8 else np.uint8)
+    
+    @property
+    def _post_on_host(self) -> bool:
+        """Whether post passes run once on the finished frame.
+        
+        Accumulated, supersampled and tiled frames are assembled in host
+        memory, so the passes cannot run per draw: dithering would be
+        averaged away and grading would see single samples. Their samples
+        are drawn into a float target instead, and the passes run on the
+        averaged, output-size frame just before it is quantized.
+        """
+        return self._post_chain.active and (
+            self.accumulation_samples > 1 or self.supersample_scale > 1
+            or bool(self.tile_height)
+        )
+    
+    def _fail(self, message: str) -> bool:
+        self.last_error = message
+        return False
+    
+    def create_context(self, surface: Optional[QOffscreenSurface] = None) -> bool:
+        """Create the OpenGL context and make it current.
+        
+        Args:
+            surface: Offscreen surface to render with, or None to create one
+        
+        Returns:
+            True if successful (see ``last_error`` otherwise)
+        """
+        try:
+            fmt = create_surface_format()
+            
+            self._surface = surface or create_offscreen_surface()
+            if not self._surface.isValid():
+                return self._fail("Failed to create offscreen surface")
+            
+            self._context = QOpenGLContext()
+            self._context.setFormat(fmt)
+            
+            if not self._context.create():
+                self._context = None
+                return self._fail("Failed to create OpenGL context")
+            
+            return self.make_current()
+        except Exception as e:
+            return self._fail(f"OpenGL setup failed: {e}")
+    
+    def make_current(self) -> bool:
+        """Make the renderer's context current in this thread.
+        
+        Also switches this thread to fast GL calls if ``fast_gl`` is set.
+        """
+        if not self._context or not self._context.makeCurrent(self._surface):
+            return self._fail("Failed to make OpenGL context current")
+        if self.fast_gl:
+            fast_gl.enable()
+        else:
+            fast_gl.disable()
+        return True
+    
+    def done_current(self):
+        """Release the context from this thread."""
+        if self._context:
+            self._context.doneCurrent()
+    
+    def configure(
+        self,
+        width: int,
+        height: int,
+        supersample_scale: int = 1,
+        accumulation_samples: int = 1,
+        tile_height: int = 0,
+        shutter_angle: float = 0.0,
+        fps: float = 30.0,
+        bit_depth: int = 8,
+        gpu_downsample: bool = False
+    ):
+        """Set the output size and quality for the next frames.
+        
+        Args:
+            width: Output width in pixels
+            height: Output height in pixels
+            supersample_scale: Supersample factor
+            accumulation_samples: Number of samples per frame for AA
+                (and motion blur)
+            tile_height: Render-resolution rows per band (0 = whole frame)
+            shutter_angle: Motion blur shutter in degrees (0 = off)
+            fps: Frame rate, which sets the shutter interval
+            bit_depth: 8 for RGBA8 frames, 16 for an RGBA16 render target
+                read back as uint16 frames
+            gpu_downsample: Downsample supersampled renders on the GPU, so
+                only output-size pixels are read back (scales 2 and 4;
+                others are downsampled on the CPU). Samples may differ by
+                one level from CPU downsampling, which truncates.
+        """
+        self.width = width
+        self.height = height
+        self.supersample_scale = max(1, supersample_scale)
+        self.accumulation_samples = max(1, accumulation_samples)
+        self.tile_height = tile_height
+        self.shutter_angle = shutter_angle
+        self.fps = fps
+        self.bit_depth = 16 if bit_depth > 8 else 8
+        self.gpu_downsample = gpu_downsample
+    
+    def set_post_passes(self, passes: List[PostPass]):
+        """Set the GPU post passes applied to every frame before readback.
+        
+        Passes run once per frame at output resolution, after
+        accumulation and downsampling. Programs of passes used before
+        are kept. Call ``prepare`` afterwards.
+        
+        Args:
+            passes: Post passes in order (empty = none)
+        """
+        self._post_chain.set_passes(passes)
+    
+    def set_shader(self, source: str) -> bool:
+        """Select the shader to render, compiling it unless cached.
+        
+        Args:
+            source: The shader source code (mainImage function)
+        
+        Returns:
+            True if the program is ready (see ``last_error`` otherwise)
+        """
+        key = get_source_key(source)
+        program = self._programs.get(key)
+        if program is not None:
+            self._programs.move_to_end(key)
+            self._program = program
+            self.cache_hits += 1
+            return True
+        
+        self.cache_misses += 1
+        try:
+            program = self._shader_manager.compile_program(source)
+        except Exception as e:
+            return self._fail(f"GL resource setup failed: {e}")
+        
+        if not program.is_valid:
+            errors = "\n".join(e.message for e in program.errors)
+            return self._fail(f"Shader compilation failed:\n{errors}")
+        
+        self._programs[key] = program
+        while len(self._programs) > self.program_cache_size:
+            _, evicted = self._programs.popitem(last=False)
+            evicted.delete()
+        
+        self._program = program
+        return True
+    
+    def prepare(self) -> bool:
+        """Create or resize the quad and render target for the settings.
+        
+        Returns:
+            True if successful (see ``last_error`` otherwise)
+        """
+        try:
+            if self._quad is None:
+                self._quad = QuadMesh()
+                self._quad.create()
+            
+            # One band tall when tiling
+            height = self.tile_height or self.render_height
+            output_format = "rgba16" if self.bit_depth > 8 else "rgba8"
+            post_on_host = self._post_on_host
+            color_format = "rgba16f" if post_on_host else output_format
+            if (self._render_target is not None
+                    and self._render_target.color_format != color_format):
+                self._render_target.delete()
+                self._render_target = None
+            if self._render_target is None:
+                self._render_target = RenderTarget(color_format=color_format)
+                self._render_target.create(self.render_width, height)
+            else:
+                self._render_target.resize(self.render_width, height)
+            
+            if not self._render_target.is_valid:
+                return self._fail("Failed to create render target")
+            
+            if post_on_host:
+                chain_width, chain_height = self.width, self.height
+            else:
+                chain_width, chain_height = self.render_width, height
+            if not self._post_chain.prepare(chain_width, chain_height):
+                return self._fail(self._post_chain.last_error)
+            
+            self._delete_post_target()
+            if post_on_host:
+                self._post_target = RenderTarget(color_format=output_format)
+                self._post_target.create(self.width, self.height)
+                if not self._post_target.is_valid:
+                    return self._fail("Failed to create post-processing target")
+            
+            self._delete_downsample_targets()
+            if self.gpu_downsample and self.supersample_scale in (2, 4):
+                width = self.render_width
+                while width > self.width:
+                    width, height = width // 2, height // 2
+                    target = RenderTarget(color_format=color_format)
+                    target.create(width, height)
+                    self._downsample_targets.append(target)
+                    if not target.is_valid:
+                        return self._fail("Failed to create downsample target")
+            
+            return True
+        except Exception as e:
+            return self._fail(f"GL resource setup failed: {e}")
+    
+    def release(self):
+        """Delete GL resources and cached programs, keeping the context."""
+        if self._quad:
+            self._quad.delete()
+            self._quad = None
+        
+        if self._render_target:
+            self._render_target.delete()
+            self._render_target = None
+        
+        self._delete_downsample_targets()
+        self._delete_post_target()
+        self._post_chain.delete()
+        
+        for program in self._programs.values():
+            program.delete()
+        self._programs.clear()
+        self._program = None
+    
+    def _delete_downsample_targets(self):
+        for target in self._downsample_targets:
+            target.delete()
+        self._downsample_targets.clear()
+    
+    def _delete_post_target(self):
+        if self._post_target is not None:
+            self._post_target.delete()
+            self._post_target = None
+    
+    def destroy(self):
+        """Delete all GL resources and the context."""
+        if self._context and self._surface:
+            self._context.makeCurrent(self._surface)
+        
+        self.release()
+        
+        if self._context:
+            self._context.doneCurrent()
+        self._context = None
+        self._surface = None
+    
+    def _post_uniforms(self, frame_info, resolution, y0: int = 0) -> dict:
+        """Frame uniforms of the post passes."""
+        return {
+            "u_resolution": (float(resolution[0]), float(resolution[1])),
+            "u_offset": (0.0, float(y0)),
+            "u_time": frame_info.time,
+            "u_phase": frame_info.phase,
+            "u_frame": frame_info.frame,
+            "u_levels": 65535.0 if self.bit_depth > 8 else 255.0,
+        }
+    
+    def _draw(self, frame_info, uniform_manager: UniformManager, y0: int = 0):
+        """Draw one pass of the shader into the render target.
+        
+        Single-sample frames also run the post passes here; see
+        ``_post_on_host`` for the others.
+        
+        Args:
+            frame_info: FrameInfo with time/phase data
+            uniform_manager: Uniform manager with current state
+            y0: First render-resolution row of the band being drawn
+        """
+        chain = self._post_chain
+        post_in_draw = chain.active and not self._post_on_host
+        if post_in_draw:
+            chain.scene_target.bind()
+        else:
+            self._render_target.bind()
+        clear_viewport(0.0, 0.0, 0.0, 1.0)
+        
+        # Update uniforms
+        uniform_manager.set_frame_info(
+            time=frame_info.time,
+            phase=frame_info.phase,
+            frame=frame_info.frame,
+            loop_x=frame_info.loop_x,
+            loop_y=frame_info.loop_y
+        )
+        
+        self._shader_manager.set_uniforms(self._program, uniform_manager.get_all_uniforms())
+        self._quad.draw()
+        
+        if post_in_draw:
+            target = self._render_target
+            chain.run(self._quad, target.fbo, target.width, target.height,
+                      self._post_uniforms(frame_info, (self.render_width, self.render_height), y0))
+    
+    def _post_process(self, frame_info, pixels: np.ndarray) -> Optional[np.ndarray]:
+        """Run the post passes once on a finished, output-size frame.
+        
+        Args:
+            frame_info: FrameInfo with time/phase data
+            pixels: Float frame (height, width, 4), top row first
+        
+        Returns:
+            Post-processed frame of ``dtype``, top row first, or None on failure
+        """
+        chain = self._post_chain
+        chain.scene_target.upload(np.ascontiguousarray(pixels[::-1], dtype=np.float32))
+        
+        target = self._post_target
+        chain.run(self._quad, target.fbo, target.width, target.height,
+                  self._post_uniforms(frame_info, (self.width, self.height)))
+        
+        output = np.empty((self.height, self.width, 4), dtype=self.dtype)
+        if not target.read_pixels_into(output):
+            return None
+        return np.flipud(output)
+    
+    def _readback_target(self) -> RenderTarget:
+        """Target holding the drawn band at readback size.
+        
+        With GPU downsampling the band is halved by linear blits until it
+        is at output size; otherwise it is the render target itself.
+        """
+        source = self._render_target
+        for target in self._downsample_targets:
+            source.blit_to(target.fbo, target.width, target.height)
+            source = target
+        return source
+    
+    def _ready(self) -> bool:
+        return (self._program is not None and self._program.is_valid
+                and self._render_target is not None)
+    
+    def render_frame_into(self, frame_info, uniform_manager: UniformManager,
+                          slot: np.ndarray) -> bool:
+        """Render a frame into a bottom-up frame store slot.
+        
+        Single-sample renders are read straight into the slot with no
+        intermediate copy; other renders copy the finished frame in.
+        
+        Args:
+            frame_info: FrameInfo with time/phase data
+            uniform_manager: Uniform manager with current state
+            slot: Writable (height, width, 4) array of ``dtype`` in GL row order
+        
+        Returns:
+            True if successful
+        """
+        if (self.accumulation_samples == 1 and self.supersample_scale == 1
+                and not self.tile_height):
+            if not self._ready():
+                return False
+            
+            self._draw(frame_info, uniform_manager)
+            return self._render_target.read_pixels_into(slot)
+        
+        pixels = self.render_frame(frame_info, uniform_manager)
+        if pixels is None:
+            return False
+        
+        slot[...] = pixels[::-1]
+        return True
+    
+    def render_frame(self, frame_info, uniform_manager: UniformManager) -> Optional[np.ndarray]:
+        """Render a single frame.
+        
+        The frame is rendered in one or more horizontal bands of the
+        configured tile height. Each band offsets the fragment
+        coordinates through u_jitter, so shaders see the full-frame
+        coordinate space with u_resolution unchanged.
+        
+        Args:
+            frame_info: FrameInfo with time/phase data
+            uniform_manager: Uniform manager with current state
+        
+        Returns:
+            RGBA pixel data as numpy array of ``dtype``, or None on failure
+        """
+        if not self._ready():
+            return None
+        
+        render_height = self.render_height
+        tile_height = self.tile_height or render_height
+        
+        if tile_height >= render_height:
+            band = self._render_band(frame_info, uniform_manager, 0, render_height)
+            if band is None:
+                return None
+            
+            # Flip vertically (OpenGL origin is bottom-left)
+            pixels_array = np.flipud(band)
+            
+            # Downsample if supersampling (unless the GPU already has)
+            if self.supersample_scale > 1 and not self._downsample_targets:
+                pixels_array = self._downsample(pixels_array)
+            
+            if self._post_on_host:
+                return self._post_process(frame_info, pixels_array)
+            return pixels_array
+        
+        # Tiled: assemble downsampled bands into the output frame
+        scale = self.supersample_scale
+        output = np.empty((self.height, self.width, 4), dtype=self._render_target.dtype)
+        
+        for y0 in range(0, render_height, tile_height):
+            rows = min(tile_height, render_height - y0)
+            band = self._render_band(frame_info, uniform_manager, y0, rows)
+            if band is None:
+                return None
+            
+            band = np.flipud(band)
+            if scale > 1 and not self._downsample_targets:
+                band = self._downsample(band)
+            
+            # Band rows are bottom-up in GL space
+            top = self.height - (y0 + rows) // scale
+            output[top:top + band.shape[0]] = band
+        
+        if self._post_on_host:
+            return self._post_process(frame_info, output)
+        return output
+    
+    def _render_band(self, frame_info, uniform_manager: UniformManager,
+                     y0: int, rows: int) -> Optional[np.ndarray]:
+        """Render (and accumulate) one horizontal band of a frame.
+        
+        Args:
+            frame_info: FrameInfo with time/phase data
+            uniform_manager: Uniform manager with current state
+            y0: First render-resolution row of the band (GL, bottom-up)
+            rows: Number of rows in the band
+        
+        Returns:
+            Band pixels (rows, render_width, 4) of ``dtype`` in GL row order
+            (rows / scale by width when downsampled on the GPU), or None on
+            failure
+        """
+        dtype = self._render_target.dtype
+        target = self._downsample_targets[-1] if self._downsample_targets else self._render_target
+        if self._downsample_targets:
+            rows //= self.supersample_scale
+        
+        # For accumulation AA, we'll accumulate multiple samples
+        if self.accumulation_samples > 1:
+            accumulator = np.zeros((rows, target.width, 4), dtype=np.float32)
+            
+            # Each sample also takes its own moment within the shutter
+            offsets = get_shutter_offsets(self.accumulation_samples, self.shutter_angle)
+            timeline = Timeline(duration=uniform_manager.standard.duration, fps=self.fps)
+            
+            readback = np.empty((target.height, target.width, 4), dtype=dtype)
+            
+            for sample in range(self.accumulation_samples):
+                # Apply small jitter for AA (deterministic based on frame and sample)
+                # Jitter is in pixel units for the shader to use
+                jitter_x = (sample % 4) / 4.0 - 0.5
+                jitter_y = (sample // 4) / 4.0 - 0.5
+                
+                # Set jitter uniform for shader to offset pixel coordinates
+                uniform_manager.set_jitter(jitter_x, jitter_y + y0)
+                
+                sample_info = frame_info
+                if offsets[sample]:
+                    sample_info = timeline.get_subframe_info(frame_info.frame, offsets[sample])
+                
+                # Render with jitter
+                self._draw(sample_info, uniform_manager, y0)
+                
+                # Read pixels into the reused buffer
+                if self._readback_target().read_pixels_into(readback):
+                    # In-place add converts in chunks, no full float copy
+                    accumulator += readback[:rows]
+            
+            # Reset jitter
+            uniform_manager.set_jitter(0.0, 0.0)
+            
+            # Average samples
+            accumulator /= self.accumulation_samples
+            return accumulator.astype(dtype)
+        
+        # Single sample render
+        uniform_manager.set_jitter(0.0, float(y0))
+        self._draw(frame_info, uniform_manager, y0)
+        uniform_manager.set_jitter(0.0, 0.0)
+        
+        band = np.empty((target.height, target.width, 4), dtype=dtype)
+        if not self._readback_target().read_pixels_into(band):
+            return None
+        
+        return band[:rows]
+    
+    def _downsample(self, image: np.ndarray) -> np.ndarray:
+        """Downsample image by supersample scale using box filter.
+        
+        Args:
+            image: Input RGBA image
+        
+        Returns:
+            Downsampled image
+        """
+        scale = self.supersample_scale
+        h, w = image.shape[:2]
+        new_h, new_w = h // scale, w // scale
+        
+        # Simple box filter downsampling (float32 is exact for these means)
+        result = image.reshape(new_h, scale, new_w, scale, 4).mean(axis=(1, 3), dtype=np.float32)
+        return result.astype(image.dtype)
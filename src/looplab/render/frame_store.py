@@ -0,0 +1,277 @@
+"""Memory-mapped raw frame store.
+
+A frame store is a single preallocated file holding a fixed-size header,
+a per-frame "written" table and then every frame of a render as raw
+pixels. The offline worker reads pixels straight into the mapped frame
+slots, FFmpeg reads the file as ``rawvideo`` and analysis tools open it
+as a NumPy memmap with random access to any frame.
+
+Frames are stored in OpenGL row order (bottom-up) by default so
+``glReadPixels`` can target a slot directly; ``get_frame`` returns a
+top-down view and ``ffmpeg_input_args`` adds the matching ``vflip``.
+"""
+
+import os
+import struct
+from pathlib import Path
+from typing import List, Optional, Union
+
+import numpy as np
+
+
+# File extension for frame stores
+FRAME_STORE_EXTENSION = "llraw"
+
+# Name of the frame format setting that selects a frame store
+FRAME_STORE_FORMAT = "store"
+
+FRAME_STORE_MAGIC = b"LLRAW\x00\x00\x01"
+FRAME_STORE_VERSION = 1
+
+# magic, version, header_size, width, height, channels, frame_count,
+# dtype ('u1' or 'u2'), bottom_up, fps
+_HEADER_STRUCT = struct.Struct("<8sIIIIII2s?xd")
+
+# Frames start on a page boundary so slots map cleanly
+_ALIGNMENT = 4096
+
+# FFmpeg pixel formats by (channels, dtype)
+_PIX_FMTS = {
+    (4, "u1"): "rgba",
+    (4, "u2"): "rgba64le",
+    (3, "u1"): "rgb24",
+    (3, "u2"): "rgb48le",
+}
+
+
+def _aligned(size: int) -> int:
+    """Round size up to the frame alignment."""
+    return (size + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+class RawFrameStore:
+    """Fixed-size frame container backed by a memory-mapped file.
+    
+    Use ``RawFrameStore.create`` to allocate a new store for a render and
+    ``RawFrameStore.open`` to read (or resume writing) an existing one.
+    """
+    
+    def __init__(
+        self,
+        path: Path,
+        width: int,
+        height: int,
+        frame_count: int,
+        fps: float,
+        channels: int,
+        dtype: np.dtype,
+        bottom_up: bool,
+        header_size: int,
+        mode: str
+    ):
+        self.path = path
+        self.width = width
+        self.height = height
+        self.frame_count = frame_count
+        self.fps = fps
+        self.channels = channels
+        self.dtype = np.dtype(dtype)
+        self.bottom_up = bottom_up
+        self.header_size = header_size
+        
+        self._written = np.memmap(
+            path, dtype=np.uint8, mode=mode,
+            offset=_HEADER_STRUCT.size, shape=(frame_count,)
+        )
+        self._frames = np.memmap(
+            path, dtype=self.dtype, mode=mode, offset=header_size,
+            shape=(frame_count, height, width, channels)
+        )
+    
+    @classmethod
+    def create(
+        cls,
+        path: Union[str, Path],
+        width: int,
+        height: int,
+        frame_count: int,
+        fps: float,
+        channels: int = 4,
+        dtype: Union[str, np.dtype] = np.uint8,
+        bottom_up: bool = True
+    ) -> "RawFrameStore":
+        """Create and preallocate a new frame store, replacing any old file.
+        
+        Args:
+            path: Output file path
+            width: Frame width in pixels
+            height: Frame height in pixels
+            frame_count: Number of frame slots
+            fps: Frame rate (recorded for encoding)
+            channels: 3 (RGB) or 4 (RGBA)
+            dtype: uint8 or uint16 samples
+            bottom_up: Store rows in OpenGL order
+        
+        Returns:
+            Writable RawFrameStore
+        """
+        path = Path(path)
+        dtype = np.dtype(dtype)
+        if (channels, dtype.str[1:]) not in _PIX_FMTS:
+            raise ValueError(f"Unsupported frame layout: {channels} x {dtype}")
+        
+        header_size = _aligned(_HEADER_STRUCT.size + frame_count)
+        frame_bytes = width * height * channels * dtype.itemsize
+        total_size = header_size + frame_bytes * frame_count
+        
+        header = _HEADER_STRUCT.pack(
+            FRAME_STORE_MAGIC, FRAME_STORE_VERSION, header_size,
+            width, height, channels, frame_count,
+            dtype.str[1:].encode("ascii"), bottom_up, float(fps)
+        )
+        
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(header)
+            f.truncate(total_size)
+            # Reserve the blocks now so a full disk fails here, not mid-render
+            if hasattr(os, "posix_fallocate"):
+                try:
+                    os.posix_fallocate(f.fileno(), 0, total_size)
+                except OSError:
+                    pass
+        
+        return cls(path, width, height, frame_count, fps, channels,
+                   dtype, bottom_up, header_size, "r+")
+    
+    @classmethod
+    def open(cls, path: Union[str, Path], mode: str = "r") -> "RawFrameStore":
+        """Open an existing frame store.
+        
+        Args:
+            path: Store file path
+            mode: "r" for read-only, "r+" to keep writing
+        
+        Returns:
+            RawFrameStore
+        
+        Raises:
+            ValueError: If the file is not a frame store
+        """
+        path = Path(path)
+        with open(path, "rb") as f:
+            data = f.read(_HEADER_STRUCT.size)
+        
+        if len(data) < _HEADER_STRUCT.size:
+            raise ValueError(f"Not a frame store: {path}")
+        
+        (magic, version, header_size, width, height, channels,
+         frame_count, dtype, bottom_up, fps) = _HEADER_STRUCT.unpack(data)
+        
+        if magic != FRAME_STORE_MAGIC:
+            raise ValueError(f"Not a frame store: {path}")
+        if version > FRAME_STORE_VERSION:
+            raise ValueError(f"Unsupported frame store version: {version}")
+        
+        return cls(path, width, height, frame_count, fps, channels,
+                   np.dtype(dtype.decode("ascii")), bottom_up, header_size, mode)
+    
+    def __len__(self) -> int:
+        return self.frame_count
+    
+    def __enter__(self) -> "RawFrameStore":
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    @property
+    def frame_shape(self) -> tuple:
+        """Shape of a single frame (height, width, channels)."""
+        return (self.height, self.width, self.channels)
+    
+    @property
+    def frame_bytes(self) -> int:
+        """Size of a single frame in bytes."""
+        return self.width * self.height * self.channels * self.dtype.itemsize
+    
+    @property
+    def pix_fmt(self) -> str:
+        """FFmpeg pixel format of the stored frames."""
+        return _PIX_FMTS[(self.channels, self.dtype.str[1:])]
+    
+    def frame_slot(self, frame: int) -> np.ndarray:
+        """Get the writable storage for a frame, in storage row order.
+        
+        Writing into the returned array writes into the file.
+        """
+        return self._frames[frame]
+    
+    def get_frame(self, frame: int) -> np.ndarray:
+        """Get a frame as a top-down (height, width, channels) view."""
+        slot = self._frames[frame]
+        return slot[::-1] if self.bottom_up else slot
+    
+    def write_frame(self, frame: int, pixels: np.ndarray):
+        """Copy a top-down frame into the store and mark it written."""
+        slot = self._frames[frame]
+        slot[...] = pixels[::-1] if self.bottom_up else pixels
+        self.mark_written(frame)
+    
+    def mark_written(self, frame: int):
+        """Record that a frame slot holds rendered data."""
+        self._written[frame] = 1
+    
+    def is_written(self, frame: int) -> bool:
+        """Check whether a frame slot holds rendered data."""
+        return bool(self._written[frame])
+    
+    def written_frames(self) -> List[int]:
+        """Indices of all frames that have been written."""
+        return np.flatnonzero(self._written).tolist()
+    
+    def ffmpeg_input_args(self, start: int = 0) -> List[str]:
+        """FFmpeg input options that read this store as rawvideo.
+        
+        Args:
+            start: First frame to read (frames are fixed-size, so this
+                is an exact byte offset)
+        """
+        return [
+            "-f", "rawvideo",
+            "-pix_fmt", self.pix_fmt,
+            "-video_size", f"{self.width}x{self.height}",
+            "-framerate", str(self.fps),
+            "-skip_initial_bytes", str(self.header_size + start * self.frame_bytes),
+            "-i", str(self.path),
+        ]
+    
+    def ffmpeg_filters(self) -> List[str]:
+        """Video filters needed to present frames top-down."""
+        return ["vflip"] if self.bottom_up else []
+    
+    def flush(self):
+        """Flush written frames to disk."""
+        if self._frames.mode != "r":
+            self._written.flush()
+            self._frames.flush()
+    
+    def close(self):
+        """Flush and release the mapping."""
+        self.flush()
+        # Dropping the references unmaps the file
+        self._written = None
+        self._frames = None
+
+
+def get_frame_store_path(output_dir: Union[str, Path], name: str = "frames") -> Path:
+    """Get the default frame store path inside a render output directory."""
+    return Path(output_dir) / f"{name}.{FRAME_STORE_EXTENSION}"
+
+
+def open_frame_store(path: Union[str, Path]) -> Optional[RawFrameStore]:
+    """Open a frame store read-only, returning None if it is not one."""
+    try:
+        return RawFrameStore.open(path)
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,146 @@
+"""Benchmark for per-frame GL call overhead.
+
+Renders a trivial shader at a small size, where GPU work is negligible
+and frame time is dominated by the Python side of the render loop
+(uniform updates, draws, binds and readback), once with checked
+PyOpenGL calls and once in fast GL mode (see looplab.gl.fast_gl).
+Wall and CPU time per frame are reported for both.
+
+Run with:
+    python -m looplab.render.gl_benchmark --width 64 --height 64 --frames 2000
+"""
+
+import argparse
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+from ..gl.uniforms import UniformManager
+from .timeline import Timeline
+
+
+# Cheap shader so the measurement is of call overhead, not fill rate
+BENCHMARK_SHADER = """
+void mainImage(out vec4 fragColor, in vec2 fragCoord) {
+    vec2 uv = fragCoord / u_resolution;
+    fragColor = vec4(uv, 0.5 + 0.5 * sin(u_phase), 1.0);
+}
+"""
+
+
+@dataclass
+class GLBenchmarkResult:
+    """Benchmark result for one GL call mode."""
+    
+    label: str
+    frames: int
+    seconds: float
+    cpu_seconds: float
+    
+    @property
+    def ms_per_frame(self) -> float:
+        """Wall-clock milliseconds per frame."""
+        return self.seconds / max(1, self.frames) * 1000.0
+    
+    @property
+    def cpu_ms_per_frame(self) -> float:
+        """Process CPU milliseconds per frame."""
+        return self.cpu_seconds / max(1, self.frames) * 1000.0
+
+
+def benchmark_gl_modes(
+    width: int = 64,
+    height: int = 64,
+    frames: int = 2000,
+    accumulation_samples: int = 1,
+    warmup: int = 50
+) -> List[GLBenchmarkResult]:
+    """Render frames in checked and fast GL modes and time them.
+    
+    Args:
+        width: Frame width
+        height: Frame height
+        frames: Number of timed frames per mode
+        accumulation_samples: Draws per frame
+        warmup: Untimed frames rendered first in each mode
+    
+    Returns:
+        Results for "checked" and "fast" modes
+    
+    Raises:
+        RuntimeError: If no GL context or shader could be set up
+    """
+    from .frame_renderer import FrameRenderer, ensure_gui_application
+    
+    ensure_gui_application()
+    timeline = Timeline(duration=4.0, fps=30.0)
+    results = []
+    
+    for label, fast in (("checked", False), ("fast", True)):
+        renderer = FrameRenderer()
+        renderer.fast_gl = fast
+        renderer.configure(width, height, accumulation_samples=accumulation_samples)
+        if not (renderer.create_context() and renderer.set_shader(BENCHMARK_SHADER)
+                and renderer.prepare()):
+            renderer.destroy()
+            raise RuntimeError(renderer.last_error)
+        
+        uniform_manager = UniformManager()
+        uniform_manager.set_resolution(float(width), float(height))
+        uniform_manager.standard.duration = timeline.duration
+        
+        infos = [timeline.get_frame_info(f) for f in range(timeline.total_frames)]
+        
+        try:
+            for frame in range(warmup):
+                renderer.render_frame(infos[frame % len(infos)], uniform_manager)
+            
+            start = time.perf_counter()
+            cpu_start = time.process_time()
+            for frame in range(frames):
+                renderer.render_frame(infos[frame % len(infos)], uniform_manager)
+            elapsed = time.perf_counter() - start
+            cpu_elapsed = time.process_time() - cpu_start
+        finally:
+            renderer.destroy()
+        
+        results.append(GLBenchmarkResult(
+            label=label,
+            frames=frames,
+            seconds=elapsed,
+            cpu_seconds=cpu_elapsed
+        ))
+    
+    return results
+
+
+def format_results(results: List[GLBenchmarkResult]) -> str:
+    """Format benchmark results as a text table."""
+    lines = [f"{'mode':<10} {'ms/frame':>9} {'cpu ms':>9} {'fps':>9} {'speedup':>8}"]
+    baseline = results[0].ms_per_frame if results else 0.0
+    for r in results:
+        fps = 1000.0 / r.ms_per_frame if r.ms_per_frame > 0 else 0.0
+        speedup = baseline / r.ms_per_frame if r.ms_per_frame > 0 else 0.0
+        lines.append(
+            f"{r.label:<10} {r.ms_per_frame:>9.3f} {r.cpu_ms_per_frame:>9.3f} "
+            f"{fps:>9.0f} {speedup:>7.2f}x"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark LoopLab per-frame GL overhead")
+    parser.add_argument("--width", type=int, default=64)
+    parser.add_argument("--height", type=int, default=64)
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument("--samples", type=int, default=1, help="Accumulation samples per frame")
+    args = parser.parse_args(argv)
+    
+    results = benchmark_gl_modes(args.width, args.height, args.frames, args.samples)
+    print(f"{args.width}x{args.height}, {args.frames} frames, {args.samples} sample(s)")
+    print(format_results(results))
+
+
+if __name__ == "__main__":
+    main()
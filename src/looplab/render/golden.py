@@ -0,0 +1,429 @@
+"""Golden-image regression checks for the bundled shaders.
+
+Changes to the injected header, the loop helpers or the uniform path can
+silently change what every example shader renders. Recording a golden
+set renders a few fixed frames of each example at low resolution and
+stores, per shader, an exact hash of every frame, a small PNG reference
+and the compile and render times. Checking renders the same frames
+again and reports each shader as identical, within a PSNR tolerance of
+its references, or changed, together with render time drift.
+
+Golden directory layout:
+
+    golden.json                     settings, frames, hashes and timings
+    refs/<shader>/frame_000000.png  reference frames
+
+Run with:
+    looplab golden record tests/golden --software
+    looplab golden check tests/golden --software
+"""
+
+import hashlib
+import json
+import math
+import os
+import re
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Union
+import numpy as np
+
+from .image_writer import load_frame, save_frame_png
+from .streaming import RenderSettings
+from .timeline import FrameInfo
+
+
+GOLDEN_FILE = "golden.json"
+GOLDEN_VERSION = 1
+
+# Small frames keep a full library run (and software GL) fast
+DEFAULT_GOLDEN_WIDTH = 160
+DEFAULT_GOLDEN_HEIGHT = 90
+DEFAULT_GOLDEN_FRAME_COUNT = 4
+
+# Minimum PSNR (dB) for a changed frame to count as unchanged
+DEFAULT_TOLERANCE_DB = 40.0
+# Render time ratio above which a shader is reported as slower
+DEFAULT_TIMING_TOLERANCE = 1.5
+# Timings below this are too noisy to compare
+_MIN_TIMING_MS = 1.0
+
+# Check statuses
+IDENTICAL = "identical"
+WITHIN_TOLERANCE = "within_tolerance"
+CHANGED = "changed"
+FAILED = "failed"
+STILL_FAILING = "still_failing"
+FIXED = "fixed"
+NEW = "new"
+MISSING = "missing"
+
+# Statuses that fail a check run
+REGRESSIONS = (CHANGED, FAILED, MISSING)
+
+SHADER_EXTENSIONS = (".frag", ".glsl")
+
+
+def get_examples_dir() -> Path:
+    """Directory of the bundled example shaders."""
+    return Path(__file__).parent.parent / "shaders" / "examples"
+
+
+def get_example_shaders(directory: Union[str, Path, None] = None) -> List[Path]:
+    """Shader files of a directory, sorted by name.
+    
+    Args:
+        directory: Directory to scan (None = bundled examples)
+    """
+    directory = Path(directory) if directory else get_examples_dir()
+    return sorted(
+        (p for p in directory.iterdir() if p.suffix in SHADER_EXTENSIONS),
+        key=lambda p: p.name
+    )
+
+
+def get_golden_frames(total_frames: int, count: int = DEFAULT_GOLDEN_FRAME_COUNT) -> List[int]:
+    """Evenly spaced frames of the loop, starting at frame 0."""
+    count = max(1, min(count, total_frames))
+    return sorted({i * total_frames // count for i in range(count)})
+
+
+def hash_frame(pixels: np.ndarray) -> str:
+    """Exact content hash of a frame (shape and pixels)."""
+    digest = hashlib.sha256(str(pixels.shape).encode("ascii"))
+    digest.update(np.ascontiguousarray(pixels).tobytes())
+    return digest.hexdigest()
+
+
+def compute_psnr(a: np.ndarray, b: np.ndarray) -> float:
+    """Perceptual-ish PSNR of two RGBA frames, in dB.
+    
+    Both frames are box-filtered 2x before comparing RGB, so isolated
+    single-pixel precision differences between GL drivers weigh less
+    than visible changes.
+    
+    Returns:
+        PSNR in dB (inf for identical frames, 0 for different shapes)
+    """
+    if a.shape != b.shape:
+        return 0.0
+    
+    def reduce(pixels: np.ndarray) -> np.ndarray:
+        h, w = pixels.shape[0] // 2 * 2, pixels.shape[1] // 2 * 2
+        rgb = pixels[:h, :w, :3].astype(np.float32)
+        return rgb.reshape(h // 2, 2, w // 2, 2, 3).mean(axis=(1, 3))
+    
+    mse = float(np.mean((reduce(a) - reduce(b)) ** 2))
+    if mse == 0.0:
+        return math.inf
+    return 10.0 * math.log10(255.0 ** 2 / mse)
+
+
+def use_software_gl():
+    """Ask Qt and Mesa for software OpenGL (call before any Qt setup)."""
+    os.environ.setdefault("LIBGL_ALWAYS_SOFTWARE", "1")
+    os.environ.setdefault("QT_OPENGL", "software")
+
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", name)
+
+
+@dataclass
+class ShaderRender:
+    """Frames and timings of one shader.
+    
+    Attributes:
+        name: Shader file name
+        frames: Rendered top-down RGBA frames by frame index
+        compile_ms: Shader compile time
+        render_ms: Mean render time per frame
+        error: Compile or render error, if any
+    """
+    
+    name: str
+    frames: Dict[int, np.ndarray] = field(default_factory=dict)
+    compile_ms: float = 0.0
+    render_ms: float = 0.0
+    error: str = ""
+    
+    @property
+    def hashes(self) -> Dict[int, str]:
+        return {frame: hash_frame(pixels) for frame, pixels in self.frames.items()}
+
+
+def render_shaders(
+    paths: Sequence[Path],
+    settings: RenderSettings,
+    frames: Sequence[int],
+    log_callback: Optional[Callable[[str], None]] = None,
+    frame_info: Optional[Callable[[int], FrameInfo]] = None
+) -> Iterator[ShaderRender]:
+    """Render fixed frames of each shader with one headless context.
+    
+    Args:
+        paths: Shader files
+        settings: Render settings (resolution, timing, seed)
+        frames: Frame indices to render
+        log_callback: Called with progress messages
+        frame_info: Maps frame indices to FrameInfo (default: the
+            settings' timeline)
+    
+    Yields:
+        ShaderRender per shader, in order
+    
+    Raises:
+        RuntimeError: If no GL context can be created
+    """
+    from .frame_renderer import FrameRenderer, ensure_gui_application
+    
+    ensure_gui_application()
+    renderer = FrameRenderer(program_cache_size=1)
+    if not renderer.create_context():
+        raise RuntimeError(renderer.last_error)
+    
+    try:
+        renderer.configure(
+            settings.width, settings.height, settings.supersample_scale,
+            settings.accumulation_samples, 0, settings.shutter_angle, settings.fps
+        )
+        if not renderer.prepare():
+            raise RuntimeError(renderer.last_error)
+        
+        timeline = settings.create_timeline()
+        frame_info = frame_info or timeline.get_frame_info
+        uniform_manager = settings.create_uniform_manager()
+        
+        for index, path in enumerate(paths):
+            result = ShaderRender(name=path.name)
+            if log_callback:
+                log_callback(f"[{index + 1}/{len(paths)}] {path.name}")
+            
+            try:
+                source = path.read_text()
+            except (OSError, UnicodeDecodeError) as e:
+                result.error = f"Failed to read shader: {e}"
+                yield result
+                continue
+            
+            start = time.perf_counter()
+            compiled = renderer.set_shader(source)
+            result.compile_ms = (time.perf_counter() - start) * 1000.0
+            if not compiled:
+                result.error = renderer.last_error
+                yield result
+                continue
+            
+            start = time.perf_counter()
+            for frame in frames:
+                pixels = renderer.render_frame(frame_info(frame), uniform_manager)
+                if pixels is None:
+                    result.error = f"Failed to render frame {frame}"
+                    break
+                result.frames[frame] = np.array(pixels)
+            result.render_ms = (time.perf_counter() - start) * 1000.0 / max(1, len(frames))
+            
+            yield result
+    finally:
+        renderer.destroy()
+
+
+@dataclass
+class ShaderCheck:
+    """Comparison of one shader against its golden entry.
+    
+    Attributes:
+        name: Shader file name
+        status: One of the check statuses (IDENTICAL, CHANGED, ...)
+        psnr: Lowest PSNR over the frames, if any differ
+        render_ms: Mean render time per frame now
+        golden_render_ms: Mean render time per frame when recorded
+        message: Details (error message, differing frames)
+    """
+    
+    name: str
+    status: str
+    psnr: Optional[float] = None
+    render_ms: float = 0.0
+    golden_render_ms: float = 0.0
+    message: str = ""
+    
+    @property
+    def timing_ratio(self) -> Optional[float]:
+        """Render time relative to the golden run, if both are measurable."""
+        if min(self.render_ms, self.golden_render_ms) < _MIN_TIMING_MS:
+            return None
+        return self.render_ms / self.golden_render_ms
+    
+    @property
+    def regression(self) -> bool:
+        return self.status in REGRESSIONS
+
+
+class GoldenSet:
+    """A recorded golden directory."""
+    
+    def __init__(self, directory: Union[str, Path], data: Optional[dict] = None):
+        self.directory = Path(directory)
+        self.data = data or {
+            "version": GOLDEN_VERSION,
+            "settings": asdict(RenderSettings(
+                width=DEFAULT_GOLDEN_WIDTH, height=DEFAULT_GOLDEN_HEIGHT
+            )),
+            "frames": [],
+            "shaders": {},
+        }
+    
+    @classmethod
+    def load(cls, directory: Union[str, Path]) -> "GoldenSet":
+        """Load a golden directory.
+        
+        Raises:
+            ValueError: If the directory holds no valid golden set
+        """
+        path = Path(directory) / GOLDEN_FILE
+        try:
+            data = json.loads(path.read_text())
+        except (OSError, ValueError) as e:
+            raise ValueError(f"Not a golden set: {directory} ({e})")
+        if data.get("version", 0) > GOLDEN_VERSION:
+            raise ValueError(f"Unsupported golden set version: {data.get('version')}")
+        return cls(directory, data)
+    
+    @property
+    def settings(self) -> RenderSettings:
+        return RenderSettings.from_dict(self.data["settings"])
+    
+    @property
+    def frames(self) -> List[int]:
+        return list(self.data["frames"])
+    
+    @property
+    def shaders(self) -> Dict[str, dict]:
+        return self.data["shaders"]
+    
+    def reference_path(self, name: str, frame: int) -> Path:
+        """Reference image path of a shader frame."""
+        return self.directory / "refs" / _slug(name) / f"frame_{frame:06d}.png"
+    
+    def add(self, result: ShaderRender):
+        """Record a shader render, writing its reference frames."""
+        for frame, pixels in result.frames.items():
+            path = self.reference_path(result.name, frame)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            save_frame_png(pixels, path, compress_level=9)
+        
+        self.shaders[result.name] = {
+            "hashes": {str(frame): digest for frame, digest in result.hashes.items()},
+            "compile_ms": round(result.compile_ms, 3),
+            "render_ms": round(result.render_ms, 3),
+            "error": result.error,
+        }
+    
+    def save(self):
+        """Write golden.json atomically."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / GOLDEN_FILE
+        tmp = path.with_name(f".{GOLDEN_FILE}.tmp")
+        tmp.write_text(json.dumps(self.data, indent=2, sort_keys=True))
+        os.replace(tmp, path)
+    
+    def check(self, result: ShaderRender,
+              tolerance_db: float = DEFAULT_TOLERANCE_DB) -> ShaderCheck:
+        """Compare a shader render with its golden entry.
+        
+        Frames with the recorded hash are identical; others are compared
+        with the reference image and pass if their PSNR is at least
+        ``tolerance_db``.
+        """
+        entry = self.shaders.get(result.name)
+        check = ShaderCheck(name=result.name, status=IDENTICAL, render_ms=result.render_ms)
+        
+        if entry is None:
+            check.status = FAILED if result.error else NEW
+            check.message = result.error
+            return check
+        
+        check.golden_render_ms = entry.get("render_ms", 0.0)
+        if result.error:
+            check.status = STILL_FAILING if entry.get("error") else FAILED
+            check.message = result.error
+            return check
+        if entry.get("error"):
+            check.status = FIXED
+            check.message = f"Recorded as failing: {entry['error']}"
+            return check
+        
+        hashes = result.hashes
+        changed = []
+        for frame, golden_hash in sorted(entry["hashes"].items(), key=lambda i: int(i[0])):
+            frame = int(frame)
+            if frame not in result.frames:
+                changed.append(f"frame {frame} not rendered")
+                check.psnr = 0.0
+                continue
+            if hashes[frame] == golden_hash:
+                continue
+            
+            try:
+                reference = load_frame(self.reference_path(result.name, frame))
+            except (OSError, ValueError):
+                changed.append(f"frame {frame} has no reference")
+                check.psnr = 0.0
+                continue
+            
+            psnr = compute_psnr(result.frames[frame], reference)
+            check.psnr = psnr if check.psnr is None else min(check.psnr, psnr)
+            changed.append(f"frame {frame}: {psnr:.1f} dB")
+        
+        if changed:
+            check.status = WITHIN_TOLERANCE if check.psnr >= tolerance_db else CHANGED
+            check.message = ", ".join(changed)
+        return check
+    
+    def missing(self, names: Sequence[str]) -> List[ShaderCheck]:
+        """Checks for golden shaders that were not rendered."""
+        seen = set(names)
+        return [
+            ShaderCheck(name=name, status=MISSING,
+                        golden_render_ms=entry.get("render_ms", 0.0))
+            for name, entry in sorted(self.shaders.items()) if name not in seen
+        ]
+
+
+def format_report(checks: Sequence[ShaderCheck],
+                  timing_tolerance: float = DEFAULT_TIMING_TOLERANCE) -> str:
+    """Human-readable report, regressions and slow shaders first.
+    
+    Args:
+        checks: Shader checks
+        timing_tolerance: Render time ratio reported as a slowdown
+    
+    Returns:
+        Report text
+    """
+    def slow(check: ShaderCheck) -> bool:
+        ratio = check.timing_ratio
+        return ratio is not None and ratio > timing_tolerance
+    
+    def order(check: ShaderCheck):
+        return (not check.regression, not slow(check), check.status == IDENTICAL, check.name)
+    
+    lines = []
+    for check in sorted(checks, key=order):
+        timing = f"{check.render_ms:8.2f} ms"
+        if check.timing_ratio is not None:
+            timing += f" ({check.timing_ratio:.2f}x{' SLOWER' if slow(check) else ''})"
+        line = f"{check.status:<17} {timing:<28} {check.name}"
+        if check.message:
+            line += f"  [{check.message}]"
+        lines.append(line)
+    
+    counts: Dict[str, int] = {}
+    for check in checks:
+        counts[check.status] = counts.get(check.status, 0) + 1
+    summary = ", ".join(f"{count} {status}" for status, count in sorted(counts.items()))
+    slower = sum(1 for check in checks if slow(check))
+    lines.append(f"{len(checks)} shaders: {summary}; {slower} slower than {timing_tolerance:g}x")
+    return "\n".join(lines)
@@ -1,7 +1,21 @@
-"""Image writing utilities for saving rendered frames."""
+"""Image writing utilities for saving rendered frames.
 
+Frames can be written through several backends (see ``FRAME_FORMATS``).
+PNG is the default; QOI, uncompressed TIFF and NumPy ``.npy`` trade file
+size for much lower CPU cost per frame.
+
+Frames are uint8 RGBA, or uint16 RGBA for high bit depth renders. Pillow
+has no 16-bit RGBA image mode, so 16-bit PNG and TIFF files are encoded
+and decoded here directly.
+"""
+
+import io
+import struct
+import zlib
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Union
+from typing import Dict, Tuple, Type, Union
 import numpy as np
 
 try:
@@ -11,10 +25,264 @@ except ImportError:
     PIL_AVAILABLE = False
 
 
+# Compression level used for intermediate PNG frames that only feed FFmpeg.
+# Level 1 is several times faster than Pillow's default (6) and the output
+# stays lossless, only slightly larger.
+FAST_PNG_COMPRESS_LEVEL = 1
+
+# zlib strategies accepted by Pillow's ``compress_type`` PNG option
+PNG_STRATEGIES = {
+    "default": 0,    # Z_DEFAULT_STRATEGY
+    "filtered": 1,   # Z_FILTERED
+    "huffman": 2,    # Z_HUFFMAN_ONLY
+    "rle": 3,        # Z_RLE
+    "fixed": 4,      # Z_FIXED
+}
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+_TIFF_SIGNATURES = (b"II*\x00", b"MM\x00*")
+
+
+def _prepare_pixels(pixels: np.ndarray, flip_vertical: bool) -> np.ndarray:
+    """Flip and convert pixel data to contiguous uint8 (or uint16) RGBA."""
+    if flip_vertical:
+        pixels = np.flipud(pixels)
+    
+    # Ensure uint8, keeping 16-bit frames at full precision
+    if pixels.dtype not in (np.uint8, np.uint16):
+        pixels = np.clip(pixels, 0, 255).astype(np.uint8)
+    
+    return np.ascontiguousarray(pixels)
+
+
+def _png_chunk(kind: bytes, data: bytes) -> bytes:
+    """Length-prefixed, CRC-terminated PNG chunk."""
+    return (struct.pack(">I", len(data)) + kind + data
+            + struct.pack(">I", zlib.crc32(kind + data)))
+
+
+def save_frame_png16(
+    pixels: np.ndarray,
+    path: Union[str, Path],
+    compress_level: int = 6,
+    strategy: str = "default"
+):
+    """Save a uint16 RGBA (or RGB) frame as a 16-bit PNG.
+    
+    Every row uses the Sub filter, which turns smooth gradients into
+    runs of small differences that deflate well.
+    
+    Args:
+        pixels: Contiguous uint16 array (height, width, 4 or 3)
+        path: Output file path
+        compress_level: zlib compression level (0 = store, 9 = smallest)
+        strategy: zlib strategy name (see PNG_STRATEGIES)
+    """
+    height, width, channels = pixels.shape
+    bpp = channels * 2
+    
+    # PNG samples are big-endian
+    raw = pixels.astype(">u2").view(np.uint8).reshape(height, width * bpp)
+    rows = np.empty((height, 1 + width * bpp), dtype=np.uint8)
+    rows[:, 0] = 1  # Sub
+    rows[:, 1:1 + bpp] = raw[:, :bpp]
+    np.subtract(raw[:, bpp:], raw[:, :-bpp], out=rows[:, 1 + bpp:])
+    
+    compressor = zlib.compressobj(compress_level, strategy=PNG_STRATEGIES.get(strategy, 0))
+    data = compressor.compress(rows.tobytes()) + compressor.flush()
+    
+    color_type = 6 if channels == 4 else 2
+    header = struct.pack(">IIBBBBB", width, height, 16, color_type, 0, 0, 0)
+    with open(path, "wb") as f:
+        f.write(_PNG_SIGNATURE)
+        f.write(_png_chunk(b"IHDR", header))
+        f.write(_png_chunk(b"IDAT", data))
+        f.write(_png_chunk(b"IEND", b""))
+
+
+# Samples per pixel of the PNG colour types _load_png16 decodes
+# (greyscale, RGB, greyscale + alpha, RGBA)
+_PNG_CHANNELS = {0: 1, 2: 3, 4: 2, 6: 4}
+
+
+def _unfilter_png_row(kind: int, line: np.ndarray, previous: np.ndarray,
+                      bpp: int, out: np.ndarray):
+    """Undo the filter of one PNG row into ``out`` (all uint8 arrays)."""
+    if kind == 0:
+        out[:] = line
+    elif kind == 1:
+        # uint8 cumulative sums wrap like the filter's byte arithmetic
+        out[:] = np.cumsum(line.reshape(-1, bpp), axis=0, dtype=np.uint8).ravel()
+    elif kind == 2:
+        np.add(line, previous, out=out)
+    elif kind in (3, 4):
+        # Average and Paeth depend on the decoded pixel to the left
+        up = previous.astype(np.int16)
+        left = np.zeros(bpp, dtype=np.int16)
+        up_left = np.zeros(bpp, dtype=np.int16)
+        for x in range(0, len(line), bpp):
+            above = up[x:x + bpp]
+            if kind == 3:
+                predictor = (left + above) // 2
+            else:
+                base = left + above - up_left
+                pa, pb, pc = np.abs(base - left), np.abs(base - above), np.abs(base - up_left)
+                predictor = np.where((pa <= pb) & (pa <= pc), left,
+                                     np.where(pb <= pc, above, up_left))
+            left = (line[x:x + bpp] + predictor) & 0xFF
+            out[x:x + bpp] = left
+            up_left = above
+    else:
+        raise ValueError(f"Unsupported PNG row filter: {kind}")
+
+
+def _load_png16(data: bytes) -> np.ndarray:
+    """Decode a non-interlaced 16-bit PNG to uint16 RGBA.
+    
+    Raises:
+        ValueError: For layouts this decoder does not handle (interlaced
+            files, unknown filters) or damaged data
+    """
+    width, height, depth, color_type, _, _, interlace = struct.unpack(">IIBBBBB", data[16:29])
+    if depth != 16 or color_type not in _PNG_CHANNELS or interlace:
+        raise ValueError("Unsupported 16-bit PNG layout")
+    
+    idat = []
+    pos = 8
+    while pos < len(data):
+        length, kind = struct.unpack(">I4s", data[pos:pos + 8])
+        if kind == b"IDAT":
+            idat.append(data[pos + 8:pos + 8 + length])
+        pos += 12 + length
+    
+    channels = _PNG_CHANNELS[color_type]
+    bpp = channels * 2
+    try:
+        rows = np.frombuffer(zlib.decompress(b"".join(idat)), dtype=np.uint8)
+    except zlib.error as e:
+        raise ValueError(f"Damaged PNG data: {e}") from None
+    if rows.size != height * (1 + width * bpp):
+        raise ValueError("PNG data does not match its size")
+    rows = rows.reshape(height, 1 + width * bpp)
+    raw = np.empty((height, width * bpp), dtype=np.uint8)
+    
+    previous = np.zeros(width * bpp, dtype=np.uint8)
+    for y in range(height):
+        _unfilter_png_row(rows[y, 0], rows[y, 1:], previous, bpp, raw[y])
+        previous = raw[y]
+    
+    samples = raw.view(">u2").reshape(height, width, channels).astype(np.uint16)
+    opaque = np.full((height, width, 1), 65535, dtype=np.uint16)
+    if channels == 1:
+        return np.concatenate([samples] * 3 + [opaque], axis=2)
+    if channels == 2:
+        return np.concatenate([samples[..., :1]] * 3 + [samples[..., 1:]], axis=2)
+    if channels == 3:
+        return np.concatenate([samples, opaque], axis=2)
+    return samples
+
+
+def save_frame_tiff16(pixels: np.ndarray, path: Union[str, Path]):
+    """Save a uint16 RGBA (or RGB) frame as an uncompressed 16-bit TIFF.
+    
+    Args:
+        pixels: Contiguous uint16 array (height, width, 4 or 3)
+        path: Output file path
+    """
+    height, width, channels = pixels.shape
+    data = pixels.astype("<u2").tobytes()
+    
+    # (tag, type, count, value); type 3 = SHORT, 4 = LONG
+    tags = [
+        (256, 4, 1, width),
+        (257, 4, 1, height),
+        (258, 3, channels, 0),  # BitsPerSample, stored after the IFD
+        (259, 3, 1, 1),  # No compression
+        (262, 3, 1, 2),  # RGB
+        (273, 4, 1, 0),  # StripOffsets, after BitsPerSample
+        (277, 3, 1, channels),
+        (278, 4, 1, height),
+        (279, 4, 1, len(data)),
+        (284, 3, 1, 1),  # Contiguous samples
+    ]
+    if channels == 4:
+        tags.append((338, 3, 1, 2))  # Unassociated alpha
+    
+    bits_offset = 8 + 2 + 12 * len(tags) + 4
+    data_offset = bits_offset + 2 * channels
+    
+    ifd = struct.pack("<H", len(tags))
+    for tag, kind, count, value in tags:
+        if tag == 258:
+            value = bits_offset
+        elif tag == 273:
+            value = data_offset
+        field = struct.pack("<H2x", value) if kind == 3 and count == 1 else struct.pack("<I", value)
+        ifd += struct.pack("<HHI", tag, kind, count) + field
+    ifd += struct.pack("<I", 0)
+    
+    with open(path, "wb") as f:
+        f.write(b"II*\x00" + struct.pack("<I", 8))
+        f.write(ifd)
+        f.write(struct.pack(f"<{channels}H", *([16] * channels)))
+        f.write(data)
+
+
+def _read_tiff_tags(data: bytes) -> Tuple[str, Dict[int, Tuple[int, ...]]]:
+    """Read the first IFD of a TIFF file.
+    
+    Returns:
+        (struct byte order, {tag: values})
+    """
+    order = "<" if data[:2] == b"II" else ">"
+    (ifd_offset,) = struct.unpack(order + "I", data[4:8])
+    (count,) = struct.unpack(order + "H", data[ifd_offset:ifd_offset + 2])
+    
+    tags = {}
+    for i in range(count):
+        entry = data[ifd_offset + 2 + 12 * i:ifd_offset + 14 + 12 * i]
+        tag, kind, n = struct.unpack(order + "HHI", entry[:8])
+        if kind not in (3, 4):
+            continue
+        size = 2 if kind == 3 else 4
+        if n * size > 4:
+            (offset,) = struct.unpack(order + "I", entry[8:])
+            raw = data[offset:offset + n * size]
+        else:
+            raw = entry[8:8 + n * size]
+        tags[tag] = struct.unpack(order + ("H" if kind == 3 else "I") * n, raw)
+    return order, tags
+
+
+def _load_tiff16(data: bytes) -> np.ndarray:
+    """Decode an uncompressed, contiguous 16-bit RGB(A) TIFF to uint16 RGBA.
+    
+    Raises:
+        ValueError: For layouts this decoder does not handle
+    """
+    order, tags = _read_tiff_tags(data)
+    width, height = tags[256][0], tags[257][0]
+    channels = tags.get(277, (1,))[0]
+    if (tags.get(259, (1,))[0] != 1 or tags.get(284, (1,))[0] != 1
+            or channels not in (3, 4) or set(tags[258]) != {16}):
+        raise ValueError("Unsupported 16-bit TIFF layout")
+    
+    strips = b"".join(
+        data[offset:offset + size] for offset, size in zip(tags[273], tags[279])
+    )
+    pixels = np.frombuffer(strips, dtype=order + "u2", count=width * height * channels)
+    pixels = pixels.reshape(height, width, channels).astype(np.uint16)
+    if channels == 3:
+        pixels = np.dstack([pixels, np.full((height, width), 65535, dtype=np.uint16)])
+    return pixels
+
+
 def save_frame_png(
     pixels: np.ndarray,
     path: Union[str, Path],
-    flip_vertical: bool = False
+    flip_vertical: bool = False,
+    compress_level: int = 6,
+    strategy: str = "default"
 ) -> bool:
     """Save a frame as PNG.
     
@@ -22,44 +290,228 @@ def save_frame_png(
         pixels: RGBA pixel data as numpy array (height, width, 4)
         path: Output file path
         flip_vertical: Whether to flip the image vertically
-        
+        compress_level: zlib compression level (0 = store, 9 = smallest)
+        strategy: zlib strategy name (see PNG_STRATEGIES)
+    
     Returns:
         True if successful
     """
     if not PIL_AVAILABLE:
         raise ImportError("Pillow is required for image saving")
     
-    if flip_vertical:
-        pixels = np.flipud(pixels)
+    pixels = _prepare_pixels(pixels, flip_vertical)
     
-    # Ensure uint8
-    if pixels.dtype != np.uint8:
-        pixels = np.clip(pixels, 0, 255).astype(np.uint8)
+    if pixels.dtype == np.uint16:
+        save_frame_png16(pixels, path, compress_level, strategy)
+        return True
     
     # Create image and save
     image = Image.fromarray(pixels, mode='RGBA')
-    image.save(str(path), format='PNG')
+    image.save(
+        str(path),
+        format='PNG',
+        compress_level=compress_level,
+        compress_type=PNG_STRATEGIES.get(strategy, 0)
+    )
     
     return True
 
 
 def load_frame_png(path: Union[str, Path]) -> np.ndarray:
-    """Load a PNG frame as numpy array.
+    """Load a PNG (or other Pillow-readable) frame as numpy array.
     
     Args:
         path: Input file path
-        
+    
     Returns:
-        RGBA pixel data as numpy array (height, width, 4)
+        RGBA pixel data as numpy array (height, width, 4); uint16 for
+        16-bit PNG and TIFF files, otherwise uint8
     """
     if not PIL_AVAILABLE:
         raise ImportError("Pillow is required for image loading")
     
-    image = Image.open(str(path))
+    data = Path(path).read_bytes()
+    if data[:8] == _PNG_SIGNATURE and len(data) > 29 and data[24] == 16:
+        try:
+            return _load_png16(data)
+        except (ValueError, struct.error):
+            pass  # Pillow reads what this decoder does not (at 8 bits)
+    if data[:4] in _TIFF_SIGNATURES and 16 in _read_tiff_tags(data)[1].get(258, ()):
+        return _load_tiff16(data)
+    
+    image = Image.open(io.BytesIO(data))
     image = image.convert('RGBA')
     return np.array(image)
 
 
+def load_frame(path: Union[str, Path]) -> np.ndarray:
+    """Load a frame written by any FrameWriter backend.
+    
+    Args:
+        path: Input file path (.png, .qoi, .tiff or .npy)
+    
+    Returns:
+        RGBA pixel data as numpy array (height, width, 4), uint8 or uint16
+    """
+    if Path(path).suffix.lower() == ".npy":
+        return np.load(str(path))
+    return load_frame_png(path)
+
+
+@dataclass
+class FrameWriter(ABC):
+    """Base class for frame sequence writers.
+    
+    Subclasses set ``extension`` and implement ``write``. Frames are named
+    ``frame_000000.<ext>`` so ``frame_pattern`` can be handed to FFmpeg.
+    """
+    
+    extension: str = ""
+    ffmpeg_readable: bool = True
+    supports_16bit: bool = True
+    
+    @property
+    def frame_pattern(self) -> str:
+        """printf-style sequence pattern for FFmpeg's image2 demuxer."""
+        return f"frame_%06d.{self.extension}"
+    
+    def frame_filename(self, frame: int) -> str:
+        """Get the file name for a frame index."""
+        return f"frame_{frame:06d}.{self.extension}"
+    
+    @abstractmethod
+    def write(self, pixels: np.ndarray, path: Union[str, Path]) -> bool:
+        """Write a single frame.
+        
+        Args:
+            pixels: RGBA pixel data as numpy array (height, width, 4)
+            path: Output file path
+        
+        Returns:
+            True if successful
+        """
+
+
+@dataclass
+class PngFrameWriter(FrameWriter):
+    """PNG writer with tunable zlib compression level and strategy."""
+    
+    extension: str = "png"
+    compress_level: int = FAST_PNG_COMPRESS_LEVEL
+    strategy: str = "default"
+    
+    def write(self, pixels: np.ndarray, path: Union[str, Path]) -> bool:
+        return save_frame_png(
+            pixels, path,
+            compress_level=self.compress_level,
+            strategy=self.strategy
+        )
+
+
+@dataclass
+class QoiFrameWriter(FrameWriter):
+    """QOI writer - lossless, much faster than PNG at similar sizes.
+    
+    Requires a Pillow build with QOI save support (11.3+); FFmpeg reads
+    QOI sequences since 5.1.
+    """
+    
+    extension: str = "qoi"
+    supports_16bit: bool = False
+    
+    def write(self, pixels: np.ndarray, path: Union[str, Path]) -> bool:
+        if not PIL_AVAILABLE:
+            raise ImportError("Pillow is required for image saving")
+        
+        Image.init()
+        if "QOI" not in Image.SAVE:
+            raise ImportError("This Pillow version cannot write QOI images")
+        
+        pixels = _prepare_pixels(pixels, False)
+        if pixels.dtype != np.uint8:
+            raise ValueError("QOI frames are 8-bit only")
+        Image.fromarray(pixels, mode='RGBA').save(str(path), format='QOI')
+        return True
+
+
+@dataclass
+class TiffFrameWriter(FrameWriter):
+    """Uncompressed TIFF writer - no compression cost, largest files."""
+    
+    extension: str = "tiff"
+    
+    def write(self, pixels: np.ndarray, path: Union[str, Path]) -> bool:
+        pixels = _prepare_pixels(pixels, False)
+        if pixels.dtype == np.uint16:
+            save_frame_tiff16(pixels, path)
+            return True
+        
+        if not PIL_AVAILABLE:
+            raise ImportError("Pillow is required for image saving")
+        
+        Image.fromarray(pixels, mode='RGBA').save(
+            str(path), format='TIFF', compression='raw'
+        )
+        return True
+
+
+@dataclass
+class NpyFrameWriter(FrameWriter):
+    """NumPy .npy writer for analysis pipelines (not readable by FFmpeg)."""
+    
+    extension: str = "npy"
+    ffmpeg_readable: bool = False
+    
+    def write(self, pixels: np.ndarray, path: Union[str, Path]) -> bool:
+        np.save(str(path), _prepare_pixels(pixels, False))
+        return True
+
+
+# Available frame formats, keyed by the name used in settings
+FRAME_FORMATS: Dict[str, Type[FrameWriter]] = {
+    "png": PngFrameWriter,
+    "qoi": QoiFrameWriter,
+    "tiff": TiffFrameWriter,
+    "npy": NpyFrameWriter,
+}
+
+
+def create_frame_writer(
+    frame_format: str = "png",
+    png_compress_level: int = FAST_PNG_COMPRESS_LEVEL,
+    png_strategy: str = "default",
+    bit_depth: int = 8
+) -> FrameWriter:
+    """Create a frame writer for a format name.
+    
+    Args:
+        frame_format: Key in FRAME_FORMATS
+        png_compress_level: zlib level for the PNG backend (0-9)
+        png_strategy: zlib strategy for the PNG backend
+        bit_depth: Bits per sample of the frames (8 or 16)
+    
+    Returns:
+        FrameWriter instance
+    
+    Raises:
+        ValueError: If the format is unknown or cannot hold the bit depth
+    """
+    if frame_format not in FRAME_FORMATS:
+        raise ValueError(f"Unknown frame format: {frame_format}")
+    
+    if frame_format == "png":
+        writer = PngFrameWriter(
+            compress_level=max(0, min(9, png_compress_level)),
+            strategy=png_strategy
+        )
+    else:
+        writer = FRAME_FORMATS[frame_format]()
+    
+    if bit_depth > 8 and not writer.supports_16bit:
+        raise ValueError(f"The {frame_format} frame format cannot store {bit_depth}-bit frames")
+    return writer
+
+
 def create_thumbnail(
     pixels: np.ndarray,
     max_size: int = 256
@@ -69,7 +521,7 @@ def create_thumbnail(
     Args:
         pixels: RGBA pixel data as numpy array
         max_size: Maximum dimension of thumbnail
-        
+    
     Returns:
         Thumbnail as numpy array
     """
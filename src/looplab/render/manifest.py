@@ -0,0 +1,154 @@
+"""Render manifests.
+
+An offline render records which frames it has written in a manifest
+next to the frames, together with a signature of everything that
+affects their pixels. A render into the same directory with the same
+signature skips the frames already recorded, so a partial render (a
+frame range, or every Nth frame) can later be completed by rendering
+only the missing frames, and an interrupted render resumes where it
+stopped. A render with a different signature starts a new manifest.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+
+MANIFEST_NAME = "render_manifest.json"
+MANIFEST_VERSION = 1
+
+
+def get_manifest_path(output_dir: Union[str, Path]) -> Path:
+    """Path of the manifest in a render output directory."""
+    return Path(output_dir) / MANIFEST_NAME
+
+
+def get_render_signature(shader_source: str, **settings: Any) -> Dict[str, Any]:
+    """Signature of a render's pixels.
+    
+    Args:
+        shader_source: The shader source code
+        **settings: Settings that change the rendered frames (resolution,
+            timing, seed, quality, parameters and frame format)
+    
+    Returns:
+        JSON-serializable signature
+    """
+    return {
+        "shader": hashlib.sha1(shader_source.encode("utf-8")).hexdigest(),
+        **settings,
+    }
+
+
+def _to_ranges(frames: Iterable[int]) -> List[Tuple[int, int]]:
+    """Compress frame indices into inclusive (first, last) runs."""
+    ranges: List[Tuple[int, int]] = []
+    for frame in sorted(frames):
+        if ranges and frame == ranges[-1][1] + 1:
+            ranges[-1] = (ranges[-1][0], frame)
+        else:
+            ranges.append((frame, frame))
+    return ranges
+
+
+class RenderManifest:
+    """Frames written by the renders of one output directory.
+    
+    Attributes:
+        path: Manifest file path
+        signature: Render signature the frames belong to
+        total_frames: Number of frames in the loop
+        frames: Written frame indices
+    """
+    
+    def __init__(self, path: Union[str, Path], signature: Dict[str, Any],
+                 total_frames: int, frames: Optional[Set[int]] = None):
+        self.path = Path(path)
+        self.signature = signature
+        self.total_frames = total_frames
+        self.frames: Set[int] = set(frames or ())
+    
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> Optional["RenderManifest"]:
+        """Load a manifest file.
+        
+        Returns:
+            RenderManifest, or None if the file is missing or invalid
+        """
+        try:
+            data = json.loads(Path(path).read_text())
+            if data.get("version", 0) > MANIFEST_VERSION:
+                return None
+            frames = set()
+            for first, last in data["frames"]:
+                frames.update(range(first, last + 1))
+            return cls(path, data["signature"], data["total_frames"], frames)
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+    
+    @classmethod
+    def for_render(cls, output_dir: Union[str, Path], signature: Dict[str, Any],
+                   total_frames: int) -> "RenderManifest":
+        """Get the manifest for a render, keeping matching earlier coverage.
+        
+        Args:
+            output_dir: Render output directory
+            signature: Signature of the render (see get_render_signature)
+            total_frames: Number of frames in the loop
+        
+        Returns:
+            The existing manifest if it has the same signature, otherwise
+            a new empty one (not saved until ``save`` is called)
+        """
+        path = get_manifest_path(output_dir)
+        manifest = cls.load(path)
+        if (manifest is not None and manifest.signature == signature
+                and manifest.total_frames == total_frames):
+            return manifest
+        return cls(path, signature, total_frames)
+    
+    @property
+    def complete(self) -> bool:
+        """Whether every frame of the loop has been written."""
+        return len(self.frames) >= self.total_frames
+    
+    def add(self, frame: int):
+        """Record a written frame."""
+        self.frames.add(frame)
+    
+    def discard(self, frame: int):
+        """Forget a frame (e.g. its file has been deleted)."""
+        self.frames.discard(frame)
+    
+    def missing(self, frames: Iterable[int]) -> List[int]:
+        """The given frames that have not been written yet."""
+        return [frame for frame in frames if frame not in self.frames]
+    
+    def describe(self) -> str:
+        """Short human-readable coverage summary."""
+        runs = _to_ranges(self.frames)
+        text = ", ".join(
+            str(first) if first == last else f"{first}-{last}" for first, last in runs[:5]
+        )
+        if len(runs) > 5:
+            text += ", ..."
+        return f"{len(self.frames)}/{self.total_frames} frames" + (f" ({text})" if text else "")
+    
+    def save(self):
+        """Write the manifest atomically."""
+        data = {
+            "version": MANIFEST_VERSION,
+            "signature": self.signature,
+            "total_frames": self.total_frames,
+            "frames": _to_ranges(self.frames),
+        }
+        tmp = self.path.with_name(f".{self.path.name}.tmp")
+        tmp.write_text(json.dumps(data, indent=2))
+        os.replace(tmp, self.path)
+
+
+def get_render_coverage(output_dir: Union[str, Path]) -> Optional[RenderManifest]:
+    """Load the manifest of a render output directory, if it has one."""
+    return RenderManifest.load(get_manifest_path(output_dir))
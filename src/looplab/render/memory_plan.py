@@ -0,0 +1,324 @@
+"""Memory planning for offline renders.
+
+Supersampling and accumulation multiply the memory an offline render
+needs: a 4K frame at 4x supersampling is rendered at 15360x8640, and the
+float32 accumulator alone is over 2 GB. This module estimates the peak
+host (NumPy) and GPU (FBO) memory of a render and, when a budget is set,
+splits the frame into horizontal bands that are rendered one at a time.
+
+Run with:
+    python -m looplab.render.memory_plan --width 3840 --height 2160 \\
+        --supersample 4 --accumulation 16 --budget-mb 1024
+"""
+
+import argparse
+import math
+from dataclasses import dataclass
+from typing import List, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ..app.models import OfflineSettings
+
+
+MB = 1024 * 1024
+
+# Bytes per render-resolution pixel
+_RGBA8 = 4
+_RGBA_F32 = 16
+_DEPTH24_STENCIL8 = 4
+_RGBA16F = 8
+
+
+@dataclass
+class MemoryPlan:
+    """Estimated memory use of an offline render.
+    
+    Attributes:
+        width: Output width in pixels
+        height: Output height in pixels
+        supersample_scale: Supersample factor
+        accumulation_samples: Samples per frame
+        tile_height: Render-resolution rows per band
+        tiles: Number of bands per frame (1 = untiled)
+        host_peak_bytes: Peak host memory per frame
+        gpu_peak_bytes: Peak GPU memory for render targets
+        host_budget_bytes: Host budget, or None if unlimited
+        gpu_budget_bytes: GPU budget, or None if unlimited
+        fits: Whether the plan fits both budgets
+        reason: Why the plan does not fit (empty if it fits)
+    """
+    
+    width: int
+    height: int
+    supersample_scale: int
+    accumulation_samples: int
+    tile_height: int
+    tiles: int
+    host_peak_bytes: int
+    gpu_peak_bytes: int
+    host_budget_bytes: Optional[int] = None
+    gpu_budget_bytes: Optional[int] = None
+    fits: bool = True
+    reason: str = ""
+    
+    @property
+    def render_width(self) -> int:
+        """Render-resolution width (before downsampling)."""
+        return self.width * self.supersample_scale
+    
+    @property
+    def render_height(self) -> int:
+        """Render-resolution height (before downsampling)."""
+        return self.height * self.supersample_scale
+    
+    @property
+    def tiled(self) -> bool:
+        """Whether frames are rendered in bands."""
+        return self.tiles > 1
+    
+    def describe(self) -> str:
+        """Human-readable summary for render logs."""
+        def fmt(value: Optional[int]) -> str:
+            return "unlimited" if value is None else f"{value / MB:.0f} MB"
+        
+        text = (
+            f"Memory plan: render {self.render_width}x{self.render_height}, "
+            f"host peak {self.host_peak_bytes / MB:.0f} MB (budget {fmt(self.host_budget_bytes)}), "
+            f"GPU peak {self.gpu_peak_bytes / MB:.0f} MB (budget {fmt(self.gpu_budget_bytes)})"
+        )
+        if self.tiled:
+            text += f", {self.tiles} bands of {self.tile_height} rows"
+        if not self.fits:
+            text += f" - rejected: {self.reason}"
+        return text
+
+
+def _color_bytes(bit_depth: int) -> int:
+    """Bytes per RGBA pixel at a bit depth (8 or 16)."""
+    return _RGBA8 * 2 if bit_depth > 8 else _RGBA8
+
+
+def estimate_gpu_bytes(render_width: int, tile_height: int, bit_depth: int = 8,
+                       post_passes: int = 0, supersample_scale: int = 1,
+                       gpu_downsample: bool = False) -> int:
+    """Estimate GPU memory of the render target (RGBA color + depth/stencil).
+    
+    Post passes add an RGBA16F scene target, and a second one to
+    ping-pong between when there is more than one pass. GPU downsampling
+    (scales 2 and 4) adds a target per halving step, down to output size.
+    """
+    targets = _color_bytes(bit_depth) + _DEPTH24_STENCIL8
+    if post_passes > 0:
+        targets += (_RGBA16F + _DEPTH24_STENCIL8) * (2 if post_passes > 1 else 1)
+    total = render_width * tile_height * targets
+    
+    if gpu_downsample and supersample_scale in (2, 4):
+        width, height = render_width, tile_height
+        while width > render_width // supersample_scale:
+            width, height = width // 2, height // 2
+            total += width * height * (_color_bytes(bit_depth) + _DEPTH24_STENCIL8)
+    return total
+
+
+def estimate_host_bytes(
+    width: int,
+    height: int,
+    supersample_scale: int,
+    accumulation_samples: int,
+    tile_height: int,
+    bit_depth: int = 8
+) -> int:
+    """Estimate peak host memory for rendering one frame.
+    
+    Mirrors the allocations in FrameRenderer.render_frame: the
+    readback buffer, the float32 accumulator, the integer conversion and
+    the float32 downsample result of one band, plus the assembled output
+    frame and the writer's copy of it. Interpreter and library overhead
+    is not included.
+    
+    Args:
+        width: Output width
+        height: Output height
+        supersample_scale: Supersample factor
+        accumulation_samples: Samples per frame
+        tile_height: Render-resolution rows per band
+        bit_depth: Bits per sample of the frames (8 or 16)
+    
+    Returns:
+        Estimated peak bytes
+    """
+    color = _color_bytes(bit_depth)
+    scale = supersample_scale
+    band_pixels = width * scale * tile_height
+    out_band_pixels = band_pixels // (scale * scale)
+    frame_pixels = width * height
+    tiled = tile_height < height * scale
+    
+    if accumulation_samples > 1:
+        # Accumulator plus one readback (or the final integer conversion)
+        band_peak = band_pixels * (_RGBA_F32 + color)
+    else:
+        band_peak = band_pixels * color
+    
+    if scale > 1:
+        # Source band + float32 mean + integer result
+        band_peak = max(
+            band_peak,
+            band_pixels * color + out_band_pixels * (_RGBA_F32 + color)
+        )
+    
+    # Tiled renders assemble bands into a full output frame
+    output = frame_pixels * color if tiled else 0
+    
+    # Writers hold a copy of the frame plus the encoded data
+    write_peak = frame_pixels * color * 3
+    
+    return max(output + band_peak, write_peak)
+
+
+def plan_render_memory(
+    width: int,
+    height: int,
+    supersample_scale: int = 1,
+    accumulation_samples: int = 1,
+    host_budget_mb: float = 0,
+    gpu_budget_mb: float = 0,
+    allow_tiling: bool = True,
+    max_texture_size: Optional[int] = None,
+    bit_depth: int = 8,
+    post_passes: int = 0,
+    gpu_downsample: bool = False
+) -> MemoryPlan:
+    """Plan memory for a render, tiling into bands if over budget.
+    
+    Args:
+        width: Output width in pixels
+        height: Output height in pixels
+        supersample_scale: Supersample factor
+        accumulation_samples: Samples per frame
+        host_budget_mb: Host memory budget in MB (0 = unlimited)
+        gpu_budget_mb: GPU memory budget in MB (0 = unlimited)
+        allow_tiling: Split frames into bands to meet the budget
+        max_texture_size: GL_MAX_TEXTURE_SIZE, if known
+        bit_depth: Bits per sample of the frames (8 or 16)
+        post_passes: Number of GPU post-processing passes
+        gpu_downsample: Whether supersampled frames are downsampled on the GPU
+    
+    Returns:
+        MemoryPlan; ``fits`` is False if no band height meets the budget
+    """
+    scale = max(1, supersample_scale)
+    samples = max(1, accumulation_samples)
+    render_width = width * scale
+    render_height = height * scale
+    host_budget = int(host_budget_mb * MB) if host_budget_mb > 0 else None
+    gpu_budget = int(gpu_budget_mb * MB) if gpu_budget_mb > 0 else None
+    
+    def make_plan(tile_height: int) -> MemoryPlan:
+        return MemoryPlan(
+            width=width,
+            height=height,
+            supersample_scale=scale,
+            accumulation_samples=samples,
+            tile_height=tile_height,
+            tiles=math.ceil(render_height / tile_height),
+            host_peak_bytes=estimate_host_bytes(
+                width, height, scale, samples, tile_height, bit_depth
+            ),
+            gpu_peak_bytes=estimate_gpu_bytes(
+                render_width, tile_height, bit_depth, post_passes, scale, gpu_downsample
+            ),
+            host_budget_bytes=host_budget,
+            gpu_budget_bytes=gpu_budget
+        )
+    
+    def over_budget(plan: MemoryPlan) -> str:
+        if max_texture_size and plan.tile_height > max_texture_size:
+            return f"band height exceeds GL_MAX_TEXTURE_SIZE ({max_texture_size})"
+        if host_budget is not None and plan.host_peak_bytes > host_budget:
+            return "host memory over budget"
+        if gpu_budget is not None and plan.gpu_peak_bytes > gpu_budget:
+            return "GPU memory over budget"
+        return ""
+    
+    plan = make_plan(render_height)
+    
+    if max_texture_size and render_width > max_texture_size:
+        plan.fits = False
+        plan.reason = f"render width exceeds GL_MAX_TEXTURE_SIZE ({max_texture_size})"
+        return plan
+    
+    reason = over_budget(plan)
+    if not reason:
+        return plan
+    
+    if allow_tiling:
+        # Bands are whole output rows so each one downsamples independently
+        for tiles in range(2, height + 1):
+            rows = math.ceil(height / tiles) * scale
+            if rows >= plan.tile_height:
+                continue
+            candidate = make_plan(rows)
+            if not over_budget(candidate):
+                return candidate
+            plan = candidate
+    
+    plan.fits = False
+    plan.reason = over_budget(plan)
+    return plan
+
+
+def plan_for_settings(
+    settings: "OfflineSettings",
+    allow_tiling: bool = True,
+    max_texture_size: Optional[int] = None
+) -> MemoryPlan:
+    """Plan memory for project offline settings.
+    
+    Args:
+        settings: OfflineSettings with resolution, quality and budgets
+        allow_tiling: Split frames into bands to meet the budget
+        max_texture_size: GL_MAX_TEXTURE_SIZE, if known
+    
+    Returns:
+        MemoryPlan
+    """
+    return plan_render_memory(
+        width=settings.width,
+        height=settings.height,
+        supersample_scale=settings.supersample_scale,
+        accumulation_samples=settings.accumulation_samples,
+        host_budget_mb=settings.host_memory_budget_mb,
+        gpu_budget_mb=settings.gpu_memory_budget_mb,
+        allow_tiling=allow_tiling,
+        max_texture_size=max_texture_size,
+        bit_depth=settings.bit_depth,
+        post_passes=len(settings.post_passes)
+    )
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Plan LoopLab render memory")
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--supersample", type=int, default=1)
+    parser.add_argument("--accumulation", type=int, default=1)
+    parser.add_argument("--bit-depth", type=int, choices=(8, 16), default=8)
+    parser.add_argument("--budget-mb", type=float, default=0, help="Host memory budget")
+    parser.add_argument("--gpu-budget-mb", type=float, default=0, help="GPU memory budget")
+    parser.add_argument("--gpu-downsample", action="store_true")
+    parser.add_argument("--no-tiling", action="store_true")
+    args = parser.parse_args(argv)
+    
+    plan = plan_render_memory(
+        args.width, args.height, args.supersample, args.accumulation,
+        host_budget_mb=args.budget_mb, gpu_budget_mb=args.gpu_budget_mb,
+        allow_tiling=not args.no_tiling, bit_depth=args.bit_depth,
+        gpu_downsample=args.gpu_downsample
+    )
+    print(plan.describe())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,43 @@
 """Offline renderer worker for deterministic frame-by-frame rendering.
 
 This module provides a QThread-based worker that renders frames
-to PNG files using a dedicated OpenGL context.
+to image files (PNG by default) using a dedicated OpenGL context.
+The GL work itself is done by a FrameRenderer, which the worker either
+creates for the job or borrows warm from the render daemon.
 """
 
 import os
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Deque, List, Optional, Tuple, TYPE_CHECKING
 import numpy as np
 
 from PySide6.QtCore import QObject, QThread, Signal, Slot
-from PySide6.QtGui import QOffscreenSurface, QSurfaceFormat, QOpenGLContext
 
-from ..gl.shader_manager import ShaderManager
-from ..gl.gl_resources import QuadMesh, RenderTarget, clear_viewport
+from ..gl.post_process import PostPass, create_post_passes
 from ..gl.uniforms import UniformManager
+from .frame_renderer import FrameRenderer
 from .timeline import Timeline
-from .image_writer import save_frame_png
+from .image_writer import FrameWriter, create_frame_writer, FAST_PNG_COMPRESS_LEVEL
+from .frame_store import (
+    RawFrameStore, FRAME_STORE_FORMAT, get_frame_store_path, open_frame_store
+)
+from .memory_plan import MemoryPlan, plan_render_memory
+from .manifest import RenderManifest, get_render_signature
+from .scheduler import RENDER
+
+if TYPE_CHECKING:
+    from .scheduler import JobScheduler
+    from .shm_ring import FrameRing
+
+
+# Seconds between cancel checks while a frame ring is full
+_RING_WAIT = 0.25
+
+# Seconds between render manifest saves
+_MANIFEST_SAVE_INTERVAL = 5.0
 
 
 class OfflineRenderWorker(QObject):
@@ -36,8 +57,22 @@ class OfflineRenderWorker(QObject):
     finished = Signal(bool)
     error = Signal(str)
     
-    def __init__(self, parent: Optional[QObject] = None):
+    def __init__(self, parent: Optional[QObject] = None,
+                 renderer: Optional[FrameRenderer] = None,
+                 scheduler: Optional["JobScheduler"] = None):
+        """Initialize the worker.
+        
+        Args:
+            parent: Parent QObject
+            renderer: Warm renderer whose context is used from the calling
+                thread and left alive after the job, or None to create
+                and destroy a renderer per run
+            scheduler: Scheduler whose RENDER slot ``run`` holds while it
+                renders, writing frames with the slot's threads, or None
+                if the caller holds the slot (as the render daemon does)
+        """
         super().__init__(parent)
+        self.scheduler = scheduler
         
         # Render settings
         self.shader_source: str = ""
@@ -48,7 +83,21 @@ class OfflineRenderWorker(QObject):
         self.duration: float = 30.0
         self.seed: float = 0.0
         self.supersample_scale: int = 1
+        self.gpu_downsample: bool = False
         self.accumulation_samples: int = 1
+        self.shutter_angle: float = 0.0
+        self.bit_depth: int = 8
+        self.post_passes: List[dict] = []
+        self.frame_format: str = "png"
+        self.png_compress_level: int = FAST_PNG_COMPRESS_LEVEL
+        self.writer_threads: int = 1
+        self.host_memory_budget_mb: float = 0
+        self.gpu_memory_budget_mb: float = 0
+        
+        # Frame selection (frame_end 0 = end of loop)
+        self.frame_start: int = 0
+        self.frame_end: int = 0
+        self.frame_stride: int = 1
         
         # Library compatibility parameters
         self.complexity: int = 5
@@ -60,12 +109,8 @@ class OfflineRenderWorker(QObject):
         # Control
         self._cancelled = False
         
-        # OpenGL resources (created in render thread)
-        self._context: Optional[QOpenGLContext] = None
-        self._surface: Optional[QOffscreenSurface] = None
-        self._shader_manager: Optional[ShaderManager] = None
-        self._quad: Optional[QuadMesh] = None
-        self._render_target: Optional[RenderTarget] = None
+        # Renderer (created in render thread unless supplied)
+        self._renderer: Optional[FrameRenderer] = renderer
     
     def configure(
         self,
@@ -82,13 +127,26 @@ class OfflineRenderWorker(QObject):
         force: float = 5.0,
         force2: float = 5.0,
         base_hue_rad: float = 0.0,
-        color_mode: int = 0
+        color_mode: int = 0,
+        frame_format: str = "png",
+        png_compress_level: int = FAST_PNG_COMPRESS_LEVEL,
+        host_memory_budget_mb: float = 0,
+        gpu_memory_budget_mb: float = 0,
+        frame_start: int = 0,
+        frame_end: int = 0,
+        frame_stride: int = 1,
+        shutter_angle: float = 0.0,
+        bit_depth: int = 8,
+        post_passes: Optional[List[dict]] = None,
+        frame_ring: Optional["FrameRing"] = None,
+        writer_threads: int = 1,
+        gpu_downsample: bool = False
     ):
         """Configure render settings.
         
         Args:
             shader_source: The shader source code (mainImage function)
-            output_dir: Directory to save PNG frames
+            output_dir: Directory to save frames
             width: Output width in pixels
             height: Output height in pixels
             fps: Frames per second
@@ -101,6 +159,28 @@ class OfflineRenderWorker(QObject):
             force2: Secondary intensity parameter (0-10)
             base_hue_rad: Base hue in radians (0-TAU)
             color_mode: Color mode toggle (0 or 1)
+            frame_format: Frame writer backend (see FRAME_FORMATS), or
+                "store" to write a single memory-mapped raw frame store
+            png_compress_level: zlib level for PNG frames (0-9)
+            host_memory_budget_mb: Host memory budget per render (0 = unlimited)
+            gpu_memory_budget_mb: GPU memory budget per render (0 = unlimited)
+            frame_start: First frame to render
+            frame_end: Frame to stop before (0 = end of loop)
+            frame_stride: Render every Nth frame of the range
+            shutter_angle: Motion blur shutter in degrees (0 = off); the
+                accumulation samples are spread over the shutter interval
+            bit_depth: Bits per sample of the frames: 8, or 16 for an
+                RGBA16 render target and 16-bit PNG/TIFF/store frames
+                (see encode.ffmpeg.get_render_bit_depth)
+            post_passes: GPU post pass specs applied before readback
+                (see gl.post_process)
+            frame_ring: Shared-memory ring to publish frames to instead of
+                writing files; closed for writing when the render ends
+            writer_threads: Threads encoding image files while the next
+                frames render (1 = write on the render thread); see
+                render.scheduler for machine-wide budgets
+            gpu_downsample: Downsample supersampled frames on the GPU before
+                readback (see FrameRenderer.configure)
         """
         self.shader_source = shader_source
         self.output_dir = output_dir
@@ -116,216 +196,242 @@ class OfflineRenderWorker(QObject):
         self.force2 = force2
         self.base_hue_rad = base_hue_rad
         self.color_mode = color_mode
+        self.frame_format = frame_format
+        self.png_compress_level = png_compress_level
+        self.host_memory_budget_mb = host_memory_budget_mb
+        self.gpu_memory_budget_mb = gpu_memory_budget_mb
+        self.frame_start = frame_start
+        self.frame_end = frame_end
+        self.frame_stride = frame_stride
+        self.shutter_angle = max(0.0, min(360.0, shutter_angle))
+        self.bit_depth = 16 if bit_depth > 8 else 8
+        self.post_passes = list(post_passes or [])
+        self.frame_ring = frame_ring
+        self.writer_threads = max(1, writer_threads)
+        self.gpu_downsample = bool(gpu_downsample)
+    
+    def plan_memory(self) -> MemoryPlan:
+        """Plan host/GPU memory for the configured render."""
+        return plan_render_memory(
+            width=self.width,
+            height=self.height,
+            supersample_scale=self.supersample_scale,
+            accumulation_samples=self.accumulation_samples,
+            host_budget_mb=self.host_memory_budget_mb,
+            gpu_budget_mb=self.gpu_memory_budget_mb,
+            bit_depth=self.bit_depth,
+            post_passes=len(self.post_passes),
+            gpu_downsample=self.gpu_downsample
+        )
+    
+    @property
+    def frame_dtype(self) -> np.dtype:
+        """Sample type of the rendered frames."""
+        return np.dtype(np.uint16 if self.bit_depth > 8 else np.uint8)
+    
+    def render_signature(self) -> dict:
+        """Signature of the configured frames for the render manifest."""
+        return get_render_signature(
+            self.shader_source,
+            width=self.width,
+            height=self.height,
+            fps=self.fps,
+            duration=self.duration,
+            seed=self.seed,
+            supersample_scale=self.supersample_scale,
+            accumulation_samples=self.accumulation_samples,
+            shutter_angle=self.shutter_angle,
+            bit_depth=self.bit_depth,
+            post_passes=self.post_passes,
+            complexity=self.complexity,
+            force=self.force,
+            force2=self.force2,
+            base_hue_rad=self.base_hue_rad,
+            color_mode=self.color_mode,
+            frame_format=self.frame_format,
+            # Only recorded when on, so earlier renders keep their signature
+            **({"gpu_downsample": True} if self.gpu_downsample else {})
+        )
+    
+    def create_writer(self) -> FrameWriter:
+        """Create the frame writer for the configured format."""
+        return create_frame_writer(
+            self.frame_format, self.png_compress_level, bit_depth=self.bit_depth
+        )
     
     def cancel(self):
         """Cancel the render operation."""
         self._cancelled = True
     
-    def _setup_gl_context(self) -> bool:
-        """Set up OpenGL context and surface for offscreen rendering."""
-        try:
-            # Create surface format
-            fmt = QSurfaceFormat()
-            fmt.setVersion(3, 3)
-            fmt.setProfile(QSurfaceFormat.OpenGLContextProfile.CoreProfile)
-            
-            # Create offscreen surface
-            self._surface = QOffscreenSurface()
-            self._surface.setFormat(fmt)
-            self._surface.create()
-            
-            if not self._surface.isValid():
-                self.error.emit("Failed to create offscreen surface")
-                return False
-            
-            # Create OpenGL context
-            self._context = QOpenGLContext()
-            self._context.setFormat(fmt)
-            
-            if not self._context.create():
-                self.error.emit("Failed to create OpenGL context")
-                return False
-            
-            # Make context current
-            if not self._context.makeCurrent(self._surface):
-                self.error.emit("Failed to make OpenGL context current")
-                return False
-            
-            return True
-        except Exception as e:
-            self.error.emit(f"OpenGL setup failed: {e}")
-            return False
-    
-    def _setup_gl_resources(self) -> bool:
-        """Set up shader, quad, and render target."""
-        try:
-            # Create quad mesh
-            self._quad = QuadMesh()
-            self._quad.create()
-            
-            # Calculate render resolution (with supersampling)
-            render_width = self.width * self.supersample_scale
-            render_height = self.height * self.supersample_scale
-            
-            # Create render target (FBO)
-            self._render_target = RenderTarget()
-            self._render_target.create(render_width, render_height)
-            
-            if not self._render_target.is_valid:
-                self.error.emit("Failed to create render target")
-                return False
-            
-            # Compile shader
-            self._shader_manager = ShaderManager()
-            program = self._shader_manager.compile_program(self.shader_source)
-            
-            if not program.is_valid:
-                errors = "\n".join(e.message for e in program.errors)
-                self.error.emit(f"Shader compilation failed:\n{errors}")
-                return False
-            
-            self._shader_manager.current_program = program
-            return True
-            
-        except Exception as e:
-            self.error.emit(f"GL resource setup failed: {e}")
-            return False
-    
-    def _cleanup_gl(self):
-        """Clean up OpenGL resources."""
-        if self._context and self._surface:
-            self._context.makeCurrent(self._surface)
-        
-        if self._quad:
-            self._quad.delete()
+    def create_uniform_manager(self) -> UniformManager:
+        """Create a uniform manager with the configured render state."""
+        uniform_manager = UniformManager()
         
-        if self._render_target:
-            self._render_target.delete()
+        render_width = self.width * self.supersample_scale
+        render_height = self.height * self.supersample_scale
+        uniform_manager.set_resolution(float(render_width), float(render_height))
+        uniform_manager.set_seed(self.seed)
+        uniform_manager.standard.duration = self.duration
         
-        if self._shader_manager and self._shader_manager.current_program:
-            self._shader_manager.current_program.delete()
+        # Set library compatibility parameters
+        uniform_manager.set_complexity(self.complexity)
+        uniform_manager.set_force(self.force)
+        uniform_manager.set_force2(self.force2)
+        uniform_manager.set_base_hue(self.base_hue_rad)
+        uniform_manager.set_color_mode(self.color_mode)
         
-        if self._context:
-            self._context.doneCurrent()
+        return uniform_manager
     
-    def _render_frame(self, frame_info, uniform_manager: UniformManager) -> Optional[np.ndarray]:
-        """Render a single frame.
+    def _acquire_renderer(self, tile_height: int,
+                          post_passes: List[PostPass]) -> Optional[FrameRenderer]:
+        """Get a renderer ready for this job, creating one if needed.
         
         Args:
-            frame_info: FrameInfo with time/phase data
-            uniform_manager: Uniform manager with current state
-            
+            tile_height: Render-resolution rows per band (0 = whole frame)
+            post_passes: Loaded post passes for the job
+        
         Returns:
-            RGBA pixel data as numpy array, or None on failure
+            Renderer with its context current, or None on failure
         """
-        program = self._shader_manager.current_program
-        if not program or not program.is_valid:
-            return None
-        
-        render_width = self.width * self.supersample_scale
-        render_height = self.height * self.supersample_scale
+        renderer = self._renderer or FrameRenderer()
         
-        # For accumulation AA, we'll accumulate multiple samples
-        if self.accumulation_samples > 1:
-            accumulator = np.zeros((render_height, render_width, 4), dtype=np.float32)
-            
-            for sample in range(self.accumulation_samples):
-                # Apply small jitter for AA (deterministic based on frame and sample)
-                # Jitter is in pixel units for the shader to use
-                jitter_x = (sample % 4) / 4.0 - 0.5
-                jitter_y = (sample // 4) / 4.0 - 0.5
-                
-                # Set jitter uniform for shader to offset pixel coordinates
-                uniform_manager.set_jitter(jitter_x, jitter_y)
-                
-                # Render with jitter
-                self._render_target.bind()
-                clear_viewport(0.0, 0.0, 0.0, 1.0)
-                
-                # Update uniforms
-                uniform_manager.set_frame_info(
-                    time=frame_info.time,
-                    phase=frame_info.phase,
-                    frame=frame_info.frame,
-                    loop_x=frame_info.loop_x,
-                    loop_y=frame_info.loop_y
-                )
-                
-                self._shader_manager.set_uniforms(program, uniform_manager.get_all_uniforms())
-                self._quad.draw()
-                
-                # Read pixels
-                pixels = self._render_target.read_pixels()
-                if pixels:
-                    frame_data = np.frombuffer(pixels, dtype=np.uint8).reshape(
-                        render_height, render_width, 4
-                    ).astype(np.float32)
-                    accumulator += frame_data
-            
-            # Reset jitter
-            uniform_manager.set_jitter(0.0, 0.0)
-            
-            # Average samples
-            accumulator /= self.accumulation_samples
-            pixels_array = accumulator.astype(np.uint8)
+        if renderer.has_context:
+            ready = renderer.make_current()
         else:
-            # Single sample render
-            self._render_target.bind()
-            clear_viewport(0.0, 0.0, 0.0, 1.0)
-            
-            uniform_manager.set_frame_info(
-                time=frame_info.time,
-                phase=frame_info.phase,
-                frame=frame_info.frame,
-                loop_x=frame_info.loop_x,
-                loop_y=frame_info.loop_y
-            )
-            
-            self._shader_manager.set_uniforms(program, uniform_manager.get_all_uniforms())
-            self._quad.draw()
-            
-            pixels = self._render_target.read_pixels()
-            if not pixels:
-                return None
-            
-            pixels_array = np.frombuffer(pixels, dtype=np.uint8).reshape(
-                render_height, render_width, 4
-            )
+            ready = renderer.create_context()
         
-        # Flip vertically (OpenGL origin is bottom-left)
-        pixels_array = np.flipud(pixels_array)
+        if ready:
+            renderer.configure(
+                self.width, self.height, self.supersample_scale,
+                self.accumulation_samples, tile_height,
+                self.shutter_angle, self.fps, self.bit_depth, self.gpu_downsample
+            )
+            renderer.set_post_passes(post_passes)
+            ready = renderer.set_shader(self.shader_source) and renderer.prepare()
         
-        # Downsample if supersampling
-        if self.supersample_scale > 1:
-            pixels_array = self._downsample(pixels_array)
+        if not ready:
+            self.error.emit(renderer.last_error)
+            self._release_renderer(renderer)
+            return None
         
-        return pixels_array
+        return renderer
     
-    def _downsample(self, image: np.ndarray) -> np.ndarray:
-        """Downsample image by supersample scale using box filter.
-        
-        Args:
-            image: Input RGBA image
-            
-        Returns:
-            Downsampled image
-        """
-        scale = self.supersample_scale
-        h, w = image.shape[:2]
-        new_h, new_w = h // scale, w // scale
-        
-        # Simple box filter downsampling
-        result = image.reshape(new_h, scale, new_w, scale, 4).mean(axis=(1, 3))
-        return result.astype(np.uint8)
+    def _acquire_ring_slot(self, ring: "FrameRing") -> Optional[np.ndarray]:
+        """Wait for a free ring slot, giving up if the render is cancelled."""
+        while not self._cancelled:
+            try:
+                return ring.acquire_slot(_RING_WAIT)
+            except TimeoutError:
+                continue
+        self.log_message.emit("Render cancelled")
+        return None
+    
+    def _release_renderer(self, renderer: FrameRenderer):
+        """Release a renderer after a job (warm renderers stay alive)."""
+        if renderer is self._renderer:
+            renderer.done_current()
+        else:
+            renderer.destroy()
     
     @Slot()
     def run(self):
         """Main render loop - call this from the worker thread."""
+        ring = self.frame_ring
         self._cancelled = False
+        try:
+            if self.scheduler is None:
+                success = self._render()
+            else:
+                success = self._render_in_slot(self.scheduler)
+        finally:
+            # Consumers blocked in FrameRing.read() wait for this however
+            # the render ends
+            if ring is not None:
+                ring.close_writer()
+        self.finished.emit(success)
+    
+    def _render_in_slot(self, scheduler: "JobScheduler") -> bool:
+        """Render while holding a RENDER slot (False if cancelled while waiting)."""
+        with scheduler.slot(RENDER, cancelled=lambda: self._cancelled) as slot:
+            if slot is None:
+                self.log_message.emit("Render cancelled")
+                return False
+            self.writer_threads = slot.threads
+            return self._render()
+    
+    def _render(self) -> bool:
+        """Render the configured frames.
         
+        Returns:
+            True if every selected frame was rendered
+        """
         self.log_message.emit(f"Starting offline render: {self.width}x{self.height} @ {self.fps}fps")
         self.log_message.emit(f"Duration: {self.duration}s, Supersample: {self.supersample_scale}x, "
                               f"Accumulation: {self.accumulation_samples} samples")
+        if self.shutter_angle > 0:
+            if self.accumulation_samples > 1:
+                self.log_message.emit(f"Motion blur: {self.shutter_angle:g}° shutter")
+            else:
+                self.log_message.emit("Motion blur needs more than one accumulation sample")
+        if self.bit_depth > 8:
+            self.log_message.emit(f"Bit depth: {self.bit_depth} bits per sample")
+        
+        # Check the memory plan before allocating anything
+        plan = self.plan_memory()
+        self.log_message.emit(plan.describe())
+        if not plan.fits:
+            self.error.emit(f"Render exceeds memory budget: {plan.reason}")
+            return False
+        tile_height = plan.tile_height if plan.tiled else 0
+        
+        # Read post pass LUTs and shaders before allocating anything
+        try:
+            post_passes = create_post_passes(self.post_passes)
+        except (OSError, ValueError) as e:
+            self.error.emit(f"Invalid post pass: {e}")
+            return False
+        if post_passes:
+            self.log_message.emit(
+                f"Post passes: {', '.join(p.name for p in post_passes)}"
+            )
+        
+        # Frames go to a shared-memory ring, a single raw frame store or
+        # an image sequence
+        writer: Optional[FrameWriter] = None
+        store: Optional[RawFrameStore] = None
+        ring = self.frame_ring
+        if ring is not None:
+            if ring.frame_shape != (self.height, self.width, 4) or ring.dtype != self.frame_dtype:
+                self.error.emit(
+                    f"Frame ring holds {ring.width}x{ring.height}x{ring.channels} "
+                    f"{ring.dtype} frames, not {self.width}x{self.height} RGBA{self.bit_depth}"
+                )
+                return False
+            self.log_message.emit(f"Frame ring: {ring.name} ({ring.slot_count} slots)")
+        elif self.frame_format != FRAME_STORE_FORMAT:
+            try:
+                writer = self.create_writer()
+            except ValueError as e:
+                self.error.emit(str(e))
+                return False
+        else:
+            self.log_message.emit(f"Frame format: {self.frame_format}")
+        
+        # Select frames; numbering and phase stay those of the whole loop
+        timeline = Timeline(duration=self.duration, fps=self.fps)
+        total_frames = timeline.total_frames
+        try:
+            frames = timeline.frame_range(
+                self.frame_start, self.frame_end or None, self.frame_stride
+            )
+        except ValueError as e:
+            self.error.emit(str(e))
+            return False
+        if len(frames) < total_frames:
+            self.log_message.emit(
+                f"Frame range: {frames.start}-{frames.stop - 1}, stride {frames.step} "
+                f"({len(frames)} of {total_frames} frames)"
+            )
         
         # Create output directory
         output_path = Path(self.output_dir)
@@ -333,71 +439,193 @@ class OfflineRenderWorker(QObject):
             output_path.mkdir(parents=True, exist_ok=True)
         except Exception as e:
             self.error.emit(f"Failed to create output directory: {e}")
-            self.finished.emit(False)
-            return
+            return False
         
-        # Set up OpenGL
-        if not self._setup_gl_context():
-            self.finished.emit(False)
-            return
+        # Skip frames an earlier render of the same settings already wrote
+        manifest: Optional[RenderManifest] = None
+        pending = list(frames)
+        if ring is None:
+            manifest = RenderManifest.for_render(
+                output_path, self.render_signature(), total_frames
+            )
+            if writer is None:
+                try:
+                    store = self._open_store(output_path, total_frames, manifest)
+                except (OSError, ValueError) as e:
+                    self.error.emit(f"Failed to create frame store: {e}")
+                    return False
+                self.log_message.emit(
+                    f"Frame store: {store.path} ({store.frame_bytes * total_frames / 1e6:.0f} MB)"
+                )
+            else:
+                for frame in list(manifest.frames):
+                    if not (output_path / writer.frame_filename(frame)).exists():
+                        manifest.discard(frame)
+            
+            pending = manifest.missing(frames)
+            if len(pending) < len(frames):
+                self.log_message.emit(
+                    f"Skipping {len(frames) - len(pending)} frames already rendered "
+                    f"({manifest.describe()})"
+                )
         
-        if not self._setup_gl_resources():
-            self._cleanup_gl()
-            self.finished.emit(False)
-            return
+        if not pending:
+            if store is not None:
+                store.close()
+            self.log_message.emit("All selected frames are already rendered")
+            return True
         
-        # Set up timeline and uniforms
-        timeline = Timeline(duration=self.duration, fps=self.fps)
-        uniform_manager = UniformManager()
+        # Set up OpenGL
+        renderer = self._acquire_renderer(tile_height, post_passes)
+        if renderer is None:
+            if store is not None:
+                store.close()
+            return False
         
-        render_width = self.width * self.supersample_scale
-        render_height = self.height * self.supersample_scale
-        uniform_manager.set_resolution(float(render_width), float(render_height))
-        uniform_manager.set_seed(self.seed)
-        uniform_manager.standard.duration = self.duration
+        uniform_manager = self.create_uniform_manager()
         
-        # Set library compatibility parameters
-        uniform_manager.set_complexity(self.complexity)
-        uniform_manager.set_force(self.force)
-        uniform_manager.set_force2(self.force2)
-        uniform_manager.set_base_hue(self.base_hue_rad)
-        uniform_manager.set_color_mode(self.color_mode)
+        render_count = len(pending)
+        self.log_message.emit(f"Rendering {render_count} frames...")
+        last_save = time.monotonic()
         
-        total_frames = timeline.total_frames
-        self.log_message.emit(f"Rendering {total_frames} frames...")
+        # Image files are encoded on writer threads while later frames render
+        pool: Optional[ThreadPoolExecutor] = None
+        writes: Deque[Tuple[int, Path, Future]] = deque()
+        if writer is not None and self.writer_threads > 1:
+            pool = ThreadPoolExecutor(self.writer_threads, thread_name_prefix="looplab-writer")
         
         # Render each frame
-        for frame_info in timeline.iter_frames():
+        for index, frame in enumerate(pending):
             if self._cancelled:
                 self.log_message.emit("Render cancelled")
                 break
             
-            # Render frame
-            pixels = self._render_frame(frame_info, uniform_manager)
+            frame_info = timeline.get_frame_info(frame)
             
-            if pixels is None:
-                self.error.emit(f"Failed to render frame {frame_info.frame}")
+            if ring is not None:
+                slot = self._acquire_ring_slot(ring)
+                if slot is None:
+                    break
+                if ring.bottom_up:
+                    rendered = renderer.render_frame_into(frame_info, uniform_manager, slot)
+                else:
+                    pixels = renderer.render_frame(frame_info, uniform_manager)
+                    rendered = pixels is not None
+                    if rendered:
+                        slot[...] = pixels
+                if rendered:
+                    ring.publish(frame)
+                    self.frame_complete.emit(frame, ring.name)
+                else:
+                    self.error.emit(f"Failed to render frame {frame}")
+                self.progress.emit(index + 1, render_count)
                 continue
             
-            # Save frame
-            frame_path = output_path / f"frame_{frame_info.frame:06d}.png"
-            try:
-                save_frame_png(pixels, str(frame_path))
-                self.frame_complete.emit(frame_info.frame, str(frame_path))
-            except Exception as e:
-                self.error.emit(f"Failed to save frame {frame_info.frame}: {e}")
+            if store is not None:
+                if renderer.render_frame_into(frame_info, uniform_manager,
+                                              store.frame_slot(frame)):
+                    store.mark_written(frame)
+                    manifest.add(frame)
+                    self.frame_complete.emit(frame, str(store.path))
+                else:
+                    self.error.emit(f"Failed to render frame {frame}")
+            else:
+                # Render frame
+                pixels = renderer.render_frame(frame_info, uniform_manager)
+                
+                if pixels is None:
+                    self.error.emit(f"Failed to render frame {frame}")
+                    continue
+                
+                # Save frame
+                frame_path = output_path / writer.frame_filename(frame)
+                if pool is not None:
+                    # At most two frames per writer thread wait in memory
+                    writes.append((frame, frame_path, pool.submit(writer.write, pixels, frame_path)))
+                    while len(writes) > 2 * self.writer_threads:
+                        self._finish_write(writes.popleft(), manifest)
+                else:
+                    try:
+                        writer.write(pixels, frame_path)
+                        manifest.add(frame)
+                        self.frame_complete.emit(frame, str(frame_path))
+                    except Exception as e:
+                        self.error.emit(f"Failed to save frame {frame}: {e}")
+            
+            # Persist coverage now and then so an interrupted render resumes
+            if time.monotonic() - last_save > _MANIFEST_SAVE_INTERVAL:
+                if store is not None:
+                    store.flush()
+                self._save_manifest(manifest)
+                last_save = time.monotonic()
             
             # Report progress
-            self.progress.emit(frame_info.frame + 1, total_frames)
+            self.progress.emit(index + 1, render_count)
         
         # Cleanup
-        self._cleanup_gl()
+        if pool is not None:
+            while writes:
+                self._finish_write(writes.popleft(), manifest)
+            pool.shutdown()
+        if store is not None:
+            store.close()
+        if manifest is not None:
+            self._save_manifest(manifest)
+        self._release_renderer(renderer)
         
         success = not self._cancelled
         if success:
-            self.log_message.emit(f"Render complete: {total_frames} frames saved to {self.output_dir}")
+            self.log_message.emit(f"Render complete: {render_count} frames saved to {self.output_dir}")
+            if manifest is not None and not manifest.complete:
+                self.log_message.emit(f"Loop coverage: {manifest.describe()}")
         
-        self.finished.emit(success)
+        return success
+    
+    def _open_store(self, output_path: Path, total_frames: int,
+                    manifest: RenderManifest) -> RawFrameStore:
+        """Reopen the frame store of an earlier render, or create a new one.
+        
+        The manifest is trimmed to the frames the store really holds.
+        
+        Raises:
+            OSError, ValueError: If the store cannot be created
+        """
+        store_path = get_frame_store_path(output_path)
+        if manifest.frames:
+            store = open_frame_store(store_path)
+            if store is not None:
+                compatible = (store.frame_shape == (self.height, self.width, 4)
+                              and store.dtype == self.frame_dtype
+                              and len(store) == total_frames)
+                store.close()
+                if compatible:
+                    store = RawFrameStore.open(store_path, "r+")
+                    manifest.frames.intersection_update(store.written_frames())
+                    return store
+            manifest.frames.clear()
+        
+        return RawFrameStore.create(
+            store_path, self.width, self.height, total_frames, self.fps,
+            dtype=self.frame_dtype
+        )
+    
+    def _finish_write(self, write: Tuple[int, Path, Future], manifest: RenderManifest):
+        """Wait for a frame written on the writer pool and record it."""
+        frame, frame_path, future = write
+        try:
+            future.result()
+        except Exception as e:
+            self.error.emit(f"Failed to save frame {frame}: {e}")
+            return
+        manifest.add(frame)
+        self.frame_complete.emit(frame, str(frame_path))
+    
+    def _save_manifest(self, manifest: RenderManifest):
+        """Save the render manifest, logging rather than failing on errors."""
+        try:
+            manifest.save()
+        except OSError as e:
+            self.log_message.emit(f"Failed to save render manifest: {e}")
 
 
 def create_render_thread(worker: OfflineRenderWorker) -> QThread:
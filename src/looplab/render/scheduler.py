@@ -0,0 +1,183 @@
+"""Scheduling of render and encode work on one machine.
+
+Rendering keeps the GPU busy and encoding keeps the CPU busy, so running
+them one after the other leaves half the machine idle, and running several
+projects at once oversubscribes the cores (x264 threads, frame writers and
+NumPy all assume they have the machine to themselves). The scheduler keeps
+two slot pools, GPU render slots and CPU encode slots, and grants free
+slots to the waiter with the highest priority (the earliest among equals).
+
+A job holds its render slot only while it renders, then waits for an
+encode slot, so job A's encode runs while job B renders. The machine's
+cores are split into fixed thread budgets per slot: each render slot gets
+a few frame writer threads and each encode slot an equal share of the
+rest, passed to FFmpeg as ``-threads``.
+"""
+
+import heapq
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+
+RENDER = "render"
+ENCODE = "encode"
+SLOT_KINDS = (RENDER, ENCODE)
+
+# Frame writer threads per render slot (PNG compression releases the GIL)
+MAX_WRITER_THREADS = 2
+
+# Seconds between cancel checks while waiting for a slot
+_WAIT_INTERVAL = 0.25
+
+
+def get_thread_budgets(render_slots: int, encode_slots: int,
+                       cpu_count: Optional[int] = None) -> Tuple[int, int]:
+    """Split the cores between render and encode slots.
+    
+    Args:
+        render_slots: Concurrent renders
+        encode_slots: Concurrent encodes
+        cpu_count: Cores to share (None = os.cpu_count())
+    
+    Returns:
+        (frame writer threads per render slot, FFmpeg threads per encode slot)
+    """
+    cpus = max(1, cpu_count or os.cpu_count() or 1)
+    render_slots, encode_slots = max(1, render_slots), max(1, encode_slots)
+    writers = max(1, min(MAX_WRITER_THREADS, cpus // (render_slots + encode_slots)))
+    encode = max(1, (cpus - writers * render_slots) // encode_slots)
+    return writers, encode
+
+
+@dataclass
+class Slot:
+    """A granted render or encode slot.
+    
+    Attributes:
+        kind: RENDER or ENCODE
+        index: Slot number within its pool
+        threads: Thread budget of the slot (frame writers or FFmpeg threads)
+    """
+    
+    kind: str
+    index: int
+    threads: int
+
+
+class JobScheduler:
+    """Priority slot pools for GPU render and CPU encode work."""
+    
+    def __init__(self, render_slots: int = 1, encode_slots: int = 1,
+                 cpu_count: Optional[int] = None):
+        """Initialize the scheduler.
+        
+        Args:
+            render_slots: Concurrent renders (GPU contexts)
+            encode_slots: Concurrent encodes (FFmpeg runs)
+            cpu_count: Cores to share between the slots (None = all)
+        """
+        self.slots = {RENDER: max(1, render_slots), ENCODE: max(1, encode_slots)}
+        writers, encode = get_thread_budgets(render_slots, encode_slots, cpu_count)
+        self.threads = {RENDER: writers, ENCODE: encode}
+        
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+        self._free: Dict[str, List[int]] = {
+            kind: list(range(count)) for kind, count in self.slots.items()
+        }
+        self._waiting: Dict[str, List[Tuple[int, int]]] = {kind: [] for kind in SLOT_KINDS}
+    
+    def acquire(self, kind: str, priority: int = 0,
+                cancelled: Optional[Callable[[], bool]] = None,
+                timeout: Optional[float] = None) -> Optional[Slot]:
+        """Wait for a free slot.
+        
+        Args:
+            kind: RENDER or ENCODE
+            priority: Higher priorities are served first
+            cancelled: Polled while waiting; returning True gives up
+            timeout: Seconds to wait at most (None = no limit)
+        
+        Returns:
+            The granted Slot, or None if cancelled or timed out
+        """
+        if kind not in self.slots:
+            raise ValueError(f"Unknown slot kind: {kind}")
+        
+        ticket = (-priority, next(self._seq))
+        waiting = self._waiting[kind]
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            heapq.heappush(waiting, ticket)
+            try:
+                while True:
+                    if cancelled is not None and cancelled():
+                        return None
+                    if self._free[kind] and waiting[0] == ticket:
+                        break
+                    wait = _WAIT_INTERVAL
+                    if deadline is not None:
+                        wait = min(wait, deadline - time.monotonic())
+                        if wait <= 0:
+                            return None
+                    self._cond.wait(wait)
+                heapq.heappop(waiting)
+                return Slot(kind, self._free[kind].pop(0), self.threads[kind])
+            finally:
+                if ticket in waiting:
+                    waiting.remove(ticket)
+                    heapq.heapify(waiting)
+                # The next waiter may be able to go now
+                self._cond.notify_all()
+    
+    def release(self, slot: Slot):
+        """Return a slot to its pool."""
+        with self._cond:
+            self._free[slot.kind].append(slot.index)
+            self._free[slot.kind].sort()
+            self._cond.notify_all()
+    
+    @contextmanager
+    def slot(self, kind: str, priority: int = 0,
+             cancelled: Optional[Callable[[], bool]] = None) -> Iterator[Optional[Slot]]:
+        """Hold a slot for the duration of a ``with`` block.
+        
+        Yields None (and holds nothing) if the wait was cancelled.
+        """
+        granted = self.acquire(kind, priority, cancelled)
+        try:
+            yield granted
+        finally:
+            if granted is not None:
+                self.release(granted)
+    
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Slots, busy slots, waiters and thread budget per pool."""
+        with self._cond:
+            return {
+                kind: {
+                    "slots": count,
+                    "busy": count - len(self._free[kind]),
+                    "waiting": len(self._waiting[kind]),
+                    "threads": self.threads[kind],
+                }
+                for kind, count in self.slots.items()
+            }
+
+
+_scheduler: Optional[JobScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> JobScheduler:
+    """The process-wide scheduler (one render and one encode slot)."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = JobScheduler()
+        return _scheduler
@@ -0,0 +1,309 @@
+"""Loop-seam verification for shader libraries.
+
+A loop is seamless when the frame after the last one, at phase 2π, is
+frame 0 again and motion carries on across the wrap. The conversion
+scripts rewrite shader sources by regex, so this checks the result: each
+shader renders frames 0 and 1, the last two frames of the loop and the
+virtual frame at phase 2π, and is scored on
+
+- wrap PSNR and SSIM: the 2π frame against frame 0 (a shader that still
+  depends on u_time or u_frame differs here)
+- discontinuity: how far the step across the seam departs from the
+  steps on either side of it, relative to typical per-frame motion
+  (about 0 for smooth motion, about 1 for per-frame noise, large when
+  the seam jumps)
+
+Shaders are split across worker processes, each with its own headless
+GL context, and reported worst first.
+
+Run with:
+    looplab seams --software --workers 4
+"""
+
+import math
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence
+from pathlib import Path
+import numpy as np
+
+from .golden import ShaderRender, compute_psnr, render_shaders
+from .streaming import RenderSettings
+
+
+# Small frames keep a full library run (and software GL) fast
+DEFAULT_SEAM_WIDTH = 160
+DEFAULT_SEAM_HEIGHT = 90
+
+# Minimum PSNR (dB) of the 2π frame against frame 0
+DEFAULT_WRAP_TOLERANCE_DB = 40.0
+# Discontinuity score above which the seam counts as a visible jump
+DEFAULT_MAX_DISCONTINUITY = 2.0
+
+# SSIM constants for 8-bit levels, and window size in pixels
+_SSIM_C1 = (0.01 * 255.0) ** 2
+_SSIM_C2 = (0.03 * 255.0) ** 2
+_SSIM_WINDOW = 8
+
+# Check statuses
+SEAMLESS = "seamless"
+BROKEN = "broken"
+FAILED = "failed"
+
+
+def get_seam_frames(total_frames: int) -> List[int]:
+    """Frames rendered per shader: both sides of the seam and phase 2π.
+    
+    Raises:
+        ValueError: If the loop is too short to have distinct neighbours
+    """
+    if total_frames < 4:
+        raise ValueError(f"Loop too short for seam checks: {total_frames} frames")
+    return [0, 1, total_frames - 2, total_frames - 1, total_frames]
+
+
+def _levels(pixels: np.ndarray) -> np.ndarray:
+    """RGB of a frame as float 8-bit levels (16-bit frames are scaled)."""
+    rgb = pixels[..., :3].astype(np.float32)
+    if pixels.dtype == np.uint16:
+        rgb /= 257.0
+    return rgb
+
+
+def compute_ssim(a: np.ndarray, b: np.ndarray) -> float:
+    """Mean SSIM of the luma of two frames, over 8x8 windows.
+    
+    Returns:
+        SSIM in [-1, 1] (1 for identical frames, 0 for different shapes)
+    """
+    if a.shape != b.shape:
+        return 0.0
+    
+    weights = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    x, y = _levels(a) @ weights, _levels(b) @ weights
+    
+    # Non-overlapping windows (the whole frame if it is smaller)
+    win = min(_SSIM_WINDOW, x.shape[0], x.shape[1])
+    h, w = x.shape[0] // win * win, x.shape[1] // win * win
+    x = x[:h, :w].reshape(h // win, win, w // win, win)
+    y = y[:h, :w].reshape(h // win, win, w // win, win)
+    
+    mx, my = x.mean(axis=(1, 3)), y.mean(axis=(1, 3))
+    vx, vy = x.var(axis=(1, 3)), y.var(axis=(1, 3))
+    cov = (x * y).mean(axis=(1, 3)) - mx * my
+    
+    ssim = ((2 * mx * my + _SSIM_C1) * (2 * cov + _SSIM_C2)
+            / ((mx ** 2 + my ** 2 + _SSIM_C1) * (vx + vy + _SSIM_C2)))
+    return float(ssim.mean())
+
+
+def compute_discontinuity(before: np.ndarray, last: np.ndarray,
+                          first: np.ndarray, after: np.ndarray) -> Dict[str, float]:
+    """Temporal discontinuity of the seam between ``last`` and ``first``.
+    
+    Compares the per-pixel step across the seam with the mean of the
+    steps before and after it (a second temporal derivative), so smooth
+    motion of any speed scores close to 0.
+    
+    Args:
+        before: Frame total_frames - 2
+        last: Frame total_frames - 1
+        first: Frame 0
+        after: Frame 1
+    
+    Returns:
+        Dict with ``seam_step`` and ``motion`` (mean absolute change in
+        8-bit levels across the seam and between neighbouring frames)
+        and ``discontinuity`` (mean deviation of the seam step from its
+        neighbours, relative to motion)
+    """
+    frames = np.stack([_levels(f) for f in (before, last, first, after)])
+    steps = np.diff(frames, axis=0)
+    step_before, seam, step_after = steps
+    
+    motion = float((np.abs(step_before).mean() + np.abs(step_after).mean()) / 2.0)
+    jerk = float(np.abs(seam - (step_before + step_after) / 2.0).mean())
+    return {
+        "seam_step": float(np.abs(seam).mean()),
+        "motion": motion,
+        # One level of slack keeps static shaders from amplifying rounding
+        "discontinuity": jerk / (motion + 1.0),
+    }
+
+
+@dataclass
+class SeamCheck:
+    """Seam metrics of one shader.
+    
+    Attributes:
+        name: Shader file name
+        status: SEAMLESS, BROKEN or FAILED
+        wrap_psnr: PSNR of the 2π frame against frame 0 (dB)
+        wrap_ssim: SSIM of the 2π frame against frame 0
+        seam_step: Mean absolute change across the seam (8-bit levels)
+        motion: Mean absolute change between neighbouring frames
+        discontinuity: Seam step deviation relative to motion
+        message: Details (error message, failed criteria)
+    """
+    
+    name: str
+    status: str
+    wrap_psnr: float = math.inf
+    wrap_ssim: float = 1.0
+    seam_step: float = 0.0
+    motion: float = 0.0
+    discontinuity: float = 0.0
+    message: str = ""
+    
+    @property
+    def broken(self) -> bool:
+        return self.status != SEAMLESS
+
+
+def analyze_seam(
+    result: ShaderRender,
+    total_frames: int,
+    wrap_tolerance_db: float = DEFAULT_WRAP_TOLERANCE_DB,
+    max_discontinuity: float = DEFAULT_MAX_DISCONTINUITY
+) -> SeamCheck:
+    """Score the seam of a shader rendered at ``get_seam_frames``.
+    
+    Args:
+        result: Shader render with the seam frames
+        total_frames: Frames in the loop
+        wrap_tolerance_db: Minimum wrap PSNR
+        max_discontinuity: Maximum discontinuity score
+    """
+    check = SeamCheck(name=result.name, status=SEAMLESS)
+    missing = [f for f in get_seam_frames(total_frames) if f not in result.frames]
+    if result.error or missing:
+        check.status = FAILED
+        check.message = result.error or f"Frames not rendered: {missing}"
+        return check
+    
+    frames = result.frames
+    first, end = frames[0], frames[total_frames]
+    check.wrap_psnr = compute_psnr(end, first)
+    check.wrap_ssim = compute_ssim(end, first)
+    metrics = compute_discontinuity(
+        frames[total_frames - 2], frames[total_frames - 1], first, frames[1]
+    )
+    check.seam_step = metrics["seam_step"]
+    check.motion = metrics["motion"]
+    check.discontinuity = metrics["discontinuity"]
+    
+    problems = []
+    if check.wrap_psnr < wrap_tolerance_db:
+        problems.append(f"phase 2π differs from frame 0 ({check.wrap_psnr:.1f} dB)")
+    if check.discontinuity > max_discontinuity:
+        problems.append(f"seam jumps ({check.seam_step:.1f} levels vs "
+                        f"{check.motion:.1f} per frame)")
+    if problems:
+        check.status = BROKEN
+        check.message = "; ".join(problems)
+    return check
+
+
+def _check_chunk(
+    paths: Sequence[Path],
+    settings: RenderSettings,
+    wrap_tolerance_db: float,
+    max_discontinuity: float
+) -> List[SeamCheck]:
+    """Render and score shaders with one GL context (pool worker)."""
+    timeline = settings.create_timeline()
+    total = timeline.total_frames
+    end = timeline.get_loop_end_info()
+    
+    def frame_info(frame: int):
+        return end if frame == total else timeline.get_frame_info(frame)
+    
+    return [
+        analyze_seam(result, total, wrap_tolerance_db, max_discontinuity)
+        for result in render_shaders(paths, settings, get_seam_frames(total),
+                                     frame_info=frame_info)
+    ]
+
+
+def check_seams(
+    paths: Sequence[Path],
+    settings: RenderSettings,
+    workers: int = 1,
+    wrap_tolerance_db: float = DEFAULT_WRAP_TOLERANCE_DB,
+    max_discontinuity: float = DEFAULT_MAX_DISCONTINUITY,
+    log_callback: Optional[Callable[[str], None]] = None
+) -> List[SeamCheck]:
+    """Check the loop seams of shaders, in parallel processes.
+    
+    Args:
+        paths: Shader files
+        settings: Render settings (resolution, timing, seed)
+        workers: Worker processes, each with its own GL context
+            (1 = render in this process)
+        wrap_tolerance_db: Minimum wrap PSNR
+        max_discontinuity: Maximum discontinuity score
+        log_callback: Called with progress messages
+    
+    Returns:
+        One SeamCheck per shader, in the order of ``paths``
+    
+    Raises:
+        RuntimeError: If no GL context can be created
+        ValueError: If the loop is too short to check
+    """
+    get_seam_frames(settings.create_timeline().total_frames)
+    paths = list(paths)
+    workers = max(1, min(workers, len(paths)))
+    
+    if workers == 1:
+        checks = _check_chunk(paths, settings, wrap_tolerance_db, max_discontinuity)
+        if log_callback:
+            log_callback(f"Checked {len(checks)} shaders")
+        return checks
+    
+    import multiprocessing
+    
+    # Qt and GL state must not be forked; interleave names to balance chunks
+    context = multiprocessing.get_context("spawn")
+    by_name: Dict[str, SeamCheck] = {}
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = [
+            pool.submit(_check_chunk, paths[i::workers], settings,
+                        wrap_tolerance_db, max_discontinuity)
+            for i in range(workers)
+        ]
+        for future in as_completed(futures):
+            for check in future.result():
+                by_name[check.name] = check
+            if log_callback:
+                log_callback(f"Checked {len(by_name)}/{len(paths)} shaders")
+    
+    return [by_name[p.name] for p in paths]
+
+
+def rank_checks(checks: Sequence[SeamCheck]) -> List[SeamCheck]:
+    """Checks worst first: failures, broken seams, then by discontinuity."""
+    order = {FAILED: 0, BROKEN: 1, SEAMLESS: 2}
+    return sorted(checks, key=lambda c: (
+        order.get(c.status, 0), -c.discontinuity, c.wrap_psnr, c.name
+    ))
+
+
+def format_report(checks: Sequence[SeamCheck]) -> str:
+    """Human-readable ranked report, worst seams first."""
+    lines = [
+        f"{'status':<9} {'wrap dB':>8} {'ssim':>6} {'jump':>7} {'motion':>7} {'score':>6}  shader"
+    ]
+    for check in rank_checks(checks):
+        psnr = "inf" if math.isinf(check.wrap_psnr) else f"{check.wrap_psnr:.1f}"
+        line = (f"{check.status:<9} {psnr:>8} {check.wrap_ssim:>6.3f} "
+                f"{check.seam_step:>7.2f} {check.motion:>7.2f} "
+                f"{check.discontinuity:>6.2f}  {check.name}")
+        if check.message:
+            line += f"  [{check.message}]"
+        lines.append(line)
+    
+    broken = sum(1 for check in checks if check.status == BROKEN)
+    failed = sum(1 for check in checks if check.status == FAILED)
+    lines.append(f"{len(checks)} shaders: {broken} broken, {failed} failed")
+    return "\n".join(lines)
@@ -0,0 +1,424 @@
+"""Shared-memory frame ring for multi-process pipelines.
+
+A FrameRing is a fixed set of frame slots in one
+``multiprocessing.shared_memory`` block. A single producer (usually the
+offline render worker) reads pixels straight into a slot and publishes
+it with a sequence number; consumers in other processes (frame writers,
+encoders, previews) get NumPy views of the same memory. No frame is
+pickled, piped or copied between stages.
+
+Every consumer sees every frame, in order. Each consumer has a fixed
+index and a read cursor in shared memory; the producer only reuses a
+slot once all consumers have released it, so a slow consumer applies
+backpressure to the render instead of frames being dropped. Waiting is
+done by polling the shared counters, so processes can attach by name
+without sharing any other synchronization objects.
+
+Example:
+    ring = FrameRing.create(1920, 1080, slot_count=4, consumers=2)
+    # in each consumer process:
+    ring = FrameRing.attach(name, consumer=index)
+    for frame, pixels in ring.frames():
+        ...
+"""
+
+import struct
+import time
+from multiprocessing import shared_memory, resource_tracker
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+
+RING_MAGIC = b"LLRING\x00\x01"
+RING_VERSION = 1
+
+# magic, version, slot_count, consumers, width, height, channels,
+# dtype ('u1' or 'u2'), bottom_up
+_HEADER_STRUCT = struct.Struct("<8sIIIIII2s?x")
+
+# Control block: write_seq, closed, then one cursor per consumer, then
+# (seq, frame) per slot, all int64
+_CONTROL_OFFSET = 64
+_WRITE_SEQ = 0
+_CLOSED = 1
+_CURSORS = 2
+
+# Slots start on a page boundary
+_ALIGNMENT = 4096
+
+# Polling backoff while waiting for the other side
+_MIN_SLEEP = 0.0001
+_MAX_SLEEP = 0.002
+
+
+def _aligned(size: int) -> int:
+    """Round size up to the slot alignment."""
+    return (size + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def _open_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """Attach to an existing block without handing it to the resource tracker.
+    
+    Before Python 3.13 attaching registers the block with this process's
+    resource tracker, which unlinks it when the process exits and so
+    destroys the ring for everyone else.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        pass
+    
+    register = resource_tracker.register
+    resource_tracker.register = lambda *args, **kwargs: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+def _wait(predicate, timeout: Optional[float], what: str):
+    """Poll until predicate() is true.
+    
+    Raises:
+        TimeoutError: If the timeout expires first
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    sleep = _MIN_SLEEP
+    while not predicate():
+        if deadline is not None and time.monotonic() >= deadline:
+            raise TimeoutError(f"Timed out waiting for {what}")
+        time.sleep(sleep)
+        sleep = min(sleep * 2, _MAX_SLEEP)
+
+
+class FrameRing:
+    """Fixed ring of frame slots in shared memory.
+    
+    Use ``FrameRing.create`` in the process that owns the ring and
+    ``FrameRing.attach`` in the others.
+    """
+    
+    def __init__(
+        self,
+        shm: shared_memory.SharedMemory,
+        consumer: Optional[int],
+        owner: bool
+    ):
+        self._shm = shm
+        self.consumer = consumer
+        self.owner = owner
+        
+        (magic, version, slot_count, consumers, width, height, channels,
+         dtype, bottom_up) = _HEADER_STRUCT.unpack_from(shm.buf, 0)
+        if magic != RING_MAGIC:
+            raise ValueError(f"Not a frame ring: {shm.name}")
+        if version > RING_VERSION:
+            raise ValueError(f"Unsupported frame ring version: {version}")
+        
+        self.slot_count = slot_count
+        self.consumers = consumers
+        self.width = width
+        self.height = height
+        self.channels = channels
+        self.dtype = np.dtype(dtype.decode("ascii"))
+        self.bottom_up = bottom_up
+        
+        if consumer is not None and not 0 <= consumer < consumers:
+            raise ValueError(f"Consumer index {consumer} out of range (0-{consumers - 1})")
+        
+        control_size = _CURSORS + consumers + 2 * slot_count
+        self._control = np.ndarray(
+            (control_size,), dtype=np.int64, buffer=shm.buf, offset=_CONTROL_OFFSET
+        )
+        self._meta = self._control[_CURSORS + consumers:].reshape(slot_count, 2)
+        self._slots = np.ndarray(
+            (slot_count, height, width, channels), dtype=self.dtype,
+            buffer=shm.buf, offset=self._slots_offset(consumers, slot_count)
+        )
+        
+        # Producer: sequence number of the acquired, unpublished slot
+        self._pending: Optional[int] = None
+        # Consumer: whether the frame at the cursor is checked out
+        self._reading = False
+    
+    @staticmethod
+    def _slots_offset(consumers: int, slot_count: int) -> int:
+        control_size = (_CURSORS + consumers + 2 * slot_count) * 8
+        return _aligned(_CONTROL_OFFSET + control_size)
+    
+    @classmethod
+    def create(
+        cls,
+        width: int,
+        height: int,
+        slot_count: int = 4,
+        consumers: int = 1,
+        channels: int = 4,
+        dtype: Union[str, np.dtype] = np.uint8,
+        bottom_up: bool = True,
+        name: Optional[str] = None
+    ) -> "FrameRing":
+        """Allocate a new ring. The creating process owns (and unlinks) it.
+        
+        Args:
+            width: Frame width in pixels
+            height: Frame height in pixels
+            slot_count: Frames in flight between producer and consumers
+            consumers: Number of consumers that must see every frame
+            channels: 3 (RGB) or 4 (RGBA)
+            dtype: uint8 or uint16 samples
+            bottom_up: Slots are in OpenGL row order (views are flipped)
+            name: Shared memory name, or None for a random one
+        
+        Returns:
+            FrameRing in the producer role
+        """
+        dtype = np.dtype(dtype)
+        if dtype.str[1:] not in ("u1", "u2") or channels not in (3, 4):
+            raise ValueError(f"Unsupported frame layout: {channels} x {dtype}")
+        if slot_count < 1 or consumers < 1:
+            raise ValueError("A ring needs at least one slot and one consumer")
+        
+        slot_bytes = width * height * channels * dtype.itemsize
+        size = cls._slots_offset(consumers, slot_count) + slot_bytes * slot_count
+        
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        shm.buf[:_CONTROL_OFFSET] = bytes(_CONTROL_OFFSET)
+        _HEADER_STRUCT.pack_into(
+            shm.buf, 0, RING_MAGIC, RING_VERSION, slot_count, consumers,
+            width, height, channels, dtype.str[1:].encode("ascii"), bottom_up
+        )
+        ring = cls(shm, None, owner=True)
+        ring._control[:] = 0
+        ring._meta[:] = -1
+        return ring
+    
+    @classmethod
+    def attach(cls, name: str, consumer: Optional[int] = None) -> "FrameRing":
+        """Attach to an existing ring by name.
+        
+        Args:
+            name: Shared memory name (``ring.name`` in the creator)
+            consumer: Consumer index, or None to attach as the producer
+        
+        Returns:
+            FrameRing
+        
+        Raises:
+            FileNotFoundError: If no ring has this name
+            ValueError: If the block is not a frame ring
+        """
+        return cls(_open_shared_memory(name), consumer, owner=False)
+    
+    def __enter__(self) -> "FrameRing":
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    @property
+    def name(self) -> str:
+        """Shared memory name for ``attach``."""
+        return self._shm.name
+    
+    @property
+    def frame_shape(self) -> tuple:
+        """Shape of a single frame (height, width, channels)."""
+        return (self.height, self.width, self.channels)
+    
+    @property
+    def write_seq(self) -> int:
+        """Number of frames published so far."""
+        return int(self._control[_WRITE_SEQ])
+    
+    @property
+    def closed(self) -> bool:
+        """Whether the producer has finished."""
+        return bool(self._control[_CLOSED])
+    
+    def cursors(self) -> List[int]:
+        """Next sequence number each consumer will read."""
+        return self._control[_CURSORS:_CURSORS + self.consumers].tolist()
+    
+    # Producer
+    
+    def acquire_slot(self, timeout: Optional[float] = None) -> np.ndarray:
+        """Wait for a free slot and return it for writing.
+        
+        The returned array is in storage row order (bottom-up by
+        default), so ``glReadPixels`` can target it directly.
+        
+        Raises:
+            TimeoutError: If consumers do not free a slot in time
+        """
+        if self._pending is not None:
+            return self._slots[self._pending % self.slot_count]
+        
+        seq = self.write_seq
+        cursors = self._control[_CURSORS:_CURSORS + self.consumers]
+        _wait(lambda: int(cursors.min()) > seq - self.slot_count, timeout, "a free slot")
+        
+        self._pending = seq
+        return self._slots[seq % self.slot_count]
+    
+    def publish(self, frame: int):
+        """Publish the acquired slot as a frame."""
+        if self._pending is None:
+            raise RuntimeError("publish() without acquire_slot()")
+        
+        seq = self._pending
+        self._meta[seq % self.slot_count] = (seq, frame)
+        # Publishing last makes the slot contents visible as a whole
+        self._control[_WRITE_SEQ] = seq + 1
+        self._pending = None
+    
+    def write(self, frame: int, pixels: np.ndarray, timeout: Optional[float] = None):
+        """Copy a top-down frame into the ring and publish it."""
+        slot = self.acquire_slot(timeout)
+        slot[...] = pixels[::-1] if self.bottom_up else pixels
+        self.publish(frame)
+    
+    def close_writer(self):
+        """Signal consumers that no more frames will be published."""
+        self._control[_CLOSED] = 1
+    
+    # Consumer
+    
+    def read(self, timeout: Optional[float] = None) -> Optional[Tuple[int, np.ndarray]]:
+        """Wait for the next frame.
+        
+        The returned view stays valid until ``release()``.
+        
+        Returns:
+            (frame index, top-down pixel view), or None once the producer
+            has closed and every frame was read
+        
+        Raises:
+            TimeoutError: If no frame arrives in time
+        """
+        if self.consumer is None:
+            raise RuntimeError("read() requires a consumer index")
+        
+        cursor = int(self._control[_CURSORS + self.consumer])
+        _wait(lambda: self.write_seq > cursor or self.closed, timeout, "a frame")
+        if self.write_seq <= cursor:
+            return None
+        
+        index = cursor % self.slot_count
+        seq, frame = self._meta[index]
+        if seq != cursor:
+            raise RuntimeError(f"Frame ring out of sync (slot holds {seq}, expected {cursor})")
+        
+        self._reading = True
+        slot = self._slots[index]
+        return int(frame), slot[::-1] if self.bottom_up else slot
+    
+    def release(self):
+        """Release the frame returned by ``read()`` back to the producer."""
+        if self._reading:
+            self._control[_CURSORS + self.consumer] += 1
+            self._reading = False
+    
+    def frames(self, timeout: Optional[float] = None) -> Iterator[Tuple[int, np.ndarray]]:
+        """Iterate over frames until the producer closes the ring.
+        
+        Each view is released when the next frame is requested.
+        """
+        while True:
+            item = self.read(timeout)
+            if item is None:
+                return
+            try:
+                yield item
+            finally:
+                self.release()
+    
+    def close(self):
+        """Detach from the ring; the owner also unlinks it."""
+        self.release()
+        self._control = None
+        self._meta = None
+        self._slots = None
+        try:
+            self._shm.close()
+        except BufferError:
+            # A caller still holds a view; the mapping goes with it
+            pass
+        if self.owner:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+            self.owner = False
+
+
+def write_frames_from_ring(
+    name: str,
+    output_dir: Union[str, Path],
+    consumer: int = 0,
+    workers: int = 1,
+    frame_format: str = "png",
+    png_compress_level: int = 1
+) -> int:
+    """Write frames from a ring to files; run in a separate process.
+    
+    With several workers (consumers 0..workers-1 of the same ring),
+    worker k writes the frames whose sequence number is k modulo
+    ``workers`` and skips the rest, so encoding is spread over
+    processes without the GIL.
+    
+    Args:
+        name: Ring name
+        output_dir: Directory for the frame files
+        consumer: This worker's consumer index
+        workers: Total number of writer workers
+        frame_format: Frame writer backend (see FRAME_FORMATS)
+        png_compress_level: zlib level for PNG frames
+    
+    Returns:
+        Number of frames written by this worker
+    """
+    from .image_writer import create_frame_writer
+    
+    writer = create_frame_writer(frame_format, png_compress_level)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    written = 0
+    
+    with FrameRing.attach(name, consumer) as ring:
+        for seq, (frame, pixels) in enumerate(ring.frames()):
+            if seq % workers == consumer:
+                writer.write(pixels, output_dir / writer.frame_filename(frame))
+                written += 1
+    
+    return written
+
+
+def start_writer_processes(
+    ring: FrameRing,
+    output_dir: Union[str, Path],
+    frame_format: str = "png",
+    png_compress_level: int = 1
+) -> list:
+    """Start one frame-writer process per ring consumer.
+    
+    Returns:
+        Started multiprocessing.Process objects (join them after the
+        producer calls ``close_writer()``)
+    """
+    import multiprocessing
+    
+    processes = []
+    for consumer in range(ring.consumers):
+        process = multiprocessing.Process(
+            target=write_frames_from_ring,
+            args=(ring.name, str(output_dir), consumer, ring.consumers,
+                  frame_format, png_compress_level),
+            name=f"looplab-writer-{consumer}",
+            daemon=True
+        )
+        process.start()
+        processes.append(process)
+    return processes
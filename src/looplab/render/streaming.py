@@ -0,0 +1,278 @@
+"""Streaming frame API.
+
+This module renders a shader as a lazy stream of NumPy frames, for
+scripts, notebooks and analysis pipelines that want pixels in memory
+rather than files on disk:
+
+    from looplab.render import stream
+
+    for frame_info, pixels in stream(source, {"width": 640, "height": 360}):
+        ...
+
+Frames are rendered only when the consumer asks for the next one, so a
+slow consumer never makes frames pile up in memory. The stream needs a
+QGuiApplication (one is created if missing) but no widgets or windows,
+and must be consumed on the thread that started it.
+"""
+
+from dataclasses import dataclass, field, fields
+from typing import Iterator, List, Optional, Sequence, Tuple, Union, TYPE_CHECKING
+import numpy as np
+
+from ..gl.post_process import PostPass, create_post_passes
+from ..gl.uniforms import UniformManager
+from .timeline import FrameInfo, Timeline
+from .memory_plan import MemoryPlan, plan_render_memory
+
+if TYPE_CHECKING:
+    from ..app.models import Project
+
+
+OutputBuffers = Union[np.ndarray, Sequence[np.ndarray]]
+
+
+@dataclass
+class RenderSettings:
+    """Settings for a streamed render.
+    
+    Attributes:
+        width: Output width in pixels
+        height: Output height in pixels
+        fps: Frames per second
+        duration: Loop duration in seconds
+        seed: Random seed for reproducibility
+        supersample_scale: Supersample factor (1, 2, or 4)
+        gpu_downsample: Downsample supersampled frames on the GPU before
+            readback (scales 2 and 4)
+        accumulation_samples: Number of samples per frame for AA
+        shutter_angle: Motion blur shutter in degrees (0 = off)
+        bit_depth: Bits per sample, 8 for uint8 frames or 16 for uint16
+        post_passes: GPU post pass specs (see gl.post_process)
+        complexity: Shader complexity/detail level (1-10)
+        force: Primary intensity parameter (0-10)
+        force2: Secondary intensity parameter (0-10)
+        base_hue_rad: Base hue in radians (0-TAU)
+        color_mode: Color mode toggle (0 or 1)
+        host_memory_budget_mb: Host memory budget (0 = unlimited)
+        gpu_memory_budget_mb: GPU memory budget (0 = unlimited)
+    """
+    
+    width: int = 1920
+    height: int = 1080
+    fps: float = 30.0
+    duration: float = 30.0
+    seed: float = 0.0
+    supersample_scale: int = 1
+    gpu_downsample: bool = False
+    accumulation_samples: int = 1
+    shutter_angle: float = 0.0
+    bit_depth: int = 8
+    post_passes: list = field(default_factory=list)
+    complexity: int = 5
+    force: float = 5.0
+    force2: float = 5.0
+    base_hue_rad: float = 0.0
+    color_mode: int = 0
+    host_memory_budget_mb: float = 0
+    gpu_memory_budget_mb: float = 0
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> "RenderSettings":
+        """Create settings from a dictionary, rejecting unknown keys.
+        
+        Raises:
+            ValueError: If the dictionary has keys that are not settings
+        """
+        names = {f.name for f in fields(cls)}
+        unknown = sorted(set(data) - names)
+        if unknown:
+            raise ValueError(f"Unknown render settings: {', '.join(unknown)}")
+        return cls(**data)
+    
+    @classmethod
+    def from_project(cls, project: "Project") -> "RenderSettings":
+        """Create settings from a project's timeline and offline settings."""
+        offline = project.offline
+        return cls(
+            width=offline.width,
+            height=offline.height,
+            fps=offline.fps,
+            duration=project.duration,
+            seed=project.seed,
+            supersample_scale=offline.supersample_scale,
+            accumulation_samples=offline.accumulation_samples,
+            shutter_angle=offline.shutter_angle,
+            bit_depth=offline.bit_depth or 8,
+            post_passes=list(offline.post_passes),
+            host_memory_budget_mb=offline.host_memory_budget_mb,
+            gpu_memory_budget_mb=offline.gpu_memory_budget_mb
+        )
+    
+    def create_timeline(self) -> Timeline:
+        """Create the timeline for these settings."""
+        return Timeline(duration=self.duration, fps=self.fps)
+    
+    def create_uniform_manager(self) -> UniformManager:
+        """Create a uniform manager with these render settings."""
+        uniform_manager = UniformManager()
+        
+        scale = max(1, self.supersample_scale)
+        uniform_manager.set_resolution(float(self.width * scale), float(self.height * scale))
+        uniform_manager.set_seed(self.seed)
+        uniform_manager.standard.duration = self.duration
+        
+        # Set library compatibility parameters
+        uniform_manager.set_complexity(self.complexity)
+        uniform_manager.set_force(self.force)
+        uniform_manager.set_force2(self.force2)
+        uniform_manager.set_base_hue(self.base_hue_rad)
+        uniform_manager.set_color_mode(self.color_mode)
+        
+        return uniform_manager
+    
+    def plan_memory(self) -> MemoryPlan:
+        """Plan host/GPU memory for a frame at these settings."""
+        return plan_render_memory(
+            width=self.width,
+            height=self.height,
+            supersample_scale=max(1, self.supersample_scale),
+            accumulation_samples=max(1, self.accumulation_samples),
+            host_budget_mb=self.host_memory_budget_mb,
+            gpu_budget_mb=self.gpu_memory_budget_mb,
+            bit_depth=self.bit_depth,
+            post_passes=len(self.post_passes),
+            gpu_downsample=self.gpu_downsample
+        )
+    
+    @property
+    def dtype(self) -> np.dtype:
+        """Sample type of the streamed frames."""
+        return np.dtype(np.uint16 if self.bit_depth > 8 else np.uint8)
+
+
+def _check_buffers(out: OutputBuffers, shape: Tuple[int, int, int],
+                   dtype: np.dtype) -> list:
+    """Validate caller output buffers and return them as a list."""
+    buffers = [out] if isinstance(out, np.ndarray) else list(out)
+    if not buffers:
+        raise ValueError("No output buffers given")
+    for buffer in buffers:
+        if buffer.shape != shape or buffer.dtype != dtype:
+            raise ValueError(
+                f"Output buffers must be {shape} {dtype} arrays, "
+                f"got {buffer.shape} {buffer.dtype}"
+            )
+        if not buffer.flags.c_contiguous or not buffer.flags.writeable:
+            raise ValueError("Output buffers must be writable and C-contiguous")
+    return buffers
+
+
+def stream(
+    shader_source: str,
+    settings: Union[RenderSettings, dict, None] = None,
+    start: int = 0,
+    end: Optional[int] = None,
+    stride: int = 1,
+    out: Optional[OutputBuffers] = None,
+    bottom_up: bool = False
+) -> Iterator[Tuple[FrameInfo, np.ndarray]]:
+    """Render a shader as a lazy stream of frames.
+    
+    Arguments are checked immediately; the GL context is created when the
+    first frame is requested and destroyed when the stream is exhausted
+    or closed.
+    
+    Args:
+        shader_source: The shader source code (mainImage function)
+        settings: RenderSettings or a dict of its fields (None = defaults)
+        start: First frame
+        end: Frame to stop before (None = end of the loop)
+        stride: Step between frames
+        out: Output buffer, or a sequence of buffers used in turn, to
+            render into instead of allocating a new array per frame.
+            Yielded frames are these buffers, so a buffer's contents are
+            replaced when its turn comes round again.
+        bottom_up: Yield frames in GL row order (first row at the bottom),
+            which lets single-sample renders read straight into ``out``
+    
+    Returns:
+        Iterator of (FrameInfo, (height, width, 4) RGBA array), uint8
+        or uint16 per ``settings.bit_depth``
+    
+    Raises:
+        ValueError: If the settings, frame range, post passes or buffers
+            are invalid or the render exceeds its memory budget
+        OSError: If a post pass LUT or shader file cannot be read
+        RuntimeError: While iterating, if GL setup or a frame fails
+    """
+    if settings is None:
+        settings = RenderSettings()
+    elif isinstance(settings, dict):
+        settings = RenderSettings.from_dict(settings)
+    
+    frames = settings.create_timeline().frame_range(start, end, stride)
+    post_passes = create_post_passes(settings.post_passes)
+    
+    plan = settings.plan_memory()
+    if not plan.fits:
+        raise ValueError(f"Render exceeds memory budget: {plan.reason}")
+    
+    buffers = None
+    if out is not None:
+        buffers = _check_buffers(out, (settings.height, settings.width, 4), settings.dtype)
+    
+    return _render_stream(shader_source, settings, frames, plan, post_passes,
+                          buffers, bottom_up)
+
+
+def _render_stream(shader_source: str, settings: RenderSettings, frames: range,
+                   plan: MemoryPlan, post_passes: List[PostPass], buffers: Optional[list],
+                   bottom_up: bool) -> Iterator[Tuple[FrameInfo, np.ndarray]]:
+    """Generator behind ``stream``."""
+    # Qt is only needed once frames are pulled
+    from .frame_renderer import FrameRenderer, ensure_gui_application
+    
+    ensure_gui_application()
+    renderer = FrameRenderer(program_cache_size=1)
+    try:
+        if not renderer.create_context():
+            raise RuntimeError(renderer.last_error)
+        
+        renderer.configure(
+            settings.width, settings.height, settings.supersample_scale,
+            settings.accumulation_samples, plan.tile_height if plan.tiled else 0,
+            settings.shutter_angle, settings.fps, settings.bit_depth, settings.gpu_downsample
+        )
+        renderer.set_post_passes(post_passes)
+        if not (renderer.set_shader(shader_source) and renderer.prepare()):
+            raise RuntimeError(renderer.last_error)
+        
+        timeline = settings.create_timeline()
+        uniform_manager = settings.create_uniform_manager()
+        
+        # GL-order scratch frame for top-down buffers, reused every frame
+        scratch = None
+        if buffers is not None and not bottom_up:
+            scratch = np.empty_like(buffers[0])
+        
+        for i, frame in enumerate(frames):
+            frame_info = timeline.get_frame_info(frame)
+            
+            if buffers is None:
+                pixels = renderer.render_frame(frame_info, uniform_manager)
+                if pixels is not None and bottom_up:
+                    pixels = pixels[::-1]
+            else:
+                pixels = buffers[i % len(buffers)]
+                target = pixels if bottom_up else scratch
+                if not renderer.render_frame_into(frame_info, uniform_manager, target):
+                    pixels = None
+                elif not bottom_up:
+                    np.copyto(pixels, scratch[::-1])
+            
+            if pixels is None:
+                raise RuntimeError(f"Failed to render frame {frame}")
+            
+            yield frame_info, pixels
+    finally:
+        renderer.destroy()
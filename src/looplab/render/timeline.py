@@ -7,7 +7,7 @@ the phase value (0 to 2π) rather than wall-clock time.
 
 import math
 from dataclasses import dataclass
-from typing import NamedTuple
+from typing import List, NamedTuple, Optional
 
 
 class FrameInfo(NamedTuple):
@@ -67,6 +67,49 @@ class Timeline:
             loop_y=loop_y
         )
     
+    def get_loop_end_info(self) -> FrameInfo:
+        """Get the virtual frame one past the last, at phase 2π.
+        
+        It is never rendered into a loop, but a shader that loops
+        seamlessly renders it exactly like frame 0.
+        
+        Returns:
+            FrameInfo with frame total_frames, time duration and phase 2π
+        """
+        phase = 2.0 * math.pi
+        return FrameInfo(
+            frame=self.total_frames,
+            time=self.duration,
+            phase=phase,
+            loop_x=math.cos(phase),
+            loop_y=math.sin(phase)
+        )
+    
+    def get_subframe_info(self, frame: int, offset: float) -> FrameInfo:
+        """Get time/phase information between frames, for motion blur.
+        
+        Time and phase wrap around the loop, so samples before frame 0
+        blend with the end of the loop exactly as a continuous loop would.
+        
+        Args:
+            frame: Frame index (0 to total_frames - 1)
+            offset: Offset from the frame in frames (e.g. -0.25)
+        
+        Returns:
+            FrameInfo of the frame, with time and phase of the sub-frame
+        """
+        info = self.get_frame_info(frame)
+        time = ((info.frame + offset) / self.fps) % self.duration
+        phase = 2.0 * math.pi * (time / self.duration)
+        
+        return FrameInfo(
+            frame=info.frame,
+            time=time,
+            phase=phase,
+            loop_x=math.cos(phase),
+            loop_y=math.sin(phase)
+        )
+    
     def get_frame_from_time(self, time: float) -> int:
         """Get the frame index for a given time.
         
@@ -102,11 +145,73 @@ class Timeline:
         frames = self.fps * self.duration
         return abs(frames - round(frames)) < 1e-9
     
-    def iter_frames(self):
-        """Iterate over all frames in the timeline.
+    def frame_range(self, start: int = 0, end: Optional[int] = None,
+                    stride: int = 1) -> range:
+        """Get the frame indices of part of the loop.
+        
+        Args:
+            start: First frame
+            end: Frame to stop before (None = end of the loop)
+            stride: Step between frames
+        
+        Returns:
+            Range of frame indices
+        
+        Raises:
+            ValueError: If the range lies outside the loop or stride < 1
+        """
+        total = self.total_frames
+        end = total if end is None else end
+        if stride < 1:
+            raise ValueError(f"Frame stride must be at least 1, got {stride}")
+        if not 0 <= start <= end <= total:
+            raise ValueError(f"Frame range {start}-{end} is outside the loop (0-{total})")
+        return range(start, end, stride)
+    
+    def iter_frames(self, start: int = 0, end: Optional[int] = None, stride: int = 1):
+        """Iterate over the frames in the timeline.
+        
+        Frame numbers and phases are those of the whole loop, so a partial
+        range renders exactly the frames a full render would.
+        
+        Args:
+            start: First frame
+            end: Frame to stop before (None = end of the loop)
+            stride: Step between frames
         
         Yields:
             FrameInfo for each frame
         """
-        for frame in range(self.total_frames):
+        for frame in self.frame_range(start, end, stride):
             yield self.get_frame_info(frame)
+
+
+def get_shutter_offsets(samples: int, shutter_angle: float) -> List[float]:
+    """Sub-frame time offsets of accumulation samples for motion blur.
+    
+    The shutter is centred on the frame and open for shutter_angle / 360
+    of a frame interval. Offsets are spread evenly over the shutter but
+    visited in a scrambled order, so they do not line up with the
+    sample-ordered subpixel jitter pattern.
+    
+    Args:
+        samples: Number of accumulation samples per frame
+        shutter_angle: Shutter angle in degrees (0 = no motion blur)
+    
+    Returns:
+        Offset in frames for each sample
+    """
+    samples = max(1, samples)
+    open_fraction = max(0.0, min(shutter_angle, 360.0)) / 360.0
+    if samples == 1 or open_fraction == 0.0:
+        return [0.0] * samples
+    
+    # Step through the slots by a stride coprime with the sample count
+    stride = max(1, round(samples * 0.618))
+    while math.gcd(stride, samples) != 1:
+        stride += 1
+    
+    return [
+        ((sample * stride % samples + 0.5) / samples - 0.5) * open_fraction
+        for sample in range(samples)
+    ]
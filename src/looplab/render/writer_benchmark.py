@@ -0,0 +1,169 @@
+"""Benchmark for frame writer backends.
+
+Writes synthetic frames through each FrameWriter backend and reports
+throughput (MB/s of raw RGBA input) and bytes per frame, so the fastest
+acceptable intermediate format can be chosen per machine.
+
+Run with:
+    python -m looplab.render.writer_benchmark --width 1920 --height 1080
+"""
+
+import argparse
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .image_writer import FrameWriter, PngFrameWriter, create_frame_writer, FRAME_FORMATS
+
+
+@dataclass
+class WriterBenchmarkResult:
+    """Benchmark result for a single writer configuration."""
+    
+    label: str
+    frames: int
+    seconds: float
+    total_bytes: int
+    raw_bytes_per_frame: int
+    
+    @property
+    def mb_per_second(self) -> float:
+        """Raw RGBA megabytes consumed per second."""
+        if self.seconds <= 0:
+            return 0.0
+        return self.raw_bytes_per_frame * self.frames / self.seconds / 1e6
+    
+    @property
+    def bytes_per_frame(self) -> float:
+        """Average encoded file size per frame."""
+        return self.total_bytes / max(1, self.frames)
+
+
+def make_test_frames(width: int, height: int, count: int, seed: int = 0) -> List[np.ndarray]:
+    """Create deterministic synthetic frames resembling shader output.
+    
+    Smooth gradients plus a little noise, so compressors see neither a
+    trivially compressible nor an incompressible image.
+    
+    Args:
+        width: Frame width
+        height: Frame height
+        count: Number of frames
+        seed: Random seed for the noise component
+    
+    Returns:
+        List of RGBA uint8 arrays (height, width, 4)
+    """
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    frames = []
+    for i in range(count):
+        phase = 2.0 * np.pi * i / max(1, count)
+        r = 0.5 + 0.5 * np.sin(x / width * 6.0 + phase)
+        g = 0.5 + 0.5 * np.sin(y / height * 4.0 - phase)
+        b = 0.5 + 0.5 * np.cos((x + y) / (width + height) * 8.0 + phase)
+        rgb = np.stack([r, g, b], axis=-1) * 235.0
+        rgb += rng.integers(0, 20, size=rgb.shape)
+        frame = np.empty((height, width, 4), dtype=np.uint8)
+        frame[..., :3] = rgb.astype(np.uint8)
+        frame[..., 3] = 255
+        frames.append(frame)
+    return frames
+
+
+def default_candidates() -> List[Tuple[str, FrameWriter]]:
+    """Writer configurations benchmarked by default."""
+    candidates: List[Tuple[str, FrameWriter]] = [
+        (f"png (level {level})", PngFrameWriter(compress_level=level))
+        for level in (0, 1, 3, 6, 9)
+    ]
+    candidates.append(("png (level 1, rle)", PngFrameWriter(compress_level=1, strategy="rle")))
+    for name in FRAME_FORMATS:
+        if name != "png":
+            candidates.append((name, create_frame_writer(name)))
+    return candidates
+
+
+def benchmark_writers(
+    width: int = 1920,
+    height: int = 1080,
+    frames: int = 10,
+    candidates: Optional[List[Tuple[str, FrameWriter]]] = None,
+    output_dir: Optional[str] = None
+) -> List[WriterBenchmarkResult]:
+    """Benchmark frame writers on synthetic frames.
+    
+    Args:
+        width: Frame width
+        height: Frame height
+        frames: Number of frames written per writer
+        candidates: (label, writer) pairs, or None for default_candidates()
+        output_dir: Directory to write into (a temp dir if None)
+    
+    Returns:
+        One result per writer that is usable on this machine
+    """
+    test_frames = make_test_frames(width, height, frames)
+    raw_bytes = width * height * 4
+    results = []
+    
+    with tempfile.TemporaryDirectory(dir=output_dir) as tmpdir:
+        for label, writer in candidates or default_candidates():
+            target = Path(tmpdir) / label.replace(" ", "_").replace(",", "").strip("()")
+            target.mkdir(parents=True, exist_ok=True)
+            
+            paths = [target / writer.frame_filename(i) for i in range(frames)]
+            try:
+                start = time.perf_counter()
+                for pixels, path in zip(test_frames, paths):
+                    writer.write(pixels, path)
+                elapsed = time.perf_counter() - start
+            except ImportError:
+                # Backend not available in this environment
+                continue
+            
+            total = sum(p.stat().st_size for p in paths)
+            results.append(WriterBenchmarkResult(
+                label=label,
+                frames=frames,
+                seconds=elapsed,
+                total_bytes=total,
+                raw_bytes_per_frame=raw_bytes
+            ))
+    
+    return results
+
+
+def format_results(results: List[WriterBenchmarkResult]) -> str:
+    """Format benchmark results as a text table."""
+    lines = [f"{'writer':<22} {'MB/s':>9} {'ms/frame':>9} {'KB/frame':>10} {'ratio':>6}"]
+    for r in results:
+        ms = r.seconds / max(1, r.frames) * 1000.0
+        ratio = r.bytes_per_frame / r.raw_bytes_per_frame
+        lines.append(
+            f"{r.label:<22} {r.mb_per_second:>9.1f} {ms:>9.1f} "
+            f"{r.bytes_per_frame / 1024:>10.0f} {ratio:>6.2f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark LoopLab frame writers")
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--frames", type=int, default=10)
+    parser.add_argument("--dir", default=None, help="Directory for temporary output")
+    args = parser.parse_args(argv)
+    
+    results = benchmark_writers(args.width, args.height, args.frames, output_dir=args.dir)
+    print(f"{args.width}x{args.height}, {args.frames} frames")
+    print(format_results(results))
+
+
+if __name__ == "__main__":
+    main()
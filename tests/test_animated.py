@@ -0,0 +1,239 @@
+"""Tests for animated image export."""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from looplab.encode.animated import (
+    AnimatedStep, encode_animated, encode_render_animated, get_step_args, plan_size_steps
+)
+from looplab.encode.ffmpeg import (
+    PALETTE_FRAME, PRESETS, FFmpegEncoder, get_palette_graph, get_palette_path,
+    get_preset_pix_fmt, get_render_bit_depth, load_custom_presets, save_custom_preset
+)
+from looplab.render.daemon import create_job
+
+
+# Stand-in FFmpeg: writes its arguments, padded to a size that shrinks with
+# the palette size (of its graph or of the palette it reads), the WebP
+# quality and the scale filter
+FAKE_FFMPEG = """
+import json, sys
+args = sys.argv[1:]
+graph = " ".join(args[i + 1] for i, a in enumerate(args) if a in ("-vf", "-filter_complex"))
+for i, a in enumerate(args):
+    if a == "-i" and args[i + 1].endswith(".palette.png"):
+        palette = json.loads(open(args[i + 1]).read())["args"]
+        graph += " " + palette[palette.index("-vf") + 1]
+size = 10000
+if "max_colors=" in graph:
+    size = size * int(graph.split("max_colors=")[1].split(":")[0]) // 256
+if "-quality" in args:
+    size = size * int(args[args.index("-quality") + 1]) // 75
+if "scale=trunc(iw*" in graph:
+    size = int(size * float(graph.split("scale=trunc(iw*")[1].split("/")[0]) ** 2)
+record = json.dumps({"args": args})
+open(args[-1], "w").write(record + " " * max(0, size - len(record)))
+print("frame=8\\nprogress=end", flush=True)
+"""
+
+
+def _ffmpeg(directory: str) -> str:
+    path = Path(directory) / "ffmpeg"
+    path.write_text(f"#!{sys.executable}\n{FAKE_FFMPEG}")
+    path.chmod(0o755)
+    return str(path)
+
+
+def _args(path: Path) -> list:
+    return json.loads(path.read_text())["args"]
+
+
+class TestPalette:
+    """Tests for palette filter graphs and animated presets."""
+    
+    def test_palette_graphs(self):
+        """Test per-frame palettes in one graph and loop palettes from an input."""
+        graph = get_palette_graph("loop")
+        
+        assert graph.startswith("null[frames];[frames][1:v]paletteuse")
+        assert "palettegen" not in graph and graph.endswith("diff_mode=rectangle")
+        frame = get_palette_graph(PALETTE_FRAME, colors=64, tag="1")
+        assert frame.startswith("split[frames1][stats1];[stats1]palettegen=max_colors=64")
+        assert "stats_mode=single" in frame and "paletteuse=new=1" in frame
+    
+    def test_presets_loop_forever(self):
+        """Test the infinite-loop flags of the animated presets."""
+        for name in ("gif", "gif_frame_palette", "webp"):
+            args = PRESETS[name].ffmpeg_args
+            assert args[args.index("-loop") + 1] == "0"
+        apng = PRESETS["apng"].ffmpeg_args
+        assert apng[apng.index("-plays") + 1] == "0"
+        assert all(PRESETS[name].is_animated for name in ("gif", "webp", "apng"))
+        assert not PRESETS["h264_high"].is_animated
+    
+    def test_presets_keep_alpha(self):
+        """Test that WebP and APNG encode the frames' alpha, at 16 bits if rendered so."""
+        assert get_preset_pix_fmt(PRESETS["webp"]) == "yuva420p"
+        assert get_preset_pix_fmt(PRESETS["apng"]) == "rgba"
+        assert get_preset_pix_fmt(PRESETS["apng_16bit"]) == "rgba64be"
+        assert get_render_bit_depth("apng") == 8
+        assert get_render_bit_depth("apng_16bit") == 16
+    
+    def test_step_args(self):
+        """Test scaling, palette size and WebP quality of a size step."""
+        filters, args = get_step_args(PRESETS["gif_frame_palette"], AnimatedStep(0.5, 64),
+                                      ["vflip"])
+        
+        assert filters[0] == "-vf"
+        assert filters[1].startswith("vflip,scale=trunc(iw*0.5/2)*2:-2:flags=lanczos,split")
+        assert "max_colors=64" in filters[1]
+        filters, _ = get_step_args(PRESETS["gif"], AnimatedStep(), ["vflip"])
+        assert filters == ["-filter_complex", "[0:v]vflip," + get_palette_graph("loop")]
+        _, args = get_step_args(PRESETS["webp"], AnimatedStep(quality=45))
+        assert args[args.index("-quality") + 1] == "45"
+        assert PRESETS["webp"].ffmpeg_args[3] == "75"
+    
+    def test_size_steps(self):
+        """Test quality steps before scale steps, and scale only for APNG."""
+        steps = plan_size_steps(PRESETS["gif"])
+        
+        assert [step.colors for step in steps[:4]] == [256, 128, 64, 32]
+        assert [(step.scale, step.colors) for step in steps[4:]] == [(0.75, 32), (0.5, 32)]
+        assert [step.scale for step in plan_size_steps(PRESETS["apng"])] == [1.0, 0.75, 0.5]
+    
+    def test_custom_preset_keeps_palette(self):
+        """Test that a saved GIF preset reloads with its palette mode."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "presets.json"
+            try:
+                save_custom_preset("test_gif", PRESETS["gif_frame_palette"], path)
+                assert load_custom_presets(path)["test_gif"].palette == PALETTE_FRAME
+            finally:
+                PRESETS.pop("test_gif", None)
+
+
+@pytest.mark.skipif(os.name == "nt", reason="Stand-in FFmpeg needs a shebang")
+class TestEncode:
+    """Tests for encoding animated images with a stand-in FFmpeg."""
+    
+    def test_sequence_applies_palette(self):
+        """Test that a GIF preset encode reads a palette made by a first pass."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            output = Path(tmpdir) / "loop.gif"
+            encoder = FFmpegEncoder(_ffmpeg(tmpdir))
+            messages = []
+            
+            assert encoder.encode_sequence("frame_%06d.png", str(output), 30.0, "gif",
+                                           video_filters=["vflip"],
+                                           log_callback=messages.append)
+            args = _args(output)
+            palette = get_palette_path(str(output))
+            
+            palette_run = next(m for m in messages if m.startswith("Running") and
+                               "palettegen" in m)
+            assert "vflip,palettegen=max_colors=256:stats_mode=full" in palette_run
+            assert args[args.index("-i", args.index("-i") + 1) + 1] == str(palette)
+            assert args[args.index("-filter_complex") + 1].startswith("[0:v]vflip,null[frames]")
+            assert args[args.index("-loop") + 1] == "0"
+            assert not palette.exists()
+    
+    def test_frame_palette_single_run(self):
+        """Test that per-frame palettes need no palette pass."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            output = Path(tmpdir) / "loop.gif"
+            messages = []
+            
+            assert FFmpegEncoder(_ffmpeg(tmpdir)).encode_sequence(
+                "frame_%06d.png", str(output), 30.0, "gif_frame_palette",
+                log_callback=messages.append
+            )
+            
+            assert sum(m.startswith("Running") for m in messages) == 1
+            assert _args(output)[_args(output).index("-vf") + 1].startswith("split[frames]")
+    
+    def test_multi_palette_branch(self):
+        """Test that a GIF deliverable quantizes its own branch of the split."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            gif = Path(tmpdir) / "out.gif"
+            encoder = FFmpegEncoder(_ffmpeg(tmpdir))
+            
+            encoder.encode_multi(["-i", "in.mov"], {
+                "h264_high": str(Path(tmpdir) / "out.mp4"), "gif": str(gif)
+            })
+            args = _args(gif)
+            graph = args[args.index("-filter_complex") + 1]
+            
+            assert graph.startswith("[0:v]split=2[out0][out1];[out1]null[frames1]")
+            assert "[frames1][1:v]paletteuse" in graph and graph.endswith("[gif1]")
+            palette_at = args.index("-i", args.index("-i") + 1) + 1
+            assert args[palette_at] == str(get_palette_path(str(gif)))
+            assert args[args.index("-map") + 1] == "[out0]"
+            assert args[args.index("-map", args.index("-map") + 1) + 1] == "[gif1]"
+    
+    def test_size_cap(self):
+        """Test re-encoding with smaller palettes until the file fits."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            output = Path(tmpdir) / "loop.gif"
+            messages = []
+            
+            ok = encode_animated(["-i", "in.mov"], str(output), "gif", max_bytes=3000,
+                                 encoder=FFmpegEncoder(_ffmpeg(tmpdir)),
+                                 log_callback=messages.append)
+            
+            assert ok
+            assert output.stat().st_size == 2500
+            assert "Generating a 64-colour palette for the loop" in messages
+            assert sum(m.startswith("Re-encoding at") for m in messages) == 2
+            assert not get_palette_path(str(output)).exists()
+    
+    def test_size_cap_out_of_reach(self):
+        """Test failure once every step is still too large."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            ok = encode_animated(["-i", "in.mov"], str(Path(tmpdir) / "loop.webp"),
+                                 "webp", max_bytes=100,
+                                 encoder=FFmpegEncoder(_ffmpeg(tmpdir)))
+            
+            assert not ok
+            assert not encode_animated(["-i", "in.mov"], str(Path(tmpdir) / "x.mp4"),
+                                       "h264_high", encoder=FFmpegEncoder(_ffmpeg(tmpdir)))
+    
+    def test_render_output(self):
+        """Test encoding a rendered image sequence with the preset's extension."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for i in range(8):
+                (Path(tmpdir) / f"frame_{i:06d}.png").write_bytes(b"")
+            
+            ok = encode_render_animated(tmpdir, str(Path(tmpdir) / "out.mp4"), 24.0,
+                                        "apng", encoder=FFmpegEncoder(_ffmpeg(tmpdir)))
+            
+            assert ok
+            args = _args(Path(tmpdir) / "out.png")
+            assert args[args.index("-plays") + 1] == "0"
+
+
+class TestJobs:
+    """Tests for size caps in job specs."""
+    
+    def test_max_size(self):
+        """Test that size caps apply to single animated presets."""
+        spec = {"shader_source": "x", "output_dir": "out"}
+        
+        job = create_job("a", {**spec, "preset": "gif", "max_size_mb": 4})
+        assert job.max_size_mb == 4.0
+        assert job.video_path.endswith("output.gif")
+        with pytest.raises(ValueError):
+            create_job("b", {**spec, "preset": "h264_high", "max_size_mb": 4})
+        with pytest.raises(ValueError):
+            create_job("c", {**spec, "preset": "gif", "max_size_mb": "4"})
+        with pytest.raises(ValueError):
+            create_job("d", {**spec, "preset": "gif", "loop_repeats": 3})
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,241 @@
+"""Tests for the render daemon job queue and API."""
+
+import http.client
+import json
+import os
+import stat
+import tempfile
+import threading
+from pathlib import Path
+import pytest
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from looplab.render.daemon import (
+    RenderDaemon, DaemonClient, create_job, create_server, load_daemon_token,
+    QUEUED, RUNNING, DONE, CANCELLED
+)
+
+
+SHADER = "void mainImage(out vec4 c, in vec2 p) { c = vec4(1.0); }"
+
+
+def _spec(**kwargs):
+    spec = {"shader_source": SHADER, "output_dir": "/tmp/looplab-test"}
+    spec.update(kwargs)
+    return spec
+
+
+class TestCreateJob:
+    """Tests for job spec validation."""
+    
+    def test_valid_spec(self):
+        """Test that render settings are passed through."""
+        job = create_job("1", _spec(width=320, height=240, frame_format="store"))
+        
+        assert job.state == QUEUED
+        assert job.settings == {"width": 320, "height": 240, "frame_format": "store"}
+    
+    def test_shader_path(self):
+        """Test loading the shader from a file."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "test.frag"
+            path.write_text(SHADER)
+            job = create_job("1", {"shader_path": str(path), "output_dir": tmpdir})
+            assert job.shader_source == SHADER
+    
+    def test_invalid_specs(self):
+        """Test that incomplete or unknown specs are rejected."""
+        with pytest.raises(ValueError):
+            create_job("1", {"output_dir": "/tmp"})
+        with pytest.raises(ValueError):
+            create_job("1", {"shader_source": SHADER})
+        with pytest.raises(ValueError):
+            create_job("1", _spec(widht=320))
+        with pytest.raises(ValueError):
+            create_job("1", _spec(preset="not_a_preset"))
+        with pytest.raises(ValueError):
+            create_job("1", _spec(fps=10.0, duration=1.0, frame_end=11))
+        with pytest.raises(ValueError):
+            create_job("1", _spec(frame_stride=0))
+        with pytest.raises(ValueError):
+            create_job("1", _spec(post_passes=[{"type": "blur"}]))
+        with pytest.raises(ValueError):
+            create_job("1", _spec(preset="h265_high", encode_jobs=0))
+    
+    def test_preset_sets_video_path(self):
+        """Test that a preset gives the video its container extension."""
+        job = create_job("1", _spec(preset="prores_422"))
+        assert job.video_path.endswith(".mov")
+    
+    def test_several_presets(self):
+        """Test that deliverables get one video path each and the deepest frames."""
+        job = create_job("1", _spec(preset="h264_high", presets=["prores_422", "h264_high"]))
+        
+        assert job.presets == ["h264_high", "prores_422"]
+        assert job.preset == "h264_high"
+        assert job.video_paths["prores_422"].endswith("output_prores_422.mov")
+        assert job.video_path == job.video_paths["h264_high"]
+        assert job.settings["bit_depth"] == 16
+        with pytest.raises(ValueError):
+            create_job("1", _spec(presets=["h264_high", "nope"]))
+        with pytest.raises(ValueError):
+            create_job("1", _spec(presets=["h264_high", "h265_high"], encode_jobs=2))
+    
+    def test_loop_repeats(self):
+        """Test that loop_repeats is a positive single-preset job option."""
+        job = create_job("1", _spec(preset="h264_high", loop_repeats=20))
+        assert job.loop_repeats == 20
+        assert "loop_repeats" not in job.settings
+        with pytest.raises(ValueError):
+            create_job("1", _spec(preset="h264_high", loop_repeats=0))
+        with pytest.raises(ValueError):
+            create_job("1", _spec(presets=["h264_high", "h265_high"], loop_repeats=2))
+    
+    def test_encode_jobs(self):
+        """Test that encode_jobs is a job option, not a render setting."""
+        job = create_job("1", _spec(preset="h265_high", encode_jobs=8))
+        assert job.encode_jobs == 8
+        assert "encode_jobs" not in job.settings
+        assert create_job("1", _spec()).encode_jobs == 1
+    
+    def test_10bit_preset_renders_16bit(self):
+        """Test that 10-bit presets get 16-bit frames unless overridden."""
+        assert create_job("1", _spec(preset="prores_422")).settings["bit_depth"] == 16
+        assert create_job("1", _spec(preset="h264_high")).settings["bit_depth"] == 8
+        job = create_job("1", _spec(preset="prores_4444", bit_depth=8))
+        assert job.settings["bit_depth"] == 8
+
+
+class TestRenderDaemon:
+    """Tests for the queue without executor threads."""
+    
+    def test_submit_and_cancel_queued(self):
+        """Test cancelling a job before it runs."""
+        daemon = RenderDaemon()
+        job = daemon.submit(_spec())
+        
+        assert daemon.get(job.id) is job
+        assert daemon.cancel(job.id) is True
+        assert job.state == CANCELLED
+        assert daemon.cancel(job.id) is False
+        assert daemon.stats()["jobs"][CANCELLED] == 1
+    
+    def test_wait_events(self):
+        """Test that event readers wake on new events and job end."""
+        daemon = RenderDaemon()
+        job = daemon.submit(_spec())
+        events, finished = job.wait_events(timeout=0)
+        assert [e["state"] for e in events] == [QUEUED]
+        assert finished is False
+        
+        def run():
+            job.set_state(RUNNING)
+            job.add_event("progress", frame=1, total=1)
+            job.set_state(DONE)
+        
+        threading.Timer(0.05, run).start()
+        seen = events[-1]["seq"]
+        while True:
+            events, finished = job.wait_events(seen, timeout=5)
+            seen = events[-1]["seq"] if events else seen
+            if finished:
+                break
+        
+        assert job.state == DONE
+        assert job.finished >= job.started > 0
+
+
+class TestDaemonAPI:
+    """Tests for the HTTP API and client."""
+    
+    def _serve(self, daemon, **kwargs):
+        server = create_server(daemon, port=0, token="secret", **kwargs)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+    
+    def test_http_roundtrip(self):
+        """Test submit, status, events and cancel over TCP."""
+        daemon = RenderDaemon()
+        server = self._serve(daemon)
+        try:
+            client = DaemonClient(port=server.server_address[1], timeout=5, token="secret")
+            
+            job = client.submit(_spec(width=64, height=64))
+            assert job["state"] == QUEUED
+            assert client.status(job["id"])["id"] == job["id"]
+            assert len(client.list_jobs()) == 1
+            
+            result = client.cancel(job["id"])
+            assert result["cancelled"] is True
+            
+            states = [e["state"] for e in client.events(job["id"]) if e["type"] == "state"]
+            assert states == [QUEUED, CANCELLED]
+            
+            assert client.health()["jobs"][CANCELLED] == 1
+            
+            with pytest.raises(ValueError):
+                client.submit({"output_dir": "/tmp"})
+            with pytest.raises(ValueError):
+                client.status("missing")
+        finally:
+            server.shutdown()
+            server.server_close()
+    
+    def test_refuses_foreign_requests(self):
+        """Test that other hosts, missing tokens and non-JSON posts are refused."""
+        daemon = RenderDaemon()
+        server = self._serve(daemon)
+        body = json.dumps(_spec())
+        
+        def post(headers):
+            conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=5)
+            try:
+                conn.request("POST", "/jobs", body, headers)
+                return conn.getresponse().status
+            finally:
+                conn.close()
+        
+        try:
+            token = {"Authorization": "Bearer secret"}
+            assert post({"Content-Type": "text/plain", **token}) == 415
+            assert post({"Content-Type": "application/json"}) == 401
+            assert post({"Content-Type": "application/json", "Authorization": "Bearer x"}) == 401
+            assert post({"Content-Type": "application/json", "Host": "evil.example:8765",
+                         **token}) == 403
+            assert daemon.list_jobs() == []
+            assert post({"Content-Type": "application/json; charset=utf-8",
+                         "Host": "localhost:8765", **token}) == 201
+        finally:
+            server.shutdown()
+            server.server_close()
+    
+    def test_token_file(self, tmp_path):
+        """Test that the token is created once and readable by the user only."""
+        path = tmp_path / "looplab" / "daemon_token"
+        
+        assert load_daemon_token(path=path) is None
+        token = load_daemon_token(create=True, path=path)
+        assert token and load_daemon_token(create=True, path=path) == token
+        if os.name != "nt":
+            assert stat.S_IMODE(path.stat().st_mode) == 0o600
+    
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="Unix sockets only")
+    def test_unix_socket(self):
+        """Test the API over a Unix domain socket."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "looplab.sock")
+            daemon = RenderDaemon()
+            server = self._serve(daemon, socket_path=path)
+            try:
+                client = DaemonClient(socket_path=path, timeout=5)
+                job = client.submit(_spec())
+                assert client.status(job["id"])["state"] == QUEUED
+            finally:
+                server.shutdown()
+                server.server_close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,205 @@
+"""Tests for shared-filesystem distributed rendering."""
+
+import os
+import tempfile
+import time
+from pathlib import Path
+import pytest
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from looplab.render.distributed import (
+    LeaseTable, DistributedJob, FarmWorker, ENCODE_LEASE
+)
+
+
+SHADER = "void mainImage(out vec4 c, in vec2 p) { c = vec4(1.0); }"
+
+
+class TestLeaseTable:
+    """Tests for lease files."""
+    
+    def test_exclusive_acquire(self):
+        """Test that a live lease cannot be taken by another worker."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            a = LeaseTable(tmpdir, "a", timeout=60)
+            b = LeaseTable(tmpdir, "b", timeout=60)
+            
+            lease = a.acquire("chunk_000000")
+            assert lease is not None
+            assert lease.generation == 0
+            assert b.acquire("chunk_000000") is None
+            assert b.holder("chunk_000000")["owner"] == "a"
+    
+    def test_release_allows_reclaim(self):
+        """Test that a released lease is free immediately."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            a = LeaseTable(tmpdir, "a")
+            b = LeaseTable(tmpdir, "b")
+            
+            a.acquire("chunk_000000").release()
+            assert b.acquire("chunk_000000") is not None
+    
+    def test_stale_lease_reclaimed(self):
+        """Test that a lease without heartbeats is reclaimed."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            a = LeaseTable(tmpdir, "a")
+            b = LeaseTable(tmpdir, "b", timeout=0.05)
+            
+            lease = a.acquire("chunk_000000")
+            # First sighting starts b's clock for this lease
+            assert b.acquire("chunk_000000") is None
+            time.sleep(0.1)
+            
+            stolen = b.acquire("chunk_000000")
+            assert stolen is not None
+            assert stolen.generation == 1
+            
+            # The original holder notices on its next heartbeat
+            assert lease.heartbeat() is False
+            assert lease.lost is True
+    
+    def test_heartbeat_keeps_lease(self):
+        """Test that a refreshed lease is not considered stale."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            a = LeaseTable(tmpdir, "a")
+            b = LeaseTable(tmpdir, "b", timeout=0.15)
+            
+            lease = a.acquire("chunk_000000")
+            assert b.acquire("chunk_000000") is None
+            for _ in range(4):
+                time.sleep(0.05)
+                # Make each heartbeat visible even on coarse mtime clocks
+                os.utime(lease.path, ns=(time.time_ns(), time.time_ns()))
+                assert lease.heartbeat() is True
+                assert b.acquire("chunk_000000") is None
+
+
+class TestDistributedJob:
+    """Tests for job directories."""
+    
+    def test_create_and_load(self):
+        """Test chunking of the timeline."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            job_dir = Path(tmpdir) / "job"
+            spec = {"shader_source": SHADER, "fps": 10.0, "duration": 2.5}
+            DistributedJob.create(job_dir, spec, chunk_size=10)
+            
+            job = DistributedJob.load(job_dir)
+            assert job.total_frames == 25
+            assert job.chunk_count == 3
+            assert list(job.chunk_frames(2)) == list(range(20, 25))
+            assert job.output_dir == job_dir / "frames"
+            
+            with pytest.raises(ValueError):
+                DistributedJob.create(job_dir, spec)
+    
+    def test_frame_range(self):
+        """Test that chunks cover only the selected frames."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            spec = {"shader_source": SHADER, "fps": 10.0, "duration": 3.0,
+                    "frame_start": 5, "frame_end": 25, "frame_stride": 2}
+            job = DistributedJob.create(Path(tmpdir) / "job", spec, chunk_size=4)
+            
+            assert job.total_frames == 10
+            assert job.chunk_count == 3
+            assert list(job.chunk_frames(0)) == [5, 7, 9, 11]
+            assert list(job.chunk_frames(2)) == [21, 23]
+            
+            with pytest.raises(ValueError):
+                DistributedJob.create(
+                    Path(tmpdir) / "video", {**spec, "preset": "h264_high"}
+                )
+    
+    def test_rejects_frame_store(self):
+        """Test that single-writer frame stores are rejected."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with pytest.raises(ValueError):
+                DistributedJob.create(
+                    Path(tmpdir) / "job",
+                    {"shader_source": SHADER, "frame_format": "store"}
+                )
+    
+    def test_status(self):
+        """Test done and leased chunk reporting."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            job = DistributedJob.create(
+                Path(tmpdir) / "job",
+                {"shader_source": SHADER, "fps": 10.0, "duration": 3.0},
+                chunk_size=10
+            )
+            job.mark_chunk_done(0, "a")
+            LeaseTable(job.lease_dir, "b").acquire(job.chunk_name(1))
+            
+            status = job.status()
+            assert status["done"] == 1
+            assert status["leased"] == {"chunk_000001": "b"}
+            assert status["pending"] == 1
+            assert status["encode"] == "none"
+
+
+class _FakeWorker(FarmWorker):
+    """Farm worker that records chunks instead of rendering."""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.rendered = []
+        self.encoded = False
+    
+    def _render_chunk(self, chunk, lease):
+        self.rendered.append(chunk)
+        return True
+    
+    def _run_encode(self):
+        self.encoded = True
+        (self.job.job_dir / "encode.done").write_text(self.worker_id)
+
+
+class TestFarmWorker:
+    """Tests for the work-stealing loop."""
+    
+    def _job(self, tmpdir, **spec):
+        spec = {"shader_source": SHADER, "fps": 10.0, "duration": 3.0, **spec}
+        return DistributedJob.create(Path(tmpdir) / "job", spec, chunk_size=10)
+    
+    def test_single_worker_renders_all(self):
+        """Test that one worker completes every chunk and encodes."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            job = self._job(tmpdir, preset="h264_high")
+            worker = _FakeWorker(job, "a", poll_interval=0.01)
+            
+            assert worker.run() is True
+            assert worker.rendered == [0, 1, 2]
+            assert worker.encoded is True
+            assert job.finished
+    
+    def test_skips_chunks_leased_elsewhere(self):
+        """Test that live leases are left to their holder."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            job = self._job(tmpdir)
+            other = LeaseTable(job.lease_dir, "other").acquire(job.chunk_name(1))
+            worker = _FakeWorker(job, "a", poll_interval=0.01)
+            
+            assert worker._work_once() is True
+            assert worker._work_once() is True
+            assert worker._work_once() is False
+            assert worker.rendered == [0, 2]
+            assert not job.all_done
+            other.release()
+    
+    def test_encode_lease_is_exclusive(self):
+        """Test that only one worker encodes."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            job = self._job(tmpdir, preset="h264_high")
+            for chunk in range(job.chunk_count):
+                job.mark_chunk_done(chunk, "x")
+            LeaseTable(job.lease_dir, "other").acquire(ENCODE_LEASE)
+            
+            worker = _FakeWorker(job, "a", poll_interval=0.01)
+            assert worker._work_once() is False
+            assert worker.encoded is False
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,113 @@
+"""Tests for the fast GL call mode (no GL context needed)."""
+
+import threading
+
+import pytest
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from looplab.gl import fast_gl
+from looplab.gl import shader_manager
+from looplab.gl.shader_manager import ShaderManager, ShaderProgram
+
+
+class RecordingGL:
+    """Stand-in for FastGL that records calls instead of issuing them."""
+    
+    def __init__(self):
+        self.calls = []
+        self.uniform_setters = {
+            n: self._recorder(f"glUniform{n}f") for n in (1, 2, 3, 4)
+        }
+        self.glUseProgram = self._recorder("glUseProgram")
+        self.glUniform1i = self._recorder("glUniform1i")
+        self.glUniform1f = self.uniform_setters[1]
+    
+    def _recorder(self, name):
+        def record(*args):
+            self.calls.append((name, *args))
+        return record
+
+
+@pytest.fixture
+def recording_gl(monkeypatch):
+    gl = RecordingGL()
+    monkeypatch.setattr(fast_gl, "current", lambda: gl)
+    monkeypatch.setattr(shader_manager, "OPENGL_AVAILABLE", True)
+    return gl
+
+
+class TestFastMode:
+    """Tests for per-thread enablement."""
+    
+    def test_off_by_default(self):
+        """Test that threads start with checked calls."""
+        result = []
+        thread = threading.Thread(target=lambda: result.append(fast_gl.current()))
+        thread.start()
+        thread.join()
+        
+        assert result == [None]
+    
+    def test_checks_env_var(self, monkeypatch):
+        """Test that LOOPLAB_GL_CHECKS keeps checked calls."""
+        monkeypatch.setenv("LOOPLAB_GL_CHECKS", "1")
+        
+        assert fast_gl.checks_forced()
+        assert not fast_gl.enable()
+        assert fast_gl.current() is None
+    
+    def test_checks_env_var_zero(self, monkeypatch):
+        """Test that LOOPLAB_GL_CHECKS=0 does not force checks."""
+        monkeypatch.setenv("LOOPLAB_GL_CHECKS", "0")
+        
+        assert not fast_gl.checks_forced()
+    
+    def test_renderers_opt_in(self):
+        """Test that renderers keep checked calls unless asked."""
+        pytest.importorskip("PySide6")
+        from looplab.render.frame_renderer import FrameRenderer
+        
+        assert FrameRenderer().fast_gl is False
+
+
+class TestFastUniforms:
+    """Tests for uniform updates through raw calls."""
+    
+    def make_program(self):
+        return ShaderProgram(
+            program_id=7, is_valid=True,
+            uniform_locations={"u_time": 1, "u_frame": 2, "u_resolution": 3, "u_missing": -1}
+        )
+    
+    def test_sets_by_type(self, recording_gl):
+        """Test that values go to the setter for their type."""
+        program = self.make_program()
+        
+        ShaderManager().set_uniforms(program, {
+            "u_time": 1.5, "u_frame": 3, "u_resolution": (64.0, 32.0), "u_missing": 1.0
+        })
+        
+        assert recording_gl.calls == [
+            ("glUseProgram", 7),
+            ("glUniform1f", 1, 1.5),
+            ("glUniform1i", 2, 3),
+            ("glUniform2f", 3, 64.0, 32.0),
+        ]
+    
+    def test_skips_unchanged(self, recording_gl):
+        """Test that only changed uniforms are sent again."""
+        program = self.make_program()
+        manager = ShaderManager()
+        
+        manager.set_uniforms(program, {"u_time": 1.5, "u_frame": 3})
+        recording_gl.calls.clear()
+        manager.set_uniforms(program, {"u_time": 2.0, "u_frame": 3})
+        
+        assert recording_gl.calls == [("glUseProgram", 7), ("glUniform1f", 1, 2.0)]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
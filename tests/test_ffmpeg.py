@@ -0,0 +1,251 @@
+"""Tests for FFmpeg progress reporting and cancellation."""
+
+import json
+import os
+import stat
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from looplab.encode.ffmpeg import (
+    EncodeProgress, FFmpegEncoder, ProgressParser, count_sequence_frames,
+    encode_render_deliverables, get_output_paths_for_presets
+)
+
+
+# Stand-in FFmpeg: progress blocks on stdout, a warning on stderr
+FAKE_FFMPEG = """
+import sys, time
+for frame in (10, 20, 30):
+    print(f"frame={frame}\\nfps=20.0\\nout_time_us={frame * 33333}\\nspeed=0.8x")
+    print("progress=" + ("end" if frame == 30 else "continue"), flush=True)
+    time.sleep(0.01)
+print("deprecated pixel format used", file=sys.stderr, flush=True)
+sys.exit(int(sys.argv[-1].endswith("fail.mp4")))
+"""
+
+# Stand-in FFmpeg that never finishes
+HANGING_FFMPEG = """
+import time
+print("frame=1\\nprogress=continue", flush=True)
+time.sleep(60)
+"""
+
+# Stand-in FFmpeg for multi-output runs: records its arguments, writes every
+# output file and logs one x265 message and one general message
+MULTI_FFMPEG = """
+import json, os, sys
+args = sys.argv[1:]
+json.dump(args, open(os.path.join(os.path.dirname(sys.argv[0]), "args.json"), "w"))
+for i, arg in enumerate(args):
+    if arg.endswith((".mp4", ".mov")) and args[i - 1] != "-i":
+        open(arg, "w").write("video")
+print("[libx265 @ 0x1234] x265 warning", file=sys.stderr)
+print("general warning", file=sys.stderr, flush=True)
+print("frame=3\\nprogress=end", flush=True)
+"""
+
+
+def _script(directory: str, source: str) -> str:
+    path = Path(directory) / "ffmpeg"
+    path.write_text(f"#!{sys.executable}\n{source}")
+    path.chmod(path.stat().st_mode | stat.S_IXUSR)
+    return str(path)
+
+
+class TestProgressParser:
+    """Tests for parsing -progress output."""
+    
+    def test_blocks(self):
+        """Test that each block yields one snapshot."""
+        parser = ProgressParser(total_frames=100)
+        lines = ["frame=25", "fps=50.0", "out_time_us=1000000", "speed=2.5x", "progress=continue"]
+        
+        results = [parser.feed(line) for line in lines]
+        
+        assert results[:-1] == [None] * 4
+        progress = results[-1]
+        assert progress.frame == 25
+        assert progress.fps == 50.0
+        assert progress.speed == 2.5
+        assert progress.out_time == 1.0
+        assert not progress.done
+        assert progress.eta_seconds == pytest.approx(1.5)
+        
+        parser.feed("frame=100")
+        assert parser.feed("progress=end").done
+        # Snapshots are not changed by later lines
+        assert progress.frame == 25
+    
+    def test_not_available(self):
+        """Test N/A values before the first frame."""
+        parser = ProgressParser()
+        parser.feed("speed=N/A")
+        parser.feed("fps=N/A")
+        progress = parser.feed("progress=continue")
+        
+        assert progress.speed == 0.0
+        assert progress.eta_seconds is None
+    
+    def test_describe(self):
+        """Test the one-line summary."""
+        progress = EncodeProgress(frame=120, total_frames=900, fps=45.0, speed=1.5)
+        
+        assert progress.describe() == "frame 120/900 (13%), 45.0 fps, 1.50x, ETA 0:17"
+        assert EncodeProgress(frame=3).describe() == "frame 3"
+    
+    def test_count_sequence_frames(self):
+        """Test counting the files of an image sequence."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for i in range(3):
+                (Path(tmpdir) / f"frame_{i:06d}.png").touch()
+            (Path(tmpdir) / "notes.txt").touch()
+            
+            assert count_sequence_frames(tmpdir, "frame_%06d.png") == 3
+
+
+@pytest.mark.skipif(os.name == "nt", reason="Stand-in FFmpeg needs a shebang")
+class TestEncoder:
+    """Tests for running an FFmpeg process."""
+    
+    def test_progress_and_logs(self):
+        """Test that progress and log lines reach the callbacks."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            encoder = FFmpegEncoder(_script(tmpdir, FAKE_FFMPEG))
+            frames, reports, logs = [], [], []
+            
+            ok = encoder.encode_sequence(
+                "frame_%06d.png", str(Path(tmpdir) / "out.mp4"), 30.0,
+                progress_callback=lambda current, total: frames.append((current, total)),
+                log_callback=logs.append,
+                total_frames=30,
+                status_callback=reports.append
+            )
+        
+        assert ok
+        assert frames == [(10, 30), (20, 30), (30, 30)]
+        assert reports[-1].done
+        assert encoder.last_progress.frame == 30
+        assert "FFmpeg: deprecated pixel format used" in logs
+        assert list(encoder.log_lines) == ["deprecated pixel format used"]
+    
+    def test_failure(self):
+        """Test that a failing FFmpeg reports its exit code."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            encoder = FFmpegEncoder(_script(tmpdir, FAKE_FFMPEG))
+            logs = []
+            
+            ok = encoder.encode_sequence(
+                "frame_%06d.png", str(Path(tmpdir) / "fail.mp4"), 30.0,
+                log_callback=logs.append
+            )
+        
+        assert not ok
+        assert logs[-1] == "FFmpeg exited with code 1"
+    
+    def test_cancel(self):
+        """Test that cancel stops a hanging encode promptly."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            encoder = FFmpegEncoder(_script(tmpdir, HANGING_FFMPEG))
+            logs = []
+            
+            timer = threading.Timer(0.3, encoder.cancel)
+            timer.start()
+            start = time.monotonic()
+            ok = encoder.encode_sequence(
+                "frame_%06d.png", str(Path(tmpdir) / "out.mp4"), 30.0,
+                log_callback=logs.append
+            )
+            timer.join()
+        
+        assert not ok
+        assert time.monotonic() - start < 5.0
+        assert logs[-1] == "Encoding cancelled"
+        assert encoder.process is None
+
+
+
+@pytest.mark.skipif(os.name == "nt", reason="Stand-in FFmpeg needs a shebang")
+class TestMultiOutput:
+    """Tests for encoding several presets in one FFmpeg run."""
+    
+    def test_output_paths(self):
+        """Test that several deliverables are named after their presets."""
+        assert get_output_paths_for_presets("out/video.mp4", ["prores_422"]) == {
+            "prores_422": "out/video.mov"
+        }
+        assert get_output_paths_for_presets("out/video.mp4", ["h264_high", "prores_422"]) == {
+            "h264_high": "out/video_h264_high.mp4",
+            "prores_422": "out/video_prores_422.mov",
+        }
+    
+    def test_single_decode_graph(self):
+        """Test that the input is filtered once and split to every encoder."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            encoder = FFmpegEncoder(_script(tmpdir, MULTI_FFMPEG))
+            outputs = get_output_paths_for_presets(
+                str(Path(tmpdir) / "out.mp4"), ["h264_high", "h265_high", "prores_422"]
+            )
+            logs = []
+            
+            results = encoder.encode_multi(
+                ["-i", "frame_%06d.png"], outputs, video_filters=["vflip"],
+                total_frames=3, log_callback=logs.append
+            )
+            args = json.loads((Path(tmpdir) / "args.json").read_text())
+        
+        assert args.count("-i") == 1
+        graph = args[args.index("-filter_complex") + 1]
+        assert graph == "[0:v]vflip,split=3[out0][out1][out2]"
+        assert [args[i + 1] for i, arg in enumerate(args) if arg == "-map"] == [
+            "[out0]", "[out1]", "[out2]"
+        ]
+        
+        assert [r.preset for r in results] == ["h264_high", "h265_high", "prores_422"]
+        assert all(r.success and r.size == 5 for r in results)
+        assert results[0].log_lines == ["general warning"]
+        assert results[1].log_lines == ["[libx265 @ 0x1234] x265 warning", "general warning"]
+        assert f"[prores_422] Encoding complete: {outputs['prores_422']}" in logs
+    
+    def test_thread_budget(self):
+        """Test that every output's encoder is limited to the thread budget."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            encoder = FFmpegEncoder(_script(tmpdir, MULTI_FFMPEG), threads=3)
+            outputs = get_output_paths_for_presets(
+                str(Path(tmpdir) / "out.mp4"), ["h264_high", "prores_422"]
+            )
+            
+            encoder.encode_multi(["-i", "frame_%06d.png"], outputs, total_frames=3)
+            args = json.loads((Path(tmpdir) / "args.json").read_text())
+        
+        for path in outputs.values():
+            assert args[args.index(path) - 2:args.index(path)] == ["-threads", "3"]
+    
+    def test_render_deliverables(self):
+        """Test encoding a render output directory to several presets."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            frames = Path(tmpdir) / "frames"
+            frames.mkdir()
+            for i in range(3):
+                (frames / f"frame_{i:06d}.png").write_bytes(b"")
+            encoder = FFmpegEncoder(_script(tmpdir, MULTI_FFMPEG))
+            
+            results = encode_render_deliverables(
+                str(frames), str(Path(tmpdir) / "out.mp4"), 24.0,
+                ["h264_high", "h264_high", "avi_mjpeg"], encoder=encoder
+            )
+            args = json.loads((Path(tmpdir) / "args.json").read_text())
+        
+        assert [r.preset for r in results] == ["h264_high", "avi_mjpeg"]
+        assert results[1].output_path.endswith("out_avi_mjpeg.avi")
+        assert args[args.index("-framerate") + 1] == "24.0"
+        assert "split=2" in args[args.index("-filter_complex") + 1]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
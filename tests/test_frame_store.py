@@ -0,0 +1,110 @@
+"""Tests for the memory-mapped raw frame store."""
+
+import tempfile
+from pathlib import Path
+import numpy as np
+import pytest
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from looplab.render.frame_store import (
+    RawFrameStore, get_frame_store_path, open_frame_store
+)
+
+
+def _frame(index: int, width: int = 8, height: int = 4) -> np.ndarray:
+    """Create a distinguishable top-down RGBA frame."""
+    frame = np.zeros((height, width, 4), dtype=np.uint8)
+    frame[..., 0] = np.arange(height)[:, None]  # row index in red
+    frame[..., 1] = index
+    frame[..., 3] = 255
+    return frame
+
+
+class TestRawFrameStore:
+    """Tests for RawFrameStore."""
+    
+    def test_create_preallocates(self):
+        """Test that the file holds header plus every frame."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = get_frame_store_path(tmpdir)
+            with RawFrameStore.create(path, 8, 4, frame_count=10, fps=30.0) as store:
+                expected = store.header_size + 10 * store.frame_bytes
+            
+            assert path.stat().st_size == expected
+            assert store.header_size % 4096 == 0
+    
+    def test_roundtrip_random_access(self):
+        """Test writing frames out of order and reading them back."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "frames.llraw"
+            with RawFrameStore.create(path, 8, 4, frame_count=5, fps=24.0) as store:
+                for i in (3, 0, 4):
+                    store.write_frame(i, _frame(i))
+            
+            store = RawFrameStore.open(path)
+            assert (store.width, store.height, len(store)) == (8, 4, 5)
+            assert store.fps == 24.0
+            assert store.written_frames() == [0, 3, 4]
+            assert not store.is_written(1)
+            np.testing.assert_array_equal(store.get_frame(3), _frame(3))
+            store.close()
+    
+    def test_bottom_up_storage(self):
+        """Test that slots are in GL row order and get_frame flips them."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "frames.llraw"
+            with RawFrameStore.create(path, 8, 4, frame_count=1, fps=30.0) as store:
+                store.write_frame(0, _frame(0))
+                slot = store.frame_slot(0)
+                
+                # Bottom row of the image is stored first
+                assert slot[0, 0, 0] == 3
+                assert store.get_frame(0)[0, 0, 0] == 0
+                assert store.ffmpeg_filters() == ["vflip"]
+    
+    def test_sixteen_bit_layout(self):
+        """Test uint16 stores map to rgba64le."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "frames.llraw"
+            with RawFrameStore.create(path, 8, 4, 2, 30.0, dtype=np.uint16) as store:
+                assert store.pix_fmt == "rgba64le"
+                assert store.frame_bytes == 8 * 4 * 4 * 2
+    
+    def test_ffmpeg_input_args(self):
+        """Test rawvideo input options skip the header."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "frames.llraw"
+            with RawFrameStore.create(path, 8, 4, 2, 30.0) as store:
+                args = store.ffmpeg_input_args()
+            
+            assert args[args.index("-f") + 1] == "rawvideo"
+            assert args[args.index("-pix_fmt") + 1] == "rgba"
+            assert args[args.index("-video_size") + 1] == "8x4"
+            assert args[args.index("-skip_initial_bytes") + 1] == str(store.header_size)
+            assert args[-1] == str(path)
+    
+    def test_ffmpeg_input_args_start(self):
+        """Test that a start frame skips whole frames after the header."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "frames.llraw"
+            with RawFrameStore.create(path, 8, 4, 6, 30.0) as store:
+                args = store.ffmpeg_input_args(start=3)
+            
+            skip = int(args[args.index("-skip_initial_bytes") + 1])
+            assert skip == store.header_size + 3 * store.frame_bytes
+    
+    def test_open_rejects_other_files(self):
+        """Test that non-store files are rejected."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "frame_000000.png"
+            path.write_bytes(b"\x89PNG" + b"\x00" * 100)
+            
+            with pytest.raises(ValueError):
+                RawFrameStore.open(path)
+            assert open_frame_store(path) is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
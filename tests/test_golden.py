@@ -0,0 +1,119 @@
+"""Tests for golden-image regression checks."""
+
+import math
+import tempfile
+from pathlib import Path
+import numpy as np
+import pytest
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from looplab.render.golden import (
+    GoldenSet, ShaderRender, ShaderCheck, compute_psnr, format_report,
+    get_example_shaders, get_golden_frames, hash_frame,
+    IDENTICAL, WITHIN_TOLERANCE, CHANGED, FAILED, STILL_FAILING, NEW, MISSING
+)
+
+
+def _frame(value: int = 100) -> np.ndarray:
+    frame = np.full((8, 16, 4), value, dtype=np.uint8)
+    frame[..., 3] = 255
+    return frame
+
+
+def _render(name: str, frame: np.ndarray, render_ms: float = 2.0) -> ShaderRender:
+    return ShaderRender(name=name, frames={0: frame, 5: frame}, render_ms=render_ms)
+
+
+class TestHelpers:
+    """Tests for frame selection and comparison helpers."""
+    
+    def test_golden_frames(self):
+        """Test evenly spaced frames starting at 0."""
+        assert get_golden_frames(900, 4) == [0, 225, 450, 675]
+        assert get_golden_frames(3, 10) == [0, 1, 2]
+    
+    def test_hash_and_psnr(self):
+        """Test exact hashes and tolerant comparison."""
+        a = _frame(100)
+        b = a.copy()
+        b[0, 0, 0] = 101
+        
+        assert hash_frame(a) == hash_frame(a.copy())
+        assert hash_frame(a) != hash_frame(b)
+        assert compute_psnr(a, a) == math.inf
+        assert compute_psnr(a, b) > 50
+        assert compute_psnr(a, _frame(140)) < 20
+        assert compute_psnr(a, a[:4]) == 0.0
+    
+    def test_example_shaders(self):
+        """Test discovery of the bundled examples."""
+        paths = get_example_shaders()
+        assert paths
+        assert all(p.suffix in (".frag", ".glsl") for p in paths)
+
+
+class TestGoldenSet:
+    """Tests for recording and checking golden sets."""
+    
+    def _golden(self, tmpdir) -> GoldenSet:
+        golden = GoldenSet(tmpdir)
+        golden.data["frames"] = [0, 5]
+        golden.add(_render("a.frag", _frame(100)))
+        golden.add(_render("b.frag", _frame(100)))
+        golden.add(ShaderRender(name="broken.frag", error="compile error"))
+        golden.save()
+        return GoldenSet.load(tmpdir)
+    
+    def test_roundtrip(self):
+        """Test that settings, frames and references are stored."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            golden = self._golden(tmpdir)
+            assert golden.frames == [0, 5]
+            assert golden.settings.width == 160
+            assert golden.reference_path("a.frag", 5).exists()
+    
+    def test_check_statuses(self):
+        """Test identical, tolerant, changed and failure results."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            golden = self._golden(tmpdir)
+            
+            assert golden.check(_render("a.frag", _frame(100))).status == IDENTICAL
+            
+            nearly = _frame(100)
+            nearly[0, 0, 0] = 102
+            check = golden.check(_render("a.frag", nearly))
+            assert check.status == WITHIN_TOLERANCE
+            assert check.psnr > 40
+            
+            check = golden.check(_render("a.frag", _frame(200)))
+            assert check.status == CHANGED
+            assert check.regression
+            
+            failed = ShaderRender(name="a.frag", error="boom")
+            assert golden.check(failed).status == FAILED
+            broken = ShaderRender(name="broken.frag", error="compile error")
+            assert golden.check(broken).status == STILL_FAILING
+            assert golden.check(_render("c.frag", _frame())).status == NEW
+            
+            missing = golden.missing(["a.frag", "broken.frag"])
+            assert [(c.name, c.status) for c in missing] == [("b.frag", MISSING)]
+    
+    def test_report_orders_regressions_first(self):
+        """Test that the report lists regressions and slowdowns first."""
+        checks = [
+            ShaderCheck("ok.frag", IDENTICAL, render_ms=2.0, golden_render_ms=2.0),
+            ShaderCheck("slow.frag", IDENTICAL, render_ms=6.0, golden_render_ms=2.0),
+            ShaderCheck("bad.frag", CHANGED, psnr=12.0, message="frame 0: 12.0 dB"),
+        ]
+        lines = format_report(checks).splitlines()
+        
+        assert "bad.frag" in lines[0]
+        assert "slow.frag" in lines[1] and "SLOWER" in lines[1]
+        assert "ok.frag" in lines[2]
+        assert lines[-1].startswith("3 shaders")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,191 @@
+"""Tests for frame writer backends."""
+
+import struct
+import tempfile
+import zlib
+from pathlib import Path
+import numpy as np
+import pytest
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from looplab.render.image_writer import (
+    FrameWriter, PngFrameWriter, TiffFrameWriter, NpyFrameWriter,
+    create_frame_writer, load_frame, load_frame_png, FRAME_FORMATS
+)
+from looplab.render.writer_benchmark import benchmark_writers, make_test_frames
+
+
+def _test_frame() -> np.ndarray:
+    """Small deterministic RGBA frame."""
+    return make_test_frames(32, 16, 1)[0]
+
+
+def _test_frame16() -> np.ndarray:
+    """Small 16-bit RGBA gradient with values no 8-bit frame can hold."""
+    values = np.arange(32 * 16 * 4, dtype=np.uint32) * 31
+    return (values % 65536).astype(np.uint16).reshape(16, 32, 4)
+
+
+def _filtered_png16(pixels: np.ndarray, filters) -> bytes:
+    """16-bit RGBA PNG whose rows cycle through the given filter types."""
+    height, width, channels = pixels.shape
+    bpp = channels * 2
+    rows = np.frombuffer(pixels.astype(">u2").tobytes(), dtype=np.uint8)
+    rows = rows.reshape(height, width * bpp).astype(np.int32)
+    
+    data = b""
+    previous = np.zeros(width * bpp, dtype=np.int32)
+    for y in range(height):
+        kind = filters[y % len(filters)]
+        line = rows[y]
+        left = np.concatenate([np.zeros(bpp, dtype=np.int32), line[:-bpp]])
+        up_left = np.concatenate([np.zeros(bpp, dtype=np.int32), previous[:-bpp]])
+        base = left + previous - up_left
+        pa, pb, pc = abs(base - left), abs(base - previous), abs(base - up_left)
+        paeth = np.where((pa <= pb) & (pa <= pc), left, np.where(pb <= pc, previous, up_left))
+        predictor = [0, left, previous, (left + previous) // 2, paeth][kind]
+        data += bytes([kind]) + ((line - predictor) & 0xFF).astype(np.uint8).tobytes()
+        previous = line
+    
+    def chunk(kind: bytes, body: bytes) -> bytes:
+        return (struct.pack(">I", len(body)) + kind + body
+                + struct.pack(">I", zlib.crc32(kind + body)))
+    
+    header = struct.pack(">IIBBBBB", width, height, 16, 6, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header)
+            + chunk(b"IDAT", zlib.compress(data)) + chunk(b"IEND", b""))
+
+
+class TestFrameWriters:
+    """Tests for FrameWriter implementations."""
+    
+    @pytest.mark.parametrize("writer", [
+        PngFrameWriter(compress_level=0),
+        PngFrameWriter(compress_level=9, strategy="rle"),
+        TiffFrameWriter(),
+        NpyFrameWriter(),
+    ])
+    def test_lossless_roundtrip(self, writer):
+        """Test that every backend reproduces the frame exactly."""
+        pixels = _test_frame()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / writer.frame_filename(7)
+            assert writer.write(pixels, path) is True
+            np.testing.assert_array_equal(load_frame(path), pixels)
+    
+    @pytest.mark.parametrize("writer", [
+        PngFrameWriter(compress_level=0),
+        PngFrameWriter(compress_level=6),
+        TiffFrameWriter(),
+        NpyFrameWriter(),
+    ])
+    def test_16bit_roundtrip(self, writer):
+        """Test that 16-bit frames keep every sample."""
+        pixels = _test_frame16()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / writer.frame_filename(3)
+            assert writer.write(pixels, path) is True
+            loaded = load_frame(path)
+            assert loaded.dtype == np.uint16
+            np.testing.assert_array_equal(loaded, pixels)
+    
+    def test_writers_must_write(self):
+        """Test that a writer without ``write`` cannot be created."""
+        class NoWrite(FrameWriter):
+            extension = "raw"
+        
+        with pytest.raises(TypeError):
+            NoWrite()
+    
+    def test_16bit_png_readable_by_pillow(self):
+        """Test that 16-bit PNGs are valid files for other readers."""
+        from PIL import Image
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "frame.png"
+            PngFrameWriter().write(_test_frame16(), path)
+            with Image.open(path) as image:
+                assert image.size == (32, 16)
+    
+    def test_16bit_png_filters(self):
+        """Test decoding every PNG row filter, as other encoders use them."""
+        pixels = _test_frame16()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "frame.png"
+            path.write_bytes(_filtered_png16(pixels, [0, 1, 2, 3, 4]))
+            np.testing.assert_array_equal(load_frame_png(path), pixels)
+    
+    def test_16bit_png_from_other_writers(self):
+        """Test 16-bit greyscale PNGs and files too short to decode."""
+        from PIL import Image
+        
+        grey = (np.arange(16 * 32, dtype=np.uint16) * 97).reshape(16, 32)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "grey.png"
+            Image.fromarray(grey).save(path)
+            loaded = load_frame_png(path)
+            
+            assert loaded.dtype == np.uint16
+            np.testing.assert_array_equal(loaded[..., 0], grey)
+            np.testing.assert_array_equal(loaded[..., 2], grey)
+            assert (loaded[..., 3] == 65535).all()
+            
+            path.write_bytes(b"\x89PNG\r\n\x1a\n" + b"\x00" * 12)
+            with pytest.raises(OSError):
+                load_frame_png(path)
+    
+    def test_qoi_rejects_16bit(self):
+        """Test that 8-bit-only formats refuse 16-bit renders."""
+        with pytest.raises(ValueError):
+            create_frame_writer("qoi", bit_depth=16)
+        assert create_frame_writer("tiff", bit_depth=16).supports_16bit is True
+    
+    def test_frame_pattern_follows_backend(self):
+        """Test that the FFmpeg pattern matches the written file names."""
+        writer = create_frame_writer("tiff")
+        assert writer.frame_pattern == "frame_%06d.tiff"
+        assert writer.frame_filename(12) == writer.frame_pattern % 12
+    
+    def test_npy_not_ffmpeg_readable(self):
+        """Test that npy frames are flagged as not encodable."""
+        assert create_frame_writer("npy").ffmpeg_readable is False
+        assert create_frame_writer("png").ffmpeg_readable is True
+    
+    def test_png_compress_level_clamped(self):
+        """Test that out-of-range PNG levels are clamped."""
+        assert create_frame_writer("png", png_compress_level=42).compress_level == 9
+        assert create_frame_writer("png", png_compress_level=-3).compress_level == 0
+    
+    def test_unknown_format(self):
+        """Test that unknown formats are rejected."""
+        with pytest.raises(ValueError):
+            create_frame_writer("exr")
+    
+    def test_all_formats_registered(self):
+        """Test registry contents."""
+        assert set(FRAME_FORMATS) == {"png", "qoi", "tiff", "npy"}
+
+
+class TestWriterBenchmark:
+    """Tests for the writer benchmark harness."""
+    
+    def test_benchmark_reports_results(self):
+        """Test that the benchmark reports throughput and sizes."""
+        results = benchmark_writers(
+            width=32, height=16, frames=2,
+            candidates=[("png", PngFrameWriter()), ("npy", NpyFrameWriter())]
+        )
+        
+        assert [r.label for r in results] == ["png", "npy"]
+        for result in results:
+            assert result.bytes_per_frame > 0
+            assert result.mb_per_second > 0
+        
+        # npy stores raw pixels plus a small header
+        assert results[1].bytes_per_frame >= 32 * 16 * 4
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
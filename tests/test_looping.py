@@ -0,0 +1,176 @@
+"""Tests for loop-aware encoding."""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from looplab.encode.ffmpeg import PRESETS, FFmpegEncoder
+from looplab.encode.looping import (
+    encode_render_loop, get_loop_gop, get_loop_output_args, repeat_loop
+)
+from looplab.encode.segmented import SegmentedEncoder
+
+
+# Stand-in FFmpeg: an encode writes the frame count of its input sequence
+# and its arguments; a stream copy writes the input's count times the loops,
+# and a concat the sum of its segments
+FAKE_FFMPEG = """
+import glob, json, os, sys
+args = sys.argv[1:]
+output = args[-1]
+source = args[args.index("-i") + 1]
+if "-stream_loop" in args:
+    loops = int(args[args.index("-stream_loop") + 1]) + 1
+    frames = json.load(open(source))["frames"] * loops
+elif "concat" in args:
+    names = [l.split("'")[1] for l in open(source) if l.startswith("file")]
+    frames = sum(json.load(open(os.path.join(os.path.dirname(source), n)))["frames"]
+                 for n in names)
+else:
+    frames = len(glob.glob(source.replace("%06d", "*")))
+    if "-frames:v" in args:
+        frames = min(frames, int(args[args.index("-frames:v") + 1]))
+json.dump({"frames": frames, "args": args}, open(output, "w"))
+print(f"frame={frames}\\nprogress=end", flush=True)
+"""
+
+
+def _ffmpeg(directory: str) -> str:
+    path = Path(directory) / "ffmpeg"
+    path.write_text(f"#!{sys.executable}\n{FAKE_FFMPEG}")
+    path.chmod(0o755)
+    return str(path)
+
+
+class TestLoopGop:
+    """Tests for choosing loop GOPs."""
+    
+    def test_gop_divides_loop(self):
+        """Test that the GOP is the divisor nearest two seconds."""
+        assert get_loop_gop(900, 30.0) == 60
+        assert get_loop_gop(720, 24.0) == 48
+        assert get_loop_gop(700, 30.0) == 70
+    
+    def test_short_and_prime_loops(self):
+        """Test loops shorter than a GOP and loops without a usable divisor."""
+        assert get_loop_gop(45, 30.0) == 45
+        assert get_loop_gop(907, 30.0) == 60
+    
+    def test_output_args(self):
+        """Test closed, fixed GOPs for x264 and none for intra codecs."""
+        args = get_loop_output_args(PRESETS["h264_high"], 900, 30.0)
+        
+        assert args == ["-g", "60", "-keyint_min", "60", "-sc_threshold", "0",
+                        "-flags", "+cgop"]
+        assert "open-gop=0" in get_loop_output_args(PRESETS["h265_high"], 900, 30.0)[-1]
+        assert get_loop_output_args(PRESETS["prores_422"], 900, 30.0) == []
+
+
+@pytest.mark.skipif(os.name == "nt", reason="Stand-in FFmpeg needs a shebang")
+class TestRepeat:
+    """Tests for repeating an encoded loop with a stand-in FFmpeg."""
+    
+    def test_repeat_copies_streams(self):
+        """Test that repeats are stream copies of the loop."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            loop = Path(tmpdir) / "loop.mp4"
+            loop.write_text(json.dumps({"frames": 90}))
+            output = Path(tmpdir) / "long.mp4"
+            
+            ok = repeat_loop(str(loop), str(output), 4, loop_frames=90,
+                             encoder=FFmpegEncoder(_ffmpeg(tmpdir)))
+            result = json.loads(output.read_text())
+        
+        assert ok
+        assert result["frames"] == 360
+        args = result["args"]
+        assert args[args.index("-stream_loop") + 1] == "3"
+        assert args[args.index("-c") + 1] == "copy"
+        assert "+faststart" in args
+    
+    def test_frame_count_checked(self):
+        """Test that a short repeated video fails."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            loop = Path(tmpdir) / "loop.mp4"
+            loop.write_text(json.dumps({"frames": 89}))
+            logs = []
+            
+            ok = repeat_loop(str(loop), str(Path(tmpdir) / "long.mp4"), 2, loop_frames=90,
+                             encoder=FFmpegEncoder(_ffmpeg(tmpdir)), log_callback=logs.append)
+        
+        assert not ok
+        assert logs[-1] == "Repeated video has 178 frames, expected 180"
+    
+    def test_encode_render_loop(self):
+        """Test encoding a render once with loop GOPs, then repeating it."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            frames = Path(tmpdir) / "frames"
+            frames.mkdir()
+            for i in range(120):
+                (frames / f"frame_{i:06d}.png").write_bytes(b"")
+            output = Path(tmpdir) / "long.mov"
+            logs = []
+            
+            ok = encode_render_loop(str(frames), str(output), 30.0, repeats=5,
+                                    encoder=FFmpegEncoder(_ffmpeg(tmpdir)),
+                                    log_callback=logs.append)
+            long = Path(tmpdir) / "long.mp4"
+            result = json.loads(long.read_text())
+            leftovers = [p.name for p in Path(tmpdir).iterdir() if p.name.startswith(".")]
+        
+        assert ok
+        assert result["frames"] == 600
+        assert leftovers == []
+        assert logs[-1] == f"Encoding complete: {long} (5 loops)"
+        encode_args = next(m for m in logs if m.startswith("Running:") and "-keyint_min" in m)
+        assert "-g 60" in encode_args
+    
+    def _frames(self, tmpdir: str) -> Path:
+        frames = Path(tmpdir) / "frames"
+        frames.mkdir()
+        for i in range(120):
+            (frames / f"frame_{i:06d}.png").write_bytes(b"")
+        return frames
+    
+    def test_segmented_repeat(self):
+        """Test that a segmented encoder runs the repeat step itself."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            frames = self._frames(tmpdir)
+            encoder = SegmentedEncoder(jobs=2, ffmpeg_path=_ffmpeg(tmpdir))
+            logs = []
+            
+            ok = encode_render_loop(str(frames), str(Path(tmpdir) / "long.mp4"), 30.0,
+                                    repeats=3, encoder=encoder, log_callback=logs.append)
+            
+            assert ok, logs
+            assert encoder.last_progress.frame == 360
+            assert json.loads((Path(tmpdir) / "long.mp4").read_text())["frames"] == 360
+    
+    def test_cancel_before_repeat(self):
+        """Test that a cancel after the loop is encoded skips the repeat."""
+        for make in (FFmpegEncoder, lambda path: SegmentedEncoder(jobs=2, ffmpeg_path=path)):
+            with tempfile.TemporaryDirectory() as tmpdir:
+                frames = self._frames(tmpdir)
+                encoder = make(_ffmpeg(tmpdir))
+                logs = []
+                
+                def log(message):
+                    logs.append(message)
+                    if message.startswith("Encoding complete"):
+                        encoder.cancel()
+                
+                ok = encode_render_loop(str(frames), str(Path(tmpdir) / "long.mp4"), 30.0,
+                                        repeats=3, encoder=encoder, log_callback=log)
+                
+                assert not ok
+                assert logs[-1] == "Encoding cancelled"
+                assert not (Path(tmpdir) / "long.mp4").exists()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
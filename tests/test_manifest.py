@@ -0,0 +1,75 @@
+"""Tests for render manifests."""
+
+import tempfile
+from pathlib import Path
+import pytest
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from looplab.render.manifest import (
+    RenderManifest, get_render_signature, get_render_coverage
+)
+
+
+SHADER = "void mainImage(out vec4 c, in vec2 p) { c = vec4(1.0); }"
+
+
+class TestRenderManifest:
+    """Tests for RenderManifest."""
+    
+    def _signature(self, **kwargs):
+        settings = {"width": 64, "height": 32, "fps": 10.0, "seed": 1.0}
+        settings.update(kwargs)
+        return get_render_signature(SHADER, **settings)
+    
+    def test_roundtrip(self):
+        """Test that coverage survives saving and loading."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manifest = RenderManifest.for_render(tmpdir, self._signature(), 100)
+            for frame in [*range(10, 20), 40, 42]:
+                manifest.add(frame)
+            manifest.save()
+            
+            loaded = get_render_coverage(tmpdir)
+            assert loaded.frames == manifest.frames
+            assert loaded.signature == manifest.signature
+            assert "12/100 frames (10-19, 40, 42)" == loaded.describe()
+    
+    def test_fill_in_missing_frames(self):
+        """Test that a later full render only needs the missing frames."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manifest = RenderManifest.for_render(tmpdir, self._signature(), 10)
+            for frame in range(0, 10, 4):
+                manifest.add(frame)
+            manifest.save()
+            
+            manifest = RenderManifest.for_render(tmpdir, self._signature(), 10)
+            missing = manifest.missing(range(10))
+            assert missing == [1, 2, 3, 5, 6, 7, 9]
+            
+            for frame in missing:
+                manifest.add(frame)
+            assert manifest.complete
+    
+    def test_changed_settings_start_over(self):
+        """Test that coverage of different settings is not reused."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manifest = RenderManifest.for_render(tmpdir, self._signature(), 10)
+            manifest.add(0)
+            manifest.save()
+            
+            assert RenderManifest.for_render(tmpdir, self._signature(seed=2.0), 10).frames == set()
+            assert RenderManifest.for_render(tmpdir, self._signature(), 20).frames == set()
+            assert RenderManifest.for_render(tmpdir, self._signature(), 10).frames == {0}
+    
+    def test_invalid_file(self):
+        """Test that unreadable manifests are ignored."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            assert get_render_coverage(tmpdir) is None
+            (Path(tmpdir) / "render_manifest.json").write_text("{not json")
+            assert get_render_coverage(tmpdir) is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
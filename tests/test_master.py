@@ -0,0 +1,237 @@
+"""Tests for lossless mezzanine masters."""
+
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from looplab.encode.ffmpeg import (
+    PRESETS, FFmpegEncoder, encode_render_output, find_render_input,
+    get_output_path_for_preset
+)
+from looplab.encode.master import (
+    encode_render_master, get_master_path, load_master_input
+)
+from looplab.encode.segmented import SegmentedEncoder
+from looplab.render.daemon import create_job
+from looplab.render.manifest import RenderManifest, get_manifest_path
+
+
+# Stand-in FFmpeg: an encode writes its arguments and the frame count of its
+# input (an image sequence, a file written by an earlier encode or an
+# ffconcat list of them)
+FAKE_FFMPEG = """
+import glob, json, os, sys
+args = sys.argv[1:]
+source = args[args.index("-i") + 1]
+if "concat" in args:
+    names = [l.split("'")[1] for l in open(source) if l.startswith("file")]
+    frames = sum(json.load(open(os.path.join(os.path.dirname(source), n)))["frames"]
+                 for n in names)
+elif "%06d" in source:
+    frames = len(glob.glob(source.replace("%06d", "*")))
+else:
+    frames = json.load(open(source))["frames"]
+if "-frames:v" in args:
+    frames = min(frames, int(args[args.index("-frames:v") + 1]))
+json.dump({"frames": frames, "args": args}, open(args[-1], "w"))
+print(f"frame={frames}\\nprogress=end", flush=True)
+"""
+
+
+def _ffmpeg(directory: str) -> str:
+    path = Path(directory) / "ffmpeg"
+    path.write_text(f"#!{sys.executable}\n{FAKE_FFMPEG}")
+    path.chmod(0o755)
+    return str(path)
+
+
+def _render(directory: str, frames: int = 6, signature=None) -> Path:
+    """Output directory with a complete PNG render and its manifest."""
+    output = Path(directory) / "out"
+    output.mkdir()
+    for i in range(frames):
+        (output / f"frame_{i:06d}.png").write_bytes(b"")
+    RenderManifest(get_manifest_path(output), signature or {"shader": "a"}, frames,
+                   set(range(frames))).save()
+    return output
+
+
+class TestPresets:
+    """Tests for the master presets."""
+    
+    def test_master_presets(self):
+        """Test lossless, seekable master settings."""
+        ffv1 = PRESETS["master_ffv1"]
+        x264 = PRESETS["master_x264"]
+        
+        assert (ffv1.extension, x264.extension) == ("mkv", "mkv")
+        assert ffv1.ffmpeg_args[ffv1.ffmpeg_args.index("-g") + 1] == "1"
+        assert "-slices" in ffv1.ffmpeg_args
+        assert x264.ffmpeg_args[x264.ffmpeg_args.index("-qp") + 1] == "0"
+    
+    def test_job_master(self):
+        """Test validating the master of a job."""
+        spec = {"shader_source": "x", "output_dir": "out"}
+        
+        assert create_job("a", {**spec, "master": "master_ffv1"}).master == "master_ffv1"
+        assert create_job("b", spec).master == ""
+        with pytest.raises(ValueError):
+            create_job("c", {**spec, "master": "h264_high"})
+    
+    def test_job_x264_master_limits(self):
+        """Test that x264 masters are refused where they would lose data."""
+        spec = {"shader_source": "x", "output_dir": "out", "master": "master_x264"}
+        
+        assert create_job("a", {**spec, "preset": "h264_high"}).master == "master_x264"
+        with pytest.raises(ValueError):
+            create_job("b", {**spec, "preset": "prores_422"})
+        with pytest.raises(ValueError):
+            create_job("c", {**spec, "bit_depth": 16})
+
+
+@pytest.mark.skipif(os.name == "nt", reason="Stand-in FFmpeg needs a shebang")
+class TestMaster:
+    """Tests for encoding and transcoding from masters with a stand-in FFmpeg."""
+    
+    def test_encode_master(self):
+        """Test that the master is encoded once and recorded."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            output = _render(tmpdir)
+            encoder = FFmpegEncoder(_ffmpeg(tmpdir))
+            messages = []
+            
+            assert encode_render_master(str(output), encoder=encoder)
+            master = json.loads(get_master_path(output).read_text())
+            assert master["frames"] == 6
+            assert "ffv1" in master["args"]
+            
+            assert encode_render_master(str(output), encoder=encoder,
+                                        log_callback=messages.append)
+            assert messages[0].startswith("Master is up to date")
+    
+    def test_render_input_prefers_master(self):
+        """Test that encodes read the master, with half-frame-early seeks."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            output = _render(tmpdir)
+            assert encode_render_master(str(output), fps=24.0,
+                                        encoder=FFmpegEncoder(_ffmpeg(tmpdir)))
+            
+            source = find_render_input(str(output), 24.0)
+            
+            assert source.total_frames == 6 and source.fps == 24.0
+            assert source.input_args(0) == ["-i", str(get_master_path(output))]
+            assert source.input_args(3)[:2] == ["-ss", "0.104167"]
+            assert find_render_input(str(output), 24.0, use_master=False).input_args(0)[-1] \
+                .endswith("frame_%06d.png")
+    
+    def test_stale_master(self):
+        """Test that a master is ignored once the render changes."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            output = _render(tmpdir)
+            assert encode_render_master(str(output), encoder=FFmpegEncoder(_ffmpeg(tmpdir)))
+            assert load_master_input(output) is not None
+            
+            RenderManifest(get_manifest_path(output), {"shader": "b"}, 6, set(range(6))).save()
+            assert load_master_input(output) is None
+            
+            RenderManifest(get_manifest_path(output), {"shader": "a"}, 6, set(range(6))).save()
+            later = time.time() + 10
+            os.utime(get_manifest_path(output), (later, later))
+            assert load_master_input(output) is None
+    
+    def test_alpha_preset_skips_rgb_master(self):
+        """Test that ProRes 4444 reads the frames, not an rgb24 master."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            output = _render(tmpdir, signature={"shader": "a", "bit_depth": 8})
+            ffmpeg = _ffmpeg(tmpdir)
+            assert encode_render_master(str(output), preset="master_x264",
+                                        encoder=FFmpegEncoder(ffmpeg))
+            assert json.loads((output / "master.json").read_text())["pix_fmt"] == "rgb24"
+            
+            for preset, reads_master in (("prores_4444", False), ("h264_high", True)):
+                video = Path(tmpdir) / f"video_{preset}"
+                assert encode_render_output(str(output), str(video), 30.0, preset,
+                                            encoder=FFmpegEncoder(ffmpeg))
+                args = json.loads(Path(get_output_path_for_preset(str(video), preset))
+                                  .read_text())["args"]
+                source = args[args.index("-i") + 1]
+                assert (source == str(get_master_path(output))) == reads_master
+    
+    def test_16bit_render_gets_ffv1_master(self):
+        """Test that a 16-bit render's x264 master is made with FFV1 instead."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            output = _render(tmpdir, signature={"shader": "a", "bit_depth": 16})
+            messages = []
+            
+            assert encode_render_master(str(output), preset="master_x264",
+                                        encoder=FFmpegEncoder(_ffmpeg(tmpdir)),
+                                        log_callback=messages.append)
+            info = json.loads((output / "master.json").read_text())
+            
+            assert (info["preset"], info["pix_fmt"]) == ("master_ffv1", "gbrap16le")
+            assert "instead" in messages[0]
+            assert find_render_input(str(output), presets=["prores_4444"]).input_args(0) == \
+                ["-i", str(get_master_path(output))]
+    
+    def test_incremental_from_master(self):
+        """Test that incremental encodes from a master keep unchanged segments."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            output = _render(tmpdir, frames=120)
+            ffmpeg = _ffmpeg(tmpdir)
+            assert encode_render_master(str(output), fps=10.0, encoder=FFmpegEncoder(ffmpeg))
+            video = str(Path(tmpdir) / "video.mp4")
+            
+            for unchanged in ("0 of 3", "3 of 3"):
+                logs = []
+                encoder = SegmentedEncoder(jobs=2, ffmpeg_path=ffmpeg, gop_seconds=1.0,
+                                           incremental=True)
+                assert encode_render_output(str(output), video, 10.0, "h264_high",
+                                            log_callback=logs.append, encoder=encoder), logs
+                assert f"{unchanged} segments are unchanged" in logs
+            
+            assert json.loads(Path(video).read_text())["frames"] == 120
+    
+    def test_transcode_without_frames(self):
+        """Test that presets transcode from the master after the frames are deleted."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            output = _render(tmpdir)
+            ffmpeg = _ffmpeg(tmpdir)
+            assert encode_render_master(str(output), encoder=FFmpegEncoder(ffmpeg))
+            for frame in output.glob("frame_*.png"):
+                frame.unlink()
+            
+            video = Path(tmpdir) / "video.mp4"
+            assert encode_render_output(str(output), str(video), 30.0, "h264_high",
+                                        encoder=FFmpegEncoder(ffmpeg))
+            result = json.loads(video.read_text())
+            
+            assert result["frames"] == 6
+            assert result["args"][result["args"].index("-i") + 1] == \
+                str(get_master_path(output))
+    
+    def test_segmented_seeks_into_master(self):
+        """Test that parallel segments seek into the master."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            output = _render(tmpdir, frames=120)
+            ffmpeg = _ffmpeg(tmpdir)
+            assert encode_render_master(str(output), encoder=FFmpegEncoder(ffmpeg))
+            messages = []
+            
+            video = Path(tmpdir) / "video.mp4"
+            encoder = SegmentedEncoder(jobs=2, ffmpeg_path=ffmpeg, gop_seconds=1.0)
+            encode_render_output(str(output), str(video), 30.0, "h264_high",
+                                 encoder=encoder, log_callback=messages.append)
+            
+            seeks = [m for m in messages if "Running" in m and "-ss" in m]
+            assert len(seeks) == 3
+            assert all("master.mkv" in m for m in seeks)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
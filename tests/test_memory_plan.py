@@ -0,0 +1,123 @@
+"""Tests for render memory planning."""
+
+from pathlib import Path
+import pytest
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from looplab.app.models import OfflineSettings
+from looplab.render.memory_plan import (
+    plan_render_memory, plan_for_settings, estimate_host_bytes, MB
+)
+
+
+class TestMemoryPlan:
+    """Tests for plan_render_memory."""
+    
+    def test_small_render_untiled(self):
+        """Test that a default 1080p render needs a single band."""
+        plan = plan_render_memory(1920, 1080)
+        
+        assert plan.fits is True
+        assert plan.tiles == 1
+        assert plan.tile_height == 1080
+        assert plan.gpu_peak_bytes == 1920 * 1080 * 8
+    
+    def test_4k_supersampled_accumulation_is_large(self):
+        """Test the 4K x4 accumulation case exceeds 2 GB host memory."""
+        plan = plan_render_memory(3840, 2160, supersample_scale=4, accumulation_samples=16)
+        
+        accumulator = (2160 * 4) * (3840 * 4) * 4 * 4
+        assert plan.host_peak_bytes > accumulator > 2e9
+        assert plan.tiles == 1
+    
+    def test_budget_tiles_render(self):
+        """Test that a budget splits the frame into bands that fit."""
+        plan = plan_render_memory(
+            3840, 2160, supersample_scale=4, accumulation_samples=16,
+            host_budget_mb=1024, gpu_budget_mb=512
+        )
+        
+        assert plan.fits is True
+        assert plan.tiled is True
+        assert plan.host_peak_bytes <= 1024 * MB
+        assert plan.gpu_peak_bytes <= 512 * MB
+        # Bands are whole output rows so they downsample independently
+        assert plan.tile_height % 4 == 0
+        assert plan.tiles * plan.tile_height >= plan.render_height
+    
+    def test_budget_rejects_without_tiling(self):
+        """Test that over-budget jobs are rejected when tiling is off."""
+        plan = plan_render_memory(
+            3840, 2160, supersample_scale=4, accumulation_samples=16,
+            host_budget_mb=1024, allow_tiling=False
+        )
+        
+        assert plan.fits is False
+        assert "host" in plan.reason
+        assert "rejected" in plan.describe()
+    
+    def test_impossible_budget_rejected(self):
+        """Test that a budget below the output frame size is rejected."""
+        plan = plan_render_memory(3840, 2160, host_budget_mb=10)
+        assert plan.fits is False
+    
+    def test_max_texture_size(self):
+        """Test that bands respect GL_MAX_TEXTURE_SIZE."""
+        plan = plan_render_memory(1920, 4320, supersample_scale=4, max_texture_size=16384)
+        assert plan.fits is True
+        assert plan.tile_height <= 16384
+        
+        plan = plan_render_memory(5120, 1080, supersample_scale=4, max_texture_size=16384)
+        assert plan.fits is False
+        assert "width" in plan.reason
+    
+    def test_tiling_reduces_host_estimate(self):
+        """Test that smaller bands need less host memory."""
+        full = estimate_host_bytes(3840, 2160, 2, 8, 4320)
+        band = estimate_host_bytes(3840, 2160, 2, 8, 432)
+        assert band < full
+    
+    def test_16bit_doubles_color_memory(self):
+        """Test that 16-bit frames double the color buffers."""
+        plan = plan_render_memory(1920, 1080, bit_depth=16)
+        assert plan.gpu_peak_bytes == 1920 * 1080 * 12
+        assert estimate_host_bytes(1920, 1080, 1, 1, 1080, 16) == \
+            2 * estimate_host_bytes(1920, 1080, 1, 1, 1080, 8)
+    
+    def test_post_passes_add_gpu_targets(self):
+        """Test that post passes add one, then two, RGBA16F targets."""
+        base = plan_render_memory(1920, 1080).gpu_peak_bytes
+        one = plan_render_memory(1920, 1080, post_passes=1).gpu_peak_bytes
+        three = plan_render_memory(1920, 1080, post_passes=3).gpu_peak_bytes
+        assert one - base == 1920 * 1080 * 12
+        assert three - base == 2 * (one - base)
+    
+    def test_gpu_downsample_adds_targets(self):
+        """Test that GPU downsampling adds one target per halving step."""
+        pixel = 8
+        base = plan_render_memory(1920, 1080, supersample_scale=4).gpu_peak_bytes
+        gpu = plan_render_memory(1920, 1080, supersample_scale=4,
+                                 gpu_downsample=True).gpu_peak_bytes
+        assert gpu - base == (3840 * 2160 + 1920 * 1080) * pixel
+        # Scale 3 falls back to the CPU and needs no targets
+        assert plan_render_memory(1920, 1080, supersample_scale=3,
+                                  gpu_downsample=True).gpu_peak_bytes == \
+            plan_render_memory(1920, 1080, supersample_scale=3).gpu_peak_bytes
+    
+    def test_plan_for_settings(self):
+        """Test planning from OfflineSettings."""
+        settings = OfflineSettings(
+            width=3840, height=2160, supersample_scale=4,
+            accumulation_samples=4, host_memory_budget_mb=2048
+        )
+        plan = plan_for_settings(settings)
+        
+        assert plan.fits is True
+        assert plan.host_budget_bytes == 2048 * MB
+        assert plan.gpu_budget_bytes is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,137 @@
+"""Tests for GPU post pass configuration."""
+
+import tempfile
+from pathlib import Path
+import numpy as np
+import pytest
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from looplab.gl.post_process import (
+    parse_cube_lut, create_post_pass, create_post_passes, parse_post_pass_arg,
+    resolve_post_pass_paths, validate_post_pass_spec, POST_PASS_TYPES
+)
+
+
+def _identity_cube(size: int = 2) -> str:
+    """Text of an identity .cube LUT (red varies fastest)."""
+    lines = ['TITLE "identity"', f"LUT_3D_SIZE {size}"]
+    step = 1.0 / (size - 1)
+    for b in range(size):
+        for g in range(size):
+            for r in range(size):
+                lines.append(f"{r * step:.6f} {g * step:.6f} {b * step:.6f}")
+    return "\n".join(lines) + "\n"
+
+
+class TestCubeLut:
+    """Tests for .cube parsing."""
+    
+    def test_parse_identity(self):
+        """Test that entries are laid out [b, g, r] like a 3D texture."""
+        lut = parse_cube_lut(_identity_cube(3))
+        
+        assert lut.size == 3
+        assert lut.title == "identity"
+        assert lut.table.shape == (3, 3, 3, 3)
+        assert lut.table.dtype == np.float32
+        np.testing.assert_allclose(lut.table[0, 1, 2], [1.0, 0.5, 0.0])
+    
+    def test_domain_and_comments(self):
+        """Test DOMAIN lines, comments and unknown keywords."""
+        text = ("# graded\nLUT_3D_INPUT_RANGE 0 1\nDOMAIN_MIN 0 0 0\n"
+                "DOMAIN_MAX 2 2 2\n" + _identity_cube())
+        lut = parse_cube_lut(text)
+        assert lut.domain_max == (2.0, 2.0, 2.0)
+    
+    @pytest.mark.parametrize("text", [
+        "LUT_1D_SIZE 2\n0 0 0\n1 1 1\n",
+        "LUT_3D_SIZE 2\n0 0 0\n",
+        "0 0 0\n",
+        "LUT_3D_SIZE 2\n" + "0 0\n" * 8,
+    ])
+    def test_invalid(self, text):
+        """Test that malformed LUTs are rejected."""
+        with pytest.raises(ValueError):
+            parse_cube_lut(text)
+
+
+class TestPostPassSpecs:
+    """Tests for pass specs and their creation."""
+    
+    def test_validate(self):
+        """Test spec validation messages."""
+        assert validate_post_pass_spec({"type": "dither"}) is None
+        assert validate_post_pass_spec({"type": "tonemap", "exposure": 2}) is None
+        assert validate_post_pass_spec({"type": "shader", "path": "a.glsl", "amount": 0.3}) is None
+        
+        assert "Unknown" in validate_post_pass_spec({"type": "blur"})
+        assert "path" in validate_post_pass_spec({"type": "shader"})
+        assert "strength" in validate_post_pass_spec({"type": "dither", "strength": 2})
+        assert "exposure" in validate_post_pass_spec({"type": "dither", "exposure": 1})
+        assert validate_post_pass_spec({"type": "tonemap", "exposure": "hi"}) is not None
+        assert validate_post_pass_spec(["dither"]) is not None
+    
+    def test_builtin_defaults(self):
+        """Test that built-in passes get their default parameters."""
+        post_pass = create_post_pass({"type": "tonemap"})
+        assert post_pass.uniforms == {"u_exposure": 1.0}
+        assert "postProcess" in post_pass.source
+        
+        post_pass = create_post_pass({"type": "tonemap", "exposure": 2, "strength": 0.5})
+        assert post_pass.uniforms == {"u_exposure": 2.0}
+        assert post_pass.strength == 0.5
+    
+    def test_file_passes(self):
+        """Test LUT and user shader passes load their files."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            Path(tmpdir, "grade.cube").write_text(_identity_cube(4))
+            Path(tmpdir, "vignette.glsl").write_text(
+                "vec4 postProcess(vec4 color, vec2 fragCoord) { return color; }"
+            )
+            
+            lut, user = create_post_passes([
+                {"type": "lut", "path": "grade.cube"},
+                {"type": "shader", "path": "vignette.glsl", "amount": 0.3},
+            ], base_dir=tmpdir)
+        
+        assert lut.lut is not None and lut.lut.size == 4
+        assert lut.uniforms["u_lut_size"] == 4.0
+        assert user.name == "vignette.glsl"
+        assert user.uniforms == {"u_amount": 0.3}
+        assert user.key != lut.key
+    
+    def test_missing_file(self):
+        """Test that missing files raise OSError."""
+        with pytest.raises(OSError):
+            create_post_pass({"type": "lut", "path": "/nonexistent/grade.cube"})
+    
+    def test_resolve_paths(self):
+        """Test that relative paths are made absolute against a directory."""
+        specs = [{"type": "lut", "path": "grade.cube"}, {"type": "dither"}]
+        resolved = resolve_post_pass_paths(specs, "/projects/a")
+        
+        assert resolved[0]["path"] == str(Path("/projects/a") / "grade.cube")
+        assert resolved[1] == {"type": "dither"}
+        assert specs[0]["path"] == "grade.cube"
+    
+    def test_parse_arg(self):
+        """Test command-line pass syntax."""
+        assert parse_post_pass_arg("dither") == {"type": "dither"}
+        assert parse_post_pass_arg("tonemap,exposure=1.5") == {"type": "tonemap", "exposure": 1.5}
+        assert parse_post_pass_arg("lut:grade.cube,strength=0.5") == {
+            "type": "lut", "path": "grade.cube", "strength": 0.5
+        }
+        
+        for text in ("blur", "tonemap,exposure", "tonemap,exposure=x", "shader"):
+            with pytest.raises(ValueError):
+                parse_post_pass_arg(text)
+    
+    def test_types(self):
+        """Test the registered pass types."""
+        assert set(POST_PASS_TYPES) == {"lut", "tonemap", "dither", "shader"}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,232 @@
+"""Tests for cached FFmpeg capability probing."""
+
+import json
+import os
+import sys
+from pathlib import Path
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from looplab.encode import ffmpeg, probe
+from looplab.encode.ffmpeg import PRESETS
+from looplab.encode.probe import (
+    check_presets, parse_encoder_pix_fmts, parse_encoders, parse_filters, parse_pix_fmts,
+    probe_ffmpeg
+)
+from looplab.render.daemon import RenderDaemon
+
+
+SHADER = "void mainImage(out vec4 c, in vec2 p) { c = vec4(1.0); }"
+
+ENCODERS = """Encoders:
+ V..... = Video
+ A..... = Audio
+ ------
+ V....D libx264              libx264 H.264 / AVC (codec h264)
+ V....D prores_ks            Apple ProRes (iCodec Pro) (codec prores)
+ A....D aac                  AAC (Advanced Audio Coding)
+"""
+
+PIX_FMTS = """Pixel formats:
+I.... = Supported Input  format for conversion
+-----
+IO... yuv420p                3            12      8-8-8
+IO... yuv422p10le            3            20      10-10-10
+IO... rgb24                  3            24      8-8-8
+"""
+
+FILTERS = """Filters:
+  T.. = Timeline support
+ ... split             V->N       Pass on the input to N video outputs.
+ ... libvmaf           VV->V      Calculate the VMAF between two video streams.
+"""
+
+# Stand-in FFmpeg: answers capability queries and counts its runs
+FAKE_FFMPEG = """
+import os, sys
+open(os.path.join(os.path.dirname(sys.argv[0]), "runs.log"), "a").write(" ".join(sys.argv[1:]) + "\\n")
+args = sys.argv[1:]
+answers = {ANSWERS!r}
+if "-version" in args:
+    print("ffmpeg version 6.1-test Copyright (c) 2000-2023")
+elif "-h" in args:
+    encoder = args[args.index("-h") + 1].split("=")[1]
+    print("Encoder " + encoder)
+    if encoder == "libx264":
+        print("    Supported pixel formats: yuv420p yuvj420p")
+else:
+    print(answers[args[-1]])
+"""
+
+
+def _ffmpeg(directory: Path, encoders: str = ENCODERS) -> str:
+    answers = {"-encoders": encoders, "-pix_fmts": PIX_FMTS, "-filters": FILTERS}
+    path = directory / "ffmpeg"
+    path.write_text(f"#!{sys.executable}\n" + FAKE_FFMPEG.replace("{ANSWERS!r}", repr(answers)))
+    path.chmod(0o755)
+    return str(path)
+
+
+def _runs(directory: Path) -> list:
+    log = directory / "runs.log"
+    return log.read_text().splitlines() if log.exists() else []
+
+
+@pytest.fixture(autouse=True)
+def probe_cache(tmp_path, monkeypatch):
+    """Use a private probe cache and no in-memory results."""
+    monkeypatch.setattr(probe, "get_probe_cache_path", lambda: tmp_path / "probe.json")
+    monkeypatch.setattr(probe, "_probes", {})
+    return tmp_path / "probe.json"
+
+
+class TestParsers:
+    """Tests for parsing FFmpeg listings."""
+    
+    def test_listings(self):
+        """Test encoder, pixel format and filter listings."""
+        assert parse_encoders(ENCODERS) == ["libx264", "prores_ks"]
+        assert parse_pix_fmts(PIX_FMTS) == ["yuv420p", "yuv422p10le", "rgb24"]
+        assert parse_filters(FILTERS) == ["split", "libvmaf"]
+    
+    def test_encoder_pix_fmts(self):
+        """Test the pixel formats of one encoder."""
+        text = "Encoder libx264\n    Supported pixel formats: yuv420p nv12\n"
+        assert parse_encoder_pix_fmts(text) == ["yuv420p", "nv12"]
+        assert parse_encoder_pix_fmts("Encoder prores_ks\n") == []
+
+
+@pytest.mark.skipif(os.name == "nt", reason="Stand-in FFmpeg needs a shebang")
+class TestProbe:
+    """Tests for probing and caching with a stand-in FFmpeg."""
+    
+    def test_probe_once(self, tmp_path):
+        """Test that a binary is probed once and then served from memory."""
+        ffmpeg = _ffmpeg(tmp_path)
+        
+        first = probe_ffmpeg(ffmpeg)
+        second = probe_ffmpeg(ffmpeg)
+        
+        assert first is second
+        assert first.version.startswith("ffmpeg version 6.1-test")
+        assert first.has_encoder("libx264") and not first.has_encoder("libx265")
+        assert first.has_filter("libvmaf")
+        assert len(_runs(tmp_path)) == 4
+    
+    def test_persisted_cache(self, tmp_path, probe_cache, monkeypatch):
+        """Test that a new process reuses the saved probe."""
+        ffmpeg = _ffmpeg(tmp_path)
+        probe_ffmpeg(ffmpeg)
+        monkeypatch.setattr(probe, "_probes", {})
+        
+        capabilities = probe_ffmpeg(ffmpeg)
+        
+        assert capabilities.encoders == ["libx264", "prores_ks"]
+        assert len(_runs(tmp_path)) == 4
+        assert str(Path(ffmpeg).resolve()) in json.loads(probe_cache.read_text())["binaries"]
+    
+    def test_changed_binary_is_probed_again(self, tmp_path):
+        """Test that a new modification time invalidates the cache."""
+        ffmpeg = _ffmpeg(tmp_path)
+        probe_ffmpeg(ffmpeg)
+        stat = os.stat(ffmpeg)
+        os.utime(ffmpeg, (stat.st_atime, stat.st_mtime + 10))
+        
+        probe_ffmpeg(ffmpeg)
+        
+        assert len(_runs(tmp_path)) == 8
+    
+    def test_failed_probe_not_cached(self, tmp_path, probe_cache):
+        """Test that a probe FFmpeg did not answer is reported and retried."""
+        ffmpeg = _ffmpeg(tmp_path, encoders="")
+        
+        problems = check_presets(["h264_high"], ffmpeg)
+        capabilities = probe_ffmpeg(ffmpeg)
+        
+        assert len(problems) == 1 and problems[0].startswith("Could not probe FFmpeg")
+        assert not capabilities.answered
+        assert probe._probes == {}
+        assert not probe_cache.exists()
+        assert len(_runs(tmp_path)) == 8
+    
+    def test_check_presets(self, tmp_path):
+        """Test preset checks against encoders and their pixel formats."""
+        ffmpeg = _ffmpeg(tmp_path)
+        
+        assert check_presets(["h264_high", "prores_422"], ffmpeg) == []
+        problems = check_presets(["h265_high", "avi_huffyuv", "nope"], ffmpeg)
+        
+        assert problems == [
+            "H.265 High Quality: FFmpeg has no libx265 encoder",
+            "AVI (Lossless HuffYUV): FFmpeg has no huffyuv encoder",
+            "Unknown preset: nope",
+        ]
+        # Encoder pixel formats are probed once per encoder
+        assert sum(1 for run in _runs(tmp_path) if run.startswith("-hide_banner -h")) == 2
+        check_presets(["h264_high"], ffmpeg)
+        assert sum(1 for run in _runs(tmp_path) if run.startswith("-hide_banner -h")) == 2
+    
+    def test_unsupported_pix_fmt(self, tmp_path):
+        """Test that a pixel format the encoder lacks is reported."""
+        capabilities = probe_ffmpeg(_ffmpeg(tmp_path))
+        encoding = PRESETS["h264_high"]
+        ten_bit = type(encoding)(encoding.name, encoding.codec, encoding.extension,
+                                 ["-c:v", "libx264", "-pix_fmt", "yuv420p10le"])
+        
+        assert capabilities.check_preset(ten_bit) == \
+            "H.264 High Quality: libx264 cannot encode yuv420p10le"
+    
+    def test_daemon_refuses_unencodable_jobs(self, tmp_path, monkeypatch):
+        """Test that submit fails before rendering when FFmpeg lacks the codec."""
+        monkeypatch.setattr(probe, "find_ffmpeg", lambda: _ffmpeg(tmp_path))
+        daemon = RenderDaemon()
+        spec = {"shader_source": SHADER, "output_dir": str(tmp_path / "out")}
+        
+        with pytest.raises(ValueError, match="no libx265 encoder"):
+            daemon.submit({**spec, "preset": "h265_high"})
+        assert daemon.list_jobs() == []
+        assert daemon.submit({**spec, "preset": "h264_high"}).preset == "h264_high"
+
+
+class TestFindFFmpeg:
+    """Tests for remembering where FFmpeg is."""
+    
+    @pytest.fixture(autouse=True)
+    def fresh_lookup(self, monkeypatch):
+        monkeypatch.setattr(ffmpeg, "_path_ffmpeg", (None, None))
+        monkeypatch.setattr(ffmpeg, "_located_ffmpeg", None)
+        monkeypatch.setattr(ffmpeg, "_search_missed", None)
+        monkeypatch.setenv("PATH", "/first")
+    
+    def test_path_lookup_per_path(self, tmp_path, monkeypatch):
+        """Test that the PATH is looked up again only when it changes."""
+        lookups = []
+        found = _ffmpeg(tmp_path)
+        monkeypatch.setattr(ffmpeg.shutil, "which",
+                            lambda name: lookups.append(os.environ["PATH"]) or found)
+        
+        assert ffmpeg.find_ffmpeg() == ffmpeg.find_ffmpeg() == found
+        monkeypatch.setenv("PATH", "/second")
+        ffmpeg.find_ffmpeg()
+        
+        assert lookups == ["/first", "/second"]
+    
+    def test_missing_ffmpeg_searched_once(self, tmp_path, monkeypatch):
+        """Test that a failed search is remembered until the probe cache changes."""
+        searches = []
+        monkeypatch.setattr(ffmpeg.shutil, "which", lambda name: None)
+        monkeypatch.setattr(ffmpeg, "_search_ffmpeg", lambda: searches.append(1))
+        
+        assert ffmpeg.find_ffmpeg() is None
+        assert ffmpeg.find_ffmpeg() is None
+        assert len(searches) == 1
+        
+        # Another process found FFmpeg and recorded it
+        probe.save_located_ffmpeg(_ffmpeg(tmp_path))
+        assert ffmpeg.find_ffmpeg() == str(tmp_path / "ffmpeg")
+        assert len(searches) == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -214,6 +214,38 @@ class TestProjectSchema:
         assert is_valid is False
         assert "render_scale" in error
     
+    def test_validate_invalid_upscale_filter(self):
+        """Test validation catches unknown preview upscale filters."""
+        data = get_default_project_data()
+        assert data["preview"]["upscale_filter"] == "linear"
+        data["preview"]["upscale_filter"] = "bicubic"
+        
+        is_valid, error = validate_project_data(data)
+        assert is_valid is False
+        assert "upscale_filter" in error
+    
+    def test_validate_invalid_frame_range(self):
+        """Test validation catches bad frame ranges and strides."""
+        data = get_default_project_data()
+        data["offline"]["frame_stride"] = 0
+        assert validate_project_data(data)[0] is False
+        
+        data = get_default_project_data()
+        data["offline"]["frame_start"] = 100
+        data["offline"]["frame_end"] = 50
+        assert validate_project_data(data)[0] is False
+    
+    def test_validate_post_passes(self):
+        """Test validation of GPU post pass specs."""
+        data = get_default_project_data()
+        data["offline"]["post_passes"] = [{"type": "tonemap", "exposure": 1.5}, {"type": "dither"}]
+        assert validate_project_data(data)[0] is True
+        
+        data["offline"]["post_passes"] = [{"type": "lut"}]
+        valid, error = validate_project_data(data)
+        assert valid is False
+        assert "path" in error
+    
     def test_default_project_data_structure(self):
         """Test default project data has expected structure."""
         data = get_default_project_data()
@@ -0,0 +1,172 @@
+"""Tests for render and encode slot scheduling."""
+
+import sys
+import threading
+import time
+from pathlib import Path
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from looplab.encode import probe
+from looplab.render.daemon import CANCELLED, DONE, RUNNING, RenderDaemon
+from looplab.render.scheduler import ENCODE, RENDER, JobScheduler, get_thread_budgets
+
+
+SHADER = "void mainImage(out vec4 c, in vec2 p) { c = vec4(1.0); }"
+
+
+class TestThreadBudgets:
+    """Tests for splitting the cores between slots."""
+    
+    def test_budgets(self):
+        """Test writer and FFmpeg thread shares."""
+        assert get_thread_budgets(1, 1, cpu_count=16) == (2, 14)
+        assert get_thread_budgets(2, 2, cpu_count=16) == (2, 6)
+        assert get_thread_budgets(1, 1, cpu_count=2) == (1, 1)
+        assert get_thread_budgets(4, 4, cpu_count=1) == (1, 1)
+    
+    def test_scheduler_budgets(self):
+        """Test that granted slots carry their pool's budget."""
+        scheduler = JobScheduler(render_slots=1, encode_slots=2, cpu_count=8)
+        
+        with scheduler.slot(ENCODE) as slot:
+            assert (slot.kind, slot.index, slot.threads) == (ENCODE, 0, 3)
+            assert scheduler.stats()[ENCODE]["busy"] == 1
+        assert scheduler.stats()[ENCODE]["busy"] == 0
+        with pytest.raises(ValueError):
+            scheduler.acquire("gpu")
+
+
+class TestSlots:
+    """Tests for waiting on slots."""
+    
+    def test_pools_are_separate(self):
+        """Test that a busy encode slot does not block renders."""
+        scheduler = JobScheduler(render_slots=1, encode_slots=1)
+        encode = scheduler.acquire(ENCODE)
+        
+        assert scheduler.acquire(RENDER, timeout=0) is not None
+        assert scheduler.acquire(ENCODE, timeout=0.05) is None
+        scheduler.release(encode)
+        assert scheduler.acquire(ENCODE, timeout=0) is not None
+    
+    def test_priority_order(self):
+        """Test that waiters are served by priority, then arrival."""
+        scheduler = JobScheduler(encode_slots=1)
+        held = scheduler.acquire(ENCODE)
+        order = []
+        
+        def wait(name, priority):
+            slot = scheduler.acquire(ENCODE, priority)
+            order.append(name)
+            scheduler.release(slot)
+        
+        threads = []
+        for name, priority in (("low", 0), ("high", 5), ("low2", 0), ("urgent", 9)):
+            thread = threading.Thread(target=wait, args=(name, priority))
+            thread.start()
+            threads.append(thread)
+            while scheduler.stats()[ENCODE]["waiting"] < len(threads):
+                time.sleep(0.005)
+        scheduler.release(held)
+        for thread in threads:
+            thread.join(5)
+        
+        assert order == ["urgent", "high", "low", "low2"]
+    
+    def test_cancelled_wait(self):
+        """Test that a cancelled waiter gives up and leaves the queue."""
+        scheduler = JobScheduler(encode_slots=1)
+        held = scheduler.acquire(ENCODE)
+        cancel = threading.Event()
+        threading.Timer(0.05, cancel.set).start()
+        
+        with scheduler.slot(ENCODE, cancelled=cancel.is_set) as slot:
+            assert slot is None
+        assert scheduler.stats()[ENCODE]["waiting"] == 0
+        scheduler.release(held)
+    
+    def test_worker_render_slot(self, tmp_path):
+        """Test that a worker given a scheduler renders only in a render slot."""
+        pytest.importorskip("PySide6")
+        from looplab.render.offline_worker import OfflineRenderWorker
+        
+        scheduler = JobScheduler(render_slots=1, cpu_count=8)
+        worker = OfflineRenderWorker(scheduler=scheduler)
+        worker.output_dir = str(tmp_path)
+        # Rejected by the memory plan as soon as the slot is granted
+        worker.width, worker.height = 3840, 2160
+        worker.host_memory_budget_mb = 10
+        results = []
+        worker.finished.connect(results.append)
+        
+        held = scheduler.acquire(RENDER)
+        threading.Timer(0.05, worker.cancel).start()
+        worker.run()
+        assert results == [False]
+        assert scheduler.stats()[RENDER]["waiting"] == 0
+        
+        scheduler.release(held)
+        worker.run()
+        assert worker.writer_threads == 2
+        assert scheduler.stats()[RENDER]["busy"] == 0
+
+
+class TestDaemonPipeline:
+    """Tests for overlapping encodes with later renders in the daemon."""
+    
+    @pytest.fixture
+    def daemon(self, monkeypatch):
+        """Daemon that accepts presets without probing FFmpeg."""
+        monkeypatch.setattr(probe, "check_presets", lambda presets: [])
+        daemon = RenderDaemon(encode_slots=1, threads=4)
+        yield daemon
+        daemon.stop()
+    
+    def test_priority_queue(self, daemon, tmp_path):
+        """Test that executors take the highest-priority job first."""
+        spec = {"shader_source": SHADER, "output_dir": str(tmp_path)}
+        first = daemon.submit(spec)
+        urgent = daemon.submit({**spec, "priority": 10})
+        
+        assert urgent.priority == 10
+        assert [daemon._queue.get()[2] for _ in range(2)] == [urgent, first]
+        with pytest.raises(ValueError):
+            daemon.submit({**spec, "priority": "high"})
+    
+    def test_encodes_wait_for_slots(self, daemon, tmp_path, monkeypatch):
+        """Test that rendered jobs queue for the encode slot off the GL thread."""
+        release = threading.Event()
+        encoded = []
+        
+        def fake_encode(job, threads):
+            encoded.append((job.id, threads))
+            return release.wait(5)
+        
+        monkeypatch.setattr(daemon, "_encode", fake_encode)
+        spec = {"shader_source": SHADER, "output_dir": str(tmp_path), "preset": "h264_high"}
+        jobs = [daemon.submit(spec) for _ in range(3)]
+        for job in jobs:
+            # As after a successful render
+            job.set_state(RUNNING)
+            daemon._start_encode(job)
+        while not encoded or daemon.scheduler.stats()[ENCODE]["waiting"] < 2:
+            time.sleep(0.01)
+        
+        assert encoded == [(jobs[0].id, 2)]
+        assert [job.stage for job in jobs] == ["encode", "encode_wait", "encode_wait"]
+        
+        assert daemon.cancel(jobs[2].id)
+        release.set()
+        for job in jobs:
+            job.wait_events(timeout=5)
+            while not job.is_finished:
+                job.wait_events(job.events[-1]["seq"], timeout=5)
+        
+        assert [job.state for job in jobs] == [DONE, DONE, CANCELLED]
+        assert [job_id for job_id, _ in encoded] == [jobs[0].id, jobs[1].id]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
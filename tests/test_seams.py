@@ -0,0 +1,148 @@
+"""Tests for loop-seam verification."""
+
+import math
+from pathlib import Path
+import numpy as np
+import pytest
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from looplab.render.golden import ShaderRender
+from looplab.render.seams import (
+    SeamCheck, analyze_seam, compute_discontinuity, compute_ssim,
+    format_report, get_seam_frames, rank_checks,
+    SEAMLESS, BROKEN, FAILED
+)
+from looplab.render.timeline import Timeline
+
+
+TOTAL = 12
+
+
+def _frame(value: float) -> np.ndarray:
+    frame = np.empty((16, 16, 4), dtype=np.uint8)
+    x = np.arange(16, dtype=np.float32)[None, :]
+    frame[..., :3] = np.clip(value + 4 * x, 0, 255).astype(np.uint8)[..., None]
+    frame[..., 3] = 255
+    return frame
+
+
+def _render(brightness, name: str = "a.frag") -> ShaderRender:
+    """Shader render at the seam frames with brightness(frame)."""
+    return ShaderRender(name=name, frames={
+        frame: _frame(brightness(frame)) for frame in get_seam_frames(TOTAL)
+    })
+
+
+def _triangle(frame: int) -> float:
+    """Seamless loop: brightness rises and falls over the loop."""
+    t = (frame % TOTAL) / TOTAL
+    return 100 + 120 * (1 - abs(2 * t - 1))
+
+
+class TestMetrics:
+    """Tests for frame selection and seam metrics."""
+    
+    def test_seam_frames(self):
+        """Test both sides of the seam plus the virtual frame."""
+        assert get_seam_frames(900) == [0, 1, 898, 899, 900]
+        with pytest.raises(ValueError):
+            get_seam_frames(3)
+    
+    def test_loop_end_info(self):
+        """Test the virtual frame one past the end of the loop."""
+        timeline = Timeline(duration=2.0, fps=10.0)
+        info = timeline.get_loop_end_info()
+        
+        assert info.frame == 20
+        assert info.time == 2.0
+        assert info.phase == pytest.approx(2.0 * math.pi)
+        assert info.loop_x == pytest.approx(1.0)
+        assert info.loop_y == pytest.approx(0.0, abs=1e-12)
+    
+    def test_ssim(self):
+        """Test SSIM of identical, similar and unrelated frames."""
+        a = _frame(100)
+        noise = np.random.default_rng(0).integers(0, 256, a.shape, dtype=np.uint8)
+        
+        assert compute_ssim(a, a) == pytest.approx(1.0)
+        assert compute_ssim(a, _frame(102)) > 0.9
+        assert compute_ssim(a, noise) < 0.2
+        assert compute_ssim(a, a[:8]) == 0.0
+    
+    def test_ssim_16bit(self):
+        """Test that 16-bit frames are compared on the same scale."""
+        a = _frame(100).astype(np.uint16) * 257
+        assert compute_ssim(a, a) == pytest.approx(1.0)
+    
+    def test_smooth_motion(self):
+        """Test that steady motion across the seam scores near 0."""
+        frames = [_frame(100 + 5 * i) for i in range(4)]
+        metrics = compute_discontinuity(*frames)
+        
+        assert metrics["seam_step"] == pytest.approx(5.0)
+        assert metrics["motion"] == pytest.approx(5.0)
+        assert metrics["discontinuity"] == pytest.approx(0.0)
+    
+    def test_jump(self):
+        """Test that a jump at the seam scores high."""
+        metrics = compute_discontinuity(_frame(100), _frame(101), _frame(140), _frame(141))
+        
+        assert metrics["seam_step"] == pytest.approx(39.0)
+        assert metrics["discontinuity"] > 10.0
+
+
+class TestAnalyze:
+    """Tests for seam checks of shader renders."""
+    
+    def test_seamless(self):
+        """Test a loop that wraps exactly."""
+        check = analyze_seam(_render(_triangle), TOTAL)
+        
+        assert check.status == SEAMLESS
+        assert math.isinf(check.wrap_psnr)
+        assert check.wrap_ssim == pytest.approx(1.0)
+        assert not check.broken
+    
+    def test_time_dependent(self):
+        """Test a shader that keeps drifting with time."""
+        check = analyze_seam(_render(lambda f: 40 + 10 * f), TOTAL)
+        
+        assert check.status == BROKEN
+        assert check.wrap_psnr < 40
+        assert "phase 2π" in check.message
+        assert "jumps" in check.message
+    
+    def test_failed(self):
+        """Test renders with errors or missing frames."""
+        errored = ShaderRender(name="bad.frag", error="Shader compilation failed")
+        partial = _render(_triangle)
+        del partial.frames[TOTAL]
+        
+        assert analyze_seam(errored, TOTAL).status == FAILED
+        check = analyze_seam(partial, TOTAL)
+        assert check.status == FAILED
+        assert str(TOTAL) in check.message
+    
+    def test_ranked_report(self):
+        """Test that the report lists the worst seams first."""
+        checks = [
+            SeamCheck(name="good.frag", status=SEAMLESS, discontinuity=0.1),
+            SeamCheck(name="jumpy.frag", status=BROKEN, discontinuity=3.0),
+            SeamCheck(name="worse.frag", status=BROKEN, discontinuity=9.0, wrap_psnr=20.0),
+            SeamCheck(name="bad.frag", status=FAILED, message="no context"),
+        ]
+        
+        assert [c.name for c in rank_checks(checks)] == [
+            "bad.frag", "worse.frag", "jumpy.frag", "good.frag"
+        ]
+        report = format_report(checks)
+        lines = report.splitlines()
+        assert "bad.frag" in lines[1]
+        assert "good.frag" in lines[4]
+        assert lines[-1] == "4 shaders: 2 broken, 1 failed"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
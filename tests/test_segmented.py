@@ -0,0 +1,218 @@
+"""Tests for segmented parallel encoding."""
+
+import os
+import stat
+import sys
+import tempfile
+from pathlib import Path
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from looplab.encode.ffmpeg import PRESETS, create_encoder, encode_frames, FFmpegEncoder
+from looplab.encode.segmented import (
+    SEGMENT_MANIFEST, SegmentedEncoder, get_gop_args, get_gop_frames, hash_frame_file,
+    plan_segments, write_concat_list
+)
+from looplab.render.daemon import create_job
+
+
+# Stand-in FFmpeg: "encodes" -frames:v N frames into a file holding N, and
+# "concatenates" by summing the files of an ffconcat list
+FAKE_FFMPEG = """
+import os, sys
+args = sys.argv[1:]
+output = args[-1]
+if "concat" in args:
+    listing = args[args.index("-i") + 1]
+    base = os.path.dirname(listing)
+    names = [l.split("'")[1] for l in open(listing) if l.startswith("file")]
+    frames = sum(int(open(os.path.join(base, n)).read()) for n in names)
+else:
+    frames = int(args[args.index("-frames:v") + 1])
+    frames -= int(os.environ.get("FAKE_DROP_FRAMES", "0"))
+open(output, "w").write(str(frames))
+print(f"frame={frames}\\nprogress=end", flush=True)
+"""
+
+
+def _ffmpeg(directory: str) -> str:
+    path = Path(directory) / "ffmpeg"
+    path.write_text(f"#!{sys.executable}\n{FAKE_FFMPEG}")
+    path.chmod(path.stat().st_mode | stat.S_IXUSR)
+    return str(path)
+
+
+class TestPlanning:
+    """Tests for segment planning and encoder options."""
+    
+    def test_segments_are_gop_aligned(self):
+        """Test that all but the last segment are whole GOPs."""
+        segments = plan_segments(900, jobs=4, gop=60)
+        
+        assert segments[0] == (0, 120)
+        assert all(count % 60 == 0 for _, count in segments[:-1])
+        assert sum(count for _, count in segments) == 900
+        assert [start for start, _ in segments] == list(range(0, 900, 120))
+    
+    def test_short_and_empty(self):
+        """Test loops shorter than a GOP and empty ranges."""
+        assert plan_segments(45, jobs=8, gop=60) == [(0, 45)]
+        assert plan_segments(0, jobs=8, gop=60) == []
+    
+    def test_fixed_length(self):
+        """Test that a segment length makes the plan independent of the jobs."""
+        for jobs in (1, 2, 8):
+            assert plan_segments(700, jobs=jobs, gop=60, length=250) == [
+                (0, 300), (300, 300), (600, 100)
+            ]
+    
+    def test_gop_args(self):
+        """Test fixed GOPs for inter codecs and none for intra codecs."""
+        assert get_gop_frames(30.0) == 60
+        assert get_gop_args(PRESETS["h264_high"], 60) == [
+            "-g", "60", "-keyint_min", "60", "-sc_threshold", "0"
+        ]
+        assert "scenecut=0:open-gop=0" in get_gop_args(PRESETS["h265_high"], 60)
+        assert get_gop_args(PRESETS["prores_422"], 60) == []
+    
+    def test_concat_list(self):
+        """Test that names are quoted for the concat demuxer."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "list.ffconcat"
+            write_concat_list(path, [Path("a.mp4"), Path("it's.mp4")])
+            
+            assert path.read_text().splitlines() == [
+                "ffconcat version 1.0", "file 'a.mp4'", "file 'it'\\''s.mp4'"
+            ]
+    
+    def test_create_encoder(self):
+        """Test that several jobs select the segmented encoder."""
+        assert isinstance(create_encoder(1), FFmpegEncoder)
+        assert isinstance(create_encoder(4), SegmentedEncoder)
+        assert create_encoder(1, incremental=True).incremental
+    
+    def test_frame_hash(self):
+        """Test hashing whole frame files and frames within a file."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "frames.bin"
+            path.write_bytes(b"aaaabbbb")
+            
+            assert hash_frame_file(path, 0, 4) != hash_frame_file(path, 4, 4)
+            assert hash_frame_file(path) == hash_frame_file(path, 0, 8)
+            assert hash_frame_file(Path(tmpdir) / "missing.png") == ""
+    
+    def test_job_incremental(self):
+        """Test validating incremental encodes in job specs."""
+        spec = {"shader_source": "x", "output_dir": "out", "preset": "h265_high"}
+        
+        assert create_job("a", {**spec, "incremental_encode": True}).incremental_encode
+        with pytest.raises(ValueError):
+            create_job("b", {**spec, "incremental_encode": "yes"})
+        with pytest.raises(ValueError):
+            create_job("c", {**spec, "preset": "gif", "incremental_encode": True})
+
+
+@pytest.mark.skipif(os.name == "nt", reason="Stand-in FFmpeg needs a shebang")
+class TestSegmentedEncoder:
+    """Tests for encoding and joining segments."""
+    
+    def _encode(self, tmpdir: str, logs: list):
+        encoder = SegmentedEncoder(jobs=3, ffmpeg_path=_ffmpeg(tmpdir), gop_seconds=1.0)
+        starts = []
+        
+        def input_args(start):
+            starts.append(start)
+            return ["-start_number", str(start), "-i", "frame_%06d.png"]
+        
+        ok = encoder.encode(input_args, 100, str(Path(tmpdir) / "out.mp4"), 10.0,
+                            preset="h265_high", log_callback=logs.append)
+        return ok, sorted(starts), encoder
+    
+    def test_encode_and_join(self):
+        """Test that segments are encoded, joined and cleaned up."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            logs = []
+            ok, starts, encoder = self._encode(tmpdir, logs)
+            
+            assert ok, logs
+            assert starts == [0, 20, 40, 60, 80]
+            assert (Path(tmpdir) / "out.mp4").read_text() == "100"
+            assert not (Path(tmpdir) / ".out.segments").exists()
+            assert encoder.last_progress.frame == 100
+            assert logs[-1].startswith("Encoding complete")
+    
+    def test_frame_count_mismatch(self, monkeypatch):
+        """Test that a segment with missing frames fails the encode."""
+        monkeypatch.setenv("FAKE_DROP_FRAMES", "1")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            logs = []
+            ok, _, _ = self._encode(tmpdir, logs)
+            
+            assert not ok
+            assert any("expected 20" in message for message in logs)
+            assert not (Path(tmpdir) / "out.mp4").exists()
+
+
+
+@pytest.mark.skipif(os.name == "nt", reason="Stand-in FFmpeg needs a shebang")
+class TestIncremental:
+    """Tests for re-encoding only the segments whose frames changed."""
+    
+    def _encode(self, tmpdir: str, logs: list) -> bool:
+        encoder = SegmentedEncoder(jobs=2, ffmpeg_path=_ffmpeg(tmpdir), gop_seconds=1.0,
+                                   incremental=True)
+        return encode_frames(tmpdir, str(Path(tmpdir) / "out.mp4"), 10.0, "h265_high",
+                             log_callback=logs.append, encoder=encoder)
+    
+    def _frames(self, tmpdir: str, count: int = 120):
+        for i in range(count):
+            (Path(tmpdir) / f"frame_{i:06d}.png").write_bytes(str(i).encode())
+    
+    def test_only_changed_segments(self):
+        """Test that a changed frame re-encodes its segment alone."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            self._frames(tmpdir)
+            logs = []
+            assert self._encode(tmpdir, logs), logs
+            assert "Encoding 120 frames as 3 segments" in "\n".join(logs)
+            assert (Path(tmpdir) / ".out.segments" / SEGMENT_MANIFEST).is_file()
+            
+            (Path(tmpdir) / "frame_000070.png").write_bytes(b"fixed")
+            logs = []
+            assert self._encode(tmpdir, logs), logs
+            
+            assert "2 of 3 segments are unchanged" in logs
+            assert any(m.startswith("Encoding 50 frames as 1 segments") for m in logs)
+            assert not any("[segment 0]" in m or "[segment 2]" in m for m in logs)
+            assert (Path(tmpdir) / "out.mp4").read_text() == "120"
+    
+    def test_settings_change(self):
+        """Test that other encoder settings re-encode every segment."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            self._frames(tmpdir)
+            assert self._encode(tmpdir, [])
+            
+            logs = []
+            encoder = SegmentedEncoder(jobs=2, ffmpeg_path=_ffmpeg(tmpdir), gop_seconds=1.0,
+                                       incremental=True)
+            assert encode_frames(tmpdir, str(Path(tmpdir) / "out.mp4"), 12.0, "h265_high",
+                                 log_callback=logs.append, encoder=encoder)
+            assert "0 of 2 segments are unchanged" in logs
+            assert len(list((Path(tmpdir) / ".out.segments").glob("segment_*.mp4"))) == 2
+    
+    def test_failed_segment_not_kept(self, monkeypatch):
+        """Test that a failed segment is encoded again on the next run."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            self._frames(tmpdir)
+            monkeypatch.setenv("FAKE_DROP_FRAMES", "1")
+            assert not self._encode(tmpdir, [])
+            
+            monkeypatch.delenv("FAKE_DROP_FRAMES")
+            logs = []
+            assert self._encode(tmpdir, logs), logs
+            assert any(m.startswith("Encoding 120 frames") for m in logs)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
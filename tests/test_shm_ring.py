@@ -0,0 +1,143 @@
+"""Tests for the shared-memory frame ring."""
+
+import tempfile
+import threading
+from pathlib import Path
+import numpy as np
+import pytest
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from looplab.render.shm_ring import FrameRing, start_writer_processes
+from looplab.render.image_writer import load_frame
+
+
+def _frame(index: int, width: int = 8, height: int = 4) -> np.ndarray:
+    """Create a distinguishable top-down RGBA frame."""
+    frame = np.zeros((height, width, 4), dtype=np.uint8)
+    frame[..., 0] = np.arange(height)[:, None]
+    frame[..., 1] = index
+    frame[..., 3] = 255
+    return frame
+
+
+class TestFrameRing:
+    """Tests for FrameRing."""
+    
+    def test_roundtrip(self):
+        """Test frames arrive in order with their frame numbers."""
+        with FrameRing.create(8, 4, slot_count=2) as ring:
+            consumer = FrameRing.attach(ring.name, consumer=0)
+            
+            ring.write(10, _frame(10))
+            frame, pixels = consumer.read(timeout=1)
+            assert frame == 10
+            np.testing.assert_array_equal(pixels, _frame(10))
+            consumer.release()
+            consumer.close()
+    
+    def test_slots_are_bottom_up(self):
+        """Test that slots use GL row order and views are flipped back."""
+        with FrameRing.create(8, 4) as ring:
+            slot = ring.acquire_slot()
+            slot[...] = _frame(0)[::-1]
+            ring.publish(0)
+            
+            consumer = FrameRing.attach(ring.name, consumer=0)
+            _, pixels = consumer.read(timeout=1)
+            assert pixels[0, 0, 0] == 0
+            consumer.close()
+    
+    def test_backpressure(self):
+        """Test that the producer blocks until consumers release slots."""
+        with FrameRing.create(8, 4, slot_count=2) as ring:
+            consumer = FrameRing.attach(ring.name, consumer=0)
+            ring.write(0, _frame(0))
+            ring.write(1, _frame(1))
+            
+            with pytest.raises(TimeoutError):
+                ring.acquire_slot(timeout=0.05)
+            
+            consumer.read(timeout=1)
+            consumer.release()
+            ring.write(2, _frame(2), timeout=1)
+            assert ring.write_seq == 3
+            consumer.close()
+    
+    def test_every_consumer_sees_every_frame(self):
+        """Test broadcast to several consumers and end of stream."""
+        with FrameRing.create(8, 4, slot_count=3, consumers=2) as ring:
+            results = {0: [], 1: []}
+            
+            def consume(index):
+                with FrameRing.attach(ring.name, consumer=index) as consumer:
+                    for frame, pixels in consumer.frames(timeout=5):
+                        results[index].append((frame, int(pixels[0, 0, 1])))
+            
+            threads = [threading.Thread(target=consume, args=(i,)) for i in range(2)]
+            for thread in threads:
+                thread.start()
+            for i in range(10):
+                ring.write(i, _frame(i), timeout=5)
+            ring.close_writer()
+            for thread in threads:
+                thread.join(5)
+            
+            expected = [(i, i) for i in range(10)]
+            assert results[0] == expected
+            assert results[1] == expected
+    
+    def test_invalid_consumer(self):
+        """Test that consumer indices are checked."""
+        with FrameRing.create(8, 4, consumers=1) as ring:
+            with pytest.raises(ValueError):
+                FrameRing.attach(ring.name, consumer=1)
+    
+    def test_writer_processes(self):
+        """Test frame writers in separate processes."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with FrameRing.create(8, 4, slot_count=2, consumers=2) as ring:
+                processes = start_writer_processes(ring, tmpdir, frame_format="npy")
+                for i in range(6):
+                    ring.write(i, _frame(i), timeout=10)
+                ring.close_writer()
+                for process in processes:
+                    process.join(10)
+                    assert process.exitcode == 0
+            
+            for i in range(6):
+                np.testing.assert_array_equal(
+                    load_frame(Path(tmpdir) / f"frame_{i:06d}.npy"), _frame(i)
+                )
+
+
+
+class TestWorkerRing:
+    """Tests for the offline worker's use of a frame ring."""
+    
+    def test_failed_render_closes_ring(self):
+        """Test that a render rejected by its memory plan ends the stream."""
+        pytest.importorskip("PySide6")
+        from looplab.render.offline_worker import OfflineRenderWorker
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with FrameRing.create(3840, 2160, slot_count=1) as ring:
+                consumer = FrameRing.attach(ring.name, consumer=0)
+                worker = OfflineRenderWorker()
+                worker.output_dir = tmpdir
+                worker.width, worker.height = 3840, 2160
+                worker.host_memory_budget_mb = 10
+                worker.frame_ring = ring
+                results = []
+                worker.finished.connect(results.append)
+                
+                worker.run()
+                
+                assert results == [False]
+                assert consumer.read(timeout=1) is None
+                consumer.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,74 @@
+"""Tests for the streaming frame API."""
+
+from pathlib import Path
+import numpy as np
+import pytest
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from looplab.app.models import Project
+from looplab.render import stream, RenderSettings
+
+
+SHADER = "void mainImage(out vec4 c, in vec2 p) { c = vec4(1.0); }"
+
+
+class TestRenderSettings:
+    """Tests for RenderSettings."""
+    
+    def test_from_dict(self):
+        """Test that dicts are checked against the settings fields."""
+        settings = RenderSettings.from_dict({"width": 320, "height": 240})
+        assert (settings.width, settings.height) == (320, 240)
+        
+        with pytest.raises(ValueError):
+            RenderSettings.from_dict({"widht": 320})
+    
+    def test_from_project(self):
+        """Test taking the timeline and offline settings of a project."""
+        project = Project(duration=10.0, seed=42.0)
+        project.offline.width = 640
+        project.offline.supersample_scale = 2
+        
+        settings = RenderSettings.from_project(project)
+        assert settings.duration == 10.0
+        assert settings.seed == 42.0
+        assert settings.width == 640
+        
+        uniforms = settings.create_uniform_manager()
+        assert uniforms.standard.resolution == (1280.0, 2160.0)
+    
+    def test_gpu_downsample_planned(self):
+        """Test that GPU downsampling is part of the memory plan."""
+        cpu = RenderSettings(width=640, height=360, supersample_scale=2)
+        gpu = RenderSettings(width=640, height=360, supersample_scale=2, gpu_downsample=True)
+        assert gpu.plan_memory().gpu_peak_bytes > cpu.plan_memory().gpu_peak_bytes
+
+
+class TestStream:
+    """Tests for argument checks, which run before any GL setup."""
+    
+    def test_is_lazy(self):
+        """Test that nothing is rendered until a frame is requested."""
+        frames = stream(SHADER, {"width": 64, "height": 32})
+        assert iter(frames) is frames
+        frames.close()
+    
+    def test_invalid_arguments(self):
+        """Test that bad settings, ranges and buffers fail immediately."""
+        settings = {"width": 64, "height": 32, "fps": 10.0, "duration": 1.0}
+        with pytest.raises(ValueError):
+            stream(SHADER, settings, end=20)
+        with pytest.raises(ValueError):
+            stream(SHADER, settings, out=np.zeros((64, 32, 4), dtype=np.uint8))
+        with pytest.raises(ValueError):
+            stream(SHADER, settings, out=np.zeros((32, 64, 4), dtype=np.float32))
+        with pytest.raises(ValueError):
+            stream(SHADER, settings, out=np.zeros((32, 64, 8), dtype=np.uint8)[..., :4])
+        with pytest.raises(ValueError):
+            stream(SHADER, {"width": 7680, "height": 4320, "host_memory_budget_mb": 1})
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
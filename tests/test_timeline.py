@@ -8,7 +8,7 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from looplab.render.timeline import Timeline, FrameInfo
+from looplab.render.timeline import Timeline, FrameInfo, get_shutter_offsets
 
 
 class TestTimeline:
@@ -125,6 +125,40 @@ class TestTimeline:
         frame_numbers = [f.frame for f in frames]
         assert len(set(frame_numbers)) == 900
     
+    def test_iter_frames_range(self):
+        """Test that partial ranges keep global frame numbers and phases."""
+        timeline = Timeline(duration=30.0, fps=30.0)
+        
+        frames = list(timeline.iter_frames(360, 420, 4))
+        
+        assert [f.frame for f in frames] == list(range(360, 420, 4))
+        assert frames[0] == timeline.get_frame_info(360)
+    
+    def test_frame_range_validation(self):
+        """Test that ranges outside the loop are rejected."""
+        timeline = Timeline(duration=1.0, fps=10.0)
+        
+        assert timeline.frame_range() == range(10)
+        with pytest.raises(ValueError):
+            timeline.frame_range(5, 11)
+        with pytest.raises(ValueError):
+            timeline.frame_range(6, 5)
+        with pytest.raises(ValueError):
+            timeline.frame_range(stride=0)
+    
+    def test_subframe_info_wraps(self):
+        """Test that sub-frames before frame 0 come from the loop end."""
+        timeline = Timeline(duration=30.0, fps=30.0)
+        
+        info = timeline.get_subframe_info(0, -0.5)
+        assert info.frame == 0
+        assert info.time == pytest.approx(30.0 - 0.5 / 30.0)
+        assert info.phase == pytest.approx(2.0 * math.pi * (1.0 - 0.5 / 900.0))
+        
+        info = timeline.get_subframe_info(899, 0.5)
+        assert info.time == pytest.approx(899.5 / 30.0)
+        assert timeline.get_subframe_info(10, 0.0) == timeline.get_frame_info(10)
+    
     def test_clamp_frame(self):
         """Test that out-of-range frames are clamped."""
         timeline = Timeline(duration=30.0, fps=30.0)
@@ -138,6 +172,31 @@ class TestTimeline:
         assert info.frame == 899
 
 
+class TestShutterOffsets:
+    """Tests for motion blur sample offsets."""
+    
+    def test_no_blur(self):
+        """Test that a closed shutter or single sample gives no offsets."""
+        assert get_shutter_offsets(8, 0.0) == [0.0] * 8
+        assert get_shutter_offsets(1, 180.0) == [0.0]
+    
+    def test_offsets_cover_shutter(self):
+        """Test that offsets are stratified and centred on the frame."""
+        for samples in (2, 4, 9, 16):
+            offsets = get_shutter_offsets(samples, 180.0)
+            
+            assert sum(offsets) == pytest.approx(0.0, abs=1e-12)
+            assert max(abs(o) for o in offsets) < 0.25
+            step = 0.5 / samples
+            slots = sorted(round((o + 0.25) / step - 0.5) for o in offsets)
+            assert slots == list(range(samples))
+    
+    def test_offsets_not_in_sample_order(self):
+        """Test that time offsets do not follow the jitter order."""
+        offsets = get_shutter_offsets(16, 360.0)
+        assert offsets != sorted(offsets)
+
+
 class TestFrameInfo:
     """Tests for FrameInfo named tuple."""
     
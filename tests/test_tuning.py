@@ -0,0 +1,238 @@
+"""Tests for encoder preset tuning and custom presets."""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from looplab.encode.ffmpeg import (
+    PRESETS, RenderInput, find_render_input, load_custom_presets, save_custom_preset
+)
+from looplab.encode.tuning import (
+    FASTEST, SMALLEST, TuneCandidate, choose_best, compare_frames, get_tuned_args,
+    has_vmaf, plan_sample, tune_preset
+)
+from looplab.encode import probe
+from looplab.render.frame_store import RawFrameStore
+
+
+# Stand-in FFmpeg: an "encode" writes a file recording its CRF (smaller for
+# slower speeds), decoding to PPM yields 16x16 frames whose error grows with
+# the CRF above 20, and libvmaf (when VMAF is set) scores 100 - CRF
+FAKE_FFMPEG = """
+import json, os, sys
+args = sys.argv[1:]
+if "-filters" in args:
+    print(" ... scale             V->V       Scale the input video.")
+    if VMAF:
+        print(" ... libvmaf           VV->V      Calculate the VMAF.")
+    sys.exit(0)
+
+frames = int(args[args.index("-frames:v") + 1])
+source = args[args.index("-i") + 1]
+crf = json.load(open(source))["crf"] if os.path.isfile(source) else 0
+
+if "-lavfi" in args:
+    graph = args[args.index("-lavfi") + 1]
+    path = graph.split("log_path='")[1].split("'")[0].replace("\\\\:", ":")
+    json.dump({"pooled_metrics": {"vmaf": {"mean": 100.0 - crf}}}, open(path, "w"))
+elif "image2pipe" in args:
+    error = max(0, crf - 20)
+    for _ in range(frames):
+        pixels = bytearray()
+        for i in range(16 * 16 * 3):
+            pixels.append(128 + (error if i % 2 else -error))
+        sys.stdout.buffer.write(b"P6\\n16 16\\n255\\n" + bytes(pixels))
+    sys.exit(0)
+else:
+    crf = int(args[args.index("-crf") + 1])
+    speed = args[args.index("-preset") + 1]
+    size = 1000 * (40 - crf) // (2 if speed == "slow" else 1)
+    json.dump({"crf": crf, "pad": "x" * size}, open(args[-1], "w"))
+print(f"frame={frames}\\nprogress=end", flush=True)
+"""
+
+
+def _ffmpeg(directory: str, vmaf: bool = False) -> str:
+    path = Path(directory) / ("ffmpeg_vmaf" if vmaf else "ffmpeg")
+    path.write_text(f"#!{sys.executable}\nVMAF = {vmaf}\n{FAKE_FFMPEG}")
+    path.chmod(0o755)
+    return str(path)
+
+
+@pytest.fixture(autouse=True)
+def probe_cache(tmp_path, monkeypatch):
+    """Keep FFmpeg probe results out of the user's config directory."""
+    monkeypatch.setattr(probe, "get_probe_cache_path", lambda: tmp_path / "probe.json")
+
+
+def _source(total_frames: int = 120) -> RenderInput:
+    return RenderInput(
+        input_args=lambda start: ["-start_number", str(start), "-i", "ref_%06d.png"],
+        total_frames=total_frames, fps=30.0, video_filters=[]
+    )
+
+
+class TestSearchHelpers:
+    """Tests for option rewriting, sampling and selection."""
+    
+    def test_tuned_args(self):
+        """Test that only the speed preset and CRF change."""
+        args = get_tuned_args(PRESETS["h264_high"], "fast", 24)
+        
+        assert args == ["-c:v", "libx264", "-preset", "fast", "-crf", "24",
+                        "-pix_fmt", "yuv420p"]
+        assert PRESETS["h264_high"].ffmpeg_args[3] == "slow"
+        with pytest.raises(ValueError):
+            get_tuned_args(PRESETS["prores_422"], "fast", 24)
+    
+    def test_sample_from_middle(self):
+        """Test that the sample clip is centred and clamped to the loop."""
+        assert plan_sample(900, 30.0, 4.0) == (390, 120)
+        assert plan_sample(60, 30.0, 4.0) == (0, 60)
+    
+    def test_choose_best(self):
+        """Test picking the fastest or smallest passing candidate."""
+        candidates = [
+            TuneCandidate("fast", 24, size=500, encode_seconds=1.0, passed=True),
+            TuneCandidate("slow", 24, size=300, encode_seconds=3.0, passed=True),
+            TuneCandidate("veryfast", 28, size=100, encode_seconds=0.5, passed=False),
+        ]
+        
+        assert choose_best(candidates, FASTEST).speed == "fast"
+        assert choose_best(candidates, SMALLEST).speed == "slow"
+        assert choose_best(candidates[2:]) is None
+
+
+class TestTuning:
+    """Tests for measuring and searching with a stand-in FFmpeg."""
+    
+    def test_compare_frames(self):
+        """Test local PSNR and SSIM of decoded frames."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            ffmpeg = _ffmpeg(tmpdir)
+            encoded = Path(tmpdir) / "clip.mp4"
+            encoded.write_text(json.dumps({"crf": 22}))
+            
+            scores = compare_frames(ffmpeg, str(encoded), ["-i", "ref_%06d.png"], [], 3)
+            
+            assert scores["frames"] == 3
+            assert scores["psnr"] == pytest.approx(42.11, abs=0.01)
+            assert 0.0 < scores["ssim"] < 1.0
+    
+    def test_finds_highest_passing_crf(self):
+        """Test that each speed's search stops at the last CRF meeting the target."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            ffmpeg = _ffmpeg(tmpdir)
+            messages = []
+            
+            result = tune_preset(_source(), metric="psnr", target=42.0, goal=SMALLEST,
+                                 speeds=["fast", "slow"], jobs=2, ffmpeg_path=ffmpeg,
+                                 log_callback=messages.append)
+            
+            assert result.sample_frames == 120
+            assert (result.best.speed, result.best.crf) == ("slow", 22)
+            assert all(not c.passed for c in result.candidates if c.crf > 22)
+            assert len(messages) == len(result.candidates) + 1
+            
+            preset = result.to_preset()
+            assert preset.ffmpeg_args[:6] == ["-c:v", "libx264", "-preset", "slow", "-crf", "22"]
+    
+    def test_vmaf(self):
+        """Test that auto picks VMAF when FFmpeg has libvmaf."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            assert not has_vmaf(_ffmpeg(tmpdir))
+            ffmpeg = _ffmpeg(tmpdir, vmaf=True)
+            assert has_vmaf(ffmpeg)
+            
+            result = tune_preset(_source(), target=75.0, speeds=["medium"],
+                                 ffmpeg_path=ffmpeg)
+            
+            assert result.metric == "vmaf"
+            assert result.best.crf == 25
+            assert result.best.score == pytest.approx(75.0)
+    
+    def test_target_out_of_reach(self):
+        """Test that no winner is reported when every CRF fails."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            result = tune_preset(_source(), metric="psnr", target=99.0, speeds=["fast"],
+                                 crf_range=(21, 30), ffmpeg_path=_ffmpeg(tmpdir))
+            
+            assert result.best is None
+            with pytest.raises(ValueError):
+                result.to_preset()
+    
+    def test_rejects_untunable_presets(self):
+        """Test that presets without speed and CRF options are refused."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with pytest.raises(ValueError):
+                tune_preset(_source(), base="prores_422", metric="psnr",
+                            ffmpeg_path=_ffmpeg(tmpdir))
+
+
+class TestCustomPresets:
+    """Tests for saving and loading custom presets."""
+    
+    def test_save_and_load(self):
+        """Test that a saved preset is registered and reloads."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "presets.json"
+            encoding = PRESETS["h264_high"]
+            try:
+                save_custom_preset("test_tuned", encoding, path, notes={"metric": "ssim"})
+                
+                assert PRESETS["test_tuned"] is encoding
+                loaded = load_custom_presets(path)["test_tuned"]
+                assert loaded.ffmpeg_args == encoding.ffmpeg_args
+                assert loaded.codec == encoding.codec
+            finally:
+                PRESETS.pop("test_tuned", None)
+    
+    def test_builtin_names_protected(self):
+        """Test that built-in presets cannot be replaced."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "presets.json"
+            with pytest.raises(ValueError):
+                save_custom_preset("h264_high", PRESETS["h264_medium"], path)
+            
+            path.write_text(json.dumps({"presets": {
+                "h264_high": {"name": "x", "codec": "h264", "extension": "mp4",
+                              "ffmpeg_args": []},
+                "broken": {"name": "y"},
+            }}))
+            assert load_custom_presets(path) == {}
+
+
+class TestRenderInput:
+    """Tests for finding a render's frames."""
+    
+    def test_image_sequence(self):
+        """Test finding a PNG sequence."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for i in range(3):
+                (Path(tmpdir) / f"frame_{i:06d}.png").write_bytes(b"")
+            
+            source = find_render_input(tmpdir, fps=24.0)
+            
+            assert source.total_frames == 3
+            assert source.input_args(2)[:2] == ["-start_number", "2"]
+            assert "24.0" in source.input_args(0)
+    
+    def test_frame_store(self):
+        """Test finding a frame store in an output directory."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            RawFrameStore.create(Path(tmpdir) / "frames.llraw", 8, 4, frame_count=5,
+                                 fps=25.0).close()
+            
+            source = find_render_input(tmpdir)
+            
+            assert (source.total_frames, source.fps) == (5, 25.0)
+            assert source.video_filters == ["vflip"]
+            assert find_render_input(str(Path(tmpdir) / "missing")) is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])